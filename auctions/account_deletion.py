@@ -12,7 +12,10 @@ Deletion happens in two steps:
    (:func:`cancel_deletion`, wired to the login signal in ``auctions.signals``) — the alternative is
    an irreversible mistake at 2am.
 2. :func:`delete_account` runs when the grace period is up (the ``delete_pending_accounts`` command,
-   daily via Celery beat) and is the irreversible part.
+   daily via Celery beat) and is the irreversible part. It runs as an AccountJob (see
+   ``auctions.account_jobs``): one step at a time, in short transactions, so the anonymizing of a
+   long-lived account's page views and lots doesn't lock those tables, and a deletion that was cut
+   off carries on from where it stopped the next day.
 
 What deletion means, and why it isn't a ``User.delete()``:
 
@@ -52,6 +55,8 @@ from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.utils import timezone
 
+from auctions.account_jobs import JobBusyError, delete_in_chunks, update_in_chunks
+
 logger = logging.getLogger(__name__)
 
 # How long a deletion request can be undone by signing in again. Long enough to cover "I meant to do
@@ -243,11 +248,11 @@ def _delete_personal_rows(user):
     SquareSeller.objects.filter(user=user).delete()
 
     # Preferences, interests and history — all of it is a profile of one person.
-    Watch.objects.filter(user=user).delete()
-    ChatSubscription.objects.filter(user=user).delete()
-    SearchHistory.objects.filter(user=user).delete()
-    CommandPaletteSearch.objects.filter(user=user).delete()
-    UserInterestCategory.objects.filter(user=user).delete()
+    delete_in_chunks(Watch.objects.filter(user=user))
+    delete_in_chunks(ChatSubscription.objects.filter(user=user))
+    delete_in_chunks(SearchHistory.objects.filter(user=user))
+    delete_in_chunks(CommandPaletteSearch.objects.filter(user=user))
+    delete_in_chunks(UserInterestCategory.objects.filter(user=user))
     UserIgnoreCategory.objects.filter(user=user).delete()
     AuctionIgnore.objects.filter(user=user).delete()
     # Promo-email campaigns carry the address they were sent to, so they go rather than unlink.
@@ -264,8 +269,14 @@ def _anonymize_page_views(user):
     """Keep the counts an auction's stats are built on; drop who and from where."""
     from auctions.models import PageView
 
-    PageView.objects.filter(user=user).update(
-        user=None, ip_address=None, session_id=None, user_agent=None, latitude=0, longitude=0
+    update_in_chunks(
+        PageView.objects.filter(user=user),
+        user=None,
+        ip_address=None,
+        session_id=None,
+        user_agent=None,
+        latitude=0,
+        longitude=0,
     )
 
 
@@ -277,37 +288,44 @@ def _anonymize_club_memberships(user):
     stops pointing at the account. A record that exists because the member signed themselves up, and
     that no admin has touched since, is the member's and is emptied and deactivated.
     """
-    from auctions.models import ClubHistory, ClubMember
+    from auctions.models import ClubMember
 
     for member in ClubMember.objects.filter(user=user).select_related("club"):
-        # Written with queryset updates rather than member.save(): ClubMember.save() re-links a
-        # user-less record to whichever account matches its email, which is what keeps club rosters
-        # attached to their members and would immediately undo the unlink here. It also fires the
-        # mailing-list sync, which has nothing to do here either way — a kept record keeps its
-        # contact, and a member's own record has its contact deleted outright by delete_account.
-        if member.admin_edited:
-            # contact_status is deliberately not touched. Marking do-not-contact would archive the
-            # club's Mailchimp contact and delete its Brevo one on the next sync, which is exactly
-            # the club-owned data this branch exists to leave alone.
-            ClubMember.objects.filter(pk=member.pk).update(user=None)
-            # member.name, not str(member), which falls back to the email address — this line is
-            # kept forever and must not be the one place the address survives.
-            who = member.name or f"Member #{member.pk}"
-            action = f"{who} deleted their site account; the club's member record was kept"
-        else:
-            ClubMember.objects.filter(pk=member.pk).update(
-                user=None,
-                name=DELETED_NAME,
-                email=None,
-                phone_number=None,
-                address="",
-                memo="",
-                discord_id=None,
-                discord_username=None,
-                is_deleted=True,
-            )
-            action = "A member who signed themselves up deleted their site account and their member record"
-        ClubHistory.objects.create(club=member.club, user=None, action=action, applies_to="MEMBERS")
+        with transaction.atomic():
+            _anonymize_club_membership(member)
+
+
+def _anonymize_club_membership(member):
+    from auctions.models import ClubHistory, ClubMember
+
+    # Written with queryset updates rather than member.save(): ClubMember.save() re-links a
+    # user-less record to whichever account matches its email, which is what keeps club rosters
+    # attached to their members and would immediately undo the unlink here. It also fires the
+    # mailing-list sync, which has nothing to do here either way — a kept record keeps its
+    # contact, and a member's own record has its contact deleted outright by delete_account.
+    if member.admin_edited:
+        # contact_status is deliberately not touched. Marking do-not-contact would archive the
+        # club's Mailchimp contact and delete its Brevo one on the next sync, which is exactly
+        # the club-owned data this branch exists to leave alone.
+        ClubMember.objects.filter(pk=member.pk).update(user=None)
+        # member.name, not str(member), which falls back to the email address — this line is
+        # kept forever and must not be the one place the address survives.
+        who = member.name or f"Member #{member.pk}"
+        action = f"{who} deleted their site account; the club's member record was kept"
+    else:
+        ClubMember.objects.filter(pk=member.pk).update(
+            user=None,
+            name=DELETED_NAME,
+            email=None,
+            phone_number=None,
+            address="",
+            memo="",
+            discord_id=None,
+            discord_username=None,
+            is_deleted=True,
+        )
+        action = "A member who signed themselves up deleted their site account and their member record"
+    ClubHistory.objects.create(club=member.club, user=None, action=action, applies_to="MEMBERS")
 
 
 def _anonymize_auction_records(user):
@@ -322,40 +340,46 @@ def _anonymize_auction_records(user):
     and only loses the account link. A row that exists because the person joined the auction
     themselves is theirs: name, email, phone and address all go.
     """
-    from auctions.models import AuctionHistory, AuctionTOS, Lot
+    from auctions.models import AuctionTOS, Lot
 
     # Queryset updates for the same reason as the club records: AuctionTOS.save() re-attaches a
     # row to the account matching its email, and its side effects (invoice recalculation, welcome
     # mail, duplicate merging) have no business running for someone who is leaving.
     for tos in AuctionTOS.objects.filter(user=user):
-        who = f"Bidder {tos.bidder_number}" if tos.bidder_number else f"Participant #{tos.pk}"
-        if tos.manually_added:
-            AuctionTOS.objects.filter(pk=tos.pk).update(user=None)
-            action = (
-                f"{who} deleted their site account.  An admin added this record, so it was kept "
-                "as-is and only the link to the account was removed."
-            )
-        else:
-            AuctionTOS.objects.filter(pk=tos.pk).update(
-                user=None, name=DELETED_NAME, email=None, phone_number=None, address=None
-            )
-            action = (
-                f"{who} deleted their site account.  Their name and contact details were removed; "
-                "the bidder number and every invoice amount were kept."
-            )
-        AuctionHistory.objects.create(auction_id=tos.auction_id, user=None, action=action, applies_to="USERS")
+        with transaction.atomic():
+            _anonymize_auction_record(tos)
 
     # Lots stay: they're part of an auction's results, and a buyer's invoice references them. The
     # seller is identified by the AuctionTOS record above, which is the auction's own copy.
     # A standalone lot is nobody else's record — it's a listing this person put up, and there's
-    # no longer anyone to sell it, so take it off the site (noted before the user link goes).
-    standalone_pks = list(
-        Lot.objects.filter(user=user, auction__isnull=True, is_deleted=False).values_list("pk", flat=True)
+    # no longer anyone to sell it, so take it off the site (before the user link goes, which is how
+    # it's found).
+    update_in_chunks(
+        Lot.objects.filter(user=user, auction__isnull=True, is_deleted=False, deactivated=False), deactivated=True
     )
-    Lot.objects.filter(user=user).update(user=None)
-    Lot.objects.filter(winner=user).update(winner=None)
-    if standalone_pks:
-        Lot.objects.filter(pk__in=standalone_pks).update(deactivated=True)
+    update_in_chunks(Lot.objects.filter(user=user), user=None)
+    update_in_chunks(Lot.objects.filter(winner=user), winner=None)
+
+
+def _anonymize_auction_record(tos):
+    from auctions.models import AuctionHistory, AuctionTOS
+
+    who = f"Bidder {tos.bidder_number}" if tos.bidder_number else f"Participant #{tos.pk}"
+    if tos.manually_added:
+        AuctionTOS.objects.filter(pk=tos.pk).update(user=None)
+        action = (
+            f"{who} deleted their site account.  An admin added this record, so it was kept "
+            "as-is and only the link to the account was removed."
+        )
+    else:
+        AuctionTOS.objects.filter(pk=tos.pk).update(
+            user=None, name=DELETED_NAME, email=None, phone_number=None, address=None
+        )
+        action = (
+            f"{who} deleted their site account.  Their name and contact details were removed; "
+            "the bidder number and every invoice amount were kept."
+        )
+    AuctionHistory.objects.create(auction_id=tos.auction_id, user=None, action=action, applies_to="USERS")
 
 
 def _redact_emails_from_history(emails, auction_pks, member_owned_club_pks):
@@ -418,35 +442,67 @@ def _scrub_profile(user):
     user.save()
 
 
+def _collect(job):
+    """Everything that reads the person's own records has to happen before anything blanks them."""
+    from auctions.models import AuctionTOS, ClubMember
+
+    user = job.user
+    job.state = {
+        "contacts": _marketing_contacts(user),
+        "emails": sorted(_personal_emails(user)),
+        "auction_pks": list(AuctionTOS.objects.filter(user=user).values_list("auction_id", flat=True)),
+        "member_owned_club_pks": list(
+            ClubMember.objects.filter(user=user, admin_edited=False).values_list("club_id", flat=True)
+        ),
+    }
+
+
+def _redact(job):
+    # After the anonymizing steps, so it also covers the history lines they just wrote.
+    _redact_emails_from_history(job.state["emails"], job.state["auction_pks"], job.state["member_owned_club_pks"])
+
+
+def _scrub(job):
+    with transaction.atomic():
+        _scrub_profile(job.user)
+
+
+def _delete_marketing_contacts(job):
+    from auctions.tasks import delete_marketing_contact
+
+    # Marketing lists are someone else's API and can fail; they get a task of their own.
+    for club_pk, email in job.state["contacts"]:
+        transaction.on_commit(lambda club_pk=club_pk, email=email: delete_marketing_contact.delay(club_pk, email))
+
+
+# The steps of a deletion AccountJob. Each one can be run again if it was cut off partway.
+STEPS = (
+    ("collect", _collect),
+    ("sign_in_identities", lambda job: _delete_sign_in_identities(job.user)),
+    ("personal_rows", lambda job: _delete_personal_rows(job.user)),
+    ("page_views", lambda job: _anonymize_page_views(job.user)),
+    ("club_memberships", lambda job: _anonymize_club_memberships(job.user)),
+    ("auction_records", lambda job: _anonymize_auction_records(job.user)),
+    ("redact_history", _redact),
+    ("profile", _scrub),
+    ("marketing_contacts", _delete_marketing_contacts),
+)
+
+
 def delete_account(user):
     """Delete *user*'s personal data for good. Not reversible; see the module docstring.
 
     Returns the (now anonymous) User row, which stays so that bids, invoices and sold lots keep
-    resolving. Safe to call twice — every step is idempotent.
+    resolving. Safe to call twice — every step is idempotent — and if an earlier run was cut off,
+    this carries on from the step it stopped at. Raises account_jobs.JobBusyError if another worker
+    is deleting the account right now.
     """
-    from auctions.models import AuctionTOS, ClubMember
-    from auctions.tasks import delete_marketing_contact
+    from auctions import account_jobs
+    from auctions.models import AccountJob
 
-    # Everything that reads the person's own records has to happen before anything blanks them.
-    contacts = _marketing_contacts(user)
-    emails = _personal_emails(user)
-    auction_pks = list(AuctionTOS.objects.filter(user=user).values_list("auction_id", flat=True))
-    member_owned_club_pks = list(
-        ClubMember.objects.filter(user=user, admin_edited=False).values_list("club_id", flat=True)
-    )
-    with transaction.atomic():
-        _delete_sign_in_identities(user)
-        _delete_personal_rows(user)
-        _anonymize_page_views(user)
-        _anonymize_club_memberships(user)
-        _anonymize_auction_records(user)
-        # After the two above, so it also covers the history lines they just wrote.
-        _redact_emails_from_history(emails, auction_pks, member_owned_club_pks)
-        _scrub_profile(user)
-    # Marketing lists are someone else's API and can fail; keep them out of the transaction.
-    for club_pk, email in contacts:
-        transaction.on_commit(lambda club_pk=club_pk, email=email: delete_marketing_contact.delay(club_pk, email))
+    account_jobs.run(account_jobs.start(AccountJob.DELETE, user))
     logger.info("Account deleted for user %s", user.pk)
+    user.refresh_from_db()
     return user
 
 
@@ -467,6 +523,9 @@ def process_due_deletions(now=None):
         try:
             delete_account(user)
             count += 1
+        except JobBusyError:
+            # Still due, so whichever run finishes it, or the next one, will count it.
+            logger.info("Deletion of user %s is already running", user.pk)
         except Exception:
             # One account's club integration failing must not stall everyone else's deletion.
             logger.exception("Failed to delete account for user %s", user.pk)
@@ -0,0 +1,524 @@
+"""Merging, deleting and purging accounts a step at a time.
+
+UserData.merge_into used to do everything in one transaction: it walked the account's unique
+relations row by row, then moved its lots, invoices, bids, page views and the rest with one UPDATE
+each. Account deletion and purge_bot_users did the same. For an account that had been around for
+years, that transaction held row locks on the busiest tables on the site for as long as it ran, and
+bids on those lots waited behind it.
+
+An :class:`~auctions.models.AccountJob` is one merge, deletion or purge, split into steps. :func:`run`
+goes through the steps in order and records each one as it finishes. A step moves its rows CHUNK at a
+time, each chunk in a transaction of its own, and only ever touches rows still pointing at the old
+account, so running a step again is harmless and a job that was interrupted picks up at the step it
+was on. Unique relations (watched lots, ignored auctions, chat subscriptions, ...) drop the rows the
+target account already has a chunk at a time, then move the rest.
+
+:func:`run` leases the job first, so two workers never run the same job; a caller that finds the job
+leased gets :class:`JobBusyError` rather than a job that looks done. ``resume_account_jobs`` requeues
+any unfinished job whose lease has run out, until it has failed MAX_ATTEMPTS times; then it is logged
+as an error and left for someone to look at (``last_error`` says which step and why).
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Rows moved or deleted per statement.
+CHUNK = 500
+# A worker that hasn't finished a step in this long is assumed dead, and the job is handed to another.
+LEASE = datetime.timedelta(minutes=30)
+# Failed runs after which resume_account_jobs stops retrying a job. Running it by hand still works.
+MAX_ATTEMPTS = 5
+
+
+class JobBusyError(Exception):
+    """Another worker is running the job."""
+
+
+def update_in_chunks(queryset, **changes):
+    """``queryset.update(**changes)``, CHUNK rows per statement. ``queryset`` has to stop matching a
+    row once it has been updated."""
+    model = queryset.model
+    while True:
+        pks = list(queryset.values_list("pk", flat=True)[:CHUNK])
+        if not pks:
+            return
+        model.objects.filter(pk__in=pks).update(**changes)
+
+
+def delete_in_chunks(queryset):
+    """``queryset.delete()``, CHUNK rows at a time."""
+    model = queryset.model
+    while True:
+        pks = list(queryset.values_list("pk", flat=True)[:CHUNK])
+        if not pks:
+            return
+        model.objects.filter(pk__in=pks).delete()
+
+
+def start(kind, user, target=None):
+    """The unfinished ``kind`` job for ``user`` (and ``target``), or a new one."""
+    from auctions.models import AccountJob
+
+    job = (
+        AccountJob.objects.filter(kind=kind, user=user, target=target, finished_on__isnull=True).order_by("pk").first()
+    )
+    return job or AccountJob.objects.create(kind=kind, user=user, target=target)
+
+
+def queue(kind, user, target=None):
+    """:func:`start` a job and run it in the background once this transaction commits."""
+    from auctions.tasks import run_account_job
+
+    job = start(kind, user, target)
+    transaction.on_commit(lambda: run_account_job.delay(job.pk))
+    return job
+
+
+def steps(job):
+    """[(name, step(job))] for ``job``'s kind."""
+    from auctions import account_deletion
+    from auctions.models import AccountJob
+
+    return {
+        AccountJob.MERGE: MERGE_STEPS,
+        AccountJob.DELETE: account_deletion.STEPS,
+        AccountJob.PURGE: PURGE_STEPS,
+    }[job.kind]
+
+
+def run(job):
+    """Run ``job``'s remaining steps. Raises JobBusyError, doing nothing, if another worker has it."""
+    from auctions.models import AccountJob
+
+    now = timezone.now()
+    lease = now + LEASE
+    available = Q(leased_until__isnull=True) | Q(leased_until__lt=now)
+    if not AccountJob.objects.filter(available, pk=job.pk, finished_on__isnull=True).update(leased_until=lease):
+        msg = f"The {job} is already being run"
+        raise JobBusyError(msg)
+    todo = steps(job)
+    name = None
+    try:
+        while job.steps_done < len(todo):
+            name, step = todo[job.steps_done]
+            step(job)
+            job.steps_done += 1
+            job.leased_until = timezone.now() + LEASE
+            job.save(update_fields=["user", "steps_done", "state", "leased_until"])
+    except Exception as e:
+        job.attempts += 1
+        AccountJob.objects.filter(pk=job.pk).update(
+            last_error=f"{name}: {e}"[:1000], attempts=job.attempts, leased_until=None
+        )
+        if job.attempts == MAX_ATTEMPTS:
+            logger.error("Giving up on the %s (job %s) after %s attempts: %s: %s", job, job.pk, job.attempts, name, e)
+        raise
+    # the state of a deletion is the addresses it's removing; they don't outlive it
+    job.state = {}
+    job.leased_until = None
+    job.last_error = ""
+    job.finished_on = timezone.now()
+    job.save(update_fields=["state", "leased_until", "last_error", "finished_on"])
+    return True
+
+
+def resumable(now=None):
+    """Unfinished jobs nobody holds a lease on, that haven't failed MAX_ATTEMPTS times."""
+    from auctions.models import AccountJob
+
+    now = now or timezone.now()
+    return AccountJob.objects.filter(finished_on__isnull=True, attempts__lt=MAX_ATTEMPTS).filter(
+        Q(leased_until__isnull=True) | Q(leased_until__lt=now)
+    )
+
+
+# Merging
+
+
+def _merge_profile(job):
+    """Copy what the target's profile is missing from the source's, add up the credit, and empty the
+    source's -- together, so a rerun can't count the credit twice."""
+    from auctions.models import (
+        UserData,
+        get_default_can_create_auctions,
+        get_default_can_submit_lots,
+        get_default_is_trusted,
+        get_default_paypal_enabled,
+        get_default_square_enabled,
+    )
+
+    with transaction.atomic():
+        UserData.objects.get_or_create(user=job.target)
+        source, target = (
+            UserData.objects.select_for_update().get(user=job.user),
+            UserData.objects.select_for_update().get(user=job.target),
+        )
+        target_updates = set()
+        for field in [
+            "phone_number",
+            "address",
+            "location",
+            "club",
+            "last_auction_used",
+            "last_club_used",
+            "location_coordinates",
+            "paypal_email_address",
+            "preferred_bidder_number",
+            "timezone",
+        ]:
+            source_value = getattr(source, field, None)
+            target_value = getattr(target, field, None)
+            if target_value in (None, "") and source_value not in (None, ""):
+                setattr(target, field, source_value)
+                target_updates.add(field)
+        if not target.latitude and source.latitude:
+            target.latitude = source.latitude
+            target_updates.add("latitude")
+        if not target.longitude and source.longitude:
+            target.longitude = source.longitude
+            target_updates.add("longitude")
+        if source.credit:
+            target.credit = (target.credit or 0) + source.credit
+            target_updates.add("credit")
+        for field in [
+            "can_submit_standalone_lots",
+            "can_create_club_auctions",
+            "paypal_enabled",
+            "square_enabled",
+            "is_trusted",
+        ]:
+            if getattr(source, field) and not getattr(target, field):
+                setattr(target, field, True)
+                target_updates.add(field)
+        if target_updates:
+            target.save(update_fields=list(target_updates))
+
+        source.phone_number = None
+        source.address = None
+        source.location = None
+        source.club = None
+        source.last_auction_used = None
+        source.last_club_used = None
+        source.latitude = 0
+        source.longitude = 0
+        source.location_coordinates = None
+        source.paypal_email_address = None
+        source.credit = 0
+        source.preferred_bidder_number = ""
+        source.can_submit_standalone_lots = get_default_can_submit_lots()
+        source.can_create_club_auctions = get_default_can_create_auctions()
+        source.paypal_enabled = get_default_paypal_enabled()
+        source.square_enabled = get_default_square_enabled()
+        source.is_trusted = get_default_is_trusted()
+        source.save(
+            update_fields=[
+                "phone_number",
+                "address",
+                "location",
+                "club",
+                "last_auction_used",
+                "last_club_used",
+                "latitude",
+                "longitude",
+                "location_coordinates",
+                "paypal_email_address",
+                "credit",
+                "preferred_bidder_number",
+                "can_submit_standalone_lots",
+                "can_create_club_auctions",
+                "paypal_enabled",
+                "square_enabled",
+                "is_trusted",
+            ]
+        )
+
+
+def _reassign(job):
+    """Point the source's auctions, lots, invoices, bids, page views and searches at the target."""
+    from auctions.models import (
+        Auction,
+        AuctionCampaign,
+        Bid,
+        Invoice,
+        Lot,
+        PageView,
+        PickupLocation,
+        SearchHistory,
+    )
+
+    for model, field in [
+        (Auction, "created_by"),
+        (PickupLocation, "user"),
+        (Invoice, "buyer"),
+        (Lot, "user"),
+        (Lot, "winner"),
+        (Bid, "user"),
+        (PageView, "user"),
+        (AuctionCampaign, "user"),
+        (SearchHistory, "user"),
+    ]:
+        update_in_chunks(model.objects.filter(**{field: job.user}), **{field: job.target})
+
+
+def _merge_chat_subscriptions(duplicates, target):
+    from auctions.models import ChatSubscription
+
+    targets = {
+        item.lot_id: item
+        for item in ChatSubscription.objects.filter(user=target, lot__in=[item.lot_id for item in duplicates])
+    }
+    for source_item in duplicates:
+        target_item = targets[source_item.lot_id]
+        if source_item.last_seen and (not target_item.last_seen or source_item.last_seen > target_item.last_seen):
+            target_item.last_seen = source_item.last_seen
+        if source_item.last_notification_sent and (
+            not target_item.last_notification_sent
+            or source_item.last_notification_sent > target_item.last_notification_sent
+        ):
+            target_item.last_notification_sent = source_item.last_notification_sent
+        if source_item.unsubscribed:
+            target_item.unsubscribed = True
+    ChatSubscription.objects.bulk_update(
+        list(targets.values()), ["last_seen", "last_notification_sent", "unsubscribed"]
+    )
+
+
+def _merge_interests(duplicates, target):
+    from auctions.models import UserInterestCategory
+
+    targets = {
+        item.category_id: item
+        for item in UserInterestCategory.objects.filter(
+            user=target, category__in=[item.category_id for item in duplicates]
+        )
+    }
+    for source_item in duplicates:
+        target_item = targets[source_item.category_id]
+        target_item.interest = max(target_item.interest, source_item.interest)
+    UserInterestCategory.objects.bulk_update(list(targets.values()), ["interest"])
+
+
+def _merge_unique(model, key, job, merge=None):
+    """Move the source's ``model`` rows to the target, dropping (after ``merge(rows, target)``) the
+    ones whose ``key`` the target already has."""
+    duplicates = model.objects.filter(
+        user=job.user, **{f"{key}__in": model.objects.filter(user=job.target).values(key)}
+    ).order_by("pk")
+    while True:
+        rows = list(duplicates[:CHUNK])
+        if not rows:
+            break
+        with transaction.atomic():
+            if merge:
+                merge(rows, job.target)
+            model.objects.filter(pk__in=[row.pk for row in rows]).delete()
+    update_in_chunks(model.objects.filter(user=job.user), user=job.target)
+
+
+def _merge_unique_relations(job):
+    from auctions.models import AuctionIgnore, ChatSubscription, UserIgnoreCategory, UserInterestCategory, Watch
+
+    _merge_unique(AuctionIgnore, "auction_id", job)
+    _merge_unique(UserIgnoreCategory, "category_id", job)
+    _merge_unique(Watch, "lot_number_id", job)
+    _merge_unique(ChatSubscription, "lot_id", job, merge=_merge_chat_subscriptions)
+    _merge_unique(UserInterestCategory, "category_id", job, merge=_merge_interests)
+    # as_percent is relative to the user's strongest interest, which may just have changed
+    for interest in UserInterestCategory.objects.filter(user=job.target):
+        interest.save()
+
+
+def _merge_auction_tos(job):
+    from auctions.models import AuctionTOS
+
+    for source_tos in AuctionTOS.objects.filter(user=job.user).select_related("auction").order_by("pk"):
+        with transaction.atomic():
+            target_tos = (
+                AuctionTOS.objects.filter(user=job.target, auction=source_tos.auction)
+                .exclude(pk=source_tos.pk)
+                .order_by("createdon")
+                .first()
+            )
+            if target_tos:
+                target_tos.merge_duplicate(
+                    source_tos,
+                    reason=f"merged from user account {job.user.username}",
+                )
+            else:
+                source_tos.user = job.target
+                source_tos.save()
+
+
+def _merge_club_member(source_member, target):
+    from auctions.models import AuctionTOS, BapAward, ClubMember, InvoicePayment
+
+    target_member = (
+        ClubMember.objects.filter(club=source_member.club, user=target)
+        .exclude(pk=source_member.pk)
+        .order_by("pk")
+        .first()
+    )
+    if not target_member:
+        source_member.user = target
+        source_member.save(update_fields=["user"])
+        return
+
+    member_updates = set()
+    for field in [
+        "name",
+        "email",
+        "phone_number",
+        "address",
+        "discord_id",
+        "discord_username",
+        "discord_roles",
+        "membership_last_paid",
+        "membership_expiration_date",
+        "membership_expiration_reminder_due",
+        "discord_role_override",
+        "last_discord_role_assigned",
+        "bidder_number",
+    ]:
+        source_value = getattr(source_member, field, None)
+        target_value = getattr(target_member, field, None)
+        if target_value in (None, "") and source_value not in (None, ""):
+            setattr(target_member, field, source_value)
+            member_updates.add(field)
+    for field in [
+        "permission_admin",
+        "permission_view",
+        "permission_export",
+        "permission_add_edit",
+        "permission_edit_club",
+        "permission_money",
+        "permission_manage_auctions",
+        "permission_manage_bap",
+        "permission_manage_donations",
+        "permission_send_announcements",
+    ]:
+        if getattr(source_member, field) and not getattr(target_member, field):
+            setattr(target_member, field, True)
+            member_updates.add(field)
+    for field in [
+        "bap_points",
+        "hap_points",
+        "culture_points",
+        "bap_points_ytd",
+        "hap_points_ytd",
+        "culture_points_ytd",
+    ]:
+        if getattr(source_member, field) and not getattr(target_member, field):
+            setattr(target_member, field, getattr(source_member, field))
+            member_updates.add(field)
+    if not source_member.is_deleted and target_member.is_deleted:
+        target_member.is_deleted = False
+        member_updates.add("is_deleted")
+    if member_updates:
+        target_member.save(update_fields=list(member_updates))
+
+    BapAward.objects.filter(club_member=source_member).update(club_member=target_member)
+    InvoicePayment.objects.filter(club_member=source_member).update(club_member=target_member)
+    AuctionTOS.objects.filter(clubmember=source_member).update(clubmember=target_member)
+    if target_member.bap_awards.exists():
+        BapAward.recalculate_member_points(target_member)
+    source_member.user = None
+    source_member.is_deleted = True
+    source_member.save(update_fields=["user", "is_deleted"])
+
+
+def _merge_club_members(job):
+    from auctions.models import ClubMember
+
+    for source_member in ClubMember.objects.filter(user=job.user).select_related("club").order_by("pk"):
+        with transaction.atomic():
+            _merge_club_member(source_member, job.target)
+
+
+def _merge_payment_accounts(job):
+    from auctions.models import PayPalSeller, SquareSeller
+
+    for model, field_names in [
+        (
+            PayPalSeller,
+            ["paypal_merchant_id", "currency", "payer_email"],
+        ),
+        (
+            SquareSeller,
+            [
+                "square_merchant_id",
+                "access_token",
+                "refresh_token",
+                "token_expires_at",
+                "currency",
+                "payer_email",
+            ],
+        ),
+    ]:
+        with transaction.atomic():
+            source_record = model.objects.filter(user=job.user).first()
+            if not source_record:
+                continue
+            target_record = model.objects.filter(user=job.target).first()
+            if not target_record:
+                source_record.user = job.target
+                source_record.save(update_fields=["user"])
+                continue
+            payment_updates = set()
+            for field in field_names:
+                source_value = getattr(source_record, field, None)
+                target_value = getattr(target_record, field, None)
+                if target_value in (None, "") and source_value not in (None, ""):
+                    setattr(target_record, field, source_value)
+                    payment_updates.add(field)
+            if payment_updates:
+                target_record.save(update_fields=list(payment_updates))
+            source_record.delete()
+
+
+def _recount_bidder_metrics(job):
+    from auctions import bidder_metrics
+
+    bidder_metrics.recount_user(job.target_id)
+
+
+MERGE_STEPS = (
+    ("profile", _merge_profile),
+    ("reassign", _reassign),
+    ("unique_relations", _merge_unique_relations),
+    ("auction_tos", _merge_auction_tos),
+    ("club_members", _merge_club_members),
+    ("payment_accounts", _merge_payment_accounts),
+    ("bidder_metrics", _recount_bidder_metrics),
+)
+
+
+# Purging
+
+
+def _delete_history(job):
+    """The rows a busy bot leaves most of, ahead of the cascade that deletes the rest."""
+    from auctions.models import PageView, SearchHistory, UserInterestCategory
+
+    for model in (PageView, SearchHistory, UserInterestCategory):
+        delete_in_chunks(model.objects.filter(user=job.user))
+
+
+def _delete_user(job):
+    user, job.user = job.user, None
+    if user is not None:
+        logger.info("Deleting %s", user)
+        user.delete()
+
+
+PURGE_STEPS = (
+    ("history", _delete_history),
+    ("user", _delete_user),
+)
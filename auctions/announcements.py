@@ -288,38 +288,29 @@ def refresh_email_opens(announcement):
 
 
 def _send_pushes(announcement):
-    """Enqueue one push per reachable member. Returns how many members it was handed to.
+    """Queue the push to every reachable member. Returns how many members it was handed to.
 
     The count is *delivery*, not readership: no channel here can tell a club who read something.
     Sending is queued rather than done here: a club with 400 members must not hold a form POST open
-    while 400 FCM calls go out.
+    while 400 FCM calls go out. It goes out as a few batch tasks (notifications.enqueue_push_batch)
+    rather than one task per member, so a club-wide announcement doesn't bury the worker queue.
 
     The whole announcement is the notification body -- it is capped at MAX_LENGTH precisely so it
     fits in one -- and tapping it opens the club's page, because there is nothing left to read that
     the notification did not already say.
     """
-    from auctions.notifications import CATEGORY_CLUB_ANNOUNCEMENT
-    from auctions.tasks import send_push_to_user
-
-    url = club_url(announcement.club)
-    sent = 0
-    for member in reachable_members(announcement.club).select_related("user"):
-        try:
-            send_push_to_user.delay(
-                member.user_id,
-                title=announcement.club.name,
-                body=announcement.text.strip(),
-                url=url,
-                category=CATEGORY_CLUB_ANNOUNCEMENT,
-                # One announcement, one notification: a phone that was off all day shows the latest
-                # one rather than a stack of them.
-                collapse_key=f"club_announcement_{announcement.club_id}",
-            )
-        except Exception:
-            logger.exception("Could not enqueue announcement push for member %s", member.pk)
-            continue
-        sent += 1
-    return sent
+    from auctions.notifications import CATEGORY_CLUB_ANNOUNCEMENT, enqueue_push_batch
+
+    return enqueue_push_batch(
+        reachable_members(announcement.club).values_list("user_id", flat=True),
+        title=announcement.club.name,
+        body=announcement.text.strip(),
+        url=club_url(announcement.club),
+        category=CATEGORY_CLUB_ANNOUNCEMENT,
+        # One announcement, one notification: a phone that was off all day shows the latest one
+        # rather than a stack of them.
+        collapse_key=f"club_announcement_{announcement.club_id}",
+    )
 
 
 def send_due(now=None):
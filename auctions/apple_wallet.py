@@ -16,6 +16,8 @@ Public entry points:
     generate_pkpass_for_member(member)       -> bytes  (raw .pkpass zip data)
     ensure_apple_pass_auth_token(member)     -> str    (per-pass web service secret)
     send_pass_update_notification(registration) -> bool (True = registration still valid)
+    push_pass_update(push_token) / handle_pass_update_response(registration, response)
+                                             -> the two halves of the above, for batch sends
 """
 
 from __future__ import annotations
@@ -342,16 +344,14 @@ def _apns_client() -> httpx.Client:
     return httpx.Client(http2=True, cert=_apns_cert_path(), timeout=10)
 
 
-def send_pass_update_notification(registration) -> bool:
-    """Tell one registered device its pass changed; the device then re-fetches it.
+def push_pass_update(push_token: str) -> httpx.Response:
+    """POST the (empty) pass-update push for one device token and return APNs' response.
 
-    The push is an empty payload with the pass type identifier as the topic — that
-    is the entire PassKit update protocol. Returns False (and deletes the
-    registration) when APNs says the token is dead, e.g. the user removed the pass
-    while offline. Raises httpx.HTTPError on transient failures so Celery retries.
+    Only the HTTP half of send_pass_update_notification: no database access, so
+    wallet_refresh can run many of these at once over the shared HTTP/2 connection.
     """
-    response = _apns_client().post(
-        f"{APNS_URL}/3/device/{registration.push_token}",
+    return _apns_client().post(
+        f"{APNS_URL}/3/device/{push_token}",
         json={"aps": {}},
         headers={
             "apns-topic": settings.APPLE_WALLET_PASS_TYPE_IDENTIFIER,
@@ -359,6 +359,13 @@ def send_pass_update_notification(registration) -> bool:
             "apns-priority": "10",
         },
     )
+
+
+def handle_pass_update_response(registration, response: httpx.Response) -> bool:
+    """Act on APNs' answer to a push: True if delivered, False (registration deleted) if the token is dead.
+
+    Raises httpx.HTTPError for anything transient.
+    """
     if response.status_code == 200:
         return True
     try:
@@ -378,3 +385,14 @@ def send_pass_update_notification(registration) -> bool:
         return False
     response.raise_for_status()
     return True
+
+
+def send_pass_update_notification(registration) -> bool:
+    """Tell one registered device its pass changed; the device then re-fetches it.
+
+    The push is an empty payload with the pass type identifier as the topic — that
+    is the entire PassKit update protocol. Returns False (and deletes the
+    registration) when APNs says the token is dead, e.g. the user removed the pass
+    while offline. Raises httpx.HTTPError on transient failures so Celery retries.
+    """
+    return handle_pass_update_response(registration, push_pass_update(registration.push_token))
@@ -0,0 +1,117 @@
+"""Monthly BAP/HAP/CAP totals per club member, for the leaderboard charts.
+
+The BAP tab of a club's page draws a cumulative points-over-time chart for the top ten of each
+leaderboard (up to six of them) and one for the member looking at it. Each chart grouped every
+award of those members by month, then added up everything before the chart's first month, on
+every view. The tab got slower with every year of awards a club kept.
+
+BapAward.recalculate_member_points runs whenever an award is saved or deleted, and when a club's
+points are recalculated. It now also rewrites the member's
+:class:`~auctions.models.BapMonthlyPoints`: one row per month, leaving out awards for deleted or
+banned lots just as the leaderboard does. :func:`cumulative` builds the running totals from those
+rows and caches them per club and leaderboard until the next award change. :func:`member_cumulative`
+does the same for one member's chart, without the cache.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+
+# BapAward's (and BapMonthlyPoints') point fields.
+FIELDS = ("points", "hap_points", "cap_points")
+# The ClubMember fields a leaderboard ranks by; one cached chart each.
+RANK_FIELDS = (
+    "bap_points",
+    "bap_points_ytd",
+    "hap_points",
+    "hap_points_ytd",
+    "culture_points",
+    "culture_points_ytd",
+)
+# Award changes clear the cache; this only bounds how long an orphaned entry lingers.
+CACHE_SECONDS = 60 * 60 * 24
+
+
+def _key(club_pk, rank_field):
+    return f"bap_chart:{club_pk}:{rank_field}"
+
+
+def record(member, awards):
+    """Replace ``member``'s BapMonthlyPoints with the monthly totals of ``awards``, the ones that count
+    toward their standings."""
+    from auctions.models import BapMonthlyPoints
+
+    totals = defaultdict(lambda: [0, 0, 0])
+    for award in awards:
+        total = totals[award.date.replace(day=1)]
+        for i, field in enumerate(FIELDS):
+            total[i] += getattr(award, field)
+    with transaction.atomic():
+        BapMonthlyPoints.objects.filter(club_member=member).delete()
+        BapMonthlyPoints.objects.bulk_create(
+            [
+                BapMonthlyPoints(club_member=member, month=month, **dict(zip(FIELDS, total, strict=True)))
+                for month, total in totals.items()
+            ]
+        )
+    # Only once the new rows are visible: a chart drawn from the old ones in between would be cached
+    # for CACHE_SECONDS.
+    keys = [_key(member.club_id, rank_field) for rank_field in RANK_FIELDS]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def cumulative(club, member_pks, rank_field, field, months, is_ytd=False):
+    """{member pk: running total of ``field`` at the end of each of ``months``} for the members of
+    ``club``'s ``rank_field`` leaderboard. Without ``is_ytd`` the totals start from everything
+    before the first month."""
+    from auctions.models import BapMonthlyPoints
+
+    key = _key(club.pk, rank_field)
+    params = (field, is_ytd, months[0], months[-1], len(months))
+    cached = cache.get(key)
+    if cached and cached["params"] == params and all(pk in cached["series"] for pk in member_pks):
+        return cached["series"]
+
+    rows = BapMonthlyPoints.objects.filter(club_member__in=member_pks)
+    initial = defaultdict(int)
+    if not is_ytd:
+        for row in rows.filter(month__lt=months[0]).values("club_member_id").annotate(total=Sum(field)).order_by():
+            initial[row["club_member_id"]] = row["total"] or 0
+    monthly = defaultdict(dict)
+    for member_pk, month, points in rows.filter(month__gte=months[0], month__lte=months[-1]).values_list(
+        "club_member_id", "month", field
+    ):
+        monthly[member_pk][month] = points
+
+    series = {}
+    for member_pk in member_pks:
+        running = initial[member_pk]
+        data = []
+        for month in months:
+            running += monthly[member_pk].get(month, 0)
+            data.append(running)
+        series[member_pk] = data
+    cache.set(key, {"params": params, "series": series}, CACHE_SECONDS)
+    return series
+
+
+def member_cumulative(member, months):
+    """{field: running total at the end of each of ``months``} for each of FIELDS, all time."""
+    from auctions.models import BapMonthlyPoints
+
+    rows = BapMonthlyPoints.objects.filter(club_member=member)
+    initial = rows.filter(month__lt=months[0]).aggregate(**{field: Sum(field) for field in FIELDS})
+    monthly = {row["month"]: row for row in rows.filter(month__gte=months[0]).values("month", *FIELDS)}
+    series = {}
+    for field in FIELDS:
+        running = initial[field] or 0
+        data = []
+        for month in months:
+            running += monthly.get(month, {}).get(field, 0)
+            data.append(running)
+        series[field] = data
+    return series
@@ -0,0 +1,173 @@
+"""Per-(auction, user) bid and lot-view counts behind the "sus" sort on the auction users page.
+
+add_tos_info() used to count, for every AuctionTOS row on the page, that user's bids in the auction
+and the distinct lots they viewed there -- two correlated subqueries joining the Bid and PageView
+tables through Lot, the two biggest tables on the site. Sorting a 400-bidder auction by trust ran
+800 of them per click.
+
+:class:`~auctions.models.BidderMetrics` keeps those two numbers, so add_tos_info() reads them with
+one lookup on the (auction, user) unique index instead. They are kept current as things happen:
+
+- a new bid adds one to ``lots_bid`` (which has always counted bids, not distinct lots);
+- a user's first view of a lot adds one to ``lots_viewed``;
+- a bid being deleted, or any change made with a queryset ``update()``, recounts the pair(s).
+
+The first event for a pair counts it from scratch, so a missing row is never guessed at.  Anything
+that moves bids or views without telling us (a lot moved to another auction, an admin script) is
+put right by :func:`reconcile_recent`, which the nightly ``reconcile_bidder_metrics`` task runs.
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Auctions that started or ended within this many days get recounted each night; older ones don't
+# take new bids and their views no longer matter to anybody sorting a users page.
+RECONCILE_DAYS = 30
+BATCH = 2000
+
+
+def _counted_bids():
+    from auctions.models import Bid
+
+    return Bid.objects.exclude(is_deleted=True).filter(lot_number__auction__isnull=False)
+
+
+def _counted_views():
+    from auctions.models import PageView
+
+    return PageView.objects.filter(user__isnull=False, lot_number__auction__isnull=False)
+
+
+def count(filter_q=None):
+    """{(auction_id, user_id): (lots_bid, lots_viewed)} for every pair matching filter_q.
+
+    filter_q may only use lookups that Bid and PageView share, ``user_id`` and
+    ``lot_number__auction_id``, since it filters both.
+    """
+    bids = _counted_bids()
+    views = _counted_views()
+    if filter_q is not None:
+        bids = bids.filter(filter_q)
+        views = views.filter(filter_q)
+    counts = {}
+    for auction_id, user_id, n in (
+        bids.values_list("lot_number__auction_id", "user_id").annotate(n=Count("pk")).order_by().iterator()
+    ):
+        counts[(auction_id, user_id)] = (n, 0)
+    for auction_id, user_id, n in (
+        views.values_list("lot_number__auction_id", "user_id")
+        .annotate(n=Count("lot_number", distinct=True))
+        .order_by()
+        .iterator()
+    ):
+        counts[(auction_id, user_id)] = (counts.get((auction_id, user_id), (0, 0))[0], n)
+    return counts
+
+
+def _store(scope_q, counts):
+    """Replace the rows matching scope_q (a BidderMetrics filter) with counts."""
+    from auctions.models import BidderMetrics
+
+    with transaction.atomic():
+        BidderMetrics.objects.filter(scope_q).delete()
+        BidderMetrics.objects.bulk_create(
+            (
+                BidderMetrics(auction_id=auction_id, user_id=user_id, lots_bid=lots_bid, lots_viewed=lots_viewed)
+                for (auction_id, user_id), (lots_bid, lots_viewed) in counts.items()
+            ),
+            batch_size=BATCH,
+            ignore_conflicts=True,
+        )
+
+
+def recount(auction_id, user_id):
+    """Count one pair from scratch."""
+    if not auction_id or not user_id:
+        return
+    counts = count(Q(user_id=user_id, lot_number__auction_id=auction_id))
+    _store(Q(auction_id=auction_id, user_id=user_id), counts)
+
+
+def recount_user(user_id):
+    """Count every pair for one user from scratch, e.g. after their bids were moved to them."""
+    _store(Q(user_id=user_id), count(Q(user_id=user_id)))
+
+
+def _bump(auction_id, user_id, field):
+    from auctions.models import BidderMetrics
+
+    if not auction_id or not user_id:
+        return
+    updated = BidderMetrics.objects.filter(auction_id=auction_id, user_id=user_id).update(**{field: F(field) + 1})
+    if not updated:
+        # The first thing this user did in this auction (or since the row was added): count it all.
+        recount(auction_id, user_id)
+
+
+def note_bid(bid):
+    """A bid was placed."""
+    if bid.is_deleted:
+        return
+    auction_id = bid.lot_number.auction_id
+    transaction.on_commit(lambda: _bump(auction_id, bid.user_id, "lots_bid"))
+
+
+def note_lot_views(user_id, lots):
+    """``user_id`` just viewed ``lots`` (one entry per PageView row created); counts the lots they
+    hadn't viewed before."""
+    from auctions.models import PageView
+
+    if not user_id:
+        return
+    created = {}
+    for lot in lots:
+        if lot.auction_id:
+            auction_id, rows = created.get(lot.pk, (lot.auction_id, 0))
+            created[lot.pk] = (auction_id, rows + 1)
+
+    def bump():
+        # Read after commit, so "first view" means every row there is for the lot is one just made.
+        for lot_pk, (auction_id, rows) in created.items():
+            if PageView.objects.filter(user_id=user_id, lot_number_id=lot_pk)[: rows + 1].count() == rows:
+                _bump(auction_id, user_id, "lots_viewed")
+
+    if created:
+        transaction.on_commit(bump)
+
+
+def reconcile_recent(days=RECONCILE_DAYS):
+    """Recount every pair in auctions that started or ended in the last ``days`` days (or are still
+    running). Returns how many auctions were recounted."""
+    from auctions.models import Auction
+
+    since = timezone.now() - datetime.timedelta(days=days)
+    # views older than this have been deleted (page_view_rollups.prune), so recounting an auction
+    # that started before then would lose them
+    retained = timezone.now() - datetime.timedelta(days=settings.PAGEVIEW_RETENTION_DAYS)
+    auction_ids = list(
+        Auction.objects.filter(Q(date_start__gte=since) | Q(date_end__gte=since) | Q(date_end__isnull=True))
+        .filter(date_start__lte=timezone.now(), date_start__gte=retained)
+        .values_list("pk", flat=True)
+    )
+    for auction_id in auction_ids:
+        _store(Q(auction_id=auction_id), count(Q(lot_number__auction_id=auction_id)))
+    logger.info("Reconciled bidder metrics for %s auction(s)", len(auction_ids))
+    return len(auction_ids)
+
+
+def rebuild():
+    """Recount everything, with views only as far back as PAGEVIEW_RETENTION_DAYS. Returns how many
+    (auction, user) rows there are."""
+    counts = count()
+    _store(Q(), counts)
+    logger.info("Rebuilt bidder metrics: %s rows", len(counts))
+    return len(counts)
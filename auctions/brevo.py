@@ -32,7 +32,7 @@ from django.utils import timezone
 from auctions.helper_functions import scrub_emails
 
 # Reuse the platform-agnostic helpers from the Mailchimp module (same source of truth).
-from auctions.mailchimp import _self_service_url, _site_domain, _top_category_names, in_scope_members
+from auctions.mailchimp import _digest, _self_service_url, _site_domain, _top_category_names, in_scope_members
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +58,10 @@ CONTACT_ATTRIBUTES = (
 # slightly different spelling (unsubscribe / hard_bounce / contact_deleted), handled in the view.
 WEBHOOK_EVENTS = ["unsubscribed", "hardBounce", "spam", "contactDeleted"]
 
+# Brevo's batch contact update (POST /contacts/batch) takes at most 100 contacts a call. Imports
+# of new contacts are chunked the same so one rejected call never strands more than that.
+BULK_SYNC_CHUNK = 100
+
 
 class BrevoError(Exception):
     """Raised for unrecoverable Brevo problems the caller should surface/log (e.g. auth)."""
@@ -310,6 +314,18 @@ def member_attributes(member):
     }
 
 
+def _respects_remote_optout(member, desired, force_status=False):
+    """True when Brevo told us this contact unsubscribed/bounced and we mustn't undo that."""
+    return desired == "subscribed" and not force_status and member.brevo_status in ("unsubscribed", "cleaned")
+
+
+def sync_fingerprint(member, list_id, *, status, attributes=None):
+    """Digest of what we push for *member* (see mailchimp.sync_fingerprint); Brevo has no tags half."""
+    if status == "archived":
+        return _digest(str(list_id), "archived")
+    return _digest(str(list_id), status, (member.email or "").lower(), attributes)
+
+
 def sync_member(member, force_status=False):
     """Upsert one member into the club's Brevo list (or delete them) and record the result.
 
@@ -328,24 +344,34 @@ def sync_member(member, force_status=False):
     member.refresh_cached_totals(save=True)
     desired = _desired_status(member)
 
+    attributes = None
     try:
         if desired == "archived":
             _delete_contact(client, member)
-            _record_sync(member, status="archived", contact_id="")
+            _record_sync(
+                member,
+                status="archived",
+                contact_id="",
+                fingerprint=sync_fingerprint(member, club.brevo_list_id, status="archived"),
+            )
             _clear_error(club)
             return True
 
         # Never resurrect someone Brevo told us unsubscribed/bounced, unless explicitly forced.
-        respect_remote_optout = (
-            desired == "subscribed" and not force_status and member.brevo_status in ("unsubscribed", "cleaned")
-        )
+        respect_remote_optout = _respects_remote_optout(member, desired, force_status)
         blacklisted = desired == "unsubscribed" or respect_remote_optout
-        contact_id = _upsert_contact(client, member, blacklisted)
+        attributes = member_attributes(member)
+        contact_id = _upsert_contact(client, member, blacklisted, attributes)
         if respect_remote_optout:
             status = member.brevo_status
         else:
             status = "unsubscribed" if blacklisted else "subscribed"
-        _record_sync(member, status=status, contact_id=str(contact_id or member.brevo_contact_id or ""))
+        _record_sync(
+            member,
+            status=status,
+            contact_id=str(contact_id or member.brevo_contact_id or ""),
+            fingerprint=sync_fingerprint(member, club.brevo_list_id, status=status, attributes=attributes),
+        )
         _clear_error(club)
         return True
     except BrevoApiError as e:
@@ -354,7 +380,13 @@ def sync_member(member, force_status=False):
             # but don't propagate — other members in the batch should still sync.
             # The member pk is enough to identify them; addresses never go to the logs.
             logger.warning("Brevo rejected member %s: %s", member.pk, scrub_emails(e.detail))
-            _record_sync(member, status="cleaned", contact_id=member.brevo_contact_id or "")
+            # The fingerprint stops the nightly bulk sync resending the payload that was just refused.
+            _record_sync(
+                member,
+                status="cleaned",
+                contact_id=member.brevo_contact_id or "",
+                fingerprint=sync_fingerprint(member, club.brevo_list_id, status="cleaned", attributes=attributes),
+            )
         else:
             _record_error(club, e.detail)
             logger.error("Brevo sync failed for member %s (club %s): %s", member.pk, club.pk, scrub_emails(e.detail))
@@ -364,11 +396,11 @@ def sync_member(member, force_status=False):
         return False
 
 
-def _upsert_contact(client, member, blacklisted):
+def _upsert_contact(client, member, blacklisted, attributes=None):
     """Create-or-update the contact (Brevo's updateEnabled) and return its contact id."""
     body = {
         "email": member.email,
-        "attributes": member_attributes(member),
+        "attributes": attributes if attributes is not None else member_attributes(member),
         "listIds": [int(member.club.brevo_list_id)],
         "emailBlacklisted": blacklisted,
         "updateEnabled": True,
@@ -444,34 +476,147 @@ def change_member_email(member, old_email):
 # --- bulk / scope helpers --------------------------------------------------------------------
 
 
-def backfill(club):
-    """Queue a sync for every in-scope member after an initial connection (and nightly).
+def backfill(club, force=False):
+    """Queue a bulk sync of every in-scope member (initial connection, "sync now", and nightly).
 
-    Reuses the shared in_scope rule and the per-member task path so each contact's id/status is
-    captured locally.
+    Same shape as mailchimp.backfill: one bulk_sync_club_to_brevo task pages through the shared
+    in_scope members and only sends the changed ones (everyone with force=True). Returns the
+    number of in-scope members.
     """
-    from auctions.tasks import sync_club_member_to_brevo
+    from auctions.tasks import bulk_sync_club_to_brevo
+
+    bulk_sync_club_to_brevo.delay(club.pk, force=force)
+    return in_scope_members(club).count()
+
+
+def bulk_sync(club, members, *, force=False):
+    """Sync a page of *members* with Brevo's batch endpoints; returns how many were recorded as synced.
+
+    Members whose fingerprint matches their last sync are skipped. Contacts we already have an id
+    for go through the batch update, BULK_SYNC_CHUNK at a time; new ones through a contact import,
+    one per chunk and blacklist flag (an import sets that flag for every contact in it). Imports
+    are processed asynchronously by Brevo, so a new contact's id is filled in by its next
+    individual sync rather than here. A chunk Brevo rejects as invalid falls back to sync_member
+    for each of its members, so one bad address doesn't hold up the rest.
+    """
+    from auctions.models import ClubMember
+
+    if not club.brevo_connected:
+        return 0
+    client = get_client(club)
+    if not client:
+        return 0
+
+    now = timezone.now()
+    recorded = {}
+
+    def record(member, status, fingerprint):
+        member.brevo_status = status
+        member.brevo_sync_fingerprint = fingerprint
+        member.brevo_last_synced = now
+        recorded[member.pk] = member
+
+    list_id = int(club.brevo_list_id)
+    updates = []
+    imports = {False: [], True: []}
+    deletes = []
+    for member in members:
+        member.refresh_cached_totals(save=True)
+        desired = _desired_status(member)
+        if desired == "archived":
+            fingerprint = sync_fingerprint(member, list_id, status="archived")
+            if force or fingerprint != member.brevo_sync_fingerprint:
+                deletes.append((member, fingerprint))
+            continue
+        respect_remote_optout = _respects_remote_optout(member, desired)
+        blacklisted = desired == "unsubscribed" or respect_remote_optout
+        status = member.brevo_status if respect_remote_optout else ("unsubscribed" if blacklisted else "subscribed")
+        attributes = member_attributes(member)
+        fingerprint = sync_fingerprint(member, list_id, status=status, attributes=attributes)
+        if not force and fingerprint == member.brevo_sync_fingerprint:
+            continue
+        pending = (member, status, fingerprint, {"email": member.email, "attributes": attributes})
+        if member.brevo_contact_id:
+            pending[3].update(emailBlacklisted=blacklisted, listIds=[list_id])
+            updates.append(pending)
+        else:
+            imports[blacklisted].append(pending)
+
+    calls = [("POST", "/contacts/batch", chunk, lambda contacts: {"contacts": contacts}) for chunk in _chunks(updates)]
+    for blacklisted, pending in imports.items():
+        calls += [
+            (
+                "POST",
+                "/contacts/import",
+                chunk,
+                lambda contacts, blacklisted=blacklisted: {
+                    "jsonBody": contacts,
+                    "listIds": [list_id],
+                    "emailBlacklist": blacklisted,
+                    "updateExistingContacts": True,
+                    "emptyContactsAttributes": False,
+                    "disableNotification": True,
+                },
+            )
+            for chunk in _chunks(pending)
+        ]
+
+    failed = False
+    try:
+        for method, path, chunk, body in calls:
+            try:
+                client.request(method, path, json_body=body([contact for *_, contact in chunk]))
+            except BrevoApiError as e:
+                if e.status_code not in (400, 422):
+                    raise
+                logger.warning("Brevo rejected a bulk chunk for club %s, syncing it member by member", club.pk)
+                for member, *_ in chunk:
+                    sync_member(member)
+                continue
+            for member, status, fingerprint, _ in chunk:
+                record(member, status, fingerprint)
+
+        for member, fingerprint in deletes:
+            _delete_contact(client, member)
+            member.brevo_contact_id = ""
+            record(member, "archived", fingerprint)
+    except BrevoApiError as e:
+        # Auth or 5xx: nothing after this would get through either. Members not recorded yet keep
+        # their old fingerprint, so the next run picks them up.
+        failed = True
+        _record_error(club, e.detail)
+        logger.error("Brevo bulk sync failed for club %s: %s", club.pk, scrub_emails(e.detail))
+    except BrevoError as e:
+        failed = True
+        _record_error(club, str(e))
+
+    ClubMember.objects.bulk_update(
+        recorded.values(), ["brevo_status", "brevo_contact_id", "brevo_last_synced", "brevo_sync_fingerprint"]
+    )
+    if recorded and not failed:
+        _clear_error(club)
+    return len(recorded)
+
 
-    count = 0
-    for member_id in in_scope_members(club).values_list("pk", flat=True):
-        sync_club_member_to_brevo.delay(member_id)
-        count += 1
-    return count
+def _chunks(items):
+    return [items[start : start + BULK_SYNC_CHUNK] for start in range(0, len(items), BULK_SYNC_CHUNK)]
 
 
 # --- local bookkeeping -----------------------------------------------------------------------
 
 
-def _record_sync(member, *, status, contact_id):
+def _record_sync(member, *, status, contact_id, fingerprint=""):
     from auctions.models import ClubMember
 
     member.brevo_status = status
     member.brevo_contact_id = contact_id
     member.brevo_last_synced = timezone.now()
+    member.brevo_sync_fingerprint = fingerprint
     ClubMember.objects.filter(pk=member.pk).update(
         brevo_status=status,
         brevo_contact_id=contact_id,
         brevo_last_synced=member.brevo_last_synced,
+        brevo_sync_fingerprint=fingerprint,
     )
 
 
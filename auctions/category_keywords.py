@@ -0,0 +1,154 @@
+"""The word -> category counts that :func:`auctions.models.guess_category` ranks categories from.
+
+Guessing used to be a query: every hand-categorised lot whose name matched any word of the new
+name, found with one word-boundary regex per word, pulled into Python and scored there.  That is a
+full scan of the lot table per guess, and it ran on every lot created and every row of a bulk
+import -- so each lot the site ever sold made the next guess a little slower.
+
+:class:`~auctions.models.CategoryKeyword` holds the same information counted once: for each word,
+how many lots with that word in their name a *person* put in each category.  A guess is then a
+lookup of a handful of rows by their unique (keyword, category) index, summed per category.  The
+score matches what the old loop added up -- one point per lot per shared word -- without ever
+looking at a lot.
+
+The counts are kept current as lots are saved (see the Lot receivers in signals.py): a lot whose
+counted words or category changed takes its old contribution out and puts its new one in.  Anything
+that changes lots without saving them (a queryset ``update()``, an auction stopping being promoted)
+is caught by :func:`rebuild`, which the nightly ``rebuild_category_keywords`` task runs.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+
+logger = logging.getLogger(__name__)
+
+# Words shorter than this say nothing about a fish ("of", "xl", "m/f").
+MIN_KEYWORD_LENGTH = 3
+KEYWORD_MAX_LENGTH = 64
+
+# Where a lot lands when nobody knew its category; it teaches nothing.
+UNCATEGORIZED = "Uncategorized"
+
+REBUILD_BATCH = 2000
+
+_WORD = re.compile(rf"[a-z]{{{MIN_KEYWORD_LENGTH},}}")
+
+
+def lot_keywords(text):
+    """The distinct words of a lot name that count towards a category."""
+    ignore = set(settings.IGNORE_WORDS)
+    return sorted({word[:KEYWORD_MAX_LENGTH] for word in _WORD.findall((text or "").lower()) if word not in ignore})
+
+
+def counted_keywords(
+    *, lot_name, category_id, category_name, category_automatically_added, is_deleted, auction_promoted
+):
+    """What one lot contributes to the counts: (category_id, keywords), or None.
+
+    Only a category a person chose teaches anything -- a guessed one would just reinforce the
+    guesser -- and lots that are deleted, Uncategorized, or in an auction that isn't promoted
+    (usually not fish at all) are left out, exactly as the old query left them out.
+    """
+    if is_deleted or category_automatically_added or not category_id or category_name == UNCATEGORIZED:
+        return None
+    if auction_promoted is False:
+        return None
+    keywords = lot_keywords(lot_name)
+    if not keywords:
+        return None
+    return (category_id, tuple(keywords))
+
+
+def keyword_counts(rows):
+    """Count (keyword, category_id) pairs from (lot_name, category_id) rows of counted lots."""
+    counts = Counter()
+    for lot_name, category_id in rows:
+        for keyword in lot_keywords(lot_name):
+            counts[(keyword, category_id)] += 1
+    return counts
+
+
+def rank_categories(text):
+    """[(category_pk, score)] for a lot name, best first. Empty when no word has been seen."""
+    from auctions.models import CategoryKeyword
+
+    keywords = lot_keywords(text)
+    if not keywords:
+        return []
+    return list(
+        CategoryKeyword.objects.filter(keyword__in=keywords, lots__gt=0)
+        .values("category_id")
+        .annotate(score=Sum("lots"))
+        .order_by("-score", "category_id")
+        .values_list("category_id", "score")
+    )
+
+
+def apply_change(before, after):
+    """Move a lot's contribution from ``before`` to ``after`` (each a counted_keywords() result)."""
+    if before == after:
+        return
+    if before:
+        _adjust(*before, delta=-1)
+    if after:
+        _adjust(*after, delta=1)
+
+
+def _adjust(category_id, keywords, *, delta):
+    from auctions.models import CategoryKeyword
+
+    rows = CategoryKeyword.objects.filter(category_id=category_id, keyword__in=keywords)
+    if delta < 0:
+        # Never below zero: a lot counted before the last rebuild may already be gone from it.
+        rows.filter(lots__gt=0).update(lots=F("lots") - 1)
+        return
+    existing = set(rows.values_list("keyword", flat=True))
+    if existing:
+        rows.filter(keyword__in=existing).update(lots=F("lots") + 1)
+    missing = [
+        CategoryKeyword(keyword=word, category_id=category_id, lots=1) for word in keywords if word not in existing
+    ]
+    # A concurrent save may have just created one of these; losing that single count is fine until
+    # the nightly rebuild, and much better than failing the lot's save over it.
+    CategoryKeyword.objects.bulk_create(missing, ignore_conflicts=True)
+
+
+def counted_lots():
+    """Every lot whose category teaches the counts, as (lot_name, category_id) rows."""
+    from auctions.models import Lot
+
+    return (
+        Lot.objects.filter(
+            is_deleted=False,
+            category_automatically_added=False,
+            species_category__isnull=False,
+        )
+        .exclude(species_category__name=UNCATEGORIZED)
+        .exclude(auction__promote_this_auction=False)
+        .values_list("lot_name", "species_category_id")
+    )
+
+
+def rebuild():
+    """Recount the whole table from the lots. Returns how many (keyword, category) rows it holds."""
+    from auctions.models import CategoryKeyword
+
+    counts = keyword_counts(counted_lots().iterator(chunk_size=REBUILD_BATCH))
+    with transaction.atomic():
+        CategoryKeyword.objects.all().delete()
+        CategoryKeyword.objects.bulk_create(
+            (
+                CategoryKeyword(keyword=keyword, category_id=category_id, lots=lots)
+                for (keyword, category_id), lots in counts.items()
+            ),
+            batch_size=REBUILD_BATCH,
+        )
+    logger.info("Rebuilt category keywords: %s rows", len(counts))
+    return len(counts)
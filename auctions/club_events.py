@@ -1,8 +1,8 @@
 """Keeps a club's event list, its Google Calendar, and its Discord events in step.
 
 The club page renders ``ClubEvent`` rows, so anything that should appear there has to become one
-first. ``sync_auction_events`` mirrors promoted auctions into events; ``sync_all`` is what the
-periodic task calls to service every club.
+first. ``sync_auction_events`` mirrors promoted auctions into events; ``sync_club`` services one
+club, and the periodic task runs it for every club in ``clubs_to_sync``.
 """
 
 from __future__ import annotations
@@ -378,8 +378,8 @@ def sync_club(club):
         discord_events.sync_club_events(club)
 
 
-def sync_all():
-    """Service every club that has something to sync. Returns how many clubs were touched."""
+def clubs_to_sync():
+    """Active clubs with something for sync_club() to do."""
     from auctions.models import Club
 
     # Skip clubs with nothing to do. The token column is encrypted, so it can only be tested for
@@ -387,15 +387,23 @@ def sync_all():
     # Everything else is tested for content: `discord_server_id__isnull=False` looked like a
     # filter but matched every club that had ever been saved with the field left blank, because
     # a blank CharField stores "" rather than NULL.
-    clubs = Club.objects.filter(
+    return Club.objects.filter(
         Q(google_calendar_refresh_token__isnull=False)
         | Q(discord_server_id__gt="")
         | Q(auctions__is_deleted=False, auctions__promote_this_auction=True)
         | Q(events__is_deleted=False),
         active=True,
     ).distinct()
+
+
+def sync_all():
+    """Service every club that has something to sync, one after another. Returns how many clubs were touched.
+
+    The periodic task fans out to a task per club instead (tasks.sync_club_calendars); this is the
+    serial version, for a shell or a one-off catch-up.
+    """
     count = 0
-    for club in clubs:
+    for club in clubs_to_sync():
         try:
             sync_club(club)
         except Exception:
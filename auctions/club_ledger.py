@@ -0,0 +1,187 @@
+"""Running balances for the club ledger (ClubMoney), and reconciling many invoices at once.
+
+Every treasurer page load summed the club's whole ClubMoney history for the current balance, as
+did each entry added from the report and the "balance books" tool. The ledger only ever grows, so
+that got slower every month a club used it.
+
+:class:`~auctions.models.ClubMoneyPeriod` holds one row per club, month and category with the
+money in, the money out (negative) and the number of entries. Entries are never edited or deleted
+(see Invoice.sync_club_money), so :func:`add` keeps those rows right by adding each new entry in as
+it is booked: a post_save receiver does it for entries made one at a time, and :func:`book` for the
+ones made with bulk_create. :func:`balance` then reads a few rows per month. :func:`rebuild`
+recounts a club from scratch.
+
+Invoice.sync_club_money runs four queries for each invoice it reconciles. For a bulk status change
+or a club newly attached to an auction, that was four queries for every invoice in it.
+:func:`sync_invoices` looks up what is already booked and the payment dates for all of them at once
+and books every delta with one bulk_create. Inside :func:`batch`, Invoice.save() hands its
+reconciliation to the batch instead, and it runs when the block ends.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import threading
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DecimalField, F, Max, Min, Sum, Value, When
+from django.db.models.functions import TruncMonth
+
+ZERO = Decimal("0.00")
+# Invoices reconciled per round of lookups.
+CHUNK = 500
+
+_local = threading.local()
+
+
+def month(day):
+    return day.replace(day=1)
+
+
+def add(entries):
+    """Add newly booked ClubMoney ``entries`` to their clubs' ClubMoneyPeriod rows."""
+    from auctions.models import ClubMoneyPeriod
+
+    totals = defaultdict(lambda: [ZERO, ZERO, 0])
+    for entry in entries:
+        amount = Decimal(entry.amount)
+        total = totals[(entry.club_id, month(entry.date), entry.category)]
+        total[0 if amount > 0 else 1] += amount
+        total[2] += 1
+    for (club_id, period, category), (money_in, money_out, count) in totals.items():
+        row = ClubMoneyPeriod.objects.filter(club_id=club_id, month=period, category=category)
+        changes = {
+            "money_in": F("money_in") + money_in,
+            "money_out": F("money_out") + money_out,
+            "entries": F("entries") + count,
+        }
+        if row.update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                ClubMoneyPeriod.objects.create(
+                    club_id=club_id,
+                    month=period,
+                    category=category,
+                    money_in=money_in,
+                    money_out=money_out,
+                    entries=count,
+                )
+        except IntegrityError:
+            # someone else booked the first entry of this month at the same time
+            row.update(**changes)
+
+
+def book(entries):
+    """bulk_create ``entries`` and add them to the running balances."""
+    from auctions.models import ClubMoney
+
+    if entries:
+        ClubMoney.objects.bulk_create(entries)
+        add(entries)
+    return entries
+
+
+def balance(club):
+    """The club's ledger balance: Sum("amount") of all its ClubMoney, from ClubMoneyPeriod."""
+    from auctions.models import ClubMoneyPeriod
+
+    totals = ClubMoneyPeriod.objects.filter(club=club).aggregate(money_in=Sum("money_in"), money_out=Sum("money_out"))
+    return (totals["money_in"] or ZERO) + (totals["money_out"] or ZERO)
+
+
+def period_totals(money):
+    """ClubMoneyPeriod's fields for each club, month and category of the ClubMoney in ``money``."""
+    decimal = DecimalField(max_digits=12, decimal_places=2)
+    return (
+        money.annotate(month=TruncMonth("date"))
+        .values("club_id", "month", "category")
+        .annotate(
+            money_in=Sum(Case(When(amount__gt=0, then="amount"), default=Value(ZERO), output_field=decimal)),
+            money_out=Sum(Case(When(amount__lt=0, then="amount"), default=Value(ZERO), output_field=decimal)),
+            entries=Count("pk"),
+        )
+        .order_by()
+    )
+
+
+def rebuild(club_pks=None):
+    """Recount ClubMoneyPeriod from ClubMoney, for ``club_pks`` or every club."""
+    from auctions.models import ClubMoney, ClubMoneyPeriod
+
+    periods = ClubMoneyPeriod.objects.all()
+    money = ClubMoney.objects.all()
+    if club_pks is not None:
+        periods = periods.filter(club__in=club_pks)
+        money = money.filter(club__in=club_pks)
+    with transaction.atomic():
+        periods.delete()
+        ClubMoneyPeriod.objects.bulk_create(
+            [ClubMoneyPeriod(**row) for row in period_totals(money)],
+            batch_size=CHUNK,
+        )
+
+
+def sync_invoices(invoices, acting_user=None):
+    """Invoice.sync_club_money for each of ``invoices``, with the ledger lookups done for all of
+    them together and every entry booked in one go. Returns the entries booked."""
+    from auctions.models import ClubMoney, InvoicePayment
+
+    invoices = list({invoice.pk: invoice for invoice in invoices}.values())
+    entries = []
+    for start in range(0, len(invoices), CHUNK):
+        chunk = invoices[start : start + CHUNK]
+        pks = [invoice.pk for invoice in chunk]
+        booked = defaultdict(dict)
+        booked_dates = {}
+        for row in (
+            ClubMoney.objects.filter(invoice__in=pks)
+            .values("invoice", "category")
+            .annotate(total=Sum("amount"), first=Min("date"))
+            .order_by()
+        ):
+            booked[row["invoice"]][row["category"]] = row["total"] or ZERO
+            first = booked_dates.get(row["invoice"])
+            booked_dates[row["invoice"]] = row["first"] if first is None else min(first, row["first"])
+        payments = dict(
+            InvoicePayment.objects.filter(invoice__in=pks)
+            .values("invoice")
+            .annotate(latest=Max("createdon"))
+            .order_by()
+            .values_list("invoice", "latest")
+        )
+        for invoice in chunk:
+            entries += invoice.sync_club_money(
+                acting_user,
+                booked=booked[invoice.pk],
+                event_date=invoice._cash_date(booked_dates.get(invoice.pk), payments.get(invoice.pk)),
+                commit=False,
+            )
+    return book(entries)
+
+
+def defer(invoice):
+    """Inside :func:`batch`, take over ``invoice``'s reconciliation and return True."""
+    pending = getattr(_local, "pending", None)
+    if pending is None:
+        return False
+    pending[invoice.pk] = invoice
+    return True
+
+
+@contextlib.contextmanager
+def batch(acting_user=None):
+    """Reconcile the invoices saved in this block together, when it ends (see :func:`sync_invoices`)."""
+    outer = getattr(_local, "pending", None)
+    if outer is not None:
+        yield
+        return
+    _local.pending = {}
+    try:
+        yield
+        pending = list(_local.pending.values())
+    finally:
+        _local.pending = None
+    sync_invoices(pending, acting_user)
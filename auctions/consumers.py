@@ -8,6 +8,7 @@ from channels.generic.websocket import WebsocketConsumer
 from channels.layers import get_channel_layer
 from django.utils import timezone
 
+from . import history_archive
 from .models import (
     Auction,
     ChatSubscription,
@@ -16,6 +17,7 @@ from .models import (
     User,
     UserBan,
 )
+from .request_cache import request_scope
 
 try:
     from uvicorn.protocols.utils import ClientDisconnected
@@ -111,7 +113,19 @@ def broadcast_bid_result(lot, user, result):
         )
 
 
-class LotConsumer(WebsocketConsumer):
+class RequestScopedConsumer(WebsocketConsumer):
+    """Handles each websocket message inside its own request_scope, like an HTTP request."""
+
+    def websocket_connect(self, message):
+        with request_scope():
+            super().websocket_connect(message)
+
+    def websocket_receive(self, message):
+        with request_scope():
+            super().websocket_receive(message)
+
+
+class LotConsumer(RequestScopedConsumer):
     def connect(self):
         try:
             self.lot_number = self.scope["url_route"]["kwargs"]["lot_number"]
@@ -127,7 +141,7 @@ class LotConsumer(WebsocketConsumer):
             async_to_sync(self.channel_layer.group_add)(self.user_room_name, self.channel_name)
             self.accept()
             # send the most recent history
-            allHistory = LotHistory.objects.filter(lot=self.lot, removed=False).order_by("-timestamp")[:200]
+            allHistory = history_archive.recent(self.lot)
             # send oldest first
             for history in reversed(allHistory):
                 try:
@@ -287,7 +301,7 @@ class LotConsumer(WebsocketConsumer):
         self.send(text_data=json.dumps(event))
 
 
-class UserConsumer(WebsocketConsumer):
+class UserConsumer(RequestScopedConsumer):
     """This is ready to use and corresponding code to connect added (commented out) to base.html
     You can use userdata.send_websocket_message to message the user, like this:
         result = {
@@ -341,8 +355,12 @@ class UserConsumer(WebsocketConsumer):
         bg = event.get("bg", "info")
         self.send(text_data=json.dumps({"type": "toast", "message": message, "bg": bg}))
 
+    def print_job(self, event):
+        """A remote print job moved on; see remote_print.announce"""
+        self.send(text_data=json.dumps(event))
+
 
-class AuctionConsumer(WebsocketConsumer):
+class AuctionConsumer(RequestScopedConsumer):
     """Auction Admins only.  Catch signals to mark invoices paid"""
 
     def connect(self):
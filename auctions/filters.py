@@ -20,6 +20,7 @@ from django.db.models import (
 from django.forms.widgets import HiddenInput, NumberInput, Select, TextInput
 from django.utils import timezone
 
+from . import history_archive
 from .models import (
     Auction,
     AuctionHistory,
@@ -185,15 +186,18 @@ def rhyming_name_q(value, name_field="name"):
     If *value* contains a second word it is treated as a last-name prefix and appended to every
     candidate first name so the match stays specific (e.g. "Rob Smith" won't match "Bobby Jones").
     """
+    q = Q()
+    for prefix in rhyming_name_prefixes(value):
+        q |= Q(**{f"{name_field}__istartswith": prefix})
+    return q
+
+
+def rhyming_name_prefixes(value):
+    """The lowercase name prefixes rhyming_name_q matches, for matching names already in memory."""
     parts = value.lower().split()
     first_name = parts[0] if parts else ""
     last_name = (" " + parts[1]) if len(parts) >= 2 else ""
-    q = Q()
-    for name_set in RHYMING_NAMES:
-        if first_name in name_set:
-            for candidate in name_set:
-                q |= Q(**{f"{name_field}__istartswith": candidate + last_name})
-    return q
+    return [candidate + last_name for name_set in RHYMING_NAMES if first_name in name_set for candidate in name_set]
 
 
 class AuctionTOSFilter(django_filters.FilterSet):
@@ -773,10 +777,12 @@ class LotFilter(django_filters.FilterSet):
             )
         # messages for other user
         primary_queryset = primary_queryset.annotate(
-            all_chats=Count(
-                "lothistory",
-                filter=Q(lothistory__changed_price=False, lothistory__removed=False),
-                distinct=True,
+            all_chats=history_archive.chat_count(
+                Count(
+                    "lothistory",
+                    filter=Q(lothistory__changed_price=False, lothistory__removed=False),
+                    distinct=True,
+                )
             )
         )
         # App-only "Locate with AR" button on lot lists (lot_tile_page.html / lot_list_page.html).
@@ -801,18 +807,22 @@ class LotFilter(django_filters.FilterSet):
         if self.order == "popularity" or self.order == "-popularity":
             primary_queryset = primary_queryset.annotate(
                 popularity=2 * Count("pageview", distinct=True)
-                + Count(
-                    "lothistory",
-                    filter=Q(lothistory__changed_price=False),
-                    distinct=True,
+                + history_archive.chat_count(
+                    Count(
+                        "lothistory",
+                        filter=Q(lothistory__changed_price=False),
+                        distinct=True,
+                    )
                 )
                 +
                 # this is better than bids
                 2.5
-                * Count(
-                    "lothistory",
-                    filter=Q(lothistory__changed_price=True),
-                    distinct=True,
+                * history_archive.bid_count(
+                    Count(
+                        "lothistory",
+                        filter=Q(lothistory__changed_price=True),
+                        distinct=True,
+                    )
                 )
             )
         if self.order == "-recommended":
@@ -38,9 +38,15 @@ USERINFO_URL = "https://www.googleapis.com/oauth2/v3/userinfo"
 CALENDAR_SCOPE = "https://www.googleapis.com/auth/calendar.app.created"
 
 # Google rejects a syncToken once it's too old (or after we change what we ask for). When that
-# happens the only fix is to forget the token and do a fresh full pull.
+# happens the token is forgotten; if the club has synced before, the same run catches up with an
+# updatedMin listing instead, and only a club that never completed a sync starts over next time.
 SYNC_TOKEN_GONE = 410
 
+# How far before the last successful sync an updatedMin catch-up reaches back. Covers clock skew
+# between us and Google, and edits made while that last round trip was in flight; pulling an
+# unchanged event again is harmless.
+UPDATED_MIN_OVERLAP = datetime.timedelta(minutes=10)
+
 TIMEOUT = 15
 
 # A first pull asks for a bounded window rather than everything. Without an upper bound a single
@@ -413,9 +419,10 @@ def _parse_google_datetime(value):
 def pull_events(club):
     """Pull changes from Google into ClubEvent rows. Returns (created, updated, deleted).
 
-    Uses Google's syncToken so each run only fetches what changed. Events that originated on
-    this site are recognized by their extendedProperties and only have their *content* updated
-    — we never let a pull resurrect something we deleted, or flip a generated event's identity.
+    Uses Google's syncToken so each run only fetches what changed, falling back to updatedMin
+    when the token has expired. Events that originated on this site are recognized by their
+    extendedProperties and only have their *content* updated — we never let a pull resurrect
+    something we deleted, or flip a generated event's identity.
     """
     if not club.google_calendar_connected:
         return (0, 0, 0)
@@ -429,9 +436,7 @@ def pull_events(club):
         base_params["syncToken"] = club.google_calendar_sync_token
     else:
         # First run: a bounded window, not years of history or an endless recurrence.
-        now = timezone.now()
-        base_params["timeMin"] = (now - PULL_WINDOW_BEFORE).isoformat()
-        base_params["timeMax"] = (now + PULL_WINDOW_AHEAD).isoformat()
+        base_params.update(_pull_window())
 
     created = updated = deleted = 0
     next_sync_token = ""
@@ -439,10 +444,20 @@ def pull_events(club):
     for page_number in range(1, MAX_PULL_PAGES + 1):
         page = _request(club, "GET", f"/calendars/{calendar_id}/events", params=params, allow_status=(SYNC_TOKEN_GONE,))
         if page == SYNC_TOKEN_GONE:
-            # Token expired. Start over from scratch on the next run rather than looping here.
-            logger.info("Google sync token expired for club %s; will do a full pull next time.", club.pk)
             club.google_calendar_sync_token = ""
             club.save(update_fields=["google_calendar_sync_token"])
+            if "syncToken" in base_params and club.google_calendar_last_sync:
+                # Only what changed since the last round trip that worked, inside the same window a
+                # first pull uses. Its last page hands back a fresh syncToken like any other listing.
+                logger.info("Google sync token expired for club %s; catching up with updatedMin.", club.pk)
+                since = club.google_calendar_last_sync - UPDATED_MIN_OVERLAP
+                base_params = {"showDeleted": "true", "maxResults": 250, "updatedMin": since.isoformat()}
+                base_params.update(_pull_window())
+                params = dict(base_params)
+                continue
+            # Never synced (or updatedMin was refused too). Start over from scratch on the next
+            # run rather than looping here.
+            logger.info("Google sync token expired for club %s; will do a full pull next time.", club.pk)
             return (created, updated, deleted)
 
         # Series before their own exceptions, so "this one occurrence moved" always has the
@@ -475,6 +490,11 @@ def pull_events(club):
     return (created, updated, deleted)
 
 
+def _pull_window():
+    now = timezone.now()
+    return {"timeMin": (now - PULL_WINDOW_BEFORE).isoformat(), "timeMax": (now + PULL_WINDOW_AHEAD).isoformat()}
+
+
 def _apply_pulled_event(club, item):
     """Apply one event from a Google listing. Returns what happened, for the caller's counts."""
     google_id = item.get("id", "")
@@ -9,6 +9,8 @@ Public entry points:
     is_configured()                       -> bool
     get_access_token()                    -> str | None  (cached in-memory)
     create_generic_class(club)            -> bool         (True on 200/409)
+    generic_object_patch_body(member)     -> dict         (what a refresh PATCHes)
+    patch_generic_object(member, body)    -> bool         (True on 200, False on 404)
 """
 
 from __future__ import annotations
@@ -16,6 +18,7 @@ from __future__ import annotations
 import logging
 import threading
 import time
+from functools import lru_cache
 
 import jwt
 import requests
@@ -34,6 +37,9 @@ DEFAULT_HEX_BG = "#1f2937"
 # whole card to signal the "Unpaid/expired" state.
 EXPIRED_HEX_BG = "#991b1b"
 
+# Connections kept open to the Wallet API; sized for wallet_refresh's worker threads.
+SESSION_POOL_SIZE = 8
+
 _token_lock = threading.Lock()
 _cached_token: dict = {"value": None, "expires_at": 0.0}
 
@@ -204,14 +210,17 @@ def _member_display_name(member) -> str:
     return "Member"
 
 
-def update_generic_object_for_member(member) -> bool:
-    """PATCH member object fields that should reflect current club/member data."""
-    if not is_configured():
-        return False
-    token = get_access_token()
-    if not token:
-        return False
-    object_id = _object_id_for_member(member)
+@lru_cache(maxsize=1)
+def _session() -> requests.Session:
+    """Shared keep-alive session for object PATCHes, so a club-wide refresh reuses connections."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=SESSION_POOL_SIZE)
+    session.mount("https://", adapter)
+    return session
+
+
+def generic_object_patch_body(member) -> dict:
+    """The GenericObject fields a refresh PATCHes: everything on the pass that comes from our data."""
     member_name = _member_display_name(member)
     body = {
         "cardTitle": {
@@ -237,7 +246,26 @@ def update_generic_object_for_member(member) -> bool:
     # auto-archive the pass off the user's device. A lapsed membership instead
     # keeps an active pass tinted red with an "Expired <date>" status line
     # (see wallet_status_text) — we never programmatically expire the card.
-    resp = requests.patch(
+    return body
+
+
+def update_generic_object_for_member(member) -> bool:
+    """PATCH member object fields that should reflect current club/member data."""
+    if not is_configured():
+        return False
+    return patch_generic_object(member, generic_object_patch_body(member))
+
+
+def patch_generic_object(member, body: dict) -> bool:
+    """Send a body from generic_object_patch_body. No database access, so it's safe from a worker thread.
+
+    Returns False when the member never saved the pass (404); raises on transport / 5xx.
+    """
+    token = get_access_token()
+    if not token:
+        return False
+    object_id = _object_id_for_member(member)
+    resp = _session().patch(
         f"{WALLET_API_BASE}/genericObject/{object_id}",
         json=body,
         headers={"Authorization": f"Bearer {token}"},
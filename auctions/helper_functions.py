@@ -50,11 +50,13 @@ def bin_data(
     add_column_for_low_overflow=False,
     add_column_for_high_overflow=False,
     generate_labels=False,
+    weight_field=None,
 ):
     """Pass a queryset and this will spit out a count of how many `field_name`s there are in each `number_of_bins`
     Pass a datetime or an int for start_bin and end_bin, the default is the min/max value in the queryset.
     Specify `add_column_for_low_overflow` and/or `add_column_for_high_overflow`, otherwise data that falls
     outside the start and end bins will be discarded.
+    Pass `weight_field` to count each item as that many (e.g. PageViewRollup.views) instead of as one.
 
     If `generate_labels=True`, a tuple of [labels, data] will be returned
     """
@@ -98,17 +100,18 @@ def bin_data(
     high_overflow_count = 0
     for item in queryset:
         item_value = getattr(item, field_name)
+        weight = getattr(item, weight_field) if weight_field else 1
         if item_value < start_bin:
-            low_overflow_count += 1
+            low_overflow_count += weight
         elif item_value >= end_bin:
-            high_overflow_count += 1
+            high_overflow_count += weight
         else:
             if working_with_date:
                 diff = (item_value - start_bin).total_seconds()
             else:
                 diff = float(item_value - start_bin)
             bin_index = int(diff // float(bin_size))
-            bin_counts[bin_index] += 1
+            bin_counts[bin_index] += weight
 
     # Ensure all bins are represented (even those with 0)
     counts_list = [bin_counts[i] for i in range(number_of_bins)]
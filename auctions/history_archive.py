@@ -0,0 +1,135 @@
+"""Moving the chat and bid history of long-ended lots out of LotHistory.
+
+LotHistory holds every bid and chat message the site has ever seen. The lot page's websocket, the
+unread counts on chat subscriptions and the chat counts LotFilter puts on every lot list all read
+it, and it only grows -- almost all of it belonging to lots that ended long ago and that nobody
+opens any more.
+
+:func:`archive`, run nightly by ``archive_lot_history``, moves the rows of lots that ended more than
+LOT_HISTORY_ARCHIVE_DAYS ago into :class:`~auctions.models.LotHistoryArchive`, pk and all, and adds
+them up into the lot's :class:`~auctions.models.LotHistorySummary`: how many messages and bids, and
+the last message. Lot lists add those counts to what's still live (:func:`chat_count`), and
+:func:`recent` reads a lot's feed from both tables. A message posted to such a lot afterwards goes
+to LotHistory as usual and is moved by a later run.
+"""
+
+from __future__ import annotations
+
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+# Lots moved per transaction; a run that fills it queues another straight away.
+BATCH = 200
+# Archive rows inserted per statement.
+CHUNK = 1000
+
+FIELDS = (
+    "id",
+    "lot_id",
+    "user_id",
+    "message",
+    "timestamp",
+    "seen",
+    "current_price",
+    "changed_price",
+    "notification_sent",
+    "bid_amount",
+    "removed",
+)
+
+
+def cutoff(now=None):
+    return (now or timezone.now()) - datetime.timedelta(days=settings.LOT_HISTORY_ARCHIVE_DAYS)
+
+
+def archivable_lots(before):
+    """Lots that ended before ``before`` and still have LotHistory from before then."""
+    from auctions.models import Lot, LotHistory
+
+    return (
+        Lot.objects.filter(active=False)
+        .annotate(ended_at=Coalesce("date_end", "auction__date_end", "date_posted"))
+        .filter(ended_at__lt=before)
+        .filter(Exists(LotHistory.objects.filter(lot=OuterRef("pk"), timestamp__lt=before)))
+    )
+
+
+def archive(now=None):
+    """Move the old history of up to BATCH lots. Returns how many lots were moved."""
+    from auctions.models import LotHistory, LotHistoryArchive
+
+    before = cutoff(now)
+    lot_pks = list(archivable_lots(before).order_by("pk").values_list("pk", flat=True)[:BATCH])
+    if not lot_pks:
+        return 0
+    with transaction.atomic():
+        history = LotHistory.objects.filter(lot__in=lot_pks, timestamp__lt=before)
+        rows = list(history.select_for_update().order_by("timestamp", "pk").values(*FIELDS))
+        LotHistoryArchive.objects.bulk_create(
+            [LotHistoryArchive(**row) for row in rows], batch_size=CHUNK, ignore_conflicts=True
+        )
+        _summarize(rows)
+        history.delete()
+    return len(lot_pks)
+
+
+def _summarize(rows):
+    """Add ``rows`` (oldest first) to their lots' LotHistorySummary."""
+    from auctions.models import LotHistorySummary
+
+    lot_pks = {row["lot_id"] for row in rows}
+    summaries = {
+        summary.lot_id: summary for summary in LotHistorySummary.objects.select_for_update().filter(lot__in=lot_pks)
+    }
+    existing = list(summaries.values())
+    now = timezone.now()
+    for summary in existing:
+        summary.archived_on = now
+    for row in rows:
+        summary = summaries.get(row["lot_id"])
+        if summary is None:
+            summary = summaries[row["lot_id"]] = LotHistorySummary(lot_id=row["lot_id"])
+        if row["changed_price"]:
+            summary.bid_count += 1
+        elif not row["removed"]:
+            summary.chat_count += 1
+            summary.last_message = row["message"]
+            summary.last_message_user_id = row["user_id"]
+            summary.last_message_timestamp = row["timestamp"]
+    LotHistorySummary.objects.bulk_update(
+        existing,
+        ["chat_count", "bid_count", "last_message", "last_message_user", "last_message_timestamp", "archived_on"],
+        batch_size=CHUNK,
+    )
+    LotHistorySummary.objects.bulk_create(list(summaries.values())[len(existing) :], batch_size=CHUNK)
+
+
+def chat_count(live):
+    """``live`` (a Count over a Lot's ``lothistory``) plus the messages archived from it."""
+    return live + Coalesce(F("history_summary__chat_count"), Value(0))
+
+
+def bid_count(live):
+    """As chat_count, for price changes."""
+    return live + Coalesce(F("history_summary__bid_count"), Value(0))
+
+
+def recent(lot, limit=200):
+    """The lot's latest ``limit`` LotHistory rows that weren't removed, newest first, archived ones
+    included."""
+    from auctions.models import LotHistory, LotHistoryArchive
+
+    rows = list(LotHistory.objects.filter(lot=lot, removed=False).select_related("user").order_by("-timestamp")[:limit])
+    # everything archived is older than everything still live
+    if len(rows) < limit and not lot.active:
+        rows += (
+            LotHistoryArchive.objects.filter(lot=lot, removed=False)
+            .select_related("user")
+            .order_by("-timestamp")[: limit - len(rows)]
+        )
+    return rows
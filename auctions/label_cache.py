@@ -0,0 +1,220 @@
+"""Rendered lot labels, cached by what they look like.
+
+WeasyPrint is the slow part of printing a label: laying out one thermal label takes longer than
+everything else in the request put together, and LotLabelView used to lay out a whole sheet -- up
+to 100 thermal pages, or several Avery pages -- in one go, on every request, for labels that were
+usually identical to the ones it made the last time. A seller reprinting at the check-in table
+waited for all of it while the queue behind them grew.
+
+So a sheet is rendered a page at a time. Each page is first rendered to HTML by
+``label_template.html`` (cheap), and the PDF for that HTML is cached under a digest of it: the HTML
+already holds everything a label depends on -- the lot's fields, the auction's
+``label_print_fields``, the user's ``UserLabelPrefs`` and preset -- so a key can never be stale,
+and any change to any of those is simply a different key. Pages that aren't cached yet are laid
+out in a small process pool when there are enough of them to be worth it, and the pages are
+joined into one PDF. The Bluetooth PNG is cached the same way, under the digest of the PDF it was
+rasterized from and the size and dpi asked for.
+
+:func:`prewarm` renders the single-label page of newly added lots for the people likely to print
+them at an in-person auction, so the first print at check-in is usually already made.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import billiard.process
+import django
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_SECONDS = 60 * 60 * 24 * 7
+# Below this many pages to lay out, starting work in other processes costs more than it saves.
+PARALLEL_MIN_PAGES = 8
+RENDER_PROCESSES = min(4, os.cpu_count() or 1)
+
+_pool = None
+
+
+def _digest(*parts) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _weasyprint_version():
+    import weasyprint
+
+    return weasyprint.__version__
+
+
+def _html_to_pdf(html, base_url=None):
+    """Lay out one page of labels. Runs in the pool's processes, too."""
+    import weasyprint
+    from django_weasyprint.utils import DjangoURLFetcher
+
+    return weasyprint.HTML(string=html, base_url=base_url, url_fetcher=DjangoURLFetcher()).write_pdf()
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        # spawn, not fork: a forked child would share this process's database connections, and
+        # closing them on its way out would close them for us too.
+        _pool = ProcessPoolExecutor(
+            max_workers=RENDER_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        )
+    return _pool
+
+
+def _may_start_processes():
+    """Whether this process may start the render pool. A daemonic process -- a child of the Celery
+    worker's prefork pool -- may not have children of its own; starting the pool there fails with
+    "daemonic processes are not allowed to have children"."""
+    return not (multiprocessing.current_process().daemon or billiard.process.current_process().daemon)
+
+
+def parallel_map(fn, *iterables, min_items=PARALLEL_MIN_PAGES):
+    """Yield ``fn(*args)`` for each set of arguments, in order, in the render pool when there are at
+    least ``min_items`` of them. ``fn`` must be a module-level function, as it is pickled. If the pool
+    dies, whatever it hadn't finished is done here instead. In a Celery worker everything is done
+    here: the worker is already one of several processes."""
+    global _pool
+    argsets = list(zip(*iterables, strict=True))
+    done = 0
+    if len(argsets) >= min_items and RENDER_PROCESSES > 1 and _may_start_processes():
+        try:
+            for result in _get_pool().map(fn, *zip(*argsets, strict=True)):
+                done += 1
+                yield result
+        except BrokenProcessPool:
+            logger.exception("The label render pool died; finishing the work here instead")
+            _pool = None
+        else:
+            return
+    for args in argsets[done:]:
+        yield fn(*args)
+
+
+def _render_pages(htmls, base_url):
+    """PDF bytes for each HTML page, in order."""
+    return list(parallel_map(_html_to_pdf, htmls, [base_url] * len(htmls)))
+
+
+def merge_pdfs(parts):
+    """One PDF with every page of ``parts``, in order."""
+    if len(parts) == 1:
+        return parts[0]
+    import pypdfium2
+
+    merged = pypdfium2.PdfDocument.new()
+    sources = []
+    try:
+        for part in parts:
+            source = pypdfium2.PdfDocument(part)
+            sources.append(source)
+            merged.import_pages(source)
+        buffer = io.BytesIO()
+        merged.save(buffer)
+        return buffer.getvalue()
+    finally:
+        for source in sources:
+            source.close()
+        merged.close()
+
+
+def split_pages(labels, labels_per_page):
+    """The labels of each page of a sheet, as label_template.html breaks them."""
+    labels = list(labels)
+    labels_per_page = max(1, labels_per_page)
+    return [labels[i : i + labels_per_page] for i in range(0, len(labels), labels_per_page)] or [[]]
+
+
+def render_sheet(template, context, *, request=None, base_url=None):
+    """The PDF ``template`` (label_template.html) makes of ``context``, using cached pages where it can."""
+    htmls = [
+        template.render({**context, "labels": page}, request)
+        for page in split_pages(context["labels"], context["labels_per_page"])
+    ]
+    version = _weasyprint_version()
+    keys = [f"label-pdf:{_digest(version, html)}" for html in htmls]
+    cached = cache.get_many(keys)
+    missing = [(key, html) for key, html in zip(keys, htmls, strict=True) if key not in cached]
+    if missing:
+        rendered = _render_pages([html for _key, html in missing], base_url)
+        fresh = {key: pdf for (key, _html), pdf in zip(missing, rendered, strict=True)}
+        cache.set_many(fresh, CACHE_SECONDS)
+        cached.update(fresh)
+    return merge_pdfs([cached[key] for key in keys])
+
+
+def cached_png(pdf_bytes, *, width, height, dpi, rasterize):
+    """rasterize(pdf_bytes, width=, height=, dpi=), cached by what goes in."""
+    key = f"label-png:{_digest(pdf_bytes, width, height, dpi)}"
+    png = cache.get(key)
+    if png is None:
+        png = rasterize(pdf_bytes, width=width, height=height, dpi=dpi)
+        cache.set(key, png, CACHE_SECONDS)
+    return png
+
+
+def prewarm_users(lot):
+    """Whoever is likely to print this lot's label one at a time: the seller and the auction's
+    admins, where they print to a thermal printer or from the app."""
+    from django.db.models import Q
+
+    from auctions.models import UserLabelPrefs
+
+    auction = lot.auction
+    if not auction or auction.is_online:
+        # Online auction labels are printed after the auction, with the winner on them.
+        return []
+    user_pks = set(auction.auction_admins_pks)
+    if lot.user_id:
+        user_pks.add(lot.user_id)
+    return [
+        prefs.user
+        for prefs in UserLabelPrefs.objects.filter(user__in=user_pks)
+        .filter(
+            Q(preset__in=["thermal_sm", "thermal_very_sm"]) | Q(print_method="bluetooth") | Q(print_from_computer=True)
+        )
+        .select_related("user")
+    ]
+
+
+def prewarm(lot_pks):
+    """Render the single-label page of each lot for each of its prewarm_users(). Returns how many
+    labels were rendered or already cached."""
+    from django.http import HttpRequest
+    from django.template.loader import get_template
+
+    from auctions.mobile.services.label_pdf import single_lot_label_view
+    from auctions.models import Lot
+    from auctions.views import SingleLotLabelView
+
+    template = get_template(SingleLotLabelView.template_name)
+    done = 0
+    for lot in Lot.objects.filter(pk__in=lot_pks, is_deleted=False).select_related("auction", "user"):
+        for user in prewarm_users(lot):
+            request = HttpRequest()
+            request.user = user
+            view = single_lot_label_view([lot], request, single_label_page=True, mark_printed=False)
+            try:
+                render_sheet(template, view.get_context_data())
+            except Exception:
+                # Only ever a head start; the print itself will render (and log) it properly.
+                logger.warning("Could not prewarm the label of lot %s for user %s", lot.pk, user.pk, exc_info=True)
+                continue
+            done += 1
+    return done
@@ -13,6 +13,7 @@ All Mailchimp API access goes through get_client(); tests mock that single entry
 """
 
 import hashlib
+import json
 import logging
 
 from django.conf import settings
@@ -39,6 +40,11 @@ MERGE_FIELDS = (
 )
 
 
+# Mailchimp's batch subscribe endpoint (POST /lists/{list_id}) takes at most 500 members a call;
+# the bulk sync task pages through a club's members the same size, so one page is one API call.
+BULK_SYNC_CHUNK = 500
+
+
 class MailchimpError(Exception):
     """Raised for unrecoverable Mailchimp problems the caller should surface/log."""
 
@@ -375,6 +381,28 @@ def member_merge_fields(member):
     return fields
 
 
+def _respects_remote_optout(member, desired, force_status=False):
+    """True when Mailchimp told us this contact unsubscribed/bounced and we mustn't undo that."""
+    return desired == "subscribed" and not force_status and member.mailchimp_status in ("unsubscribed", "cleaned")
+
+
+def _digest(*parts):
+    return hashlib.blake2b(json.dumps(parts, sort_keys=True, default=str).encode(), digest_size=8).hexdigest()
+
+
+def sync_fingerprint(member, list_id, *, status, merge_fields=None, tag_states=None):
+    """Digest of what we push for *member*, stored as ``<contact>:<tags>``.
+
+    The two halves are separate so the bulk sync can tell a changed contact (batch upsert) from
+    changed tags (per-member tag call). The list id is part of both, so pointing the club at a
+    different audience makes every member look changed.
+    """
+    if status == "archived":
+        return f"{_digest(list_id, 'archived')}:"
+    contact = _digest(list_id, status, (member.email or "").lower(), merge_fields)
+    return f"{contact}:{_digest(list_id, tag_states)}"
+
+
 def sync_member(member, force_status=False):
     """Upsert one member into the club's Mailchimp audience and reconcile their tags.
 
@@ -398,27 +426,35 @@ def sync_member(member, force_status=False):
     # Keep the power-seller/buyer tags accurate before we compute the tag set.
     member.refresh_cached_totals(save=True)
 
+    merge_fields = None
     try:
         if desired == "archived":
             _archive_member(client, member, list_id)
-            _record_sync(member, status="archived", web_id="")
+            _record_sync(
+                member, status="archived", web_id="", fingerprint=sync_fingerprint(member, list_id, status="archived")
+            )
             return True
 
+        merge_fields = member_merge_fields(member)
         body = {
             "email_address": member.email,
             "status_if_new": "subscribed" if desired == "subscribed" else "unsubscribed",
-            "merge_fields": member_merge_fields(member),
+            "merge_fields": merge_fields,
         }
         # Force the status unless we'd be overriding a Mailchimp-side unsubscribe.
-        respect_remote_optout = (
-            desired == "subscribed" and not force_status and member.mailchimp_status in ("unsubscribed", "cleaned")
-        )
+        respect_remote_optout = _respects_remote_optout(member, desired, force_status)
         if not respect_remote_optout:
             body["status"] = desired
 
         result = client.lists.set_list_member(list_id, subscriber_hash(member.email), body)
-        _sync_tags(client, member, list_id)
-        _record_sync(member, status=result.get("status", desired), web_id=str(result.get("web_id", "") or ""))
+        tag_states = _tag_states(member)
+        tags_synced = _sync_tags(client, member, list_id, tag_states)
+        status = result.get("status", desired)
+        fingerprint = sync_fingerprint(member, list_id, status=status, merge_fields=merge_fields, tag_states=tag_states)
+        if not tags_synced:
+            # Leave the tags half blank so the next bulk sync retries them.
+            fingerprint = fingerprint.split(":")[0] + ":"
+        _record_sync(member, status=status, web_id=str(result.get("web_id", "") or ""), fingerprint=fingerprint)
         _clear_error(club)
         return True
     except ApiClientError as e:
@@ -429,7 +465,13 @@ def sync_member(member, force_status=False):
             # Record it on the member row but don't propagate — other members in the batch should still sync.
             # The member pk is enough to identify them; addresses never go to the logs.
             logger.warning("Mailchimp rejected member %s: %s", member.pk, scrub_emails(detail))
-            _record_sync(member, status="cleaned", web_id=member.mailchimp_web_id or "")
+            # The fingerprint stops the nightly bulk sync resending the payload that was just refused.
+            _record_sync(
+                member,
+                status="cleaned",
+                web_id=member.mailchimp_web_id or "",
+                fingerprint=sync_fingerprint(member, list_id, status="cleaned", merge_fields=merge_fields),
+            )
         else:
             # 4xx auth or 5xx — record on the club so admins see it in the status panel.
             _record_error(club, detail)
@@ -485,17 +527,29 @@ def _top_category_names(member):
     return {name for name, _ in counter.most_common(5)}
 
 
-def _sync_tags(client, member, list_id):
-    from mailchimp_marketing.api_client import ApiClientError
+def _tag_states(member, category_names=None):
+    """The member's full {tag: active} map: lifecycle tags plus one tag per category.
 
+    Pass *category_names* when computing this for many members so the category list is read once.
+    """
     from auctions.models import Category
 
     tag_states = member.compute_mailchimp_tags()
 
     top_cats = _top_category_names(member)
-    for cat_name in Category.objects.exclude(name="Uncategorized").values_list("name", flat=True):
+    if category_names is None:
+        category_names = Category.objects.exclude(name="Uncategorized").values_list("name", flat=True)
+    for cat_name in category_names:
         tag_states[cat_name] = cat_name in top_cats
+    return tag_states
+
 
+def _sync_tags(client, member, list_id, tag_states=None):
+    """Push the member's tag states; returns False if Mailchimp refused them."""
+    from mailchimp_marketing.api_client import ApiClientError
+
+    if tag_states is None:
+        tag_states = _tag_states(member)
     tags = [{"name": name, "status": "active" if active else "inactive"} for name, active in tag_states.items()]
     try:
         client.lists.update_list_member_tags(list_id, subscriber_hash(member.email), {"tags": tags})
@@ -505,6 +559,8 @@ def _sync_tags(client, member, list_id):
         logger.error(
             "Failed to update Mailchimp tags for member %s: %s", member.pk, scrub_emails(_readable_api_error(e))
         )
+        return False
+    return True
 
 
 def _archive_member(client, member, list_id):
@@ -581,34 +637,144 @@ def in_scope_members(club):
     return ClubMember.objects.filter(club=club, is_deleted=False).exclude(email__isnull=True).exclude(email="")
 
 
-def backfill(club):
-    """Queue a sync for every in-scope member after an initial connection.
+def backfill(club, force=False):
+    """Queue a bulk sync of every in-scope member (initial connection, "sync now", and nightly).
 
-    Reuses the per-member task path so each contact's web_id/status is captured locally
-    (Mailchimp's batch endpoint returns asynchronously and makes that bookkeeping harder).
+    One task per club rather than one per member: bulk_sync_club_to_mailchimp pages through the
+    members and only sends the ones whose fingerprint changed since their last sync. force=True
+    resends everyone regardless. Returns the number of in-scope members.
     """
-    from auctions.tasks import sync_club_member_to_mailchimp
+    from auctions.tasks import bulk_sync_club_to_mailchimp
+
+    bulk_sync_club_to_mailchimp.delay(club.pk, force=force)
+    return in_scope_members(club).count()
+
 
-    count = 0
-    for member_id in in_scope_members(club).values_list("pk", flat=True):
-        sync_club_member_to_mailchimp.delay(member_id)
-        count += 1
-    return count
+def bulk_sync(club, members, *, force=False):
+    """Sync a page of *members* using the batch endpoint; returns how many were recorded as synced.
+
+    Each member's fingerprint (see sync_fingerprint) is compared with the one stored at their last
+    sync, and unchanged members are skipped without an API call. Changed contacts go out in one
+    batch subscribe call per BULK_SYNC_CHUNK; tags only for members whose tags changed, since the
+    tags endpoint is per-member (a batch "sync_tags" would wipe tags admins added by hand).
+    Archiving is a delete, which has no batch form either. force=True resends everyone.
+
+    Unlike sync_member this never resubscribes a remote opt-out, and a cleaned contact's details
+    are left alone (Mailchimp refuses updates to them anyway).
+    """
+    from mailchimp_marketing.api_client import ApiClientError
+
+    from auctions.models import Category, ClubMember
+
+    if not club.mailchimp_connected:
+        return 0
+    client = get_client(club)
+    if not client:
+        return 0
+
+    now = timezone.now()
+    recorded = {}
+
+    def record(member, status, fingerprint):
+        member.mailchimp_status = status
+        member.mailchimp_sync_fingerprint = fingerprint
+        member.mailchimp_last_synced = now
+        recorded[member.pk] = member
+
+    list_id = club.mailchimp_audience_id
+    category_names = list(Category.objects.exclude(name="Uncategorized").values_list("name", flat=True))
+    upserts = {}  # subscriber hash -> (batch entry, [(member, fingerprint)] sharing that address)
+    tag_pushes = []
+    archives = []
+    for member in members:
+        member.refresh_cached_totals(save=True)
+        desired = _desired_status(member)
+        stored = member.mailchimp_sync_fingerprint
+        if desired == "archived":
+            fingerprint = sync_fingerprint(member, list_id, status="archived")
+            if force or fingerprint != stored:
+                archives.append((member, fingerprint))
+            continue
+        status = member.mailchimp_status if _respects_remote_optout(member, desired) else desired
+        merge_fields = member_merge_fields(member)
+        tag_states = _tag_states(member, category_names)
+        fingerprint = sync_fingerprint(member, list_id, status=status, merge_fields=merge_fields, tag_states=tag_states)
+        if not force and fingerprint == stored:
+            continue
+        contact, tags = fingerprint.split(":")
+        stored_contact, _, stored_tags = stored.partition(":")
+        if force or tags != stored_tags:
+            tag_pushes.append((member, status, fingerprint, tag_states))
+        if status != "cleaned" and (force or contact != stored_contact):
+            entry = {"email_address": member.email, "status": status, "merge_fields": merge_fields}
+            # Until the tags have gone out too, only the contact half of the fingerprint is current.
+            upserts.setdefault(subscriber_hash(member.email), (entry, []))[1].append(
+                (member, f"{contact}:{stored_tags}")
+            )
+        elif tags == stored_tags:
+            record(member, status, fingerprint)
+
+    rejected = set()
+    failed = False
+    try:
+        entries = list(upserts.items())
+        for start in range(0, len(entries), BULK_SYNC_CHUNK):
+            chunk = dict(entries[start : start + BULK_SYNC_CHUNK])
+            result = client.lists.batch_list_members(
+                list_id, {"members": [entry for entry, _ in chunk.values()], "update_existing": True}
+            )
+            for item in (result.get("new_members") or []) + (result.get("updated_members") or []):
+                for member, _ in chunk.get(subscriber_hash(item.get("email_address", "")), (None, []))[1]:
+                    member.mailchimp_web_id = str(item.get("web_id", "") or member.mailchimp_web_id or "")
+            for error in result.get("errors") or []:
+                for member, _ in chunk.get(subscriber_hash(error.get("email_address", "")), (None, []))[1]:
+                    # Same as a 400 from sync_member: this address is bad, the rest of the batch is fine.
+                    logger.warning("Mailchimp rejected member %s: %s", member.pk, scrub_emails(error.get("error", "")))
+                    rejected.add(member.pk)
+            for entry, sharing in chunk.values():
+                for member, fingerprint in sharing:
+                    record(member, "cleaned" if member.pk in rejected else entry["status"], fingerprint)
+
+        for member, status, fingerprint, tag_states in tag_pushes:
+            if member.pk not in rejected and _sync_tags(client, member, list_id, tag_states):
+                record(member, status, fingerprint)
+
+        for member, fingerprint in archives:
+            _archive_member(client, member, list_id)
+            member.mailchimp_web_id = ""
+            record(member, "archived", fingerprint)
+    except ApiClientError as e:
+        # Auth or 5xx: nothing after this would get through either. Members not recorded yet keep
+        # their old fingerprint, so the next run picks them up.
+        failed = True
+        detail = _readable_api_error(e)
+        _record_error(club, detail)
+        logger.error("Mailchimp bulk sync failed for club %s: %s", club.pk, scrub_emails(detail))
+
+    ClubMember.objects.bulk_update(
+        recorded.values(),
+        ["mailchimp_status", "mailchimp_web_id", "mailchimp_last_synced", "mailchimp_sync_fingerprint"],
+    )
+    if recorded and not failed:
+        _clear_error(club)
+    return len(recorded)
 
 
 # --- local bookkeeping -----------------------------------------------------------------------
 
 
-def _record_sync(member, *, status, web_id):
+def _record_sync(member, *, status, web_id, fingerprint=""):
     from auctions.models import ClubMember
 
     member.mailchimp_status = status
     member.mailchimp_web_id = web_id
     member.mailchimp_last_synced = timezone.now()
+    member.mailchimp_sync_fingerprint = fingerprint
     ClubMember.objects.filter(pk=member.pk).update(
         mailchimp_status=status,
         mailchimp_web_id=web_id,
         mailchimp_last_synced=member.mailchimp_last_synced,
+        mailchimp_sync_fingerprint=fingerprint,
     )
 
 
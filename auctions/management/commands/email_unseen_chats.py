@@ -1,12 +1,13 @@
 import logging
 
-from django.contrib.auth.models import User
 from django.contrib.sites.models import Site
 from django.core.management.base import BaseCommand
-from django.db.models import Q
 from django.urls import reverse
+from django.utils import timezone
 from post_office import mail
 
+from auctions.chat_digest import CHUNK, mark_notified, pending_digests
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,38 +17,40 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         current_site = Site.objects.get_current()
-        users = User.objects.filter(
-            Q(userdata__email_me_when_people_comment_on_my_lots=True)
-            | Q(userdata__email_me_about_new_chat_replies=True)
-        )
-        for user in users:
-            try:
-                if (
-                    user.userdata.email_me_when_people_comment_on_my_lots and user.userdata.my_lot_subscriptions_count
-                ) or (user.userdata.email_me_about_new_chat_replies and user.userdata.other_lot_subscriptions_count):
-                    # collapse_key folds repeated chat pushes so a phone that was off shows one
-                    # notification, not a backlog. Non-push users are emailed exactly as before.
-                    from auctions.notifications import notify_user
+        # One query finds everybody with something unread; see auctions.chat_digest
+        digests = pending_digests()
+        # collapse_key folds repeated chat pushes so a phone that was off shows one
+        # notification, not a backlog. Non-push users are emailed exactly as before.
+        from auctions.notifications import notify_user
 
+        watched_url = f"https://{current_site.domain}{reverse('watched')}"
+        for start in range(0, len(digests), CHUNK):
+            notified = []
+            for digest in digests[start : start + CHUNK]:
+                user = digest.user
+                try:
                     notify_user(
                         user,
                         category="chat",
                         title="New replies on your lots",
                         body="You have unread comments on lots you're watching.",
-                        url=f"https://{current_site.domain}{reverse('watched')}",
-                        send_email=lambda user=user: mail.send(
+                        url=watched_url,
+                        send_email=lambda user=user, digest=digest: mail.send(
                             user.email,
                             template="unread_chat_messages",
                             context={
                                 "name": user.first_name,
                                 "domain": current_site.domain,
-                                "data": user.userdata,
+                                "data": digest,
                                 "unsubscribe": user.userdata.unsubscribe_link,
                             },
                         ),
                         collapse_key="chat",
                     )
-                    user.userdata.mark_all_subscriptions_notified()
-            except Exception:
-                logger.exception("email_unseen_chats failed for user %s", user.pk)
-                continue
+                except Exception:
+                    logger.exception("email_unseen_chats failed for user %s", user.pk)
+                    continue
+                notified.append(user.pk)
+            if notified:
+                mark_notified(notified, timezone.now())
+        self.stdout.write(f"{len(digests)} user(s) with unread chat messages")
@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand, CommandError
 
+from auctions.account_jobs import JobBusyError
+
 
 class Command(BaseCommand):
     help = "Move application data from one user account to another without deleting the source account"
@@ -29,7 +31,11 @@ class Command(BaseCommand):
             msg = "Source and target users must be different."
             raise CommandError(msg)
 
-        user_to_empty.userdata.merge_into(user_where_it_should_go)
+        try:
+            user_to_empty.userdata.merge_into(user_where_it_should_go)
+        except JobBusyError as e:
+            msg = f"{e}; try again once it has finished."
+            raise CommandError(msg) from e
         self.stdout.write(
             self.style.SUCCESS(f"Moved data from {user_to_empty.username} to {user_where_it_should_go.username}.")
         )
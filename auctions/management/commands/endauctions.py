@@ -1,9 +1,11 @@
 import logging
+from collections import defaultdict
 
 from django.contrib.sites.models import Site
 from django.core.management.base import BaseCommand
 from post_office import mail
 
+from auctions import offline_changes
 from auctions.models import Auction, Lot
 
 logger = logging.getLogger(__name__)
@@ -125,13 +127,19 @@ def deactivate_pretty_much_over_lots():
             except Exception:
                 logger.exception("auto_award_bap_points failed for unsold lot %s", lot.pk)
     # Bulk-deactivate in one query; these lots are already wound down, so no per-lot save side effects.
-    Lot.objects.filter(
+    still_active = Lot.objects.filter(
         auction_id__in=over_auction_ids,
         active=True,
         is_deleted=False,
         banned=False,
         deactivated=False,
-    ).update(active=False)
+    )
+    lots_by_auction = defaultdict(list)
+    for lot_pk, auction_id in still_active.values_list("pk", "auction_id"):
+        lots_by_auction[auction_id].append(lot_pk)
+    still_active.update(active=False)
+    for auction_id, lot_pks in lots_by_auction.items():
+        offline_changes.note_changes(offline_changes.LOT, lot_pks, auction_id)
 
 
 class Command(BaseCommand):
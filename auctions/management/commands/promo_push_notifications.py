@@ -3,7 +3,7 @@
 The push analogue of ``weekly_promo``: users with ``push_notifications_instead_of_email`` are skipped
 by the weekly promo email and instead get a per-auction push as each promoted auction crosses its
 send-at gate. Each user is notified at most once per auction, ever (``PushNotificationSent`` is the
-dedupe ledger). Runs hourly.
+dedupe ledger). Runs hourly; each auction's pushes go out as a few batch tasks, not one per user.
 """
 
 import datetime
@@ -70,12 +70,12 @@ class Command(BaseCommand):
         )
         candidates = candidates.exclude(pk__in=already_sent)
 
-        from auctions.tasks import send_push_to_user
+        from auctions.notifications import enqueue_push_batch
 
         auction_url = f"https://{current_site.domain}{auction.get_absolute_url()}"
         kind = "online auction" if auction.is_online else "in-person auction"
-        sent = 0
-        for user in candidates:
+        bodies = {}
+        for user in candidates.select_related("userdata"):
             userdata = user.userdata
             # Re-check the full gate (device present + push configured globally), not just opt-in.
             if not userdata.user_prefers_push():
@@ -97,19 +97,23 @@ class Command(BaseCommand):
             distance_text = distance_display(distance, user)
             if distance_text:
                 body += f", {distance_text} away"
-            send_push_to_user.delay(
-                user.pk,
-                title="New auction",
-                body=body,
-                url=auction_url,
-                category="promo",
-                auction_pk=auction.pk,
-            )
-            # Count the promotion attempt (mirrors weekly_promo_emails_sent).
-            Auction.objects.filter(pk=auction.pk).update(
-                promo_push_notifications_sent=F("promo_push_notifications_sent") + 1
-            )
-            sent += 1
+            bodies[user.pk] = body
+        if not bodies:
+            return 0
+        # One batch for everyone: each user's own distance travels in ``bodies``.
+        sent = enqueue_push_batch(
+            list(bodies),
+            title="New auction",
+            body=f"{auction.title} — {kind}",
+            url=auction_url,
+            category="promo",
+            auction_pk=auction.pk,
+            bodies=bodies,
+        )
+        # Count the promotion attempts (mirrors weekly_promo_emails_sent).
+        Auction.objects.filter(pk=auction.pk).update(
+            promo_push_notifications_sent=F("promo_push_notifications_sent") + sent
+        )
         return sent
 
     @staticmethod
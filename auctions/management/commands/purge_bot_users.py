@@ -4,6 +4,9 @@ from allauth.account.models import EmailAddress
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
+from auctions import account_jobs
+from auctions.models import AccountJob
+
 logger = logging.getLogger(__name__)
 
 
@@ -11,9 +14,10 @@ class Command(BaseCommand):
     help = "Remove users with no verified email"
 
     def handle(self, *args, **options):
-        emails = EmailAddress.objects.filter(verified=False, primary=True)
-        for email in emails:
+        emails = EmailAddress.objects.filter(verified=False, primary=True).select_related("user__userdata")
+        for email in emails.iterator(chunk_size=account_jobs.CHUNK):
             time_difference = email.user.userdata.last_activity - email.user.date_joined
             if time_difference < timezone.timedelta(hours=24):
-                logger.info("Deleting %s", email.user)
-                email.user.delete()
+                logger.info("Queueing deletion of %s", email.user)
+                # a purge job, so a bot that left a lot behind doesn't hold locks for one long cascade
+                account_jobs.queue(AccountJob.PURGE, email.user)
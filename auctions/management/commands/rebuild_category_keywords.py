@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from auctions.category_keywords import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the word -> category table guess_category() ranks from (CategoryKeyword). "
+        "Lot saves keep it current; this catches what they can't see, like queryset updates "
+        "and auctions that stopped being promoted."
+    )
+
+    def handle(self, *args, **options):
+        rows = rebuild()
+        self.stdout.write(f"{rows} keyword/category rows")
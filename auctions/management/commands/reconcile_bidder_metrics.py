@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from auctions.bidder_metrics import RECONCILE_DAYS, rebuild, reconcile_recent
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the per-auction bid and lot-view counts add_tos_info() sorts by (BidderMetrics). "
+        "Bid and page view saves keep them current; this catches what they can't see."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help=f"Recount every auction, not just those active in the last {RECONCILE_DAYS} days",
+        )
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            rows = rebuild()
+            self.stdout.write(f"{rows} auction/user rows")
+        else:
+            auctions = reconcile_recent()
+            self.stdout.write(f"Recounted {auctions} auction(s)")
@@ -1,10 +1,19 @@
+import datetime
+
 from django.contrib.auth.models import User
 from django.contrib.sites.models import Site
 from django.core.management.base import BaseCommand
+from django.db.models import Q
 from django.urls import reverse
+from django.utils import timezone
 from post_office import mail
 
-from auctions.models import Auction, Lot, UserData, Watch
+from auctions.models import Auction, Lot, UserData
+
+# Auctions per watcher query; keeps the IN list a sensible size on a busy evening.
+BATCH = 500
+# Auction.ending_soon and Lot.ending_soon, as a time: watchers hear two hours before the end.
+WARNING = datetime.timedelta(hours=2)
 
 
 class Command(BaseCommand):
@@ -12,39 +21,45 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         current_site = Site.objects.get_current()
+        warn_before = timezone.now() + WARNING
+        # Auction.ending_soon: under two hours to date_end (no date_end never ends)
+        auctions = list(
+            Auction.objects.exclude(is_deleted=True).filter(
+                watch_warning_email_sent=False, is_online=True, date_end__lt=warn_before
+            )
+        )
+        # Lot.ending_soon for lots that aren't part of an auction: calculated_end is date_end, or now
+        # when there isn't one
+        lot_pks = list(
+            Lot.objects.exclude(is_deleted=True)
+            .filter(watch_warning_email_sent=False, auction=None, deactivated=False)
+            .filter(Q(date_end__isnull=True) | Q(date_end__lt=warn_before))
+            .values_list("pk", flat=True)
+        )
+        for auction in auctions:
+            self.stdout.write(f"{auction} is ending soon")
         # Keyed by user pk so each watcher is notified once, and so opted-in app users can get a push
         # instead of the email (notify_user, below). Value is the User for the routing decision.
         notify_targets = {}
-        auctions = Auction.objects.exclude(is_deleted=True).filter(watch_warning_email_sent=False, is_online=True)
-        for auction in auctions:
-            if auction.ending_soon:
-                self.stdout.write(f"{auction} is ending soon")
-                lots = Lot.objects.exclude(is_deleted=True).filter(banned=False, auction=auction)
-                for lot in lots:
-                    self.stdout.write(rf" +-\ {lot}")
-                    watched = Watch.objects.filter(lot_number=lot.lot_number)
-                    for watch in watched:
-                        self.stdout.write(f" | +-- {watch}")
-                        user = User.objects.get(pk=watch.user.pk)
-                        notify_targets[user.pk] = user
-                auction.watch_warning_email_sent = True
-                auction.save()
-            # else:
-            #    self.stdout.write(f'{auction} still in progress')
-        # Handle lots that aren't attached to an auction
-        lots = Lot.objects.exclude(is_deleted=True).filter(
-            watch_warning_email_sent=False, auction=None, deactivated=False
+        auction_pks = [auction.pk for auction in auctions]
+        watcher_queries = [
+            Q(
+                watch__lot_number__auction__in=auction_pks[start : start + BATCH],
+                watch__lot_number__is_deleted=False,
+                watch__lot_number__banned=False,
+            )
+            for start in range(0, len(auction_pks), BATCH)
+        ]
+        if lot_pks:
+            watcher_queries.append(Q(watch__lot_number__in=lot_pks))
+        for watchers in watcher_queries:
+            for user in User.objects.filter(watchers).distinct().select_related("userdata"):
+                notify_targets[user.pk] = user
+        Auction.objects.filter(pk__in=auction_pks).update(watch_warning_email_sent=True)
+        Lot.objects.filter(pk__in=lot_pks).update(watch_warning_email_sent=True)
+        self.stdout.write(
+            f"{len(auctions)} auction(s) and {len(lot_pks)} lot(s) ending soon, {len(notify_targets)} watcher(s)"
         )
-        for lot in lots:
-            if lot.ending_soon:
-                self.stdout.write(f"{lot}")
-                watched = Watch.objects.filter(lot_number=lot.lot_number)
-                for watch in watched:
-                    self.stdout.write(f"+-- {watch}")
-                    user = User.objects.get(pk=watch.user.pk)
-                    notify_targets[user.pk] = user
-                lot.watch_warning_email_sent = True
-                lot.save()
         # Collected all watchers; push for opted-in app users, otherwise email exactly as before.
         from auctions.notifications import notify_user
 
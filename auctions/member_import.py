@@ -0,0 +1,447 @@
+"""Bulk writes for the club member CSV import.
+
+ClubMemberCSVImportView used to ask Club.find_member once or twice per row to build the preview,
+then create or save() the members one at a time on confirm. Each ClubMember.save() runs a handful
+of queries of its own -- the membership number, the account link, the email status, the duplicate
+check -- and its post_save receivers queue a Mailchimp sync, a Brevo sync, a geocode and a Wallet
+refresh for every member. A roster of a few thousand rows held a web worker for minutes and left
+thousands of tasks queued behind it.
+
+:class:`MemberIndex` loads the club's members once and answers find_member's question from memory,
+for the preview and for the duplicate check on confirm. :func:`import_members` does what save()
+and those receivers did, for the whole file at once: a few queries for the lookups, bulk_create
+and bulk_update for the writes, then -- once the transaction commits -- one Mailchimp and one
+Brevo bulk sync for the club, one Wallet refresh if a pass changed, and geocoding in pages of
+BATCH. Shadow AuctionTOS rows and Discord roles are still made one member at a time, and only for
+the clubs and members that use them.
+"""
+
+from __future__ import annotations
+
+import bisect
+import datetime
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from auctions import request_cache
+
+# Rows per bulk write, account lookup and geocoding task.
+BATCH = 500
+# What a Wallet pass shows; see update_wallet_passes_on_member_change.
+WALLET_FIELDS = ("name", "membership_number", "membership_expiration_date", "membership_last_paid", "is_deleted")
+# Everything an import can change on an existing member. possible_duplicate is written on its own,
+# after the new members have pks to point at.
+UPDATE_FIELDS = (
+    "name",
+    "phone_number",
+    "address",
+    "memo",
+    "discord_id",
+    "contact_status",
+    "is_deleted",
+    "email",
+    "user",
+    "email_address_status",
+    "membership_last_paid",
+    "membership_expiration_date",
+    "membership_expiration_reminder_due",
+    "membership_expiration_reminder_30_days_due",
+    "admin_edited",
+)
+
+
+def _date(value):
+    return datetime.date.fromisoformat(value) if value else None
+
+
+class MemberIndex:
+    """A club's active members, with Club.find_member's lookups done in memory.
+
+    Members can be added and discarded as an import goes, so each row sees the ones before it.
+    Of several matches the oldest wins, by (createdon, pk) as find_member orders them; members
+    added here count as newer than any already saved. Change a member's name or email only
+    between discard() and add().
+    """
+
+    def __init__(self, members):
+        self.members = {}
+        self._entries = {}
+        self._by_email = defaultdict(list)
+        self._by_name = []
+        self._added = 0
+        for member in members:
+            self.add(member)
+
+    @classmethod
+    def for_club(cls, club):
+        from auctions.models import ClubMember
+
+        members = list(ClubMember.objects.filter(club=club, is_deleted=False))
+        for member in members:
+            member.club = club
+        return cls(members)
+
+    def add(self, member):
+        if member.pk:
+            key = (0, member.createdon, member.pk)
+            self.members[member.pk] = member
+        else:
+            self._added += 1
+            key = (1, self._added)
+        email = (member.email or "").lower()
+        name = (member.name or "").lower()
+        self._entries[id(member)] = (key, email, name)
+        if email:
+            bisect.insort(self._by_email[email], (key, member))
+        bisect.insort(self._by_name, (name, key, member))
+
+    def discard(self, member):
+        entry = self._entries.pop(id(member), None)
+        if entry is None:
+            return
+        key, email, name = entry
+        self.members.pop(member.pk, None)
+        if email:
+            self._by_email[email].remove((key, member))
+        del self._by_name[bisect.bisect_left(self._by_name, (name, key))]
+
+    def find(self, name="", email="", exclude=None):
+        """Club.find_member(name, email), leaving out the member ``exclude`` rather than a pk."""
+        from auctions.filters import rhyming_name_prefixes
+        from auctions.models import normalize_email
+
+        email = normalize_email(email)
+        if not name and not email:
+            return None
+        if email:
+            for _key, member in self._by_email.get(email.lower(), ()):
+                if member is not exclude:
+                    return member
+        if name:
+            best = None
+            exact = name.strip().lower()
+            prefixes = [(exact, True)] + [(prefix, False) for prefix in rhyming_name_prefixes(name)]
+            for prefix, whole in prefixes:
+                i = bisect.bisect_left(self._by_name, (prefix,))
+                while i < len(self._by_name):
+                    entry_name, key, member = self._by_name[i]
+                    if not (entry_name == prefix if whole else entry_name.startswith(prefix)):
+                        break
+                    if member is not exclude and (best is None or key < best[0]):
+                        best = (key, member)
+                    i += 1
+            if best:
+                return best[1]
+        return None
+
+
+def _ref(member):
+    """A dict key for a member or a bare pk, before and after a new member has a pk."""
+    if isinstance(member, int):
+        return ("pk", member)
+    return ("pk", member.pk) if member.pk else ("new", id(member))
+
+
+def _pk(member):
+    return member if isinstance(member, int) or member is None else member.pk
+
+
+class _Import:
+    """One confirmed import: the rows are applied in memory in file order, then written by write()."""
+
+    def __init__(self, club, added_by):
+        self.club = club
+        self.added_by = added_by
+        self.index = MemberIndex.for_club(club)
+        self.created = []
+        self.updated = {}
+        self.before = {}
+        self.joined = defaultdict(list)
+        self.links = {}
+        self.deleted = []
+        self.discord = {}
+
+    def apply(self, action, decision):
+        kind = action["action"]
+        if kind == "skip":
+            return "skipped"
+        fields = action.get("fields", {})
+        target_pk = action.get("target_pk")
+        if kind == "create" or (kind == "duplicate" and decision == "create"):
+            self.create(fields, duplicate_of=target_pk if kind == "duplicate" else None)
+            return "created"
+        member = self.index.members.get(target_pk) if target_pk else None
+        if member is None:
+            self.create(fields)
+            return "created"
+        self.update(member, fields)
+        return "updated" if kind == "update" else "merged"
+
+    def _link(self, member, partner):
+        self.links[_ref(member)] = (member, partner)
+
+    def _partner(self, member):
+        if _ref(member) in self.links:
+            return self.links[_ref(member)][1]
+        return member.possible_duplicate_id
+
+    def _check_duplicate(self, member):
+        """The duplicate check at the end of ClubMember.save()."""
+        if not member.name:
+            return
+        duplicate = self.index.find(name=member.name, exclude=member)
+        if duplicate:
+            self._link(member, duplicate)
+            self._link(duplicate, member)
+        else:
+            partner = self._partner(member)
+            if partner:
+                self._link(partner, None)
+            self._link(member, None)
+
+    def create(self, fields, duplicate_of=None):
+        from auctions.models import ClubMember
+
+        member = ClubMember(
+            club=self.club,
+            email=fields.get("email", ""),
+            name=fields.get("name", ""),
+            phone_number=fields.get("phone", ""),
+            address=fields.get("address", ""),
+            memo=fields.get("memo", ""),
+            discord_id=fields.get("discord_id") or None,
+            contact_status=fields.get("contact_status") or "contact",
+            membership_last_paid=_date(fields.get("membership_last_paid")),
+            membership_expiration_date=_date(fields.get("membership_expiration_date")),
+            send_welcome_email=False,
+            welcome_email_sent=True,
+            source="csv",
+            added_by=self.added_by,
+            is_deleted=fields.get("mark_deleted", False),
+        )
+        if member.membership_last_paid or member.membership_expiration_date:
+            member.schedule_membership_expiration_reminders()
+        if member.discord_id:
+            self.discord[_ref(member)] = member
+        self.created.append(member)
+        self._joined(member, fields)
+        if member.is_deleted:
+            return
+        self._check_duplicate(member)
+        self.index.add(member)
+        if duplicate_of:
+            # what the admin picked on the review page wins over whatever the name check found
+            self._link(member, duplicate_of)
+            target = self.index.members.get(duplicate_of)
+            if target is not None and not self._partner(target):
+                self._link(target, member)
+
+    def update(self, member, fields):
+        """ClubMemberCSVImportView's merge: only non-empty values overwrite, so a sparse walk-in row
+        never blanks existing contact details."""
+        self.index.discard(member)
+        self.before.setdefault(member.pk, {f: getattr(member, f) for f in WALLET_FIELDS + ("address",)})
+        previous_paid, previous_expiration = member.membership_last_paid, member.membership_expiration_date
+        previous_email, previous_discord = member.email, member.discord_id
+        # An admin importing their roster owns these rows now; the account-deletion rules follow.
+        member.admin_edited = True
+        if fields.get("name"):
+            member.name = fields["name"]
+        if fields.get("phone"):
+            member.phone_number = fields["phone"]
+        if fields.get("address"):
+            member.address = fields["address"]
+        if fields.get("memo"):
+            member.memo = fields["memo"]
+        if fields.get("discord_id"):
+            member.discord_id = fields["discord_id"]
+        if fields.get("contact_status") is not None:
+            member.contact_status = fields["contact_status"]
+        if fields.get("mark_deleted"):
+            member.is_deleted = True
+        if fields.get("email") and not member.email:
+            member.email = fields["email"]
+        if _date(fields.get("membership_last_paid")) is not None:
+            member.membership_last_paid = _date(fields["membership_last_paid"])
+        if _date(fields.get("membership_expiration_date")) is not None:
+            member.membership_expiration_date = _date(fields["membership_expiration_date"])
+
+        if (member.membership_last_paid, member.membership_expiration_date) != (previous_paid, previous_expiration):
+            member.schedule_membership_expiration_reminders(
+                member.membership_expiration_reminder_due, member.membership_expiration_reminder_30_days_due
+            )
+        if member.email and member.email != previous_email:
+            member.email_address_status = "UNKNOWN"
+        if member.discord_id != previous_discord:
+            self.discord[_ref(member)] = member
+        self.updated[member.pk] = member
+        self._joined(member, fields)
+        if member.is_deleted:
+            partner = self._partner(member)
+            if partner:
+                self._link(partner, None)
+            self._link(member, None)
+            self.deleted.append(member)
+            return
+        self._check_duplicate(member)
+        self.index.add(member)
+
+    def _joined(self, member, fields):
+        date_joined = _date(fields.get("date_joined"))
+        if date_joined is not None:
+            self.joined[date_joined].append(member)
+
+    def _link_accounts(self, members):
+        """Each member's account, by email, as ClubMember.save() links it."""
+        from django.contrib.auth.models import User
+
+        emails = sorted({member.email.lower() for member in members})
+        users = {}
+        for start in range(0, len(emails), BATCH):
+            for email, pk in (
+                User.objects.annotate(email_lower=Lower("email"))
+                .filter(email_lower__in=emails[start : start + BATCH])
+                .order_by("-pk")
+                .values_list("email_lower", "pk")
+            ):
+                users[email] = pk  # lowest pk last, so it wins
+        for member in members:
+            member.user_id = users.get(member.email.lower())
+
+    def _inherit_email_status(self, members):
+        """The email_address_status ClubMember.save() copies from another record with the same email."""
+        from auctions.models import AuctionTOS, ClubMember
+
+        emails = sorted({member.email for member in members})
+        statuses = {}
+        for start in range(0, len(emails), BATCH):
+            chunk = emails[start : start + BATCH]
+            for email, status in (
+                ClubMember.objects.exclude(email_address_status="UNKNOWN")
+                .filter(email__in=chunk, is_deleted=False)
+                .order_by("createdon")
+                .values_list("email", "email_address_status")
+            ):
+                statuses[email] = status  # newest last, so it wins
+            rest = [email for email in chunk if email not in statuses]
+            for email, status in (
+                AuctionTOS.objects.exclude(email_address_status="UNKNOWN")
+                .filter(email__in=rest, auction__club=self.club)
+                .order_by("createdon")
+                .values_list("email", "email_address_status")
+            ):
+                statuses[email] = status
+        for member in members:
+            member.email_address_status = statuses.get(member.email, member.email_address_status)
+
+    def _pick_membership_numbers(self):
+        from auctions.models import ClubMember, _pick_unique_membership_number
+
+        numbers = [member.membership_number for member in self.created]
+        taken = set()
+        for start in range(0, len(numbers), BATCH):
+            taken.update(
+                ClubMember.objects.filter(membership_number__in=numbers[start : start + BATCH]).values_list(
+                    "membership_number", flat=True
+                )
+            )
+        for member in self.created:
+            while member.membership_number in taken:
+                member.membership_number = _pick_unique_membership_number()
+            taken.add(member.membership_number)
+
+    def write(self):
+        from auctions.models import Auction, ClubMember
+        from auctions.signals import _associate_auctions_for_member, propagate_clubmember_to_shadow_tos
+
+        touched = self.created + list(self.updated.values())
+        self._link_accounts([member for member in touched if member.email and not member.user_id])
+        self._inherit_email_status(
+            [member for member in touched if member.email and member.email_address_status == "UNKNOWN"]
+        )
+        self._pick_membership_numbers()
+
+        ClubMember.objects.bulk_update(list(self.updated.values()), UPDATE_FIELDS, batch_size=BATCH)
+        ClubMember.objects.bulk_create(self.created, batch_size=BATCH)
+        missing = [member for member in self.created if member.pk is None]
+        for start in range(0, len(missing), BATCH):
+            chunk = missing[start : start + BATCH]
+            pks = dict(ClubMember.objects.filter(uuid__in=[m.uuid for m in chunk]).values_list("uuid", "pk"))
+            for member in chunk:
+                member.pk = pks[member.uuid]
+        for date_joined, members in self.joined.items():
+            ClubMember.objects.filter(pk__in={member.pk for member in members}).update(createdon=date_joined)
+        links = [
+            ClubMember(pk=_pk(member), possible_duplicate_id=_pk(partner)) for member, partner in self.links.values()
+        ]
+        ClubMember.objects.bulk_update(links, ["possible_duplicate"], batch_size=BATCH)
+        if self.deleted:
+            ClubMember.objects.filter(possible_duplicate__in=[member.pk for member in self.deleted]).update(
+                possible_duplicate=None
+            )
+
+        for member in self.discord.values():
+            member.maybe_assign_discord_role()
+        if (
+            self.created
+            and Auction.objects.filter(
+                club=self.club, is_deleted=False, invoiced=False, manage_users_through_club__in=["all", "checkin"]
+            ).exists()
+        ):
+            for member in self.created:
+                propagate_clubmember_to_shadow_tos(ClubMember, member, created=True)
+        for member in self.updated.values():
+            if member.permission_admin or member.permission_manage_auctions:
+                _associate_auctions_for_member(member)
+        request_cache.invalidate()
+
+        geocode = [member.pk for member in self.created] + [
+            pk for pk, member in self.updated.items() if member.address != self.before[pk]["address"]
+        ]
+        wallet = any(
+            getattr(member, f) != self.before[pk][f] for pk, member in self.updated.items() for f in WALLET_FIELDS
+        )
+        if touched:
+            transaction.on_commit(lambda: queue_follow_up(self.club.pk, geocode, wallet=wallet))
+
+
+def queue_follow_up(club_pk, geocode_pks, *, wallet=False):
+    """The club's downstream work for an import, in place of each member's post_save tasks."""
+    from auctions.models import Club
+    from auctions.tasks import (
+        bulk_sync_club_to_brevo,
+        bulk_sync_club_to_mailchimp,
+        geocode_club_members,
+        notify_apple_wallet_devices_for_club,
+        update_google_wallet_objects_for_club,
+    )
+
+    club = Club.objects.filter(pk=club_pk).first()
+    if club is None:
+        return
+    if club.mailchimp_connected:
+        bulk_sync_club_to_mailchimp.delay(club.pk)
+    if club.brevo_connected:
+        bulk_sync_club_to_brevo.delay(club.pk)
+    if wallet:
+        update_google_wallet_objects_for_club.delay(club.pk)
+        notify_apple_wallet_devices_for_club.delay(club.pk)
+    for start in range(0, len(geocode_pks), BATCH):
+        geocode_club_members.delay(geocode_pks[start : start + BATCH])
+
+
+def import_members(club, actions, decisions, *, added_by):
+    """Apply a confirmed import's planned ``actions`` (see ClubMemberCSVImportView.plan_row) and
+    return {result tag: count}. ``decisions`` is "merge" or "create" for each duplicate row's ``i``.
+
+    Run it inside a transaction; the downstream work is queued for when that commits.
+    """
+    batch = _Import(club, added_by)
+    results = {}
+    for action in actions:
+        tag = batch.apply(action, decisions.get(action["i"], "merge"))
+        results[tag] = results.get(tag, 0) + 1
+    batch.write()
+    return results
@@ -2,6 +2,8 @@
 Custom middleware for the auctions application.
 """
 
+from .request_cache import request_scope
+
 
 class MobileAppMiddleware:
     """Flag requests coming from the native mobile app's WebView.
@@ -62,3 +64,18 @@ class MobileAppMiddleware:
         if "android" in token:
             return "android"
         return ""
+
+
+class RequestCacheMiddleware:
+    """Remember permission and TOS lookups for the length of one request.
+
+    See auctions.request_cache. The scope covers the view and the rendering of its response, which
+    is where most of the repeat lookups come from (every admin-only button asks permission_check).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_scope():
+            return self.get_response(request)
@@ -20,7 +20,7 @@ def backfill_club_money(apps, schema_editor):
     if not invoice_ids:
         return
 
-    from auctions.models import Club, Invoice
+    from auctions.models import Club, ClubMoney, Invoice
 
     # Defer fields added after this migration so the SELECT does not reference columns
     # that don't yet exist when the migration runs on a fresh database.
@@ -41,8 +41,9 @@ def backfill_club_money(apps, schema_editor):
     if deferred_lookups:
         queryset = queryset.defer(*deferred_lookups)
 
+    # commit=False: ClubMoneyPeriod doesn't exist yet; 0413 counts these rows into it.
     for invoice in queryset.iterator(chunk_size=200):
-        invoice.sync_club_money()
+        ClubMoney.objects.bulk_create(invoice.sync_club_money(commit=False))
 
 
 class Migration(migrations.Migration):
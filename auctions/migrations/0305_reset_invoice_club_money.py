@@ -30,8 +30,9 @@ def reset_invoice_ledger(apps, schema_editor):
     invoices = Invoice.objects.filter(pk__in=invoice_ids).select_related(
         "auction", "auction__club", "auctiontos_user", "auctiontos_user__auction", "auctiontos_user__auction__club"
     )
+    # commit=False: ClubMoneyPeriod doesn't exist yet; 0413 counts these rows into it.
     for invoice in invoices.iterator(chunk_size=200):
-        invoice.sync_club_money()
+        ClubMoney.objects.bulk_create(invoice.sync_club_money(commit=False))
 
 
 class Migration(migrations.Migration):
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.17 on 2026-10-19 03:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0403_alter_clubannouncement_subject"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="clubmember",
+            name="brevo_sync_fingerprint",
+            field=models.CharField(
+                blank=True,
+                default="",
+                editable=False,
+                help_text="Digest of the contact last pushed to Brevo; the bulk sync skips members whose digest is unchanged.",
+                max_length=40,
+            ),
+        ),
+        migrations.AddField(
+            model_name="clubmember",
+            name="mailchimp_sync_fingerprint",
+            field=models.CharField(
+                blank=True,
+                default="",
+                editable=False,
+                help_text="Digest of the contact and tags last pushed to Mailchimp; the bulk sync skips members whose digest is unchanged.",
+                max_length=40,
+            ),
+        ),
+    ]
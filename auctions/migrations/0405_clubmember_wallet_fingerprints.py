@@ -0,0 +1,22 @@
+# Generated by Django 5.2.17 on 2026-10-19 03:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0404_clubmember_sync_fingerprints"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="clubmember",
+            name="apple_pass_fingerprint",
+            field=models.CharField(blank=True, default="", editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name="clubmember",
+            name="google_wallet_fingerprint",
+            field=models.CharField(blank=True, default="", editable=False, max_length=16),
+        ),
+    ]
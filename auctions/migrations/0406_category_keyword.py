@@ -0,0 +1,55 @@
+# Generated by Django 5.2.17 on 2026-10-19 03:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from auctions.category_keywords import REBUILD_BATCH, UNCATEGORIZED, keyword_counts
+
+
+def count_keywords(apps, schema_editor):
+    """Fill the table once, so guess_category() has something to rank from the moment it switches over."""
+    Lot = apps.get_model("auctions", "Lot")
+    CategoryKeyword = apps.get_model("auctions", "CategoryKeyword")
+    rows = (
+        Lot.objects.filter(is_deleted=False, category_automatically_added=False, species_category__isnull=False)
+        .exclude(species_category__name=UNCATEGORIZED)
+        .exclude(auction__promote_this_auction=False)
+        .values_list("lot_name", "species_category_id")
+    )
+    counts = keyword_counts(rows.iterator(chunk_size=REBUILD_BATCH))
+    CategoryKeyword.objects.bulk_create(
+        [
+            CategoryKeyword(keyword=keyword, category_id=category_id, lots=lots)
+            for (keyword, category_id), lots in counts.items()
+        ],
+        batch_size=REBUILD_BATCH,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0405_clubmember_wallet_fingerprints"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CategoryKeyword",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("keyword", models.CharField(max_length=64)),
+                ("lots", models.PositiveIntegerField(default=0)),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="+", to="auctions.category"
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("keyword", "category"), name="unique_category_keyword")
+                ],
+            },
+        ),
+        migrations.RunPython(count_keywords, migrations.RunPython.noop),
+    ]
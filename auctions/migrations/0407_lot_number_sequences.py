@@ -0,0 +1,32 @@
+# Generated by Django 5.2.17 on 2026-10-19 03:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0406_category_keyword"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="auction",
+            name="lot_number_sequence",
+            field=models.PositiveIntegerField(
+                blank=True,
+                editable=False,
+                help_text="The last lot number handed out.  Blank until the first lot after this was added; see reserve_lot_numbers",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="auctiontos",
+            name="lot_number_sequence",
+            field=models.PositiveIntegerField(
+                blank=True,
+                editable=False,
+                help_text="The last seller-dash lot number (the part after the dash) handed out to this seller",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.17 on 2026-10-19 03:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+from auctions.bidder_metrics import BATCH
+
+
+def count_metrics(apps, schema_editor):
+    """Fill the table once, so add_tos_info() reads real numbers from the moment it switches over."""
+    Bid = apps.get_model("auctions", "Bid")
+    PageView = apps.get_model("auctions", "PageView")
+    BidderMetrics = apps.get_model("auctions", "BidderMetrics")
+    counts = {}
+    bids = Bid.objects.exclude(is_deleted=True).filter(lot_number__auction__isnull=False)
+    for auction_id, user_id, n in (
+        bids.values_list("lot_number__auction_id", "user_id").annotate(n=Count("pk")).order_by().iterator()
+    ):
+        counts[(auction_id, user_id)] = [n, 0]
+    views = PageView.objects.filter(user__isnull=False, lot_number__auction__isnull=False)
+    for auction_id, user_id, n in (
+        views.values_list("lot_number__auction_id", "user_id")
+        .annotate(n=Count("lot_number", distinct=True))
+        .order_by()
+        .iterator()
+    ):
+        counts.setdefault((auction_id, user_id), [0, 0])[1] = n
+    BidderMetrics.objects.bulk_create(
+        (
+            BidderMetrics(auction_id=auction_id, user_id=user_id, lots_bid=lots_bid, lots_viewed=lots_viewed)
+            for (auction_id, user_id), (lots_bid, lots_viewed) in counts.items()
+        ),
+        batch_size=BATCH,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0407_lot_number_sequences"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BidderMetrics",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("lots_bid", models.PositiveIntegerField(default=0)),
+                ("lots_viewed", models.PositiveIntegerField(default=0)),
+                (
+                    "auction",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="+", to="auctions.auction"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="+", to=settings.AUTH_USER_MODEL
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Bidder metrics",
+                "constraints": [models.UniqueConstraint(fields=("auction", "user"), name="unique_bidder_metrics")],
+            },
+        ),
+        migrations.RunPython(count_metrics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.17 on 2026-10-19 03:48
+
+from django.db import migrations, models
+
+import auctions.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0408_bidder_metrics"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lot",
+            name="render_stamp",
+            field=models.CharField(blank=True, default=auctions.models.new_render_stamp, editable=False, max_length=32),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.17 on 2026-10-19 03:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0409_lot_render_stamp"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mobiledevice",
+            name="label_dpi",
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="mobiledevice",
+            name="label_resolution",
+            field=models.CharField(blank=True, default="", max_length=11),
+        ),
+        migrations.AddField(
+            model_name="remoteprintjob",
+            name="label_dpi",
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="remoteprintjob",
+            name="label_resolution",
+            field=models.CharField(blank=True, default="", max_length=11),
+        ),
+        migrations.AddField(
+            model_name="remoteprintjob",
+            name="rendered_count",
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.17 on 2026-10-19 04:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0410_remote_print_bundle"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MobileOfflineChange",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("kind", models.CharField(max_length=10)),
+                ("object_pk", models.PositiveIntegerField()),
+                (
+                    "auction",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="+", to="auctions.auction"
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["auction", "id"], name="auctions_mo_auction_6197de_idx"),
+                    models.Index(fields=["kind", "object_pk"], name="auctions_mo_kind_ad629d_idx"),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.17 on 2026-10-19 04:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0411_mobile_offline_change"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncOutbox",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("task", models.CharField(max_length=200)),
+                ("object_pk", models.PositiveIntegerField()),
+                ("due", models.DateTimeField(db_index=True)),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(fields=("task", "object_pk"), name="unique_sync_outbox_entry")],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.17 on 2026-10-19 04:23
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Case, Count, DecimalField, Sum, Value, When
+from django.db.models.functions import TruncMonth
+
+
+def count_periods(apps, schema_editor):
+    """Add up the ledger so far, so balances read from the new table straight away."""
+    ClubMoney = apps.get_model("auctions", "ClubMoney")
+    ClubMoneyPeriod = apps.get_model("auctions", "ClubMoneyPeriod")
+    decimal = DecimalField(max_digits=12, decimal_places=2)
+    zero = Value(Decimal("0.00"))
+    totals = (
+        ClubMoney.objects.annotate(month=TruncMonth("date"))
+        .values("club_id", "month", "category")
+        .annotate(
+            money_in=Sum(Case(When(amount__gt=0, then="amount"), default=zero, output_field=decimal)),
+            money_out=Sum(Case(When(amount__lt=0, then="amount"), default=zero, output_field=decimal)),
+            entries=Count("pk"),
+        )
+        .order_by()
+    )
+    ClubMoneyPeriod.objects.bulk_create([ClubMoneyPeriod(**row) for row in totals], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0412_sync_outbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClubMoneyPeriod",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("month", models.DateField()),
+                ("category", models.CharField(max_length=40)),
+                ("money_in", models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ("money_out", models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ("entries", models.PositiveIntegerField(default=0)),
+                (
+                    "club",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="+", to="auctions.club"
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("club", "month", "category"), name="unique_club_money_period")
+                ],
+            },
+        ),
+        migrations.RunPython(count_periods, migrations.RunPython.noop),
+    ]
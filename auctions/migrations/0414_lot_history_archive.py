@@ -0,0 +1,100 @@
+# Generated by Django 5.2.17 on 2026-10-19 04:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0413_club_money_period"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LotHistoryArchive",
+            fields=[
+                ("id", models.IntegerField(primary_key=True, serialize=False)),
+                ("message", models.CharField(blank=True, max_length=400, null=True)),
+                ("timestamp", models.DateTimeField()),
+                ("seen", models.BooleanField(default=False)),
+                ("current_price", models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ("changed_price", models.BooleanField(default=False)),
+                ("notification_sent", models.BooleanField(default=False)),
+                ("bid_amount", models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ("removed", models.BooleanField(default=False)),
+            ],
+            options={
+                "verbose_name": "Archived chat history",
+                "verbose_name_plural": "Archived chat history",
+                "ordering": ["timestamp"],
+            },
+        ),
+        migrations.CreateModel(
+            name="LotHistorySummary",
+            fields=[
+                (
+                    "lot",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="history_summary",
+                        serialize=False,
+                        to="auctions.lot",
+                    ),
+                ),
+                ("chat_count", models.PositiveIntegerField(default=0, help_text="Chat messages that weren't removed")),
+                ("bid_count", models.PositiveIntegerField(default=0, help_text="Rows that changed the price")),
+                ("last_message", models.CharField(blank=True, max_length=400, null=True)),
+                ("last_message_timestamp", models.DateTimeField(blank=True, null=True)),
+                ("archived_on", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "Archived chat summaries",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="lothistory",
+            index=models.Index(
+                fields=["lot", "removed", "changed_price", "timestamp"], name="auctions_lo_lot_id_d1cb9e_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="lothistoryarchive",
+            name="lot",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="archived_history",
+                to="auctions.lot",
+            ),
+        ),
+        migrations.AddField(
+            model_name="lothistoryarchive",
+            name="user",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="lothistorysummary",
+            name="last_message_user",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lothistoryarchive",
+            index=models.Index(fields=["lot", "timestamp"], name="auctions_lo_lot_id_7bfbff_idx"),
+        ),
+    ]
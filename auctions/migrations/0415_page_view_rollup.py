@@ -0,0 +1,53 @@
+# Generated by Django 5.2.17 on 2026-10-19 04:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0414_lot_history_archive"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PageViewRollup",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("period", models.CharField(choices=[("hour", "Hour"), ("day", "Day")], max_length=4)),
+                ("start", models.DateTimeField()),
+                ("source", models.CharField(blank=True, default="", max_length=200)),
+                ("referrer", models.CharField(blank=True, default="", max_length=600)),
+                ("views", models.PositiveIntegerField(default=0)),
+                ("signed_in_views", models.PositiveIntegerField(default=0)),
+                ("total_time", models.PositiveBigIntegerField(default=0)),
+                (
+                    "auction",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="auctions.auction",
+                    ),
+                ),
+                (
+                    "lot",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="auctions.lot",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["period", "start"], name="auctions_pa_period_df1aed_idx"),
+                    models.Index(fields=["auction", "start"], name="auctions_pa_auction_3b8f57_idx"),
+                    models.Index(fields=["lot", "start"], name="auctions_pa_lot_id_63fd73_idx"),
+                ],
+            },
+        ),
+    ]
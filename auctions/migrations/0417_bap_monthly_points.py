@@ -0,0 +1,67 @@
+# Generated by Django 5.2.17 on 2026-10-19 04:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+
+
+def count_months(apps, schema_editor):
+    """Add up the awards so far, so the charts read from the new table straight away."""
+    BapAward = apps.get_model("auctions", "BapAward")
+    BapMonthlyPoints = apps.get_model("auctions", "BapMonthlyPoints")
+    # the same awards BapAward.recalculate_member_points counts
+    rows = (
+        BapAward.objects.exclude(lot__is_deleted=True)
+        .exclude(lot__banned=True)
+        .annotate(month=TruncMonth("date"))
+        .values("club_member_id", "month")
+        .annotate(bap=Sum("points"), hap=Sum("hap_points"), cap=Sum("cap_points"))
+        .order_by()
+    )
+    BapMonthlyPoints.objects.bulk_create(
+        [
+            BapMonthlyPoints(
+                club_member_id=row["club_member_id"],
+                month=row["month"],
+                points=row["bap"] or 0,
+                hap_points=row["hap"] or 0,
+                cap_points=row["cap"] or 0,
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0416_account_job"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BapMonthlyPoints",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("month", models.DateField()),
+                ("points", models.IntegerField(default=0)),
+                ("hap_points", models.IntegerField(default=0)),
+                ("cap_points", models.IntegerField(default=0)),
+                (
+                    "club_member",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_points",
+                        to="auctions.clubmember",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("club_member", "month"), name="unique_bap_monthly_points")
+                ],
+            },
+        ),
+        migrations.RunPython(count_months, migrations.RunPython.noop),
+    ]
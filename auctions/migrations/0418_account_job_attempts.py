@@ -0,0 +1,20 @@
+# Generated by Django 5.2.17 on 2026-10-19 04:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auctions", "0417_bap_monthly_points"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="accountjob",
+            name="attempts",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                help_text="Runs that failed; resume_account_jobs stops retrying after account_jobs.MAX_ATTEMPTS",
+            ),
+        ),
+    ]
@@ -9,7 +9,7 @@ from auctions.mobile.services.ar import (
     MAX_DETECTIONS_PER_FRAME,
     MAX_FRAMES_PER_BATCH,
 )
-from auctions.mobile.services.offline import MAX_OPS_PER_SYNC
+from auctions.mobile.services.offline import LAYOUTS, MAX_OPS_PER_SYNC
 from auctions.mobile.services.social_auth import SUPPORTED_PROVIDERS
 from auctions.models import MobileDevice, ObservedPrinter, RemotePrintJob, UserData, UserLabelPrefs
 
@@ -167,6 +167,9 @@ class MobileDeviceHeartbeatSerializer(serializers.Serializer):
     # Echoed by the app so the website can see the method the phone is actually set to; it is
     # deliberately NOT what print_ready is computed from.
     print_method = serializers.CharField(required=False, allow_blank=True, default="", max_length=20)
+    # The size the app asks labels/<pk>/ for, so a job's labels can be drawn ahead of it.
+    label_resolution = serializers.CharField(required=False, allow_blank=True, default="", max_length=11)
+    label_dpi = serializers.IntegerField(required=False, allow_null=True, default=None)
 
 
 # ---------------------------------------------------------------------------
@@ -570,3 +573,6 @@ class OfflineSyncSerializer(serializers.Serializer):
         allow_empty=True,
         max_length=MAX_OPS_PER_SYNC,
     )
+    # The snapshot in the response, as for GET offline/snapshot/: since the last cursor, and how laid out.
+    since = serializers.CharField(required=False, allow_blank=True, default="", max_length=40)
+    layout = serializers.ChoiceField(choices=LAYOUTS, required=False, default="rows")
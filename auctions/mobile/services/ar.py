@@ -13,6 +13,7 @@ from django.core.cache import cache
 from django.db.models import Q
 from django.utils import timezone
 
+from auctions import bidder_metrics
 from auctions.models import Auction, Lot, LotObservation, LotPosition, PageView, Watch
 
 logger = logging.getLogger(__name__)
@@ -364,6 +365,8 @@ def record_ar_events(auction, user, events, request):
         )
     if to_create:
         PageView.objects.bulk_create(to_create)
+        # bulk_create skips the PageView save signal that keeps these counted.
+        bidder_metrics.note_lot_views(user.pk, [view.lot_number for view in to_create])
     return len(to_create)
 
 
@@ -9,11 +9,16 @@ Also backs the ``checkin/join/`` and ``checkin/set-location/`` mutations. Every
 auction history.
 """
 
+import datetime
 import logging
+import math
+from collections import defaultdict
 
+from django.core.cache import cache
+from django.db.models import Q
 from django.utils import timezone
 
-from auctions.models import AuctionTOS, CheckinNudge, PickupLocation, distance_to
+from auctions.models import Auction, AuctionTOS, CheckinNudge, PickupLocation
 from auctions.services import apply_club_member_to_tos, ensure_club_member
 
 logger = logging.getLogger(__name__)
@@ -26,6 +31,132 @@ ADMIN_RADIUS_MI = 2.0
 # a 500 ft geofence without exposing an exact distance.
 DISTANCE_RESOLUTION_MI = 0.005
 
+# Every app user pings in the background, and almost every ping is nowhere near an auction. The
+# candidates (promoted in-person auctions inside their welcome window, with their single physical
+# location) are a handful of rows site-wide, so they're cached as one small geohash-bucketed index
+# and a ping resolves with a bucket lookup plus a few haversines -- no query unless something is
+# actually close. Saving an Auction or PickupLocation drops the index (signals.py); the timeout is
+# the safety net for queryset updates that bypass signals.
+WELCOME_INDEX_CACHE_KEY = "checkin_welcome_index"
+WELCOME_INDEX_CACHE_SECONDS = 300
+# Precision-4 cells are ~39 km x 19.5 km (narrower in longitude away from the equator): bigger than
+# the 2 mi box around a ping below ~80 degrees latitude, so that box's corners and centre name every
+# cell it can touch.
+GEOHASH_PRECISION = 4
+EARTH_RADIUS_MI = 6371 * 0.6213712  # the same constants distance_to uses
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def _geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Standard base-32 geohash of a point."""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # geohash interleaves longitude first
+    while len(chars) < precision:
+        rng, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coordinate >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_GEOHASH_ALPHABET[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def _nearby_geohashes(latitude, longitude):
+    """Every cell the ``ADMIN_RADIUS_MI`` box around a point can overlap (see GEOHASH_PRECISION)."""
+    dlat = math.degrees(ADMIN_RADIUS_MI / EARTH_RADIUS_MI)
+    dlng = dlat / max(math.cos(math.radians(latitude)), 0.01)
+    points = [(latitude, longitude)] + [
+        (max(min(latitude + y, 90.0), -90.0), ((longitude + x + 180.0) % 360.0) - 180.0)
+        for y in (-dlat, dlat)
+        for x in (-dlng, dlng)
+    ]
+    return {_geohash(lat, lng) for lat, lng in points}
+
+
+def _distance_mi(lat1, lng1, lat2, lng2):
+    """Haversine distance in miles, CEILING-rounded to DISTANCE_RESOLUTION_MI like distance_to."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+    )
+    distance = 2 * EARTH_RADIUS_MI * math.asin(min(1.0, math.sqrt(a)))
+    return math.ceil(distance / DISTANCE_RESOLUTION_MI) * DISTANCE_RESOLUTION_MI
+
+
+def _build_welcome_index(now):
+    """``{geohash: [(auction_pk, location_pk, lat, lng, opens, closes), ...]}`` -- two queries.
+
+    Takes auctions whose welcome window overlaps the next cache period, so an auction opening its
+    window mid-period is already in the index; the window itself is tested per ping. Auctions
+    without exactly one physical location are left out, as the feature doesn't apply to them.
+    """
+    horizon = now + datetime.timedelta(seconds=WELCOME_INDEX_CACHE_SECONDS)
+    auctions = Auction.objects.filter(
+        Q(date_end__gte=now) | Q(date_end__isnull=True, date_start__gte=now - datetime.timedelta(hours=12)),
+        is_online=False,
+        is_deleted=False,
+        promote_this_auction=True,
+        date_start__lte=horizon + datetime.timedelta(hours=3),
+    ).only("date_start", "date_end")
+    windows = {auction.pk: auction.welcome_window() for auction in auctions}
+    locations = defaultdict(list)
+    for location in PickupLocation.objects.filter(auction_id__in=windows, pickup_by_mail=False).only(
+        "auction_id", "latitude", "longitude"
+    ):
+        locations[location.auction_id].append(location)
+    index = defaultdict(list)
+    for auction_pk, auction_locations in locations.items():
+        window = windows[auction_pk]
+        if window is None or len(auction_locations) != 1:
+            continue
+        location = auction_locations[0]
+        index[_geohash(location.latitude, location.longitude)].append(
+            (auction_pk, location.pk, location.latitude, location.longitude, *window)
+        )
+    return dict(index)
+
+
+def welcome_index(now=None):
+    """The cached candidate index, rebuilt on a miss."""
+    index = cache.get(WELCOME_INDEX_CACHE_KEY)
+    if index is None:
+        index = _build_welcome_index(now or timezone.now())
+        cache.set(WELCOME_INDEX_CACHE_KEY, index, WELCOME_INDEX_CACHE_SECONDS)
+    return index
+
+
+def invalidate_welcome_index():
+    """Drop the index so the next ping rebuilds it."""
+    cache.delete(WELCOME_INDEX_CACHE_KEY)
+
+
+def nearby_welcome_candidates(latitude, longitude, now=None):
+    """``[(distance_mi, auction_pk), ...]`` within ADMIN_RADIUS_MI and in their welcome window,
+    nearest first. Pure Python against the cached index."""
+    now = now or timezone.now()
+    index = welcome_index(now)
+    candidates = []
+    for cell in _nearby_geohashes(latitude, longitude):
+        for auction_pk, _location_pk, lat, lng, opens, closes in index.get(cell, ()):
+            if not opens <= now <= closes:
+                continue
+            distance = _distance_mi(latitude, longitude, lat, lng)
+            if distance <= ADMIN_RADIUS_MI:
+                candidates.append((distance, auction_pk))
+    return sorted(candidates)
+
 
 def _single_pickup_location(auction):
     """The auction's one physical (non-mail) pickup location, or None unless exactly one exists."""
@@ -93,14 +224,14 @@ def _check_in(user, auction, tos, now):
     )
 
 
-def _evaluate_auction(user, auction, location, now):
+def _evaluate_auction(user, auction, distance, now):
     """Return ``(actions, is_member)`` for a single candidate auction.
 
     ``actions`` is the display-ready list (usually 0-2). ``is_member`` is True when the user already
     has an AuctionTOS here — i.e. they've joined or been added by an admin — so the caller can point
-    ``last_auction_used`` at the nearest auction the user actually belongs to."""
+    ``last_auction_used`` at the nearest auction the user actually belongs to. ``distance`` is in
+    miles, rounded the way distance_to rounds."""
     actions = []
-    distance = location.distance  # miles, annotated
     # The 500 ft welcome radius assumes the stored coordinates really are the front door. Until an
     # admin has pinned the location from their phone (``exact_location_set``), they're a geocoded
     # street address that can be off by far more than that, so everything except the auto-check-in
@@ -167,8 +298,8 @@ def _evaluate_auction(user, auction, location, now):
 def evaluate_ping(user, latitude, longitude, now=None):
     """Evaluate one position ping and return the list of display-ready actions (possibly empty)."""
     now = now or timezone.now()
-    # Candidate physical pickup locations within the (larger) admin radius; the auction is filtered
-    # down to in-person, single-location, in-window below.
+    # Candidate auctions within the (larger) admin radius, already narrowed to in-person,
+    # single-location and in-window by the cached index, nearest first.
     #
     # ``promote_this_auction`` is the disclosure gate and belongs here rather than in the app: an
     # unpromoted auction is one whose creator has not agreed to it being shown to strangers, and
@@ -177,33 +308,26 @@ def evaluate_ping(user, latitude, longitude, now=None):
     # to any signed-in app user who happened to be nearby. It gates the admin nudges too, not just the
     # join offer -- a reminder to set the location is still a mention of an auction we should not be
     # mentioning.
-    locations = (
-        PickupLocation.objects.filter(
-            auction__is_online=False,
-            auction__is_deleted=False,
-            auction__promote_this_auction=True,
-            pickup_by_mail=False,
-        )
-        .annotate(distance=distance_to(latitude, longitude, approximate_distance_to=DISTANCE_RESOLUTION_MI))
-        .exclude(distance__gt=ADMIN_RADIUS_MI)
-        .select_related("auction")
-        .order_by("distance")
-    )
+    candidates = nearby_welcome_candidates(latitude, longitude, now)
+    if not candidates:
+        return []
+    auctions = Auction.objects.in_bulk([auction_pk for _distance, auction_pk in candidates])
     actions = []
     seen = set()
     nearest_member_auction = None
-    for location in locations:
-        auction = location.auction
-        if auction.pk in seen:
+    for distance, auction_pk in candidates:
+        auction = auctions.get(auction_pk)
+        if auction is None or auction.pk in seen:
             continue
         seen.add(auction.pk)
-        if _single_pickup_location(auction) is None:
-            continue  # feature only applies to auctions with exactly one physical location
+        # The index can be up to a cache period old; re-check the gates on the fresh row.
+        if auction.is_online or auction.is_deleted or not auction.promote_this_auction:
+            continue
         if not auction.in_welcome_window(now):
             continue
-        auction_actions, is_member = _evaluate_auction(user, auction, location, now)
+        auction_actions, is_member = _evaluate_auction(user, auction, distance, now)
         actions.extend(auction_actions)
-        # Locations are distance-ordered, so the first auction the user belongs to is the nearest one.
+        # Candidates are distance-ordered, so the first auction the user belongs to is the nearest one.
         if is_member and nearest_member_auction is None:
             nearest_member_auction = auction
     if nearest_member_auction is not None:
@@ -0,0 +1,250 @@
+"""Draw a lot label straight into a 1-bit bitmap, without making a PDF first.
+
+``label_raster`` gets the Bluetooth PNG by laying the label out in WeasyPrint and rasterizing the
+PDF with pdfium. That is exact, but WeasyPrint is most of the time a volunteer at a check-in table
+spends waiting for a label, and a thermal printer only wants black and white dots anyway.
+
+This draws the same label -- the layout of ``label_template.html``, from the same context
+``SingleLotLabelView`` builds, so ``Auction.label_print_fields`` and the user's ``UserLabelPrefs``
+apply unchanged -- with Pillow, at the printer's pixel grid, in a few milliseconds. It follows the
+template's boxes: a first column with the lot number, the QR code and the short fields, and a
+second column of wrapped text, clipped to the label the way the template's ``overflow: hidden``
+clips it. ``LabelBitmapMatchesPdfTests`` compares the two pixel by pixel on a coarse grid, so a
+template change that isn't made here too fails a test rather than a printer.
+
+Fonts are DejaVu, which is what WeasyPrint's default serif resolves to on the servers.
+"""
+
+import html
+import io
+import logging
+import re
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+# What CSS calls 1px, in inches; the template's outlines are 1px.
+CSS_PX = 1 / 96
+SERIF_FONTS = {
+    (False, False): ("DejaVuSerif.ttf", "DejaVuSans.ttf"),
+    (True, False): ("DejaVuSerif-Bold.ttf", "DejaVuSans-Bold.ttf"),
+    (False, True): ("DejaVuSerif-Italic.ttf", "DejaVuSerif.ttf", "DejaVuSans.ttf"),
+}
+# Most labels a batch request may ask for; the same cap the thermal PDF has.
+MAX_BATCH_LABELS = 100
+
+_BR = re.compile(r"<br\s*/?>", re.IGNORECASE)
+
+
+class _Fonts:
+    """Pillow fonts by point size, for one output scale (pixels per point)."""
+
+    def __init__(self, scale):
+        self.scale = scale
+        self._fonts = {}
+
+    def get(self, points, *, bold=False, italic=False):
+        key = (round(points, 2), bold, italic)
+        if key not in self._fonts:
+            self._fonts[key] = self._load(max(1.0, points * self.scale), bold, italic)
+        return self._fonts[key]
+
+    @staticmethod
+    def _load(size, bold, italic):
+        from PIL import ImageFont
+
+        for name in SERIF_FONTS[(bold, italic and not bold)]:
+            try:
+                return ImageFont.truetype(name, size)
+            except OSError:
+                continue
+        return ImageFont.load_default(size=size)
+
+
+def _em(value):
+    """The multiplier in an ``"0.60em"`` font size from LotLabelView, 1 when there is none."""
+    if not value:
+        return 1.0
+    return float(str(value).removesuffix("em"))
+
+
+def _flow(draw, paragraphs, *, x, y, width, strut):
+    """Lay out paragraphs of (word, font) tokens from ``y`` down, wrapping at ``width`` like a
+    browser would. A paragraph is what the template puts between two ``<br>``; an empty one is
+    still a line tall. Returns the y below the last line."""
+    strut_ascent, strut_descent = strut.getmetrics()
+    for tokens in paragraphs:
+        lines = [[]]
+        line_width = 0
+        for word, font in tokens:
+            word_width = draw.textlength(word, font=font)
+            if lines[-1]:
+                space = draw.textlength(" ", font=lines[-1][-1][1])
+                if line_width + space + word_width > width:
+                    lines.append([])
+                    line_width = 0
+                else:
+                    line_width += space
+            lines[-1].append((word, font, line_width))
+            line_width += word_width
+        for line in lines:
+            ascent = max([strut_ascent] + [font.getmetrics()[0] for _word, font, _at in line])
+            descent = max([strut_descent] + [font.getmetrics()[1] for _word, font, _at in line])
+            for word, font, at in line:
+                draw.text((x + at, y + ascent), word, fill=0, font=font, anchor="ls")
+            y += ascent + descent
+    return y
+
+
+def _words(text, font):
+    return [(word, font) for word in str(text).split()]
+
+
+def _second_column(label, context, fonts):
+    """The second column of label_template.html as paragraphs of (word, font) tokens."""
+    fields = label.auction.label_print_fields or ""
+    regular = fonts.get(context["font_size"])
+    small = fonts.get(context["description_font_size"])
+    paragraphs = []
+    if "lot_name" in fields:
+        paragraphs.append(_words(label.lot_name, regular))
+    if "scientific_name" in fields and label.scientific_name_line:
+        paragraphs.append(_words(label.scientific_name_line, fonts.get(context["description_font_size"], italic=True)))
+    elif "scientific_name" in fields and label.common_name_line:
+        paragraphs.append(_words(label.common_name_line, small))
+    if "custom_field_1" in fields and label.custom_field_1:
+        paragraphs.append(_words(label.custom_field_1, small))
+    if "category" in fields and label.category:
+        paragraphs.append(_words(label.category, regular))
+    if label.second_column_fields:
+        paragraphs.append([token for field in label.second_column_fields for token in _words(field, regular)])
+    if label.sold:
+        paragraphs.append(
+            _words("Winner:", regular) + _words(label.winner_name, fonts.get(context["font_size"], bold=True))
+        )
+        if label.auction.multi_location:
+            paragraphs.append(_words(label.winner_location, regular))
+    else:
+        seller = []
+        if "seller_name" in fields:
+            seller += _words(f"Seller: {label.seller_name}", regular)
+        if "seller_email" in fields:
+            seller += _words(label.seller_email, fonts.get(context["font_size"] * _em(label.seller_email_font_size)))
+        if "seller_name" in fields or "seller_email" in fields:
+            paragraphs.append(seller)
+    if "description_label" in fields:
+        # description_label is the description with every tag but <br> taken out
+        paragraphs.extend(_words(html.unescape(part), small) for part in _BR.split(label.description_label))
+    return paragraphs
+
+
+def draw_label(context, label, *, width, height, dpi):
+    """The label for ``label`` (a Lot from ``context["labels"]``) as a 1-bit ``width`` x ``height``
+    Pillow image, placed on the page the way ``label_raster.rasterize_pdf`` places the PDF's page."""
+    from PIL import Image, ImageDraw
+
+    page_width, page_height = context["page_width"] * 72, context["page_height"] * 72
+    scale = min(width / page_width, height / page_height)  # pixels per point
+    ppi = scale * 72
+    left = (width - round(page_width * scale)) // 2 + round(context["page_margin_left"] * ppi)
+    top = (height - round(page_height * scale)) // 2 + round(context["page_margin_top"] * ppi)
+    label_width, label_height = round(context["label_width"] * ppi), round(context["label_height"] * ppi)
+    fonts = _Fonts(scale)
+
+    # overflow: hidden -- draw the label on its own canvas and paste it, so nothing spills out
+    canvas = Image.new("L", (max(1, label_width), max(1, label_height)), 255)
+    draw = ImageDraw.Draw(canvas)
+    strut = fonts.get(context["font_size"])
+
+    # First column: the lot number, the QR code and the short fields, never wrapped
+    number_font = fonts.get(context["font_size"] * _em(label.lot_number_font_size), bold=True)
+    y = _flow(draw, [_words(label.lot_number_display, number_font)], x=0, y=0, width=float("inf"), strut=strut)
+    if "qr_code" in (label.auction.label_print_fields or ""):
+        qr = _qr_code(label.qr_code, ppi)
+        strut_ascent, strut_descent = strut.getmetrics()
+        # An inline image sits on the baseline of its line
+        canvas.paste(qr, (0, round(y + max(0, strut_ascent - qr.height))))
+        y += max(strut_ascent, qr.height) + strut_descent
+    field_font = fonts.get(context["first_column_font_size"])
+    _flow(
+        draw,
+        [_words(field, field_font) for field in label.first_column_fields],
+        x=0,
+        y=y,
+        width=float("inf"),
+        strut=field_font,
+    )
+
+    _flow(
+        draw,
+        _second_column(label, context, fonts),
+        x=round(context["first_column_width"] * ppi),
+        y=0,
+        width=context["text_area_width"] * ppi,
+        strut=strut,
+    )
+
+    image = Image.new("L", (width, height), 255)
+    image.paste(canvas, (left, top))
+    if context["print_border"]:
+        border = max(1, round(CSS_PX * ppi))
+        ImageDraw.Draw(image).rectangle(
+            (left - border, top - border, left + label_width + border - 1, top + label_height + border - 1),
+            outline=0,
+            width=border,
+        )
+    return image.point(lambda value: 255 if value >= 128 else 0, mode="1")
+
+
+def _qr_code(text, ppi):
+    """The QR code ``{% qr_from_text label.qr_code size=4 border="1" %}`` draws, at ``ppi``."""
+    from PIL import Image
+    from qr_code.qrcode.maker import make_embedded_qr_code, make_qr_code_image
+    from qr_code.qrcode.utils import QRCodeOptions
+
+    # The template's SVG gives the physical size; the PNG of the same code gives the modules.
+    svg = make_embedded_qr_code(text, QRCodeOptions(size=4, border=1))
+    size_mm = float(re.search(r'width="([\d.]+)mm"', svg).group(1))
+    modules = Image.open(io.BytesIO(make_qr_code_image(text, QRCodeOptions(size=4, border=1, image_format="png"))))
+    side = max(1, round(size_mm / 25.4 * ppi))
+    return modules.convert("L").resize((side, side), Image.Resampling.NEAREST)
+
+
+def encode_png(image, dpi):
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", dpi=(dpi, dpi))
+    return buffer.getvalue()
+
+
+def render_lot_label_bitmaps(lots, request, *, width, height, dpi):
+    """{lot pk: PNG bytes} for each of ``lots`` that has a label to draw, for ``request.user``.
+
+    Lots are drawn an auction at a time, so the label context -- prefs, print fields, column
+    split -- is worked out once per auction rather than once per label. Lots with no auction are
+    left out; the caller decides what to do about them.
+    """
+    from .label_pdf import label_auction, single_lot_label_view
+
+    by_auction = defaultdict(list)
+    for lot in lots:
+        auction = label_auction(lot)
+        if auction is not None:
+            by_auction[auction.pk].append(lot)
+    pngs = {}
+    for auction_lots in by_auction.values():
+        view = single_lot_label_view(auction_lots, request, single_label_page=True, mark_printed=False)
+        context = view.get_context_data()
+        for label in context["labels"]:
+            if isinstance(label, str):  # an "empty" label, for a part-used sheet
+                continue
+            pngs[label.pk] = encode_png(draw_label(context, label, width=width, height=height, dpi=dpi), dpi)
+    return pngs
+
+
+def render_lot_label_bitmap(lot, request, *, width, height, dpi):
+    """One lot's label as a PNG, or ``None`` if it can't be drawn (see label_raster.render_lot_label_png)."""
+    try:
+        return render_lot_label_bitmaps([lot], request, width=width, height=height, dpi=dpi).get(lot.pk)
+    except Exception:
+        logger.exception("Could not draw the label bitmap for lot %s", getattr(lot, "pk", None))
+        return None
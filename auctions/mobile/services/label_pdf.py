@@ -13,20 +13,21 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-def render_single_lot_pdf(lot, request, *, single_label_page=False, mark_printed=True):
-    """Render *lot*'s label as a one-lot PDF using the caller's saved label prefs.
+def label_auction(lot):
+    """The auction whose label config a lot's label is drawn with, or None."""
+    return lot.auction or (lot.auctiontos_seller.auction if lot.auctiontos_seller else None)
 
-    ``request`` is the DRF request (its ``user`` is the JWT-authenticated user). Returns
-    ``(pdf_bytes, "application/pdf")``. Raises ``ValueError`` if the lot has no auction to render
-    against (mirrors the web view, which drives labels off the auction's print-field config).
 
-    ``single_label_page`` sizes the page to one label rather than a sheet, and ``mark_printed=False``
-    suppresses the "rendering a sheet marks it printed" side effect — both for the raster path,
-    where the label is being drawn rather than sent to a printer.
+def single_lot_label_view(lots, request, *, single_label_page=False, mark_printed=True):
+    """A ``SingleLotLabelView`` set up to render *lots* (all from one auction) for ``request.user``.
+
+    ``get_context_data()`` on it gives the label template's context: the user's ``UserLabelPrefs``,
+    the auction's print fields and each label's column fields. Raises ``ValueError`` if the lots
+    have no auction to render against.
     """
     from auctions.views import SingleLotLabelView
 
-    auction = lot.auction or (lot.auctiontos_seller.auction if lot.auctiontos_seller else None)
+    auction = label_auction(lots[0])
     if auction is None:
         msg = "Lot has no auction; cannot render a label PDF."
         raise ValueError(msg)
@@ -40,11 +41,26 @@ def render_single_lot_pdf(lot, request, *, single_label_page=False, mark_printed
     view.request = django_request
     view.args = ()
     view.kwargs = {}
-    view.lot = lot
+    view.lot = lots[0]
+    view.lots = lots if len(lots) > 1 else None
     view.auction = auction
     view.single_label_page = single_label_page
     view.mark_labels_printed = mark_printed
+    return view
 
+
+def render_single_lot_pdf(lot, request, *, single_label_page=False, mark_printed=True):
+    """Render *lot*'s label as a one-lot PDF using the caller's saved label prefs.
+
+    ``request`` is the DRF request (its ``user`` is the JWT-authenticated user). Returns
+    ``(pdf_bytes, "application/pdf")``. Raises ``ValueError`` if the lot has no auction to render
+    against (mirrors the web view, which drives labels off the auction's print-field config).
+
+    ``single_label_page`` sizes the page to one label rather than a sheet, and ``mark_printed=False``
+    suppresses the "rendering a sheet marks it printed" side effect — both for the raster path,
+    where the label is being drawn rather than sent to a printer.
+    """
+    view = single_lot_label_view([lot], request, single_label_page=single_label_page, mark_printed=mark_printed)
     context = view.get_context_data()
     response = view.render_to_response(context)
     response.render()
@@ -9,11 +9,16 @@ them was the one anybody had tuned.
 So there is one layout now. WeasyPrint renders the same ``label_template.html`` the PDF uses, at
 the same size, and pdfium rasterizes page one to the pixel grid the printer wants. Changing a label
 means changing the template, once.
+
+Both the PDF and the PNG made from it are cached by their content (see ``auctions.label_cache``), so
+a label printed before -- or prewarmed when the lot was added -- comes straight back.
 """
 
 import io
 import logging
 
+from auctions import label_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -66,7 +71,7 @@ def render_lot_label_png(lot, request, *, width, height, dpi):
         # of a blank page; mark_printed=False because nothing has printed yet — the app posts
         # labels/printed/ for what actually comes out.
         pdf_bytes, _ = render_single_lot_pdf(lot, request, single_label_page=True, mark_printed=False)
-        return rasterize_pdf(pdf_bytes, width=width, height=height, dpi=dpi)
+        return label_cache.cached_png(pdf_bytes, width=width, height=height, dpi=dpi, rasterize=rasterize_pdf)
     except ValueError:
         # The expected miss: a lot with no auction has no label configuration to render against.
         logger.info("Lot %s has no label PDF to rasterize; drawing a fallback label.", getattr(lot, "pk", None))
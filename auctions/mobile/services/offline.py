@@ -21,16 +21,19 @@ request/response views tied to sessions, forms and the in-person lot queue. Keep
 import logging
 from decimal import Decimal, InvalidOperation
 
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.db.models import Q
 from django.utils import timezone
 
+from auctions import offline_changes
 from auctions.models import (
     Auction,
+    AuctionHistory,
     AuctionTOS,
     Invoice,
     Lot,
     LotHistory,
+    MobileOfflineChange,
     MobileOfflineOp,
     PickupLocation,
 )
@@ -88,16 +91,17 @@ def get_last_admin_auction(user):
     return None
 
 
-def _invoice_status_by_tos(auction):
+def _invoice_status_by_tos(auction, tos_pks=None):
     """Map ``auctiontos_user_id`` → latest invoice status for the auction, in one query.
 
     Mirrors ``AuctionTOS.invoice`` (latest by ``-date``) without an N+1 across the users list.
     """
+    invoices = Invoice.objects.filter(auctiontos_user__auction=auction)
+    if tos_pks is not None:
+        invoices = invoices.filter(auctiontos_user_id__in=tos_pks)
     status_by_tos = {}
-    for tos_id, tos_status in (
-        Invoice.objects.filter(auctiontos_user__auction=auction)
-        .order_by("auctiontos_user_id", "-date")
-        .values_list("auctiontos_user_id", "status")
+    for tos_id, tos_status in invoices.order_by("auctiontos_user_id", "-date").values_list(
+        "auctiontos_user_id", "status"
     ):
         # First row seen per user is the latest (‑date), so setdefault keeps it.
         status_by_tos.setdefault(tos_id, tos_status)
@@ -116,46 +120,104 @@ def _lot_number_display(auction, lot):
     return str(lot.lot_number)
 
 
-def build_snapshot(auction):
+# The keys of a user and a lot row, in the order the "columns" layout lists them.
+USER_COLUMNS = ("pk", "bidder_number", "name", "email", "phone_number", "invoice_status")
+LOT_COLUMNS = (
+    "pk",
+    "lot_number",
+    "lot_name",
+    "quantity",
+    "donation",
+    "seller_pk",
+    "winner_pk",
+    "winning_price",
+    "active",
+)
+LAYOUTS = ("rows", "columns")
+
+
+def _users(auction, pks=None):
+    tos_rows = AuctionTOS.objects.filter(auction=auction).order_by("name")
+    if pks is not None:
+        tos_rows = tos_rows.filter(pk__in=pks)
+    status_by_tos = _invoice_status_by_tos(auction, pks)
+    return [
+        {
+            "pk": tos.pk,
+            "bidder_number": tos.bidder_number or "",
+            "name": tos.name or "",
+            "email": tos.email or "",
+            "phone_number": tos.phone_number or "",
+            "invoice_status": status_by_tos.get(tos.pk, "NONE"),
+        }
+        for tos in tos_rows
+    ]
+
+
+def _lots(auction, pks=None):
+    lots = Lot.objects.filter(auction=auction, is_deleted=False, banned=False).order_by("lot_number")
+    if pks is not None:
+        lots = lots.filter(pk__in=pks)
+    return [
+        {
+            "pk": lot.pk,
+            "lot_number": _lot_number_display(auction, lot),
+            "lot_name": lot.lot_name,
+            "quantity": lot.quantity,
+            "donation": lot.donation,
+            "seller_pk": lot.auctiontos_seller_id,
+            "winner_pk": lot.auctiontos_winner_id,
+            "winning_price": str(lot.winning_price) if lot.winning_price is not None else None,
+            "active": lot.active,
+        }
+        for lot in lots
+    ]
+
+
+def _as_columns(rows, columns):
+    """``rows`` (a list of dicts) as ``{"columns": [...], "rows": [[...], ...]}``: the same data
+    without every key repeated on every row."""
+    return {"columns": list(columns), "rows": [[row[column] for column in columns] for row in rows]}
+
+
+def build_snapshot(auction, since=None, layout="rows"):
     """The compact per-auction payload the offline screens need, or ``{"auction": None}``.
 
     ``users`` are every AuctionTOS ordered by name (matches the web users page); ``lots`` are every
     non-deleted, non-banned lot. No images, no pagination — a bounded per-auction payload.
+
+    With the ``cursor`` of an earlier snapshot as ``since``, only what changed after it is sent:
+    ``users`` and ``lots`` hold the changed rows, ``deleted_users`` and ``deleted_lots`` the pks
+    that are no longer in the snapshot, and ``delta`` is true. A ``since`` that can't be used
+    (another auction's, or from before a rebuilt log) gets the whole snapshot, with ``delta`` false.
+    ``layout="columns"`` sends users and lots as :func:`_as_columns` tables.
     """
     if auction is None:
         return {"auction": None}
 
-    status_by_tos = _invoice_status_by_tos(auction)
-    users = []
-    for tos in AuctionTOS.objects.filter(auction=auction).order_by("name"):
-        users.append(
-            {
-                "pk": tos.pk,
-                "bidder_number": tos.bidder_number or "",
-                "name": tos.name or "",
-                "email": tos.email or "",
-                "phone_number": tos.phone_number or "",
-                "invoice_status": status_by_tos.get(tos.pk, "NONE"),
-            }
-        )
-
-    lots = []
-    for lot in Lot.objects.filter(auction=auction, is_deleted=False, banned=False).order_by("lot_number"):
-        lots.append(
-            {
-                "pk": lot.pk,
-                "lot_number": _lot_number_display(auction, lot),
-                "lot_name": lot.lot_name,
-                "quantity": lot.quantity,
-                "donation": lot.donation,
-                "seller_pk": lot.auctiontos_seller_id,
-                "winner_pk": lot.auctiontos_winner_id,
-                "winning_price": str(lot.winning_price) if lot.winning_price is not None else None,
-                "active": lot.active,
-            }
-        )
-
-    return {
+    # The cursor is read before the rows, so a change made while they are read is sent again next
+    # time rather than never; a row the phone gets twice is harmless.
+    current = offline_changes.cursor(auction)
+    since_id = offline_changes.position(auction, since, current)
+    if since_id is None:
+        users, lots = _users(auction), _lots(auction)
+        deleted = None
+    else:
+        changed = {offline_changes.USER: set(), offline_changes.LOT: set()}
+        for kind, object_pk in MobileOfflineChange.objects.filter(auction=auction, pk__gt=since_id).values_list(
+            "kind", "object_pk"
+        ):
+            if kind in changed:
+                changed[kind].add(object_pk)
+        user_pks, lot_pks = changed[offline_changes.USER], changed[offline_changes.LOT]
+        users = _users(auction, user_pks) if user_pks else []
+        lots = _lots(auction, lot_pks) if lot_pks else []
+        deleted = {
+            "deleted_users": sorted(user_pks - {row["pk"] for row in users}),
+            "deleted_lots": sorted(lot_pks - {row["pk"] for row in lots}),
+        }
+
+    snapshot = {
         "auction": {
             "slug": auction.slug,
             "title": auction.title,
@@ -164,10 +226,15 @@ def build_snapshot(auction):
             "only_whole_dollar_bids": auction.only_whole_dollar_bids,
             "date_start": auction.date_start,
         },
-        "users": users,
-        "lots": lots,
+        "users": _as_columns(users, USER_COLUMNS) if layout == "columns" else users,
+        "lots": _as_columns(lots, LOT_COLUMNS) if layout == "columns" else lots,
+        "cursor": current,
+        "delta": deleted is not None,
         "generated_at": timezone.now(),
     }
+    if deleted is not None:
+        snapshot.update(deleted)
+    return snapshot
 
 
 # ---------------------------------------------------------------------------
@@ -185,18 +252,148 @@ class _OpApplier:
     Each ``_apply_*`` handler returns ``(status, payload)``: on a conflict the payload carries
     ``conflict`` + ``message`` and nothing is mutated (the server copy always wins); on
     applied/already_applied the payload carries the echoed numbers and the ledger row is recorded.
+
+    A phone back from an hour offline sends hundreds of ops, and each one used to look up its
+    ledger row, its bidders, its lot and their invoices on its own. :meth:`prefetch` loads all of
+    those for the whole batch up front, and the ops then read and update them in memory: a lot sold
+    by one op is sold for the next. Anything the batch didn't name (or a row it made that isn't
+    indexed yet) falls back to the query it always ran. AuctionHistory rows and the sellers' invoice
+    totals are kept until :meth:`flush` writes them all at once.
+
+    The ops themselves still commit one at a time (:meth:`apply_one`). A lot's number is reserved
+    under a lock on the Auction row, and holding that lock until the last of several hundred ops was
+    in would stall everyone else entering lots; an op's winner message and websocket sends can't be
+    taken back either, so nothing here ever reruns an op that got that far.
     """
 
     def __init__(self, auction, user):
         self.auction = auction
         self.user = user
         self.created_rows = {}  # op_id -> AuctionTOS | Lot created in this batch
+        self.ledger = {}  # op_id -> MobileOfflineOp, prefetched or recorded in this batch
+        self.ledger_checked = set()  # op_ids prefetch looked for, found or not
+        self.ledger_rows = {AuctionTOS: {}, Lot: {}}  # result_pk -> row, for prefetched ledger entries
+        # Keyed by every number the batch names; None means there was no such row.
+        self.tos_by_number = {}  # bidder_number -> newest AuctionTOS
+        self.lots_by_number = {}  # custom_lot_number or lot_number_int -> Lot, from lots_qs
+        self.lot_number_taken = {}  # lot_number_int -> used by any lot in the auction, deleted or not
+        self.invoice_status = {}  # AuctionTOS pk -> its newest invoice's status, None for no invoice
+        self.new_rows = []  # unsaved AuctionHistory rows of applied ops
+        self.invoice_sellers = {}  # AuctionTOS pk -> seller whose invoice needs recalculating
+        self._op_rows = []
+        self._op_sellers = {}
+        self._claimed = None  # the ledger row of the op being applied
 
     @staticmethod
     def _conflict(conflict, message):
         """A per-op conflict result: not applied, surfaced to the app for the admin to resolve."""
         return "conflict", {"conflict": conflict, "message": message}
 
+    # -- batch loading and writing --------------------------------------------
+
+    def _lot_key(self, number):
+        """A display lot number as lots_by_number keys it, or None if it can't be one."""
+        if self.auction.use_seller_dash_lot_numbering:
+            return number or None
+        try:
+            return int(number)
+        except (TypeError, ValueError):
+            return None
+
+    def prefetch(self, ops):
+        """Load every ledger row, bidder, lot and invoice status ``ops`` refer to, a query apiece."""
+        bidders, lot_numbers, requested_ints = set(), set(), set()
+        for op in ops:
+            if op.get("type") == "add_user":
+                bidders.add(_ref(op.get("bidder_number")))
+            elif op.get("type") == "add_lot":
+                bidders.add(_ref(op.get("seller")))
+                requested = _ref(op.get("lot_number"))
+                lot_numbers.add(requested)
+                if not self.auction.use_seller_dash_lot_numbering and self._lot_key(requested) is not None:
+                    requested_ints.add(self._lot_key(requested))
+            elif op.get("type") == "set_winner":
+                bidders.add(_ref(op.get("winner")))
+                lot_numbers.add(_ref(op.get("lot")))
+        refs = bidders | lot_numbers
+        op_ids = {_ref(op.get("op_id")) for op in ops} | {ref[len("op:") :] for ref in refs if ref.startswith("op:")}
+        op_ids.discard("")
+        if op_ids:
+            self.ledger = MobileOfflineOp.objects.in_bulk(op_ids, field_name="op_id")
+            self.ledger_checked = op_ids
+        for model, op_type in ((AuctionTOS, "add_user"), (Lot, "add_lot")):
+            pks = [
+                led.result_pk
+                for led in self.ledger.values()
+                if led.auction_id == self.auction.pk and led.op_type == op_type and led.result_pk
+            ]
+            if pks:
+                self.ledger_rows[model] = model.objects.in_bulk(pks)
+
+        numbers = {ref for ref in bidders if ref and not ref.startswith("op:")}
+        if numbers:
+            self.tos_by_number = dict.fromkeys(numbers)
+            for tos in AuctionTOS.objects.filter(auction=self.auction, bidder_number__in=numbers).order_by("createdon"):
+                self.tos_by_number[tos.bidder_number] = tos
+        keys = {self._lot_key(ref) for ref in lot_numbers if ref and not ref.startswith("op:")} - {None}
+        if keys:
+            self.lots_by_number = dict.fromkeys(keys)
+            field = "custom_lot_number" if self.auction.use_seller_dash_lot_numbering else "lot_number_int"
+            for lot in (
+                self.auction.lots_qs.filter(**{f"{field}__in": keys})
+                .select_related("auctiontos_seller", "auctiontos_winner")
+                .order_by("pk")
+            ):
+                self._index_lot(lot)
+        if requested_ints:
+            self.lot_number_taken = dict.fromkeys(requested_ints, False)
+            for number in Lot.objects.filter(auction=self.auction, lot_number_int__in=requested_ints).values_list(
+                "lot_number_int", flat=True
+            ):
+                self.lot_number_taken[number] = True
+
+        tos_pks = {tos.pk for tos in self.tos_by_number.values() if tos}
+        tos_pks |= set(self.ledger_rows[AuctionTOS])
+        for lot in self.lots_by_number.values():
+            if lot:
+                tos_pks |= {lot.auctiontos_seller_id, lot.auctiontos_winner_id} - {None}
+        if tos_pks:
+            self.invoice_status = dict.fromkeys(tos_pks)
+            for tos_pk, status in (
+                Invoice.objects.filter(auctiontos_user__in=tos_pks)
+                .order_by("auctiontos_user", "-date")
+                .values_list("auctiontos_user", "status")
+            ):
+                if self.invoice_status[tos_pk] is None:
+                    self.invoice_status[tos_pk] = status
+
+    def _index_lot(self, lot):
+        """Make ``lot`` findable by its display number, unless an older lot already has it."""
+        key = lot.custom_lot_number if self.auction.use_seller_dash_lot_numbering else lot.lot_number_int
+        if key is not None and self.lots_by_number.get(key) is None:
+            self.lots_by_number[key] = lot
+        if lot.lot_number_int is not None:
+            self.lot_number_taken[lot.lot_number_int] = True
+
+    def flush(self):
+        """Write what the applied ops left for the end: their sellers' invoices and history."""
+        invoices = {}
+        for invoice in Invoice.objects.filter(auctiontos_user__in=self.invoice_sellers, auction=self.auction).order_by(
+            "pk"
+        ):
+            invoices.setdefault(invoice.auctiontos_user_id, invoice)
+        for seller in self.invoice_sellers.values():
+            try:
+                with transaction.atomic():
+                    invoice = invoices.get(seller.pk) or Invoice.objects.create(
+                        auctiontos_user=seller, auction=self.auction
+                    )
+                    invoice.recalculate()
+            except Exception:
+                # The lots are in; the total is worked out again the next time the invoice is opened.
+                logger.exception("Could not recalculate the invoice of %s after an offline sync", seller.pk)
+        AuctionHistory.objects.bulk_create(self.new_rows)
+
     # -- reference resolution -------------------------------------------------
 
     def _resolve_op_ref(self, ref, op_type, model):
@@ -209,18 +406,48 @@ class _OpApplier:
         row = self.created_rows.get(op_id)
         if row is not None:
             return row if isinstance(row, model) else None
-        led = MobileOfflineOp.objects.filter(op_id=op_id, auction=self.auction, op_type=op_type).first()
+        if op_id in self.ledger_checked or op_id in self.ledger:
+            led = self.ledger.get(op_id)
+            if led and (led.auction_id != self.auction.pk or led.op_type != op_type):
+                led = None
+        else:
+            led = MobileOfflineOp.objects.filter(op_id=op_id, auction=self.auction, op_type=op_type).first()
         if led and led.result_pk:
+            if led.result_pk in self.ledger_rows[model]:
+                return self.ledger_rows[model][led.result_pk]
             return model.objects.filter(pk=led.result_pk).first()
         return None
 
+    def _bidder(self, number):
+        """The newest AuctionTOS in this auction with ``number``, or None."""
+        if number in self.tos_by_number:
+            return self.tos_by_number[number]
+        return AuctionTOS.objects.filter(auction=self.auction, bidder_number=number).order_by("-createdon").first()
+
+    def _lot(self, number):
+        """The lot in ``auction.lots_qs`` shown as ``number``, or None."""
+        key = self._lot_key(number)
+        if key is None:
+            return None
+        if key in self.lots_by_number:
+            return self.lots_by_number[key]
+        if self.auction.use_seller_dash_lot_numbering:
+            return self.auction.lots_qs.filter(custom_lot_number=key).first()
+        return self.auction.lots_qs.filter(lot_number_int=key).first()
+
+    def _lot_number_taken(self, number):
+        """Whether any lot in the auction, deleted or not, has lot_number_int ``number``."""
+        if number in self.lot_number_taken:
+            return self.lot_number_taken[number]
+        return Lot.objects.filter(auction=self.auction, lot_number_int=number).exists()
+
     def resolve_user(self, ref):
         ref = (ref or "").strip()
         if not ref:
             return None
         if ref.startswith("op:"):
             return self._resolve_op_ref(ref, "add_user", AuctionTOS)
-        return AuctionTOS.objects.filter(auction=self.auction, bidder_number=ref).order_by("-createdon").first()
+        return self._bidder(ref)
 
     def resolve_lot(self, ref):
         ref = (ref or "").strip()
@@ -229,31 +456,45 @@ class _OpApplier:
         if ref.startswith("op:"):
             return self._resolve_op_ref(ref, "add_lot", Lot)
         # Display-number lookup mirrors DynamicSetLotWinner.validate_lot.
-        if self.auction.use_seller_dash_lot_numbering:
-            return self.auction.lots_qs.filter(custom_lot_number=ref).first()
-        try:
-            number = int(ref)
-        except (TypeError, ValueError):
-            return None
-        return self.auction.lots_qs.filter(lot_number_int=number).first()
+        return self._lot(ref)
 
     # -- helpers --------------------------------------------------------------
 
-    @staticmethod
-    def _invoice_blocks(tos):
+    def _invoice_blocks(self, tos):
         """True when this user has an invoice that is no longer open (UNPAID/PAID)."""
-        invoice = tos.invoice if tos else None
-        return bool(invoice and invoice.status != "DRAFT")
+        if not tos:
+            return False
+        if tos.pk in self.invoice_status:
+            status = self.invoice_status[tos.pk]
+        else:
+            invoice = tos.invoice
+            status = invoice.status if invoice else None
+        return bool(status and status != "DRAFT")
 
-    def _record(self, op_id, op_type, result_pk, echo):
-        """Persist the applied-op ledger row so replays dedupe and later ops can reference it."""
-        MobileOfflineOp.objects.create(
-            op_id=op_id,
-            auction=self.auction,
-            user=self.user,
-            op_type=op_type,
-            result_pk=result_pk,
-            result_data=echo,
+    def _claim(self, op_id, op_type):
+        """Insert ``op_id``'s ledger row before the op runs, or return None if it is already there.
+
+        The unique ``op_id`` makes a second sync of the same queue wait here until the first one's op
+        commits, then find it recorded rather than apply it again.
+        """
+        try:
+            with transaction.atomic():
+                return MobileOfflineOp.objects.create(
+                    op_id=op_id, auction=self.auction, user=self.user, op_type=op_type
+                )
+        except IntegrityError:
+            return None
+
+    def _record(self, op_type, result_pk, echo):
+        """Fill in the applied op's ledger row so replays dedupe and later ops can reference it."""
+        led = self._claimed
+        led.op_type, led.result_pk, led.result_data = op_type, result_pk, echo
+        led.save(update_fields=["op_type", "result_pk", "result_data"])
+
+    def _history(self, applies_to, action):
+        """Auction.create_history, written with the rest of the batch."""
+        self._op_rows.append(
+            AuctionHistory(auction=self.auction, user=self.user, action=action[:800], applies_to=applies_to)
         )
 
     # -- op handlers ----------------------------------------------------------
@@ -261,17 +502,13 @@ class _OpApplier:
     def _apply_add_user(self, op):
         requested = (op.get("bidder_number") or "").strip()
         name = (op.get("name") or "").strip()
-        existing = None
-        if requested:
-            existing = (
-                AuctionTOS.objects.filter(auction=self.auction, bidder_number=requested).order_by("-createdon").first()
-            )
+        existing = self._bidder(requested) if requested else None
         if existing:
             # Same number + same name = the same person double-entered (idempotent); different name =
             # someone claimed that number on the server meanwhile (a real conflict).
             if (existing.name or "").strip().casefold() == name.casefold():
                 echo = {"bidder_number": existing.bidder_number}
-                self._record(op["op_id"], "add_user", existing.pk, echo)
+                self._record("add_user", existing.pk, echo)
                 self.created_rows[op["op_id"]] = existing
                 return "already_applied", {**echo}
             return self._conflict(
@@ -316,9 +553,10 @@ class _OpApplier:
         if requested and tos.bidder_number != requested:
             # The club number lost to the one being handed out at the door; this auction uses the card.
             tos.force_set_bidder_number(requested, acting_user=self.user)
-        self.auction.create_history(applies_to="USERS", action=f"Added {name}", user=self.user)
+        self._history("USERS", f"Added {name}")
+        self.tos_by_number[tos.bidder_number] = tos
         echo = {"bidder_number": tos.bidder_number}
-        self._record(op["op_id"], "add_user", tos.pk, echo)
+        self._record("add_user", tos.pk, echo)
         self.created_rows[op["op_id"]] = tos
         return "applied", {**echo}
 
@@ -349,26 +587,26 @@ class _OpApplier:
         # Honor the requested display number when it is still free; otherwise leave it unset so
         # Lot.save() assigns the next free one (the remap the echo reports back to the app).
         if requested:
+            # A number the app handed out is noted on the sequence it came out of, so the next lot
+            # numbered on the server (Lot.save()) doesn't get it a second time.
             if self.auction.use_seller_dash_lot_numbering:
-                if not self.auction.lots_qs.filter(custom_lot_number=requested).exists():
+                if self._lot(requested) is None:
                     lot.custom_lot_number = requested
+                    seller.note_lot_number(requested)
             else:
-                try:
-                    number = int(requested)
-                except (TypeError, ValueError):
-                    number = None
-                if number is not None and not Lot.objects.filter(auction=self.auction, lot_number_int=number).exists():
+                number = self._lot_key(requested)
+                if number is not None and not self._lot_number_taken(number):
                     lot.lot_number_int = number
+                    self.auction.note_lot_number(number)
         lot.save()
+        self._index_lot(lot)
 
-        invoice = Invoice.objects.filter(auctiontos_user=seller, auction=self.auction).first()
-        if not invoice:
-            invoice = Invoice.objects.create(auctiontos_user=seller, auction=self.auction)
-        invoice.recalculate()
-        self.auction.create_history(applies_to="LOTS", action=f"Bulk added 1 lots for {seller.name}", user=self.user)
+        # Recalculated once per seller at the end of the batch (flush), not once per lot.
+        self._op_sellers[seller.pk] = seller
+        self._history("LOTS", f"Bulk added 1 lots for {seller.name}")
 
         echo = {"lot_number": _lot_number_display(self.auction, lot)}
-        self._record(op["op_id"], "add_lot", lot.pk, echo)
+        self._record("add_lot", lot.pk, echo)
         self.created_rows[op["op_id"]] = lot
         return "applied", {**echo}
 
@@ -385,7 +623,7 @@ class _OpApplier:
             if self._invoice_blocks(lot.auctiontos_seller):
                 return self._conflict("invoice_not_open", "The seller's invoice is not open")
             self._end_unsold(lot)
-            self._record(op["op_id"], "set_winner", None, {})
+            self._record("set_winner", None, {})
             return "applied", {}
 
         winner = self.resolve_user(op.get("winner"))
@@ -399,7 +637,7 @@ class _OpApplier:
             # The server copy wins: same winner + price is an idempotent no-op, anything else is a
             # conflict the admin resolves on the website. Either way we do NOT mutate the row.
             if lot.auctiontos_winner_id == winner.pk and lot.winning_price == price:
-                self._record(op["op_id"], "set_winner", None, {})
+                self._record("set_winner", None, {})
                 return "already_applied", {}
             return self._conflict("winner_conflict", self._server_sold_message(lot))
 
@@ -409,7 +647,7 @@ class _OpApplier:
             return self._conflict("invoice_not_open", f"Bidder {winner.bidder_number}'s invoice is not open")
 
         self._set_winner(lot, winner, price)
-        self._record(op["op_id"], "set_winner", None, {})
+        self._record("set_winner", None, {})
         return "applied", {}
 
     # -- effects (mirror DynamicSetLotWinner) ---------------------------------
@@ -451,11 +689,7 @@ class _OpApplier:
                 "current_high_bid": None,
             }
         )
-        self.auction.create_history(
-            applies_to="LOTS",
-            action=f"Marked lot {lot.lot_number_display} as ended without being sold",
-            user=self.user,
-        )
+        self._history("LOTS", f"Marked lot {lot.lot_number_display} as ended without being sold")
 
     def _set_winner(self, lot, winning_tos, winning_price):
         """Mirror DynamicSetLotWinner.set_winner: winner, check-in side effects, history, bap."""
@@ -477,11 +711,7 @@ class _OpApplier:
                 seller.bidding_allowed = True
                 update_fields.append("bidding_allowed")
             seller.save(update_fields=update_fields)
-            lot.auction.create_history(
-                applies_to="USERS",
-                action=f"Checked in {seller.name} (lot sold)",
-                user=self.user,
-            )
+            self._history("USERS", f"Checked in {seller.name} (lot sold)")
         try:
             lot.add_winner_message(self.user, winning_tos, winning_price)
         except Exception:
@@ -491,11 +721,7 @@ class _OpApplier:
                 lot.auto_award_bap_points()
             except Exception:
                 logger.exception("auto_award_bap_points failed for lot %s", lot.pk)
-        self.auction.create_history(
-            applies_to="LOTS",
-            action=f"Set lot {lot.lot_number_display} as sold",
-            user=self.user,
-        )
+        self._history("LOTS", f"Set lot {lot.lot_number_display} as sold")
 
     # -- dispatch -------------------------------------------------------------
 
@@ -512,7 +738,10 @@ class _OpApplier:
 
         # Idempotent replay: a recorded op_id returns its original numbers with an already_applied
         # status instead of re-running (the phone resent the queue after a dropped response).
-        led = MobileOfflineOp.objects.filter(op_id=op_id).first()
+        if op_id in self.ledger_checked or op_id in self.ledger:
+            led = self.ledger.get(op_id)
+        else:
+            led = MobileOfflineOp.objects.filter(op_id=op_id).first()
         if led:
             result.update(led.result_data or {})
             result["status"] = "already_applied"
@@ -523,30 +752,59 @@ class _OpApplier:
             result.update(status="conflict", conflict="not_found", message="Unknown op type")
             return result
 
+        self._op_rows = []
+        self._op_sellers = {}
+        self._claimed = None
         try:
-            # One savepoint per op: a conflict returns before mutating (nothing to roll back), and an
+            # One transaction per op, committed before the next one starts. A conflict returns before
+            # mutating and rolls back only the ledger row (conflicts are never recorded); an
             # unexpected mid-apply failure rolls back just this op without aborting the whole batch.
             with transaction.atomic():
-                status, payload = getattr(self, handler_name)(op)
+                self._claimed = self._claim(op_id, op.get("type"))
+                if self._claimed is not None:
+                    status, payload = getattr(self, handler_name)(op)
+                    if status == "conflict":
+                        transaction.set_rollback(True)
         except Exception:
             logger.exception("Offline op %s (%s) failed unexpectedly", op_id, op.get("type"))
+            # The rows loaded for the batch may have been changed in memory by what was rolled back.
+            self.tos_by_number, self.lots_by_number, self.lot_number_taken = {}, {}, {}
+            self.invoice_status = {}
             result.update(status="conflict", conflict="error", message="This change could not be applied")
             return result
 
+        if self._claimed is None:
+            # Another sync of the same queue applied it after this batch was loaded.
+            led = MobileOfflineOp.objects.filter(op_id=op_id).first()
+            result.update((led.result_data if led else None) or {})
+            result["status"] = "already_applied"
+            return result
+        if status != "conflict":
+            self.ledger[op_id] = self._claimed
+        self.new_rows.extend(self._op_rows)
+        self.invoice_sellers.update(self._op_sellers)
         result.update(payload)
         result["status"] = status
         return result
 
 
+def _ref(value):
+    return str(value or "").strip()
+
+
 def apply_ops(auction, user, ops):
     """Apply a batch of queued offline ops in order; return per-op results (never all-or-nothing).
 
     Each op is independent: a conflict on one leaves the rest to apply (except ops that reference a
     conflicted op's row, which resolve to ``not_found``). Duplicate op_ids in the same batch, and
     ops already in the ledger, return ``already_applied``.
+
+    Reads for the whole batch happen once up front and its history is written once at the end; each
+    op commits on its own, with its ledger row, as it is applied.
     """
     applier = _OpApplier(auction, user)
-    results = []
-    for op in ops:
-        results.append(applier.apply_one(op if isinstance(op, dict) else {}))
+    ops = [op if isinstance(op, dict) else {} for op in ops]
+    applier.prefetch(ops)
+    results = [applier.apply_one(op) for op in ops]
+    applier.flush()
     return results
@@ -19,11 +19,24 @@ The division of labour, because it is not obvious from any one function:
   snackbar and the website shows that verbatim;
 * the **server** owns the presence rule and the job record;
 * the **waiting page** owns nothing but polling, so the same job can be watched from two tabs.
+
+The labels themselves travel as one bundle (:func:`build_bundle`). Fetching them one at a time from
+``labels/<pk>/`` made a 200-label run as slow as 200 renders one after the other, with the printer
+idle in between; so once the push is out :func:`dispatch` has the worker draw the job's labels,
+and the phone downloads them in a single zip. Until then the bundle endpoint tells the phone to come
+back shortly rather than drawing the same labels a second time inside a web request. How far the
+drawing has got is on the job and is sent to the waiting page over the user's websocket
+(:func:`announce`), which polls as well, for when the socket can't connect.
 """
 
+import io
+import json
 import logging
+import zipfile
 
+from django.core.cache import cache
 from django.db import transaction
+from django.urls import reverse
 from django.utils import timezone
 
 from auctions.models import MobileDevice, RemotePrintJob
@@ -35,9 +48,21 @@ logger = logging.getLogger(__name__)
 # would make an oversized message. FCM's own limit is 4 KB of data; this keeps a comfortable margin
 # and matches the deep-link path's cap, which is the same batch coming out of the same printer.
 MAX_LOTS_PER_JOB = 300
+# Labels per unit of work in the render pool: small enough that progress moves, big enough that each
+# process works out an auction's label context once for many labels rather than once per label.
+BUNDLE_CHUNK = 20
+# A job is printed within minutes of being made; a day leaves room for a retry after lunch.
+BUNDLE_SECONDS = 60 * 60 * 24
+# How long a queued bundle counts as being drawn. Ample for a full job on a busy worker; after it a
+# build that died no longer stops the phone's next ask from queueing another.
+BUILDING_SECONDS = 60 * 10
+# The most labels the bundle endpoint draws inside a request, for a size no worker was asked for.
+INLINE_MAX_LABELS = BUNDLE_CHUNK
 
 
-def heartbeat(user, device_uuid, *, print_ready=False, printer_name="", print_method=""):
+def heartbeat(
+    user, device_uuid, *, print_ready=False, printer_name="", print_method="", label_resolution="", label_dpi=None
+):
     """Record one "I'm awake" beat from the app. Returns the device, or None if it isn't registered.
 
     Scoped to the calling user: a heartbeat can only ever touch a device row that already belongs to
@@ -52,14 +77,27 @@ def heartbeat(user, device_uuid, *, print_ready=False, printer_name="", print_me
     be re-derived from a preference — a user can have Bluetooth selected on an account whose phone
     has nothing paired, and believing the preference there would promise a print that fails. The
     canonical copy of the preference is ``UserLabelPrefs``, which the app already syncs separately.
+
+    ``label_resolution`` and ``label_dpi`` are the size the app would ask ``labels/<pk>/`` for, and
+    are what a job's bundle is drawn at. A size the label endpoint would refuse is stored as no size
+    rather than failing the beat: presence matters more than a head start on drawing.
     """
+    from .labels import LabelService
+
     device = MobileDevice.objects.filter(device_uuid=device_uuid, user=user).first()
     if device is None:
         return None
     device.last_heartbeat = timezone.now()
     device.print_ready = bool(print_ready)
     device.printer_name = printer_name or ""
-    fields = ["last_heartbeat", "print_ready", "printer_name", "last_seen"]
+    try:
+        width, height, dpi = LabelService.parse_dimensions(label_resolution or None, label_dpi)
+    except ValueError:
+        device.label_resolution, device.label_dpi = "", None
+    else:
+        device.label_resolution = f"{width}x{height}" if label_resolution else ""
+        device.label_dpi = dpi if label_dpi else None
+    fields = ["last_heartbeat", "print_ready", "printer_name", "label_resolution", "label_dpi", "last_seen"]
     if print_ready and not device.ever_print_ready:
         device.ever_print_ready = True
         fields.append("ever_print_ready")
@@ -99,6 +137,8 @@ def create_job(user, lot_pks, device=None):
         lots=lot_pks,
         total_count=len(lot_pks),
         status=RemotePrintJob.STATUS_QUEUED,
+        label_resolution=device.label_resolution if device else "",
+        label_dpi=device.label_dpi if device else None,
     )
 
 
@@ -109,11 +149,15 @@ def dispatch(job):
     something the page waits twenty seconds to discover: the answer is already known, and making the
     user watch a spinner for a failure we could name at once is the thing this whole design exists to
     avoid.
+
+    The bundle is queued once the push is out, so it is drawing while the phone wakes up and connects
+    to the printer; a job that never reached a phone draws nothing. ``bundle`` in the push is where
+    to download it; an app that doesn't know about bundles ignores it and fetches ``labels/<pk>/`` one
+    at a time, as before.
     """
     token = (job.device.fcm_token or "") if job.device else ""
     if not token:
-        job.status = RemotePrintJob.STATUS_UNREACHABLE
-        job.save(update_fields=["status", "updated_at"])
+        _set_status(job, RemotePrintJob.STATUS_UNREACHABLE)
         return False
     result = send_fcm_data_message(
         token,
@@ -121,18 +165,28 @@ def dispatch(job):
             "type": "print_labels",
             "job": str(job.uuid),
             "lots": ",".join(str(pk) for pk in job.lots),
+            "bundle": reverse("mobile-printjob-bundle", kwargs={"job_uuid": job.uuid}),
         },
     )
     if result != SEND_OK:
         logger.warning("Remote print job %s could not be pushed to device %s", job.uuid, job.device_id)
-        job.status = RemotePrintJob.STATUS_UNREACHABLE
-        job.save(update_fields=["status", "updated_at"])
+        _set_status(job, RemotePrintJob.STATUS_UNREACHABLE)
         return False
-    job.status = RemotePrintJob.STATUS_SENT
-    job.save(update_fields=["status", "updated_at"])
+    try:
+        queue_bundle(job)
+    except ValueError:
+        # A size the label endpoint refuses; the phone will ask for the bundle at its own size.
+        logger.warning("Remote print job %s has an unusable label size", job.uuid, exc_info=True)
+    _set_status(job, RemotePrintJob.STATUS_SENT)
     return True
 
 
+def _set_status(job, status):
+    job.status = status
+    job.save(update_fields=["status", "updated_at"])
+    announce(job)
+
+
 def start(user, lot_pks):
     """:func:`create_job` + :func:`dispatch`. What the label view calls."""
     job = create_job(user, lot_pks)
@@ -149,11 +203,149 @@ def job_state(job):
     the phone demonstrably was reachable, and the truth is worth more than the earlier guess.
     """
     if job.has_gone_quiet:
-        job.status = RemotePrintJob.STATUS_UNREACHABLE
-        job.save(update_fields=["status", "updated_at"])
+        _set_status(job, RemotePrintJob.STATUS_UNREACHABLE)
+    return _state(job)
+
+
+def _state(job):
     return {
         "status": job.status,
         "printed": job.printed_count,
+        "rendered": job.rendered_count,
         "total": job.total_count,
         "message": job.message or None,
     }
+
+
+def announce(job):
+    """Send the job's state to the waiting page over the user's websocket.
+
+    Only ever a faster way to hear what polling would say, so a channel layer that is down costs
+    nothing but the speed.
+    """
+    try:
+        job.user.userdata.send_websocket_message({"type": "print_job", "job": str(job.uuid), **_state(job)})
+    except Exception:
+        logger.warning("Could not announce remote print job %s", job.uuid, exc_info=True)
+
+
+# ---------------------------------------------------------------------------
+# The bundle
+# ---------------------------------------------------------------------------
+
+
+def bundle_size(job, resolution=None, dpi=None):
+    """``(width, height, dpi)`` to draw *job* at: what was asked, else the device's, else the default.
+    Raises ``ValueError`` for a size the label endpoint would refuse."""
+    from .labels import LabelService
+
+    return LabelService.parse_dimensions(resolution or job.label_resolution or None, dpi or job.label_dpi)
+
+
+def _bundle_key(job, width, height, dpi):
+    return f"remote-print-bundle:{job.uuid}:{width}x{height}@{dpi}"
+
+
+def cached_bundle(job, resolution=None, dpi=None):
+    """The bundle's bytes if it has already been built at that size, else None."""
+    return cache.get(_bundle_key(job, *bundle_size(job, resolution, dpi)))
+
+
+def _building_key(job, width, height, dpi):
+    return f"{_bundle_key(job, width, height, dpi)}:building"
+
+
+def is_building(job, resolution=None, dpi=None):
+    """Whether the worker has been asked for the bundle at that size and hasn't finished it yet."""
+    return cache.get(_building_key(job, *bundle_size(job, resolution, dpi))) is not None
+
+
+def is_device_size(job, resolution=None, dpi=None):
+    """Whether that size is the one :func:`dispatch` had the worker draw."""
+    return bundle_size(job, resolution, dpi) == bundle_size(job)
+
+
+def queue_bundle(job, resolution=None, dpi=None):
+    """Have the worker draw *job*'s bundle at that size, unless it is already doing so. Returns
+    whether this call queued it."""
+    from auctions.tasks import build_remote_print_bundle
+
+    if not cache.add(_building_key(job, *bundle_size(job, resolution, dpi)), True, BUILDING_SECONDS):
+        return False
+    job_uuid = str(job.uuid)
+    transaction.on_commit(lambda: build_remote_print_bundle.delay(job_uuid, resolution, dpi))
+    return True
+
+
+def _draw_chunk(user_pk, lot_pks, width, height, dpi):
+    """{lot pk: PNG} for some of a job's lots, for its user. Runs in the render pool's processes."""
+    from django.contrib.auth.models import User
+    from django.http import HttpRequest
+
+    from auctions.models import Lot
+
+    from .labels import LabelService
+
+    request = HttpRequest()
+    request.user = User.objects.get(pk=user_pk)
+    lots = Lot.objects.filter(pk__in=lot_pks, is_deleted=False).select_related(
+        "user", "auction", "species_category", "auctiontos_seller", "auctiontos_seller__auction"
+    )
+    return LabelService.render_labels(list(lots), request, resolution=f"{width}x{height}", dpi=dpi)
+
+
+def pack(job, pngs, width, height, dpi):
+    """One zip of the job's labels: ``manifest.json`` -- the lots in print order, each with the file
+    holding its label, and the lots that no longer have one -- and a PNG per label."""
+    buffer = io.BytesIO()
+    labels, skipped = [], []
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        for position, lot_pk in enumerate(job.lots, start=1):
+            if lot_pk not in pngs:
+                skipped.append(lot_pk)
+                continue
+            name = f"{position:04d}-{lot_pk}.png"
+            bundle.writestr(name, pngs[lot_pk])
+            labels.append({"lot": lot_pk, "file": name})
+        manifest = {
+            "job": str(job.uuid),
+            "resolution": f"{width}x{height}",
+            "dpi": dpi,
+            "labels": labels,
+            "skipped": skipped,
+        }
+        bundle.writestr("manifest.json", json.dumps(manifest))
+    return buffer.getvalue()
+
+
+def build_bundle(job, resolution=None, dpi=None):
+    """Draw every label of *job*, pack them with :func:`pack`, cache and return the zip.
+
+    Drawn :data:`BUNDLE_CHUNK` labels at a time -- across the label render pool in a web process,
+    one chunk after another in the worker, which can't start one; after each chunk the job's
+    ``rendered_count`` moves on and the waiting page hears about it.
+    """
+    from auctions.label_cache import parallel_map
+
+    width, height, dpi = bundle_size(job, resolution, dpi)
+    chunks = [job.lots[i : i + BUNDLE_CHUNK] for i in range(0, len(job.lots), BUNDLE_CHUNK)]
+    pngs = {}
+    try:
+        for drawn in parallel_map(
+            _draw_chunk,
+            [job.user_id] * len(chunks),
+            chunks,
+            [width] * len(chunks),
+            [height] * len(chunks),
+            [dpi] * len(chunks),
+            min_items=2,
+        ):
+            pngs.update(drawn)
+            job.rendered_count = len(pngs)
+            RemotePrintJob.objects.filter(pk=job.pk).update(rendered_count=job.rendered_count)
+            announce(job)
+        content = pack(job, pngs, width, height, dpi)
+        cache.set(_bundle_key(job, width, height, dpi), content, BUNDLE_SECONDS)
+    finally:
+        cache.delete(_building_key(job, width, height, dpi))
+    return content
@@ -19,6 +19,7 @@ from .views import (
     MobileLabelsPrintedView,
     MobileLastUsedAuctionView,
     MobileLoginView,
+    MobileLotLabelBatchView,
     MobileLotLabelView,
     MobileLotWatchView,
     MobileMyClubsView,
@@ -30,6 +31,7 @@ from .views import (
     MobilePaymentCreateView,
     MobilePrinterObservedView,
     MobilePrinterProfilesView,
+    MobileRemotePrintBundleView,
     MobileRemotePrintProgressView,
     MobileRemotePrintResultView,
     MobileSocialAuthView,
@@ -89,6 +91,7 @@ urlpatterns = [
     # Labels
     path("labels/prefs/", MobileLabelPrefsView.as_view(), name="mobile-label-prefs"),
     path("labels/printed/", MobileLabelsPrintedView.as_view(), name="mobile-labels-printed"),
+    path("labels/batch/", MobileLotLabelBatchView.as_view(), name="mobile-label-batch"),
     path("labels/<int:pk>/", MobileLotLabelView.as_view(), name="mobile-label-lot"),
     # Remote print jobs: labels started on a computer, printed on this phone's Bluetooth printer.
     path(
@@ -101,6 +104,11 @@ urlpatterns = [
         MobileRemotePrintResultView.as_view(),
         name="mobile-printjob-result",
     ),
+    path(
+        "printjobs/<uuid:job_uuid>/bundle/",
+        MobileRemotePrintBundleView.as_view(),
+        name="mobile-printjob-bundle",
+    ),
     # Notifications
     path("notifications/prefs/", MobileNotificationPrefsView.as_view(), name="mobile-notification-prefs"),
     # Lots
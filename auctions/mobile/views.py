@@ -230,7 +230,9 @@ POST /api/mobile/devices/heartbeat/
           "device_uuid":   "550e8400-e29b-41d4-a716-446655440000",
           "print_ready":   true,
           "printer_name":  "Y486BT",
-          "print_method":  "bluetooth"
+          "print_method":  "bluetooth",
+          "label_resolution": "600x400",   // optional: what labels/<pk>/ is asked for
+          "label_dpi":     203
         }
 
     Response 204. 404 when the device isn't registered to the caller — which the app treats as
@@ -272,6 +274,19 @@ POST /api/mobile/printjobs/<uuid>/result/
 
     Response 204. Both endpoints 404 on a job belonging to anyone else.
 
+GET /api/mobile/printjobs/<uuid>/bundle/?resolution=600x400&dpi=203
+    Every label of the job in one zip, drawn in the background from the moment the job was made
+    (the push's ``bundle`` value is this path). ``resolution`` and ``dpi`` default to what the
+    last heartbeat reported. The zip holds ``manifest.json``::
+
+        {
+          "job": "…", "resolution": "600x400", "dpi": 203,
+          "labels":  [{"lot": 12, "file": "0001-12.png"}, …],   // print order
+          "skipped": [15]                                       // lots deleted since
+        }
+
+    and one PNG per label. 404 on a job belonging to anyone else.
+
 Notifications
 -------------
 GET /api/mobile/notifications/prefs/
@@ -354,8 +369,20 @@ GET /api/mobile/labels/<lot_pk>/?fmt=png&resolution=600x400&dpi=203
     ``Accept: application/pdf`` / ``image/png`` / ``*/*`` all negotiate (see
     ``auctions.mobile.renderers``); error bodies stay JSON.
 
+    ``engine=bitmap`` draws the PNG straight into a 1-bit image instead of rasterizing the label
+    PDF -- the same layout and fields, without waiting for WeasyPrint. The default is ``pdf``.
+
     Response 200:  binary image body with ``Content-Type: image/png``.
 
+GET /api/mobile/labels/batch/?lots=12,13,14&resolution=600x400&dpi=203
+    Many labels in one response, drawn with the bitmap engine unless ``engine=pdf`` is given.
+    ``resolution``/``dpi`` as above; at most 100 lots. Lots that don't exist or that the caller
+    can't print (same rule as ``labels/<pk>/``) are listed in ``skipped``.
+
+    Response 200::
+
+        { "labels": [{"lot": 12, "png": "<base64>"}, ...], "skipped": [14] }
+
 POST /api/mobile/labels/printed/
     Mark labels as printed. The PDF views set ``label_printed`` as a side effect of rendering, but
     native Bluetooth printing never goes through them, so without this "print unprinted labels"
@@ -622,6 +649,7 @@ POST /api/mobile/command-palette/log/
         { "id": 7 }
 """
 
+import base64
 import hashlib
 import json
 import logging
@@ -632,6 +660,7 @@ from django.contrib.auth import login, logout
 from django.http import HttpResponse, HttpResponseRedirect
 from django.templatetags.static import static
 from django.urls import reverse
+from django.utils.cache import patch_vary_headers
 from django.utils.http import url_has_allowed_host_and_scheme
 from rest_framework import status
 from rest_framework.renderers import JSONRenderer
@@ -1363,6 +1392,8 @@ class MobileDeviceHeartbeatView(APIView):
             print_ready=data.get("print_ready", False),
             printer_name=data.get("printer_name", ""),
             print_method=data.get("print_method", ""),
+            label_resolution=data.get("label_resolution", ""),
+            label_dpi=data.get("label_dpi"),
         )
         if device is None:
             return Response({"detail": "Device not found."}, status=status.HTTP_404_NOT_FOUND)
@@ -1415,6 +1446,7 @@ class MobileRemotePrintProgressView(MobileRemotePrintJobMixin, APIView):
             job.total_count = data["total"]
         job.status = RemotePrintJob.STATUS_PRINTING
         job.save(update_fields=["printed_count", "total_count", "status", "updated_at"])
+        remote_print.announce(job)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -1449,9 +1481,55 @@ class MobileRemotePrintResultView(MobileRemotePrintJobMixin, APIView):
         job.message = data.get("message", "")
         job.save(update_fields=["status", "printed_count", "total_count", "message", "updated_at"])
         job.mark_labels_printed(job.printed_count)
+        remote_print.announce(job)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class MobileRemotePrintBundleView(MobileRemotePrintJobMixin, APIView):
+    """GET /api/mobile/printjobs/<uuid>/bundle/ — every label of the job in one zip.
+
+    Usually already drawn: ``dispatch`` has the worker draw it as soon as the job is pushed. While
+    the worker is still at it -- or when it has to be asked again, for a bundle that expired or a
+    ``resolution``/``dpi`` the phone didn't report -- this answers 202 with ``Retry-After`` rather
+    than drawing the same labels a second time inside the request. Only a small job at a size no
+    worker was asked for is drawn here, and kept for the next ask.
+    """
+
+    RETRY_AFTER_SECONDS = 2
+
+    def get(self, request, job_uuid):
+        job = self.get_job(request, job_uuid)
+        if job is None:
+            return Response({"detail": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+        resolution, dpi = request.GET.get("resolution"), request.GET.get("dpi")
+        try:
+            content = remote_print.cached_bundle(job, resolution, dpi)
+            if content is None:
+                if (
+                    remote_print.is_building(job, resolution, dpi)
+                    or remote_print.is_device_size(job, resolution, dpi)
+                    or len(job.lots) > remote_print.INLINE_MAX_LABELS
+                ):
+                    remote_print.queue_bundle(job, resolution, dpi)
+                    response = Response(
+                        {
+                            "detail": "The labels are still being drawn.",
+                            "rendered": job.rendered_count,
+                            "total": job.total_count,
+                        },
+                        status=status.HTTP_202_ACCEPTED,
+                    )
+                    response["Retry-After"] = str(self.RETRY_AFTER_SECONDS)
+                    return response
+                content = remote_print.build_bundle(job, resolution, dpi)
+        except ValueError:
+            logger.warning("Invalid print job bundle request.", exc_info=True)
+            return Response({"detail": "Invalid label request."}, status=status.HTTP_400_BAD_REQUEST)
+        response = HttpResponse(content, content_type="application/zip")
+        response["Content-Disposition"] = f'attachment; filename="labels-{job.uuid}.zip"'
+        return response
+
+
 # ---------------------------------------------------------------------------
 # Clubs
 # ---------------------------------------------------------------------------
@@ -1548,7 +1626,8 @@ class MobileLotLabelView(APIView):
             return HttpResponse(content, content_type=content_type)
 
         # NB: param is "fmt", not "format" — DRF reserves ?format= for its own content negotiation.
-        # ?resolution=WIDTHxHEIGHT&dpi=N control the output raster (default 600x400 @ 203dpi).
+        # ?resolution=WIDTHxHEIGHT&dpi=N control the output raster (default 600x400 @ 203dpi), and
+        # ?engine=bitmap draws the PNG directly instead of rasterizing the PDF.
         try:
             content, content_type = LabelService.render_label(
                 lot,
@@ -1556,6 +1635,7 @@ class MobileLotLabelView(APIView):
                 resolution=request.GET.get("resolution"),
                 dpi=request.GET.get("dpi"),
                 request=request,
+                engine=request.GET.get("engine"),
             )
         except ValueError:
             logger.warning("Invalid label request.", exc_info=True)
@@ -1567,6 +1647,61 @@ class MobileLotLabelView(APIView):
         return HttpResponse(content, content_type=content_type)
 
 
+class MobileLotLabelBatchView(APIView):
+    """GET /api/mobile/labels/batch/?lots=1,2,3&resolution=600x400&dpi=203 — many label PNGs at once.
+
+    ``{"labels": [{"lot": pk, "png": base64}, …], "skipped": [pk, …]}``, in the order asked for, so
+    a print run of forty is one request rather than forty. Drawn with the bitmap engine
+    (``?engine=pdf`` for PDF rasters). Lots that don't exist or that the caller can't print are
+    skipped rather than failing the batch, the same rule as labels/printed/.
+    """
+
+    permission_classes = [IsMobileAuthenticated]
+    throttle_scope = "mobile_api"
+    throttle_classes = [ScopedRateThrottle]
+
+    def get(self, request):
+        from .services.label_bitmap import MAX_BATCH_LABELS
+
+        try:
+            pks = [int(pk) for pk in request.GET.get("lots", "").split(",") if pk.strip()]
+        except ValueError:
+            return Response(
+                {"detail": "lots must be a comma-separated list of lot ids."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if not pks or len(pks) > MAX_BATCH_LABELS:
+            return Response(
+                {"detail": f"Ask for between 1 and {MAX_BATCH_LABELS} labels."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        lots = Lot.objects.filter(pk__in=pks, is_deleted=False).select_related(
+            "user",
+            "auction",
+            "species_category",
+            "auctiontos_seller",
+            "auctiontos_seller__auction",
+            "auctiontos_seller__user",
+        )
+        allowed = {lot.pk: lot for lot in lots if MobileLotLabelView._can_access(request.user, lot)}
+        ordered = [allowed[pk] for pk in dict.fromkeys(pks) if pk in allowed]
+        try:
+            pngs = LabelService.render_labels(
+                ordered,
+                request,
+                resolution=request.GET.get("resolution"),
+                dpi=request.GET.get("dpi"),
+                engine=request.GET.get("engine"),
+            )
+        except ValueError:
+            logger.warning("Invalid label batch request.", exc_info=True)
+            return Response({"detail": "Invalid label request."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {
+                "labels": [{"lot": lot.pk, "png": base64.b64encode(pngs[lot.pk]).decode()} for lot in ordered],
+                "skipped": [pk for pk in dict.fromkeys(pks) if pk not in allowed],
+            }
+        )
+
+
 class MobileLabelsPrintedView(APIView):
     """POST /api/mobile/labels/printed/ — mark a batch of lot labels as printed.
 
@@ -2276,11 +2411,45 @@ class MobileCheckinSetLocationView(APIView):
 # ---------------------------------------------------------------------------
 
 
+def _encoded_json(request, data, status_code=200):
+    """``data`` as JSON, brotli- or gzip-compressed when the client says it takes that.
+
+    Done here rather than by middleware because only the offline snapshot is big enough, and asked
+    for often enough over slow enough Wi-Fi, to be worth it.
+    """
+    import gzip
+
+    import brotli
+
+    body = JSONRenderer().render(data)
+    accepted = {
+        token.split(";")[0].strip().lower()
+        for token in request.headers.get("Accept-Encoding", "").split(",")
+        if "q=0" not in token.replace(" ", "").split(";")[1:]
+    }
+    encoding = None
+    if len(body) >= 200:
+        if "br" in accepted:
+            body, encoding = brotli.compress(body, quality=5), "br"
+        elif "gzip" in accepted:
+            body, encoding = gzip.compress(body, compresslevel=6), "gzip"
+    response = HttpResponse(body, status=status_code, content_type="application/json")
+    if encoding:
+        response["Content-Encoding"] = encoding
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return response
+
+
 class MobileOfflineSnapshotView(APIView):
     """GET /api/mobile/offline/snapshot/ — the caller's last admin auction + offline-screen data.
 
     Returns ``auction: null`` (still 200) when the caller administers no auction. A real 404 means
     the deployment predates this endpoint, and the app disables offline mode for the process.
+
+    ``?since=<cursor>`` (the ``cursor`` of the last snapshot) sends only what changed after it, and
+    ``?layout=columns`` sends users and lots as column tables; see ``offline.build_snapshot``. The
+    ETag is the cursor, so an ``If-None-Match`` from a phone that is already current is a 304 without
+    a row being read. Brotli or gzip, per ``Accept-Encoding``.
     """
 
     permission_classes = [IsMobileAuthenticated]
@@ -2288,10 +2457,26 @@ class MobileOfflineSnapshotView(APIView):
     throttle_classes = [ScopedRateThrottle]
 
     def get(self, request):
+        from auctions import offline_changes
+
         from .services import offline
 
+        layout = request.GET.get("layout") or "rows"
+        if layout not in offline.LAYOUTS:
+            return Response(
+                {"detail": f"layout must be one of {', '.join(offline.LAYOUTS)}."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        since = request.GET.get("since") or ""
         auction = offline.get_last_admin_auction(request.user)
-        return Response(offline.build_snapshot(auction))
+        if auction is None:
+            return _encoded_json(request, offline.build_snapshot(None))
+        etag = f'"{offline_changes.cursor(auction)}/{since}/{layout}"'
+        if request.headers.get("If-None-Match") == etag:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = _encoded_json(request, offline.build_snapshot(auction, since=since, layout=layout))
+        response["ETag"] = etag
+        return response
 
 
 class MobileOfflineSyncView(APIView):
@@ -2299,7 +2484,8 @@ class MobileOfflineSyncView(APIView):
 
     The named auction must belong to the caller (``permission_check``); 403 otherwise. Ops apply in
     order, idempotently and per-op (never all-or-nothing); the response pairs each op's result with a
-    fresh snapshot so one round trip both drains the queue and refreshes the phone.
+    fresh snapshot so one round trip both drains the queue and refreshes the phone. ``since`` and
+    ``layout`` in the body work as they do on the snapshot endpoint.
     """
 
     permission_classes = [IsMobileAuthenticated]
@@ -2322,5 +2508,7 @@ class MobileOfflineSyncView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        results = offline.apply_ops(auction, request.user, serializer.validated_data["ops"])
-        return Response({"results": results, "snapshot": offline.build_snapshot(auction)})
+        data = serializer.validated_data
+        results = offline.apply_ops(auction, request.user, data["ops"])
+        snapshot = offline.build_snapshot(auction, since=data.get("since"), layout=data["layout"])
+        return _encoded_json(request, {"results": results, "snapshot": snapshot})
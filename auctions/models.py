@@ -19,7 +19,7 @@ from django.contrib.auth.models import User
 from django.contrib.sites.models import Site
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models, transaction
+from django.db import models
 from django.db.models import (
     BooleanField,
     Case,
@@ -53,7 +53,17 @@ from post_office import mail
 from pytz import timezone as pytz_timezone
 from webpush.models import PushInformation
 
-from . import cloudflare_images, printer_programs, voice
+from . import (
+    account_jobs,
+    bap_charts,
+    cloudflare_images,
+    club_ledger,
+    offline_changes,
+    page_view_rollups,
+    printer_programs,
+    request_cache,
+    voice,
+)
 from .email_routing import admin_routing_email, build_routed_sender_address, email_routing_enabled
 from .helper_functions import bin_data, get_currency_symbol
 
@@ -355,29 +365,13 @@ def add_tos_info(qs):
         )
     )
 
+    # Bids and lot views are counted ahead of time (see auctions/bidder_metrics.py); counting them
+    # here meant two subqueries over the Bid and PageView tables for every row.
+    metrics = BidderMetrics.objects.filter(user=OuterRef("user"), auction=OuterRef("auction"))
     return qs.annotate(
-        lots_bid_actual=Coalesce(
-            Subquery(
-                Bid.objects.exclude(is_deleted=True)
-                .filter(user=OuterRef("user"), lot_number__auction=OuterRef("auction"))
-                .values("user")
-                .annotate(count=Count("pk", distinct=True))
-                .values("count"),
-                output_field=IntegerField(),
-            ),
-            0,
-        ),
+        lots_bid_actual=Coalesce(Subquery(metrics.values("lots_bid")[:1], output_field=IntegerField()), 0),
         lots_bid=Case(When(Q(has_ever_granted_permission=False), then=Value(0)), default=F("lots_bid_actual")),
-        lots_viewed_actual=Coalesce(
-            Subquery(
-                PageView.objects.filter(user=OuterRef("user"), lot_number__auction=OuterRef("auction"))
-                .values("user")
-                .annotate(count=Count("lot_number", distinct=True))
-                .values("count"),
-                output_field=IntegerField(),
-            ),
-            0,
-        ),
+        lots_viewed_actual=Coalesce(Subquery(metrics.values("lots_viewed")[:1], output_field=IntegerField()), 0),
         lots_viewed=Case(When(Q(has_ever_granted_permission=False), then=Value(0)), default=F("lots_viewed_actual")),
         lots_won=Count("auctiontos_winner", distinct=True),
         lots_submitted=Count("auctiontos_seller", distinct=True),
@@ -476,45 +470,14 @@ def add_tos_distance_info(qs):
 
 
 def guess_category(text):
-    """Given some text, look up lots with similar names and make a guess at the category this `text` belongs to based on the category used there"""
-    keywords = []
-    words = re.findall("[A-Z|a-z]{3,}", text.lower())
-    for word in words:
-        if word not in settings.IGNORE_WORDS:
-            keywords.append(word)
-
-    if not keywords:
-        return None
-    lot_qs = (
-        Lot.objects.exclude(is_deleted=True)
-        .filter(
-            category_automatically_added=False,
-            species_category__isnull=False,
-            is_deleted=False,
-        )
-        .exclude(species_category__name="Uncategorized")
-        .exclude(auction__promote_this_auction=False)
-    )
-    q_objects = Q()
-    for keyword in keywords:
-        q_objects |= Q(lot_name__iregex=rf"\b{re.escape(keyword)}\b")
-
-    lot_qs = lot_qs.filter(q_objects)
-
-    # category = lot_qs.values('species_category').annotate(count=Count('species_category')).order_by('-count').first()
-    # attempting this as a single-shot query is extremely difficult to debug
-    categories = {}
-    for lot in lot_qs:
-        matches = 0
-        for keyword in keywords:
-            if keyword in lot.lot_name.lower():
-                matches += 1
-        category_total = categories.get(lot.species_category.pk, 0)
-        categories[lot.species_category.pk] = category_total + matches
-    sorted_categories = sorted(categories.items(), key=lambda x: x[1], reverse=True)
-    for key, value in sorted_categories:
-        logger.debug("%s, %s", Category.objects.filter(pk=key).first(), value)
-        return Category.objects.filter(pk=key).first()
+    """Guess the category for a lot called `text` from the categories people chose for lots with the same words in their names"""
+    from auctions.category_keywords import rank_categories
+
+    for category_pk, score in rank_categories(text):
+        category = Category.objects.filter(pk=category_pk).first()
+        if category:
+            logger.debug("%s, %s", category, score)
+            return category
     return None
 
 
@@ -1776,6 +1739,13 @@ class ClubMember(ContactRecord):
         max_length=50, blank=True, help_text="Mailchimp internal web_id, used to build the 'View in Mailchimp' link."
     )
     mailchimp_last_synced = models.DateTimeField(null=True, blank=True)
+    mailchimp_sync_fingerprint = models.CharField(
+        max_length=40,
+        blank=True,
+        default="",
+        editable=False,
+        help_text="Digest of the contact and tags last pushed to Mailchimp; the bulk sync skips members whose digest is unchanged.",
+    )
     # Brevo mirrors the Mailchimp status bookkeeping above (see auctions/brevo.py).
     BREVO_STATUS_CHOICES = (
         ("", "Not synced"),
@@ -1796,6 +1766,13 @@ class ClubMember(ContactRecord):
         max_length=50, blank=True, help_text="Brevo internal contact id, used to build the 'View in Brevo' link."
     )
     brevo_last_synced = models.DateTimeField(null=True, blank=True)
+    brevo_sync_fingerprint = models.CharField(
+        max_length=40,
+        blank=True,
+        default="",
+        editable=False,
+        help_text="Digest of the contact last pushed to Brevo; the bulk sync skips members whose digest is unchanged.",
+    )
     # Apple Wallet (PassKit web service) bookkeeping.  The auth token is the shared
     # secret baked into the member's .pkpass; devices present it as
     # "Authorization: ApplePass <token>" when talking to the web service.  Generated
@@ -1804,6 +1781,10 @@ class ClubMember(ContactRecord):
     # Bumped whenever pass-visible content changes; drives Last-Modified / If-Modified-Since
     # on pass delivery and the passesUpdatedSince filter on the device registration list.
     apple_pass_updated = models.DateTimeField(default=timezone.now, editable=False)
+    # Digests of the pass content last delivered to each provider (see wallet_refresh.py); a
+    # club-wide refresh skips members whose pass would come out the same.
+    google_wallet_fingerprint = models.CharField(max_length=16, blank=True, default="", editable=False)
+    apple_pass_fingerprint = models.CharField(max_length=16, blank=True, default="", editable=False)
 
     @property
     def has_any_permission(self):
@@ -2319,6 +2300,23 @@ class ClubMember(ContactRecord):
         reminder_date = expiration_date - datetime.timedelta(days=days_before)
         return timezone.make_aware(datetime.datetime.combine(reminder_date, datetime.time(hour=12)))
 
+    def schedule_membership_expiration_reminders(self, previous_due=None, previous_30_days_due=None):
+        """Set both reminder times for the current expiration. A reminder that is new, or earlier than
+        it was, is never set less than 30 days out, so correcting a date doesn't send the email today."""
+        new_reminder = self.calculate_membership_expiration_reminder_due(days_before=1)
+        new_reminder_30_days = self.calculate_membership_expiration_reminder_due(days_before=30)
+        min_reminder = timezone.now() + datetime.timedelta(days=30)
+        if new_reminder is not None and (previous_due is None or new_reminder < previous_due):
+            if new_reminder < min_reminder:
+                new_reminder = min_reminder
+        if new_reminder_30_days is not None and (
+            previous_30_days_due is None or new_reminder_30_days < previous_30_days_due
+        ):
+            if new_reminder_30_days < min_reminder:
+                new_reminder_30_days = min_reminder
+        self.membership_expiration_reminder_due = new_reminder
+        self.membership_expiration_reminder_30_days_due = new_reminder_30_days
+
     class Meta:
         ordering = ["name"]
         constraints = [
@@ -2379,19 +2377,7 @@ class ClubMember(ContactRecord):
             or self.membership_expiration_date != previous_expiration_date
         )
         if expiration_changed and not getattr(self, "_preserve_membership_email_schedule", False):
-            new_reminder = self.calculate_membership_expiration_reminder_due(days_before=1)
-            new_reminder_30_days = self.calculate_membership_expiration_reminder_due(days_before=30)
-            min_reminder = timezone.now() + datetime.timedelta(days=30)
-            if new_reminder is not None and (previous_reminder_due is None or new_reminder < previous_reminder_due):
-                if new_reminder < min_reminder:
-                    new_reminder = min_reminder
-            if new_reminder_30_days is not None and (
-                previous_reminder_30_days_due is None or new_reminder_30_days < previous_reminder_30_days_due
-            ):
-                if new_reminder_30_days < min_reminder:
-                    new_reminder_30_days = min_reminder
-            self.membership_expiration_reminder_due = new_reminder
-            self.membership_expiration_reminder_30_days_due = new_reminder_30_days
+            self.schedule_membership_expiration_reminders(previous_reminder_due, previous_reminder_30_days_due)
         # Inherit email_address_status from another known record, same as AuctionTOS pattern
         if self.email and self.email != previous_email:
             self.email_address_status = "UNKNOWN"
@@ -3285,6 +3271,26 @@ class Category(models.Model):
         ordering = ["name"]
 
 
+class CategoryKeyword(models.Model):
+    """How many hand-categorised lots with ``keyword`` in their name are in ``category``.
+
+    What guess_category() ranks categories from; kept up to date by the Lot save signals and
+    recounted nightly.  See auctions/category_keywords.py.
+    """
+
+    keyword = models.CharField(max_length=64)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="+")
+    lots = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.keyword} -> {self.category_id} ({self.lots})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["keyword", "category"], name="unique_category_keyword"),
+        ]
+
+
 def normalize_species_name(text):
     """Lowercase, strip punctuation, collapse whitespace.  The key both sides of a name lookup use.
 
@@ -4283,6 +4289,10 @@ class Auction(models.Model):
     )
     use_seller_dash_lot_numbering = models.BooleanField(default=False, blank=True)
     use_seller_dash_lot_numbering.help_text = "Include the seller's bidder number with the lot number.  This option is not recommended as users find it confusing."
+    lot_number_sequence = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    lot_number_sequence.help_text = (
+        "The last lot number handed out.  Blank until the first lot after this was added; see reserve_lot_numbers"
+    )
     paypal_email_address = models.EmailField(max_length=255, blank=True, null=True)
     paypal_email_address.help_text = "Not currently used, this is configured in the model PayPalSeller"
     enable_online_payments = models.BooleanField(default=False, blank=True, verbose_name="PayPal payments")
@@ -4542,8 +4552,7 @@ class Auction(models.Model):
             .select_related("auction", "auctiontos_user", "auctiontos_user__auction")
             .distinct()
         )
-        for invoice in invoices:
-            invoice.sync_club_money()
+        club_ledger.sync_invoices(invoices)
 
     def find_user(self, name="", email="", exclude_pk=None):
         """Used for duplicate checks and when adding users to an auction
@@ -4812,21 +4821,38 @@ class Auction(models.Model):
         fallback for a plain in-person event — the intent is just to stop welcoming people once the
         auction is over."""
         now = now or timezone.now()
-        if not self.date_start:
-            return False
-        if now < self.date_start - datetime.timedelta(hours=3):
+        window = self.welcome_window()
+        if window is None:
             return False
-        end = self.date_end or (self.date_start + datetime.timedelta(hours=12))
-        return now <= end
+        opens, closes = window
+        return opens <= now <= closes
+
+    def welcome_window(self):
+        """``(opens, closes)`` bounds of :meth:`in_welcome_window`, or None without a start date.
+
+        Split out so the check-in candidate index can cache the bounds and test them per ping
+        without re-reading the auction."""
+        if not self.date_start:
+            return None
+        opens = self.date_start - datetime.timedelta(hours=3)
+        closes = self.date_end or (self.date_start + datetime.timedelta(hours=12))
+        return opens, closes
 
     def permission_check(self, user):
         """See if `user` can make changes to this auction"""
-        if self.created_by == user:
+        if self.created_by_id and self.created_by_id == user.pk:
             return True
         if user.is_superuser:
             return True
         if not user.is_authenticated:
             return False
+        return request_cache.remember(
+            ("permission_check", self.pk, self.club_id if self.is_club_managed else None, user.pk),
+            lambda: self._admin_permission_check(user),
+        )
+
+    def _admin_permission_check(self, user):
+        """The queries behind permission_check: an admin TOS, or a club admin for club-managed auctions"""
         tos = AuctionTOS.objects.filter(is_admin=True, user=user, user__isnull=False, auction=self.pk).first()
         if tos:
             return True
@@ -5613,7 +5639,8 @@ class Auction(models.Model):
 
     @property
     def weekly_promo_email_clicks(self):
-        return PageView.objects.filter(source="weekly_email", auction=self.pk).count()
+        clicks = Q(source="weekly_email", auction=self)
+        return page_view_rollups.count(clicks, clicks)
 
     @property
     def weekly_promo_email_click_rate(self):
@@ -5812,7 +5839,12 @@ class Auction(models.Model):
     @property
     def auction_admins_pks(self):
         """For use in querysets, pks only"""
-        return self.auction_admins_qs.values_list("user__pk", flat=True)
+        if not self.pk:
+            return self.auction_admins_qs.values_list("user__pk", flat=True)
+        return request_cache.remember(
+            ("auction_admins_pks", self.pk, self.created_by_id),
+            lambda: list(self.auction_admins_qs.values_list("user__pk", flat=True)),
+        )
 
     @property
     def auction_admins_user_pks(self):
@@ -5849,7 +5881,10 @@ class Auction(models.Model):
         query = Q(user=user)
         if user.email:
             query |= Q(email=user.email)
-        return AuctionTOS.objects.filter(query, auction=self).order_by("-createdon").first()
+        return request_cache.remember(
+            ("tos_for_user", self.pk, user.pk, user.email),
+            lambda: AuctionTOS.objects.filter(query, auction=self).order_by("-createdon").first(),
+        )
 
     # Stat getter/setter properties
     @property
@@ -5880,7 +5915,6 @@ class Auction(models.Model):
             date_start = date_end - time_difference
             dates_messed_with = True
 
-        views = PageView.objects.filter(Q(auction=self) | Q(lot_number__auction=self))
         joins = AuctionTOS.objects.filter(auction=self)
         new_lots = Lot.objects.filter(auction=self)
         searches = SearchHistory.objects.filter(auction=self)
@@ -5891,7 +5925,7 @@ class Auction(models.Model):
             "labels": self._get_activity_labels(bins, days_before, days_after, dates_messed_with),
             "providers": ["Views", "Joins", "New lots", "Searches", "Bids", "Watches"],
             "data": [
-                bin_data(views, "date_start", bins, date_start, date_end),
+                page_view_rollups.binned(*page_view_rollups.for_auction(self), bins, date_start, date_end),
                 bin_data(joins, "createdon", bins, date_start, date_end),
                 bin_data(new_lots, "date_posted", bins, date_start, date_end),
                 bin_data(searches, "createdon", bins, date_start, date_end),
@@ -6056,14 +6090,7 @@ class Auction(models.Model):
         """Calculate and return referrers chart data"""
         from django.contrib.sites.models import Site
 
-        views = (
-            PageView.objects.filter(Q(auction=self) | Q(lot_number__auction=self))
-            .exclude(referrer__isnull=True)
-            .exclude(referrer__startswith=Site.objects.get_current().domain)
-            .exclude(referrer__exact="")
-            .values("referrer")
-            .annotate(count=Count("referrer"))
-        )
+        views = page_view_rollups.referrers(self, Site.objects.get_current().domain)
         labels = []
         data = []
         other = 0
@@ -6516,6 +6543,35 @@ class Auction(models.Model):
             midpoint = "end"
         return before + [midpoint] + after
 
+    def reserve_lot_numbers(self, count=1):
+        """Hand out the next `count` lot numbers in this auction, as a list of ints.
+
+        A short transaction of its own that locks this auction's row just long enough to read and
+        bump lot_number_sequence, so a whole intake batch costs one reservation, and volunteers
+        adding lots at the same time only queue for that, not for each other's entire lot save.
+        The first reservation starts after the highest number already used.  A number is never
+        handed out twice, even if the lot it was reserved for is deleted or never saved.
+        """
+        from django.db import transaction
+
+        with transaction.atomic():
+            last = (
+                Auction.objects.select_for_update()
+                .filter(pk=self.pk)
+                .values_list("lot_number_sequence", flat=True)
+                .get()
+            )
+            if last is None:
+                # This is deliberately not excluding deleted and removed lots -- don't use auction.lots_qs here
+                last = Lot.objects.filter(auction=self.pk).aggregate(Max("lot_number_int"))["lot_number_int__max"] or 0
+            Auction.objects.filter(pk=self.pk).update(lot_number_sequence=last + count)
+        self.lot_number_sequence = last + count
+        return list(range(last + 1, last + count + 1))
+
+    def note_lot_number(self, number):
+        """Keep reserve_lot_numbers from handing out `number`, which a lot was given by hand."""
+        Auction.objects.filter(pk=self.pk, lot_number_sequence__lt=number).update(lot_number_sequence=number)
+
     def create_history(self, applies_to, action="Edited", user=None, form=None):
         """Applies to can be RULES, USERS, INVOICES, LOTS, LOT_WINNERS, user should be the user making the change or None if it's a system change.
         Action is a string describing the change, form is a form instance that has changed data
@@ -6714,6 +6770,10 @@ class AuctionTOS(models.Model):
     # this is actually important because some day, someone will ask to make the bidder numbers have characters like "1-234" or people's names
     bidder_number = models.CharField(max_length=20, default="", blank=True, db_index=True)
     bidder_number.help_text = "Must be unique, blank to automatically generate"
+    lot_number_sequence = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    lot_number_sequence.help_text = (
+        "The last seller-dash lot number (the part after the dash) handed out to this seller"
+    )
     bidding_allowed = models.BooleanField(default=True, blank=True)
     selling_allowed = models.BooleanField(default=True, blank=True)
     name = models.CharField(max_length=181, null=True, blank=True, db_index=True)
@@ -6784,6 +6844,42 @@ class AuctionTOS(models.Model):
         lots = Lot.objects.exclude(is_deleted=True).filter(auctiontos_seller=self.pk, auction__isnull=False)
         return lots
 
+    def reserve_lot_numbers(self, count=1):
+        """The next `count` seller-dash lot numbers for this seller ("<bidder number>-<n>").
+
+        The per-seller counterpart of Auction.reserve_lot_numbers: only this seller's row is
+        locked, so two sellers' lots can be numbered at the same time.
+        """
+        from django.db import transaction
+
+        with transaction.atomic():
+            last = (
+                AuctionTOS.objects.select_for_update()
+                .filter(pk=self.pk)
+                .values_list("lot_number_sequence", flat=True)
+                .get()
+            )
+            if last is None:
+                last = 0
+                for lot_number in Lot.objects.filter(auctiontos_seller=self.pk).values_list(
+                    "custom_lot_number", flat=True
+                ):
+                    match = re.findall(r"\d+", f"{lot_number}")
+                    if match:
+                        # last string of digits found
+                        last = max(last, int(match[-1]))
+            AuctionTOS.objects.filter(pk=self.pk).update(lot_number_sequence=last + count)
+        self.lot_number_sequence = last + count
+        # trim the end to fit in custom lot number if the length is too long
+        return [f"{self.bidder_number}-{number}"[:9] for number in range(last + 1, last + count + 1)]
+
+    def note_lot_number(self, custom_lot_number):
+        """Keep reserve_lot_numbers from handing out a seller-dash number a lot was given by hand."""
+        match = re.findall(r"\d+", f"{custom_lot_number}")
+        if match:
+            number = int(match[-1])
+            AuctionTOS.objects.filter(pk=self.pk, lot_number_sequence__lt=number).update(lot_number_sequence=number)
+
     def lot_owner(self, added_by=None):
         """The account to store in `Lot.user` for a lot sold by this TOS.
 
@@ -7342,8 +7438,10 @@ class AuctionTOS(models.Model):
                     address=conflicting.address,
                 )
                 AuctionTOS.objects.filter(pk=conflicting.pk).update(bidder_number=new_number)
+                offline_changes.note_changes(offline_changes.USER, [conflicting.pk], self.auction_id)
             self.bidder_number = number
             AuctionTOS.objects.filter(pk=self.pk).update(bidder_number=number)
+            offline_changes.note_changes(offline_changes.USER, [self.pk], self.auction_id)
             source = " via barcode" if via_barcode else ""
             self.auction.create_history(
                 applies_to="USERS",
@@ -7392,10 +7490,21 @@ class AuctionTOS(models.Model):
                     setattr(self, field, dup_val)
             if updates:
                 AuctionTOS.objects.filter(pk=self.pk).update(**updates)
+                offline_changes.note_changes(offline_changes.USER, [self.pk], self.auction_id)
+        offline_changes.note_changes(
+            offline_changes.LOT,
+            Lot.objects.filter(Q(auctiontos_winner=duplicate) | Q(auctiontos_seller=duplicate)).values_list(
+                "pk", flat=True
+            ),
+            self.auction_id,
+        )
         # Move won lots to self
         Lot.objects.filter(auctiontos_winner=duplicate).update(auctiontos_winner=self)
         # Move sold lots to self
         Lot.objects.filter(auctiontos_seller=duplicate).update(auctiontos_seller=self)
+        # and recount this seller's seller-dash numbers, which now include the moved lots'
+        AuctionTOS.objects.filter(pk=self.pk).update(lot_number_sequence=None)
+        self.lot_number_sequence = None
         # Get or create an invoice for self
         invoice = Invoice.objects.filter(auctiontos_user=self).first()
         if not invoice:
@@ -7648,6 +7757,11 @@ class AuctionDropdown(models.Model):
         )
 
 
+def new_render_stamp():
+    """A fresh Lot.render_stamp"""
+    return uuid_module.uuid4().hex
+
+
 class Lot(models.Model):
     """A lot is something to bid on"""
 
@@ -7894,58 +8008,33 @@ class Lot(models.Model):
     )
     bap_auto_reason = models.CharField(max_length=30, choices=BAP_REASON_CHOICES, blank=True, default="")
     manually_approved = models.BooleanField(default=False)
+    # Changes whenever anything shown in the cached parts of the lot page might have: every save, and
+    # every image added, changed or removed (see bump_render_stamp). It is part of the key of those
+    # {% cache %} blocks in view_lot_images.html, so a stale fragment is simply never asked for again.
+    render_stamp = models.CharField(max_length=32, blank=True, default=new_render_stamp, editable=False)
 
-    def save(self, *args, **kwargs):
-        from django.db import transaction
+    @classmethod
+    def bump_render_stamp(cls, lot_pks):
+        """Retire the cached lot page fragments of these lots, and of lots showing their images"""
+        lot_pks = [pk for pk in lot_pks if pk]
+        if lot_pks:
+            cls.objects.filter(Q(pk__in=lot_pks) | Q(use_images_from__in=lot_pks)).update(
+                render_stamp=new_render_stamp()
+            )
 
+    def save(self, *args, **kwargs):
         # for old and new auctions, generate a lot number int or custom_lot_number
-        # Use database-level locking to prevent race conditions when assigning lot numbers
-        needs_lock = self.auction and (
-            (self.lot_number_int is None)  # Standard mode needs lot_number_int
-            or (
-                not self.custom_lot_number and self.auction.use_seller_dash_lot_numbering
-            )  # Seller dash mode needs custom_lot_number
-        )
-
-        if needs_lock:
-            # We need to wrap the entire save in a transaction with locking
-            with transaction.atomic():
-                # Lock the auction row using SELECT FOR UPDATE
-                # This will block other transactions trying to lock the same row until this transaction completes
-                Auction.objects.select_for_update().get(pk=self.auction.pk)
-
-                # Assign lot_number_int if needed
-                if self.lot_number_int is None:
-                    # Now safely get the max lot_number_int while holding the lock
-                    minimum_lot_number = 1
-                    # This is deliberately not excluding deleted and removed lots -- don't use auction.lots_qs here
-                    max_number = Lot.objects.filter(auction=self.auction).aggregate(Max("lot_number_int"))[
-                        "lot_number_int__max"
-                    ]
-                    self.lot_number_int = (max_number or (minimum_lot_number - 1)) + 1
-
-                # Continue with the rest of the save logic
-                self._do_save(*args, **kwargs)
-        else:
-            # No lock needed, proceed normally
-            self._do_save(*args, **kwargs)
+        # Numbers come from the auction's (and in seller-dash mode the seller's) sequence, reserved in a
+        # transaction of their own; a batch of new lots reserves them all at once, see services.number_new_lots
+        if self.auction:
+            if self.lot_number_int is None:
+                self.lot_number_int = self.auction.reserve_lot_numbers()[0]
+            if not self.custom_lot_number and self.auction.use_seller_dash_lot_numbering and self.auctiontos_seller:
+                self.custom_lot_number = self.auctiontos_seller.reserve_lot_numbers()[0]
+        self._do_save(*args, **kwargs)
 
     def _do_save(self, *args, **kwargs):
         """Internal method to complete the save operation"""
-        # custom lot number set for old auctions: bidder_number-lot_number format
-        if not self.custom_lot_number and self.auction and self.auction.use_seller_dash_lot_numbering:
-            if self.auctiontos_seller:
-                custom_lot_number = 1
-                other_lots = self.auctiontos_seller.lots_qs
-                for lot in other_lots:
-                    match = re.findall(r"\d+", f"{lot.custom_lot_number}")
-                    if match:
-                        # last string of digits found
-                        match = int(match[-1])
-                        if match >= custom_lot_number:
-                            custom_lot_number = match + 1
-                # trim the end to fit in custom lot number if the length is too long
-                self.custom_lot_number = f"{self.auctiontos_seller.bidder_number}-{custom_lot_number}"[:9]
         # a bit of magic to automatically set categories
         fix_category = False
         if not self.species_category or (self.species_category and self.species_category.name == "Uncategorized"):
@@ -8002,6 +8091,9 @@ class Lot(models.Model):
         self.summernote_description = sanitize_summernote_html(self.summernote_description)
         if not self.quantity:
             self.quantity = 1
+        self.render_stamp = new_render_stamp()
+        if kwargs.get("update_fields"):
+            kwargs["update_fields"] = {*kwargs["update_fields"], "render_stamp"}
         super().save(*args, **kwargs)
 
         # chat history subscription for the owner
@@ -8017,8 +8109,8 @@ class Lot(models.Model):
         # This handles both lot_number_int and custom_lot_number (seller_dash_lot_numbering)
         # reported in a large auction where two lots had the same number but I have not been able to reproduce it
         # https://github.com/iragm/fishauctions/issues/420
-        # Note: Only check after first save (when pk exists). Race conditions during initial save
-        # are prevented by the SELECT FOR UPDATE locking in the save() method above.
+        # Note: Only check after first save (when pk exists). Numbers reserved in save() above are never
+        # handed out twice, so this only catches numbers that were given by hand.
         if self.auction and self.pk:
             # Check for duplicates based on lot_number_display
             if self.auction.use_seller_dash_lot_numbering and self.custom_lot_number:
@@ -8034,23 +8126,8 @@ class Lot(models.Model):
                 if duplicate_lot:
                     # Generate a new custom_lot_number for this (newest) lot
                     if self.auctiontos_seller:
-                        custom_lot_number = 1
-                        # Only fetch custom_lot_number field for performance
-                        other_lot_numbers = (
-                            Lot.objects.filter(
-                                auction=self.auction,
-                                auctiontos_seller=self.auctiontos_seller,
-                            )
-                            .exclude(pk=self.pk)
-                            .values_list("custom_lot_number", flat=True)
-                        )
-                        for lot_number in other_lot_numbers:
-                            match = re.findall(r"\d+", f"{lot_number}")
-                            if match:
-                                match = int(match[-1])
-                                if match >= custom_lot_number:
-                                    custom_lot_number = match + 1
-                        self.custom_lot_number = f"{self.auctiontos_seller.bidder_number}-{custom_lot_number}"[:9]
+                        self.auctiontos_seller.note_lot_number(self.custom_lot_number)
+                        self.custom_lot_number = self.auctiontos_seller.reserve_lot_numbers()[0]
                         self.label_printed = False
                         # Update in database without triggering full save logic
                         Lot.objects.filter(pk=self.pk).update(
@@ -8073,13 +8150,12 @@ class Lot(models.Model):
                 )
                 if duplicate_lot:
                     # Generate a new lot_number_int for this (newest) lot
-                    max_number = Lot.objects.filter(auction=self.auction).aggregate(Max("lot_number_int"))[
-                        "lot_number_int__max"
-                    ]
-                    self.lot_number_int = (max_number or 0) + 1
+                    self.auction.note_lot_number(self.lot_number_int)
+                    self.lot_number_int = self.auction.reserve_lot_numbers()[0]
                     self.label_printed = False
                     # Update in database without triggering full save logic
                     Lot.objects.filter(pk=self.pk).update(lot_number_int=self.lot_number_int, label_printed=False)
+                    offline_changes.note_changes(offline_changes.LOT, [self.pk], self.auction_id)
                     self.auction.create_history(
                         "LOTS",
                         f"Duplicate lot number detected, changed to {self.lot_number_display}",
@@ -9239,6 +9315,9 @@ class Lot(models.Model):
     @property
     def bids(self):
         """Get all bids for this lot, highest bid first, one per user (their latest bid)"""
+        if hasattr(self, "_prefetched_bids"):
+            # loaded for a whole page of lots by auctions.lot_tiles
+            return self._prefetched_bids
         # bids = Bid.objects.filter(lot_number=self.lot_number, last_bid_time__lte=self.calculated_end, amount__gte=self.reserve_price).order_by('-amount', 'last_bid_time')
         bids = (
             Bid.objects.exclude(is_deleted=True)
@@ -9301,13 +9380,12 @@ class Lot(models.Model):
 
     @property
     def anonymous_views(self):
-        return len(PageView.objects.filter(lot_number=self.lot_number, user_id__isnull=True))
+        return page_view_rollups.lot_views(self)[1]
 
     @property
     def page_views(self):
         """Total number of page views from all users"""
-        pageViews = self.all_page_views
-        return len(pageViews)
+        return page_view_rollups.lot_views(self)[0]
 
     @property
     def ar_interaction_counts(self):
@@ -9463,6 +9541,9 @@ class Lot(models.Model):
 
     @property
     def thumbnail(self):
+        if hasattr(self, "_prefetched_thumbnail"):
+            # loaded for a whole page of lots by auctions.lot_tiles
+            return self._prefetched_thumbnail
         source = self.use_images_from if self.use_images_from_id else self
         default = LotImage.objects.filter(lot_number=source.lot_number, is_primary=True).first()
         if default:
@@ -9865,7 +9946,9 @@ class BapAward(models.Model):
         from django.utils import timezone
 
         this_year = timezone.now().year
-        awards = BapAward.objects.filter(club_member=member).exclude(lot__is_deleted=True).exclude(lot__banned=True)
+        awards = list(
+            BapAward.objects.filter(club_member=member).exclude(lot__is_deleted=True).exclude(lot__banned=True)
+        )
         bap = hap = cap = bap_ytd = hap_ytd = cap_ytd = 0
         for a in awards:
             is_ytd = a.date.year == this_year
@@ -9884,6 +9967,7 @@ class BapAward(models.Model):
             hap_points_ytd=hap_ytd,
             culture_points_ytd=cap_ytd,
         )
+        bap_charts.record(member, awards)
         member.refresh_from_db()
         member.maybe_assign_discord_role()
 
@@ -9898,6 +9982,23 @@ class BapAward(models.Model):
         return result
 
 
+class BapMonthlyPoints(models.Model):
+    """A club member's BAP/HAP/CAP points for one month, for the leaderboard charts.  Rewritten by
+    BapAward.recalculate_member_points; see auctions/bap_charts.py."""
+
+    club_member = models.ForeignKey(ClubMember, on_delete=models.CASCADE, related_name="monthly_points")
+    month = models.DateField()
+    points = models.IntegerField(default=0)
+    hap_points = models.IntegerField(default=0)
+    cap_points = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["club_member", "month"], name="unique_bap_monthly_points")]
+
+    def __str__(self):
+        return f"{self.club_member} in {self.month:%b %Y}"
+
+
 class ClubBapCategoryOverride(models.Model):
     """Per-club, per-category BAP point overrides. When present, these take precedence over Club.points_per_lot."""
 
@@ -10812,7 +10913,7 @@ class Invoice(models.Model):
         # stays PAID must NOT re-sync -- re-deriving the amounts from current club/auction
         # settings would silently rewrite booked accounting the next time a settled invoice is
         # merely touched. Deliberate post-payment corrections go through un-pay -> edit -> re-pay.
-        if previous_status != self.status or previous_status is None:
+        if (previous_status != self.status or previous_status is None) and not club_ledger.defer(self):
             self.sync_club_money()
 
     def _absorb_duplicate_ledger(self, duplicate):
@@ -10846,7 +10947,7 @@ class Invoice(models.Model):
             for row in rows
         ]
         ClubMoney.objects.filter(invoice=duplicate).update(invoice=self)
-        ClubMoney.objects.bulk_create(reversals)
+        club_ledger.book(reversals)
 
     def _ledger_date(self):
         """The cash-basis date to book this invoice's ClubMoney entries under.
@@ -10875,13 +10976,20 @@ class Invoice(models.Model):
         if booked_date:
             return booked_date
         latest_payment = self.payments.order_by("-createdon", "-pk").values_list("createdon", flat=True).first()
+        return self._cash_date(None, latest_payment)
+
+    def _cash_date(self, booked_date, latest_payment):
+        """_ledger_date, given the first booked date and the latest payment time it looks up
+        (club_ledger.sync_invoices looks them up for many invoices at once)."""
+        if booked_date:
+            return booked_date
         if latest_payment:
             return timezone.localtime(latest_payment).date()
         if self.date_paid:
             return timezone.localtime(self.date_paid).date()
         return timezone.localdate()
 
-    def sync_club_money(self, acting_user=None):
+    def sync_club_money(self, acting_user=None, booked=None, event_date=None, commit=True):
         """Reconcile this invoice's entries in the club ledger (ClubMoney) with its state.
 
         The ledger is **cash basis**: it records money that actually changes hands when an
@@ -10914,6 +11022,10 @@ class Invoice(models.Model):
           * exactly reversible — paid -> unpaid -> paid nets to zero, unpaid -> paid is a
             net change of the invoice total,
           * append-only — existing rows are never edited or deleted.
+
+        ``booked`` ({category: total}) and ``event_date`` skip the lookups when the caller already
+        has them, and ``commit=False`` returns the entries unsaved; club_ledger.sync_invoices uses
+        all three to reconcile a whole auction at once.
         """
         auction = self.auction or (self.auctiontos_user.auction if self.auctiontos_user else None)
         if auction and auction.club_id:
@@ -10926,7 +11038,7 @@ class Invoice(models.Model):
             club = self.club
         if not club:
             return []
-        event_date = self._ledger_date()
+        event_date = event_date or self._ledger_date()
         cents = Decimal("0.01")
 
         def _q(value):
@@ -11001,9 +11113,10 @@ class Invoice(models.Model):
                 descriptions = {ClubMoney.CATEGORY_MEMBERSHIP: f"Membership dues from {who}"}
 
         # What the ledger ALREADY shows for this invoice, per category.
-        booked = {}
-        for row in ClubMoney.objects.filter(invoice=self).values("category").annotate(total=Sum("amount")):
-            booked[row["category"]] = row["total"] or Decimal("0.00")
+        if booked is None:
+            booked = {}
+            for row in ClubMoney.objects.filter(invoice=self).values("category").annotate(total=Sum("amount")):
+                booked[row["category"]] = row["total"] or Decimal("0.00")
 
         # Only ever reconcile the current categories. A database carried over from the old
         # ledger can hold rows in retired categories (e.g. ``auction_profit``,
@@ -11028,8 +11141,8 @@ class Invoice(models.Model):
                     created_by=acting_user,
                 )
             )
-        if entries:
-            ClubMoney.objects.bulk_create(entries)
+        if commit:
+            club_ledger.book(entries)
         return entries
 
 
@@ -11190,6 +11303,33 @@ class ClubMoney(models.Model):
         return f"{self.club}: {self.date} {self.amount} {self.get_category_display()}"
 
 
+class ClubMoneyPeriod(models.Model):
+    """A club's ClubMoney rows for one month and category, added up.
+
+    Kept up to date as entries are booked (the ledger is append-only), so a balance is a sum over
+    a club's months rather than over every entry it has ever booked. See auctions/club_ledger.py.
+    """
+
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="+")
+    month = models.DateField()
+    category = models.CharField(max_length=40)
+    money_in = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    money_out = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    entries = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["club", "month", "category"], name="unique_club_money_period"),
+        ]
+
+    def __str__(self):
+        return f"{self.club_id} {self.month:%Y-%m} {self.category}"
+
+    @property
+    def total(self):
+        return self.money_in + self.money_out
+
+
 class Bid(models.Model):
     """Bids apply to lots"""
 
@@ -11247,6 +11387,28 @@ class UserBan(models.Model):
         return str(self.user) + " has banned " + str(self.banned_user)
 
 
+class BidderMetrics(models.Model):
+    """How many bids ``user`` has placed in ``auction`` and how many of its lots they've looked at.
+
+    What add_tos_info() builds the trust score from; kept up to date by the Bid and PageView save
+    signals and reconciled nightly.  See auctions/bidder_metrics.py.
+    """
+
+    auction = models.ForeignKey(Auction, on_delete=models.CASCADE, related_name="+")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    lots_bid = models.PositiveIntegerField(default=0)
+    lots_viewed = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id} in {self.auction_id}: {self.lots_bid} bids, {self.lots_viewed} lots viewed"
+
+    class Meta:
+        verbose_name_plural = "Bidder metrics"
+        constraints = [
+            models.UniqueConstraint(fields=["auction", "user"], name="unique_bidder_metrics"),
+        ]
+
+
 class UserIgnoreCategory(models.Model):
     """
     Users can choose to hide all lots from all views
@@ -11361,6 +11523,35 @@ class PageView(models.Model):
         super().save(*args, **kwargs)
 
 
+class PageViewRollup(models.Model):
+    """PageView rows added up by hour -- or by day, once they're old enough -- for each auction, lot,
+    source and referrer.  Analytics read these instead of the raw rows; see auctions/page_view_rollups.py.
+    """
+
+    HOUR = "hour"
+    DAY = "day"
+
+    period = models.CharField(max_length=4, choices=((HOUR, "Hour"), (DAY, "Day")))
+    start = models.DateTimeField()
+    auction = models.ForeignKey(Auction, null=True, blank=True, on_delete=models.CASCADE, related_name="+")
+    lot = models.ForeignKey(Lot, null=True, blank=True, on_delete=models.CASCADE, related_name="+")
+    source = models.CharField(max_length=200, blank=True, default="")
+    referrer = models.CharField(max_length=600, blank=True, default="")
+    views = models.PositiveIntegerField(default=0)
+    signed_in_views = models.PositiveIntegerField(default=0)
+    total_time = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.views} views in the {self.period} from {self.start}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["period", "start"]),
+            models.Index(fields=["auction", "start"]),
+            models.Index(fields=["lot", "start"]),
+        ]
+
+
 class UserLabelPrefs(models.Model):
     """Dimensions used for the label PDF"""
 
@@ -11670,6 +11861,9 @@ class UserData(models.Model):
         return f"{self.user.username}'s data"
 
     def merge_into(self, user_to_merge_to):
+        """Move everything of this user's to ``user_to_merge_to``, a step at a time (see
+        auctions/account_jobs.py), and return the target's UserData. Raises
+        account_jobs.JobBusyError if another worker is already running this merge."""
         if not user_to_merge_to or not getattr(user_to_merge_to, "pk", None):
             msg = "A saved user is required as the merge target."
             raise ValueError(msg)
@@ -11677,289 +11871,9 @@ class UserData(models.Model):
             msg = "Cannot merge a user into itself."
             raise ValueError(msg)
 
-        source_user = self.user
-        target_userdata, _ = UserData.objects.get_or_create(user=user_to_merge_to)
-
-        def merge_unique_relation(model, key_field, merge=None):
-            existing = {getattr(item, key_field): item for item in model.objects.filter(user=user_to_merge_to)}
-            for item in list(model.objects.filter(user=source_user)):
-                key = getattr(item, key_field)
-                target_item = existing.get(key)
-                if target_item:
-                    if merge:
-                        merge(target_item, item)
-                    item.delete()
-                    continue
-                item.user = user_to_merge_to
-                item.save(update_fields=["user"])
-                existing[key] = item
-
-        def merge_chat_subscription(target_item, source_item):
-            update_fields = set()
-            if source_item.last_seen and (not target_item.last_seen or source_item.last_seen > target_item.last_seen):
-                target_item.last_seen = source_item.last_seen
-                update_fields.add("last_seen")
-            if source_item.last_notification_sent and (
-                not target_item.last_notification_sent
-                or source_item.last_notification_sent > target_item.last_notification_sent
-            ):
-                target_item.last_notification_sent = source_item.last_notification_sent
-                update_fields.add("last_notification_sent")
-            if source_item.unsubscribed and not target_item.unsubscribed:
-                target_item.unsubscribed = True
-                update_fields.add("unsubscribed")
-            if update_fields:
-                target_item.save(update_fields=list(update_fields))
-
-        with transaction.atomic():
-            target_updates = set()
-            fields_to_copy_if_missing = [
-                "phone_number",
-                "address",
-                "location",
-                "club",
-                "last_auction_used",
-                "last_club_used",
-                "location_coordinates",
-                "paypal_email_address",
-                "preferred_bidder_number",
-                "timezone",
-            ]
-            for field in fields_to_copy_if_missing:
-                source_value = getattr(self, field, None)
-                target_value = getattr(target_userdata, field, None)
-                if target_value in (None, "") and source_value not in (None, ""):
-                    setattr(target_userdata, field, source_value)
-                    target_updates.add(field)
-            if not target_userdata.latitude and self.latitude:
-                target_userdata.latitude = self.latitude
-                target_updates.add("latitude")
-            if not target_userdata.longitude and self.longitude:
-                target_userdata.longitude = self.longitude
-                target_updates.add("longitude")
-            if self.credit:
-                target_userdata.credit = (target_userdata.credit or 0) + self.credit
-                target_updates.add("credit")
-            for field in [
-                "can_submit_standalone_lots",
-                "can_create_club_auctions",
-                "paypal_enabled",
-                "square_enabled",
-                "is_trusted",
-            ]:
-                if getattr(self, field) and not getattr(target_userdata, field):
-                    setattr(target_userdata, field, True)
-                    target_updates.add(field)
-            if target_updates:
-                target_userdata.save(update_fields=list(target_updates))
-
-            Auction.objects.filter(created_by=source_user).update(created_by=user_to_merge_to)
-            PickupLocation.objects.filter(user=source_user).update(user=user_to_merge_to)
-            Invoice.objects.filter(buyer=source_user).update(buyer=user_to_merge_to)
-            Lot.objects.filter(user=source_user).update(user=user_to_merge_to)
-            Lot.objects.filter(winner=source_user).update(winner=user_to_merge_to)
-            Bid.objects.filter(user=source_user).update(user=user_to_merge_to)
-            PageView.objects.filter(user=source_user).update(user=user_to_merge_to)
-            AuctionCampaign.objects.filter(user=source_user).update(user=user_to_merge_to)
-            SearchHistory.objects.filter(user=source_user).update(user=user_to_merge_to)
-
-            merge_unique_relation(AuctionIgnore, "auction_id")
-            merge_unique_relation(UserIgnoreCategory, "category_id")
-            merge_unique_relation(Watch, "lot_number_id")
-            merge_unique_relation(ChatSubscription, "lot_id", merge=merge_chat_subscription)
-            updated_interest_ids = set()
-            existing_interests = {
-                item.category_id: item for item in UserInterestCategory.objects.filter(user=user_to_merge_to)
-            }
-            for interest in list(UserInterestCategory.objects.filter(user=source_user)):
-                target_interest = existing_interests.get(interest.category_id)
-                if target_interest:
-                    if interest.interest > target_interest.interest:
-                        target_interest.interest = interest.interest
-                        target_interest.save(update_fields=["interest"])
-                    updated_interest_ids.add(target_interest.pk)
-                    interest.delete()
-                    continue
-                interest.user = user_to_merge_to
-                interest.save(update_fields=["user"])
-                existing_interests[interest.category_id] = interest
-                updated_interest_ids.add(interest.pk)
-            for interest in UserInterestCategory.objects.filter(pk__in=updated_interest_ids):
-                interest.save()
-
-            for source_tos in list(AuctionTOS.objects.filter(user=source_user).select_related("auction")):
-                target_tos = (
-                    AuctionTOS.objects.filter(user=user_to_merge_to, auction=source_tos.auction)
-                    .exclude(pk=source_tos.pk)
-                    .order_by("createdon")
-                    .first()
-                )
-                if target_tos:
-                    target_tos.merge_duplicate(
-                        source_tos,
-                        reason=f"merged from user account {source_user.username}",
-                    )
-                else:
-                    source_tos.user = user_to_merge_to
-                    source_tos.save()
-
-            for source_member in list(ClubMember.objects.filter(user=source_user).select_related("club")):
-                target_member = (
-                    ClubMember.objects.filter(club=source_member.club, user=user_to_merge_to)
-                    .exclude(pk=source_member.pk)
-                    .order_by("pk")
-                    .first()
-                )
-                if not target_member:
-                    source_member.user = user_to_merge_to
-                    source_member.save(update_fields=["user"])
-                    continue
-
-                member_updates = set()
-                for field in [
-                    "name",
-                    "email",
-                    "phone_number",
-                    "address",
-                    "discord_id",
-                    "discord_username",
-                    "discord_roles",
-                    "membership_last_paid",
-                    "membership_expiration_date",
-                    "membership_expiration_reminder_due",
-                    "discord_role_override",
-                    "last_discord_role_assigned",
-                    "bidder_number",
-                ]:
-                    source_value = getattr(source_member, field, None)
-                    target_value = getattr(target_member, field, None)
-                    if target_value in (None, "") and source_value not in (None, ""):
-                        setattr(target_member, field, source_value)
-                        member_updates.add(field)
-                for field in [
-                    "permission_admin",
-                    "permission_view",
-                    "permission_export",
-                    "permission_add_edit",
-                    "permission_edit_club",
-                    "permission_money",
-                    "permission_manage_auctions",
-                    "permission_manage_bap",
-                    "permission_manage_donations",
-                    "permission_send_announcements",
-                ]:
-                    if getattr(source_member, field) and not getattr(target_member, field):
-                        setattr(target_member, field, True)
-                        member_updates.add(field)
-                if source_member.bap_points and not target_member.bap_points:
-                    target_member.bap_points = source_member.bap_points
-                    member_updates.add("bap_points")
-                if source_member.hap_points and not target_member.hap_points:
-                    target_member.hap_points = source_member.hap_points
-                    member_updates.add("hap_points")
-                if source_member.culture_points and not target_member.culture_points:
-                    target_member.culture_points = source_member.culture_points
-                    member_updates.add("culture_points")
-                if source_member.bap_points_ytd and not target_member.bap_points_ytd:
-                    target_member.bap_points_ytd = source_member.bap_points_ytd
-                    member_updates.add("bap_points_ytd")
-                if source_member.hap_points_ytd and not target_member.hap_points_ytd:
-                    target_member.hap_points_ytd = source_member.hap_points_ytd
-                    member_updates.add("hap_points_ytd")
-                if source_member.culture_points_ytd and not target_member.culture_points_ytd:
-                    target_member.culture_points_ytd = source_member.culture_points_ytd
-                    member_updates.add("culture_points_ytd")
-                if not source_member.is_deleted and target_member.is_deleted:
-                    target_member.is_deleted = False
-                    member_updates.add("is_deleted")
-                if member_updates:
-                    target_member.save(update_fields=list(member_updates))
-
-                BapAward.objects.filter(club_member=source_member).update(club_member=target_member)
-                InvoicePayment.objects.filter(club_member=source_member).update(club_member=target_member)
-                AuctionTOS.objects.filter(clubmember=source_member).update(clubmember=target_member)
-                if target_member.bap_awards.exists():
-                    BapAward.recalculate_member_points(target_member)
-                source_member.user = None
-                source_member.is_deleted = True
-                source_member.save(update_fields=["user", "is_deleted"])
-
-            for model, field_names in [
-                (
-                    PayPalSeller,
-                    ["paypal_merchant_id", "currency", "payer_email"],
-                ),
-                (
-                    SquareSeller,
-                    [
-                        "square_merchant_id",
-                        "access_token",
-                        "refresh_token",
-                        "token_expires_at",
-                        "currency",
-                        "payer_email",
-                    ],
-                ),
-            ]:
-                source_record = model.objects.filter(user=source_user).first()
-                if not source_record:
-                    continue
-                target_record = model.objects.filter(user=user_to_merge_to).first()
-                if not target_record:
-                    source_record.user = user_to_merge_to
-                    source_record.save(update_fields=["user"])
-                    continue
-                payment_updates = set()
-                for field in field_names:
-                    source_value = getattr(source_record, field, None)
-                    target_value = getattr(target_record, field, None)
-                    if target_value in (None, "") and source_value not in (None, ""):
-                        setattr(target_record, field, source_value)
-                        payment_updates.add(field)
-                if payment_updates:
-                    target_record.save(update_fields=list(payment_updates))
-                source_record.delete()
-
-            self.phone_number = None
-            self.address = None
-            self.location = None
-            self.club = None
-            self.last_auction_used = None
-            self.last_club_used = None
-            self.latitude = 0
-            self.longitude = 0
-            self.location_coordinates = None
-            self.paypal_email_address = None
-            self.credit = 0
-            self.preferred_bidder_number = ""
-            self.can_submit_standalone_lots = get_default_can_submit_lots()
-            self.can_create_club_auctions = get_default_can_create_auctions()
-            self.paypal_enabled = get_default_paypal_enabled()
-            self.square_enabled = get_default_square_enabled()
-            self.is_trusted = get_default_is_trusted()
-            self.save(
-                update_fields=[
-                    "phone_number",
-                    "address",
-                    "location",
-                    "club",
-                    "last_auction_used",
-                    "last_club_used",
-                    "latitude",
-                    "longitude",
-                    "location_coordinates",
-                    "paypal_email_address",
-                    "credit",
-                    "preferred_bidder_number",
-                    "can_submit_standalone_lots",
-                    "can_create_club_auctions",
-                    "paypal_enabled",
-                    "square_enabled",
-                    "is_trusted",
-                ]
-            )
-
-        return target_userdata
+        account_jobs.run(account_jobs.start(AccountJob.MERGE, self.user, user_to_merge_to))
+        self.refresh_from_db()
+        return UserData.objects.get(user=user_to_merge_to)
 
     def set_next_promo(self):
         """Set next_promo_email_at to the next Wednesday at 10 AM in user's local time,
@@ -12267,9 +12181,7 @@ class UserData(models.Model):
 
     @property
     def mark_all_subscriptions_notified(self):
-        for subscription in self.subscriptions:
-            subscription.last_notification_sent = timezone.now()
-            subscription.save()
+        self.subscriptions.update(last_notification_sent=timezone.now())
 
     @property
     def mark_all_subscriptions_seen(self):
@@ -12945,6 +12857,56 @@ class LotHistory(models.Model):
         verbose_name_plural = "Chat history"
         verbose_name = "Chat history"
         ordering = ["timestamp"]
+        indexes = [
+            # a lot's chat/bid feed, newest first, and the unread counts on subscriptions
+            models.Index(fields=["lot", "removed", "changed_price", "timestamp"]),
+        ]
+
+
+class LotHistoryArchive(models.Model):
+    """LotHistory rows of lots that ended more than LOT_HISTORY_ARCHIVE_DAYS ago, moved here
+    unchanged (same pk) so the live table only holds recent lots.  See auctions/history_archive.py."""
+
+    id = models.IntegerField(primary_key=True)
+    lot = models.ForeignKey(Lot, blank=True, null=True, on_delete=models.CASCADE, related_name="archived_history")
+    user = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    message = models.CharField(max_length=400, blank=True, null=True)
+    timestamp = models.DateTimeField()
+    seen = models.BooleanField(default=False)
+    current_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    changed_price = models.BooleanField(default=False)
+    notification_sent = models.BooleanField(default=False)
+    bid_amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    removed = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.message or 'message'}"
+
+    class Meta:
+        verbose_name_plural = "Archived chat history"
+        verbose_name = "Archived chat history"
+        ordering = ["timestamp"]
+        indexes = [models.Index(fields=["lot", "timestamp"])]
+
+
+class LotHistorySummary(models.Model):
+    """What a lot's archived LotHistory adds up to, for the counts that lot lists show."""
+
+    lot = models.OneToOneField(Lot, on_delete=models.CASCADE, primary_key=True, related_name="history_summary")
+    chat_count = models.PositiveIntegerField(default=0)
+    chat_count.help_text = "Chat messages that weren't removed"
+    bid_count = models.PositiveIntegerField(default=0)
+    bid_count.help_text = "Rows that changed the price"
+    last_message = models.CharField(max_length=400, blank=True, null=True)
+    last_message_user = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    last_message_timestamp = models.DateTimeField(null=True, blank=True)
+    archived_on = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Lot {self.lot_id}: {self.chat_count} messages, {self.bid_count} bids archived"
+
+    class Meta:
+        verbose_name_plural = "Archived chat summaries"
 
 
 class AuctionHistory(models.Model):
@@ -13414,6 +13376,10 @@ class MobileDevice(models.Model):
     # this feature worth offering to this account at all" -- which is what decides whether /printing/
     # shows the checkbox. A switch with nothing behind it is worse than no switch.
     ever_print_ready = models.BooleanField(default=False)
+    # The paired printer's label in pixels ("600x400") and its dpi, as the app asks labels/<pk>/ for
+    # them. Reported with the heartbeat so a job's labels can be drawn before the phone asks for them.
+    label_resolution = models.CharField(max_length=11, blank=True, default="")
+    label_dpi = models.PositiveSmallIntegerField(null=True, blank=True)
 
     # One missed beat of slack on the app's 5-minute interval. Everything that asks "can we print to
     # this phone" keys off this and nothing else.
@@ -13521,6 +13487,12 @@ class RemotePrintJob(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
     printed_count = models.IntegerField(default=0)
     total_count = models.IntegerField(default=0)
+    # Labels drawn into the job's bundle so far (see remote_print.build_bundle). Written with
+    # update(), not save(), so drawing never moves updated_at and the silence rule.
+    rendered_count = models.IntegerField(default=0)
+    # The size the bundle is drawn at: the device's, when the job was made.
+    label_resolution = models.CharField(max_length=11, blank=True, default="")
+    label_dpi = models.PositiveSmallIntegerField(null=True, blank=True)
     # The app's failure text, verbatim. Never written by the server.
     message = models.TextField(blank=True, default="")
     created_at = models.DateTimeField(auto_now_add=True)
@@ -13603,6 +13575,84 @@ class MobileOfflineOp(models.Model):
         return f"{self.op_type} {self.op_id} (auction {self.auction_id})"
 
 
+class MobileOfflineChange(models.Model):
+    """The change log behind ``since=`` on GET /api/mobile/offline/snapshot/.
+
+    One row per (auction, kind, object): saving or deleting a bidder, a lot, an invoice or the auction
+    itself deletes its rows and writes them again, so the row's id -- an autoincrement, so always
+    higher than anything written before -- says when the object last changed, and the table never
+    holds more than one row per object per auction it has been in. An auction's cursor is the highest
+    id among its rows; a delta is every row above the cursor the phone already has.
+
+    A row for an object that is no longer in the auction's snapshot (deleted, banned, moved to
+    another auction) is how the phone hears it is gone, which is why a moved lot keeps a row under
+    every auction it has been in. See auctions/offline_changes.py.
+    """
+
+    auction = models.ForeignKey(Auction, on_delete=models.CASCADE, related_name="+")
+    kind = models.CharField(max_length=10)
+    object_pk = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["auction", "id"]),
+            models.Index(fields=["kind", "object_pk"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_pk} (auction {self.auction_id})"
+
+
+class AccountJob(models.Model):
+    """A merge, deletion or purge of one account, run a step at a time by auctions/account_jobs.py.
+
+    ``steps_done`` is how far it has got, so an interrupted job carries on from there; a worker
+    running it holds it until ``leased_until``. ``attempts`` counts the runs that failed.
+    """
+
+    MERGE = "merge"
+    DELETE = "delete"
+    PURGE = "purge"
+
+    kind = models.CharField(
+        max_length=10, choices=((MERGE, "Merge into another account"), (DELETE, "Delete"), (PURGE, "Purge"))
+    )
+    user = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    target = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE, related_name="+")
+    target.help_text = "The account a merge moves everything to"
+    steps_done = models.PositiveSmallIntegerField(default=0)
+    state = models.JSONField(default=dict, blank=True)
+    state.help_text = "What a step found that later steps need, e.g. the addresses a deletion is removing"
+    leased_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    attempts.help_text = "Runs that failed; resume_account_jobs stops retrying after account_jobs.MAX_ATTEMPTS"
+    created_on = models.DateTimeField(auto_now_add=True)
+    finished_on = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.kind} of user {self.user_id}"
+
+
+class SyncOutbox(models.Model):
+    """An external sync waiting to be sent: one row per (task, object).
+
+    Written in the same transaction as the change that needs it, so a rollback takes it with it,
+    and a second change before it is sent finds the row already there. drain_sync_outbox sends each
+    row once it is ``due`` and deletes it. See auctions/sync_outbox.py.
+    """
+
+    task = models.CharField(max_length=200)
+    object_pk = models.PositiveIntegerField()
+    due = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["task", "object_pk"], name="unique_sync_outbox_entry")]
+
+    def __str__(self):
+        return f"{self.task}({self.object_pk})"
+
+
 class ThermalPrinterProfile(models.Model):
     """A Bluetooth thermal label printer the mobile app knows how to drive.
 
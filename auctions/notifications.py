@@ -9,7 +9,9 @@ Push degrades gracefully — if FCM isn't configured, the user hasn't opted in,
 device token, the email is sent. This mirrors ``email_routing.email_routing_enabled()``.
 
 This module owns the *decision* and the low-level FCM send; the actual fan-out to a user's devices
-runs in the ``auctions.tasks.send_push_to_user`` Celery task (never send inline in a request).
+runs in the ``auctions.tasks.send_push_to_user`` Celery task (never send inline in a request). One
+notification going to many users (club announcements, promos, watched lots) goes through
+:func:`enqueue_push_batch` and ``auctions.tasks.send_push_batch`` instead.
 """
 
 import json
@@ -77,6 +79,13 @@ SEND_OK = "sent"
 SEND_INVALID_TOKEN = "invalid_token"  # token is dead/unregistered → prune it
 SEND_ERROR = "error"  # transient failure → keep the token, try again later
 
+# firebase-admin's send_each takes at most 500 messages and opens a thread per message, so batch
+# sends go out in smaller slices than that.
+FCM_BATCH_SIZE = 100
+# Users per send_push_batch task. One task per chunk keeps a club-wide announcement to a handful
+# of tasks while no single one runs long enough to brush the Celery time limits.
+PUSH_BATCH_USERS = 250
+
 _firebase_app = None
 _firebase_lock = threading.Lock()
 
@@ -137,6 +146,40 @@ def notify_user(user, *, category, title, body, url, send_email, auction_pk=None
     return True
 
 
+def enqueue_push_batch(user_pks, *, title, body, url, category, collapse_key=None, auction_pk=None, bodies=None):
+    """Queue one push to many users as a few ``send_push_batch`` tasks rather than one per user.
+
+    ``bodies`` optionally maps a user pk to that user's own body text (e.g. "12 miles away"); users
+    not in it get ``body``. Callers pick the recipients; this only chunks and enqueues. A chunk that
+    can't be queued is logged and skipped rather than raised, so one broker hiccup can't cost the
+    rest. Returns how many users were handed to a task.
+    """
+    from auctions.tasks import send_push_batch
+
+    user_pks = list(dict.fromkeys(user_pks))
+    bodies = bodies or {}
+    queued = 0
+    for start in range(0, len(user_pks), PUSH_BATCH_USERS):
+        chunk = user_pks[start : start + PUSH_BATCH_USERS]
+        chunk_bodies = {str(pk): bodies[pk] for pk in chunk if pk in bodies}
+        try:
+            send_push_batch.delay(
+                chunk,
+                title=title,
+                body=body,
+                url=url,
+                category=category,
+                collapse_key=collapse_key,
+                auction_pk=auction_pk,
+                bodies=chunk_bodies or None,
+            )
+        except Exception:
+            logger.exception("Could not enqueue a %s push batch for %s user(s)", category, len(chunk))
+            continue
+        queued += len(chunk)
+    return queued
+
+
 def _get_firebase_app():
     """Lazily initialise (once) and return the firebase_admin app, or None if unavailable."""
     global _firebase_app
@@ -184,13 +227,31 @@ def send_fcm_message(token, *, title, body, url, category, collapse_key=None):
     except ImportError:
         return SEND_ERROR
 
+    message = _notification_message(
+        messaging, token, title=title, body=body, url=url, category=category, collapse_key=collapse_key
+    )
+    try:
+        messaging.send(message, app=app)
+        return SEND_OK
+    except (messaging.UnregisteredError, messaging.SenderIdMismatchError):
+        return SEND_INVALID_TOKEN
+    except ValueError:
+        # Malformed/invalid token — treat as dead so it gets pruned.
+        return SEND_INVALID_TOKEN
+    except Exception:
+        logger.exception("FCM send failed (transient) for category %s", category)
+        return SEND_ERROR
+
+
+def _notification_message(messaging, token, *, title, body, url, category, collapse_key=None):
+    """The hybrid notification+data ``messaging.Message`` for one token (see send_fcm_message)."""
     apns_headers = {"apns-priority": "10"}
     if collapse_key:
         # iOS has no notion of android's collapse_key; apns-collapse-id is the equivalent, and
         # without it a phone that gets "coming up soon" then "about to be sold" stacks two alerts
         # for the same lot instead of replacing the first. Apple caps the id at 64 bytes.
         apns_headers["apns-collapse-id"] = collapse_key[:64]
-    message = messaging.Message(
+    return messaging.Message(
         notification=messaging.Notification(title=title or "", body=body or ""),
         data={
             "title": title or "",
@@ -208,17 +269,58 @@ def send_fcm_message(token, *, title, body, url, category, collapse_key=None):
             payload=messaging.APNSPayload(aps=messaging.Aps(sound="default")),
         ),
     )
-    try:
-        messaging.send(message, app=app)
-        return SEND_OK
-    except (messaging.UnregisteredError, messaging.SenderIdMismatchError):
-        return SEND_INVALID_TOKEN
-    except ValueError:
-        # Malformed/invalid token — treat as dead so it gets pruned.
+
+
+def _batch_result_for(messaging, exc, category):
+    """Map one failed ``send_each`` response to a result, the way send_fcm_message's excepts do."""
+    if isinstance(exc, (messaging.UnregisteredError, messaging.SenderIdMismatchError, ValueError)):
         return SEND_INVALID_TOKEN
-    except Exception:
-        logger.exception("FCM send failed (transient) for category %s", category)
-        return SEND_ERROR
+    logger.error("FCM send failed (transient) for category %s", category, exc_info=exc)
+    return SEND_ERROR
+
+
+def send_fcm_batch(pushes):
+    """Send many notification messages at once; return one result per push, in order.
+
+    ``pushes`` is a list of dicts with the keyword arguments of :func:`send_fcm_message` (``token``,
+    ``title``, ``body``, ``url``, ``category`` and optionally ``collapse_key``). Never raises.
+
+    FCM's v1 API has no batch endpoint any more, so this is firebase-admin's ``send_each``: one call
+    per :data:`FCM_BATCH_SIZE` messages, fanned out over the SDK's one pooled HTTP session instead of
+    a Celery task and a fresh connection per device. (The SDK's HTTP/2 client is async-only and binds
+    its pool to one event loop, which a prefork worker running task after task can't keep.)
+    """
+    if not pushes:
+        return []
+    app = _get_firebase_app()
+    if app is None:
+        return [SEND_ERROR] * len(pushes)
+    try:
+        from firebase_admin import messaging
+    except ImportError:
+        return [SEND_ERROR] * len(pushes)
+
+    results = []
+    for start in range(0, len(pushes), FCM_BATCH_SIZE):
+        chunk = pushes[start : start + FCM_BATCH_SIZE]
+        try:
+            messages = [_notification_message(messaging, **push) for push in chunk]
+            response = messaging.send_each(messages, app=app)
+        except ValueError:
+            # The SDK validates the whole list before sending anything, so one malformed token
+            # would sink the chunk; send it one at a time to find and prune just that one.
+            results.extend(send_fcm_message(**push) for push in chunk)
+            continue
+        except Exception:
+            logger.exception("FCM batch send of %s message(s) failed (transient)", len(chunk))
+            results.extend([SEND_ERROR] * len(chunk))
+            continue
+        for push, send_response in zip(chunk, response.responses, strict=True):
+            if send_response.success:
+                results.append(SEND_OK)
+            else:
+                results.append(_batch_result_for(messaging, send_response.exception, push.get("category")))
+    return results
 
 
 def send_fcm_data_message(token, data):
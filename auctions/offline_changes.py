@@ -0,0 +1,101 @@
+"""The change log that lets the app's offline snapshot be sent as a delta.
+
+GET /api/mobile/offline/snapshot/ used to send every bidder and every lot of the auction on every
+refresh -- 1,500 lots over venue Wi-Fi, every few minutes, from every admin's phone, to show the
+handful that had changed. :class:`~auctions.models.MobileOfflineChange` keeps, per auction, one row
+for each bidder, lot and invoice-holder that has changed, with an autoincrement id that only goes
+up; the snapshot hands the phone the highest id as its cursor, and next time sends only the rows
+above it (see ``auctions.mobile.services.offline.build_snapshot``).
+
+Rows are written after commit by:
+
+- the receivers in signals.py, for saves and deletes of AuctionTOS, Lot, Invoice and Auction;
+- the queryset ``update()`` calls that change what the snapshot shows, which call
+  :func:`note_changes` themselves.
+
+A change that gets past both (an admin script, the shell) is only missed until something else
+about the same row changes, or the app asks for a full snapshot, which it does on its first sync.
+"""
+
+from __future__ import annotations
+
+from django.db import transaction
+
+# MobileOfflineChange kinds
+AUCTION = "auction"
+USER = "user"
+LOT = "lot"
+
+# Fields a user or lot row of the snapshot is made from; a save that touches none of them (a label
+# marked printed, a page view counted) changes nothing the phone shows.
+USER_FIELDS = frozenset({"bidder_number", "name", "email", "phone_number", "auction"})
+LOT_FIELDS = frozenset(
+    {
+        "lot_number",
+        "lot_number_int",
+        "custom_lot_number",
+        "lot_name",
+        "quantity",
+        "donation",
+        "auctiontos_seller",
+        "auctiontos_winner",
+        "winning_price",
+        "active",
+        "is_deleted",
+        "banned",
+        "auction",
+    }
+)
+
+
+def touches(fields, update_fields):
+    return update_fields is None or not fields.isdisjoint(update_fields)
+
+
+def note_changes(kind, object_pks, auction_id):
+    """Record, once the transaction commits, that ``object_pks`` changed in ``auction_id``."""
+    object_pks = sorted({pk for pk in object_pks if pk})
+    if object_pks:
+        transaction.on_commit(lambda: _write(kind, object_pks, auction_id))
+
+
+def _write(kind, object_pks, auction_id):
+    """Replace the objects' rows with new ones, under ``auction_id`` and under every other auction
+    they already had a row in -- a lot moved away must read as gone in the auction it left."""
+    from auctions.models import MobileOfflineChange
+
+    rows = set(
+        MobileOfflineChange.objects.filter(kind=kind, object_pk__in=object_pks).values_list("object_pk", "auction_id")
+    )
+    if auction_id:
+        rows.update((pk, auction_id) for pk in object_pks)
+    if not rows:
+        return
+    with transaction.atomic():
+        MobileOfflineChange.objects.filter(kind=kind, object_pk__in=object_pks).delete()
+        MobileOfflineChange.objects.bulk_create(
+            MobileOfflineChange(auction_id=auction_pk, kind=kind, object_pk=object_pk)
+            for object_pk, auction_pk in sorted(rows)
+        )
+
+
+def cursor(auction):
+    """The auction's change cursor, ``"<auction pk>:<last change id>"``. Opaque to the app, which
+    only ever sends it back as ``since``; carrying the auction means a cursor from another auction
+    is never taken for this one's."""
+    from auctions.models import MobileOfflineChange
+
+    last = MobileOfflineChange.objects.filter(auction=auction).order_by("-pk").values_list("pk", flat=True).first()
+    return f"{auction.pk}:{last or 0}"
+
+
+def position(auction, since, current):
+    """The change id in ``since`` if a delta from it up to ``current`` can be trusted, else None."""
+    auction_pk, _, since_id = (since or "").partition(":")
+    if auction_pk != str(auction.pk) or not since_id.isdigit():
+        return None
+    since_id = int(since_id)
+    if since_id > int(current.partition(":")[2]):
+        # A cursor from the future: another database, or a log that was rebuilt.
+        return None
+    return since_id
@@ -0,0 +1,281 @@
+"""PageView, added up by the hour.
+
+PageView is the busiest table on the site -- a row for every page anyone opens, written to again
+while the page stays open -- and the auction stats charts, the admin traffic charts and every lot's
+view count read it a row at a time, so each of them got slower with every visitor.
+
+:func:`fold`, run by ``rollup_page_views``, adds each finished hour of views into
+:class:`~auctions.models.PageViewRollup`: one row per hour, auction, lot, source and referrer, with
+the number of views, how many of them were by a signed-in user and the time spent. :func:`compact`
+merges hours older than HOURLY_DAYS into one row per day, and :func:`prune` deletes raw rows older
+than PAGEVIEW_RETENTION_DAYS -- only ever ones that have been folded.
+
+Everything before the :func:`watermark` has been folded, so the readers here (:func:`count`,
+:func:`lot_views` and :func:`load_lot_views`, for a page of lots, :func:`binned`, :func:`by_weekday_and_hour`, :func:`referrers`) add the rollups
+to the raw rows from after it. Unique visitors can't be added up across hours, so
+Auction.unique_views, a lot's per-source breakdown and the admin traffic pages still read raw rows,
+as do bidder metrics and category interest; they see back as far as the retention window.
+"""
+
+from __future__ import annotations
+
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q, Sum
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay, TruncDay, TruncHour
+from django.utils import timezone
+
+from . import request_cache
+from .helper_functions import bin_data
+
+# Views keep changing for a while after they're created: total_time grows while the page is open,
+# and remove_duplicate_views merges repeats every 15 minutes. An hour is folded this long after it ends.
+FOLD_DELAY = datetime.timedelta(hours=1)
+# Hours folded per run; a run that folds this many queues another.
+FOLD_HOURS = 24
+# Hourly rows are kept this long, then merged into days.
+HOURLY_DAYS = 90
+# Days merged per run.
+COMPACT_DAYS = 31
+# Rows written or deleted per statement, and raw rows deleted per run.
+CHUNK = 1000
+PRUNE_BATCH = 100_000
+LOCK_KEY = "page_view_rollups_lock"
+LOCK_SECONDS = 600
+
+UTC = datetime.timezone.utc
+TOTALS = ("views", "signed_in_views", "total_time")
+
+
+def _hour(moment):
+    return moment.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+
+
+def _day(moment):
+    return _hour(moment).replace(hour=0)
+
+
+def watermark():
+    """Every view before this has been folded into the rollups; None before the first fold."""
+    return request_cache.remember(("page_view_watermark",), _watermark)
+
+
+def _watermark():
+    from auctions.models import PageViewRollup
+
+    for period, length in (
+        (PageViewRollup.HOUR, datetime.timedelta(hours=1)),
+        (PageViewRollup.DAY, datetime.timedelta(days=1)),
+    ):
+        latest = PageViewRollup.objects.filter(period=period).order_by("-start").values_list("start", flat=True).first()
+        if latest:
+            return latest + length
+    return None
+
+
+def _store(period, rows, key):
+    """bulk_create a PageViewRollup for each of ``rows`` (values() dicts with TOTALS), grouped by
+    ``key`` -- a None source or referrer is the same as an empty one."""
+    from auctions.models import PageViewRollup
+
+    totals = defaultdict(lambda: [0, 0, 0])
+    for row in rows:
+        total = totals[(row[key], row["auction_id"], row["lot_id"], row["source"] or "", row["referrer"] or "")]
+        for i, name in enumerate(TOTALS):
+            total[i] += row[name] or 0
+    PageViewRollup.objects.bulk_create(
+        [
+            PageViewRollup(
+                period=period,
+                start=start,
+                auction_id=auction_id,
+                lot_id=lot_id,
+                source=source[:200],
+                referrer=referrer[:600],
+                views=views,
+                signed_in_views=signed_in_views,
+                total_time=total_time,
+            )
+            for (start, auction_id, lot_id, source, referrer), (views, signed_in_views, total_time) in totals.items()
+        ],
+        batch_size=CHUNK,
+    )
+
+
+def fold(now=None):
+    """Add up to FOLD_HOURS finished hours of views to the rollups. Returns how many hours it covered."""
+    from auctions.models import PageView, PageViewRollup
+
+    end = _hour(now or timezone.now()) - FOLD_DELAY
+    pending = PageView.objects.filter(date_start__lt=end)
+    since = _watermark()
+    if since:
+        pending = pending.filter(date_start__gte=since)
+    # skip straight past any empty hours, which leave no rollup behind to move the watermark
+    first = pending.aggregate(first=Min("date_start"))["first"]
+    if first is None:
+        return 0
+    start = _hour(first)
+    end = min(end, start + datetime.timedelta(hours=FOLD_HOURS))
+    rows = (
+        PageView.objects.filter(date_start__gte=start, date_start__lt=end)
+        .annotate(hour=TruncHour("date_start", tzinfo=UTC))
+        .values("hour", "auction_id", "lot_number_id", "source", "referrer")
+        .annotate(views=Count("pk"), signed_in_views=Count("user"), total_time=Sum("total_time"))
+        .order_by()
+    )
+    with transaction.atomic():
+        _store(PageViewRollup.HOUR, ({**row, "lot_id": row["lot_number_id"]} for row in rows), "hour")
+    return int((end - start) / datetime.timedelta(hours=1))
+
+
+def compact(now=None):
+    """Merge up to COMPACT_DAYS days of hourly rows older than HOURLY_DAYS into daily ones.
+    Returns how many days it covered."""
+    from auctions.models import PageViewRollup
+
+    since = _watermark()
+    if since is None:
+        return 0
+    end = min(_day(now or timezone.now()) - datetime.timedelta(days=HOURLY_DAYS), _day(since))
+    hours = PageViewRollup.objects.filter(period=PageViewRollup.HOUR, start__lt=end)
+    first = hours.aggregate(first=Min("start"))["first"]
+    if first is None:
+        return 0
+    start = _day(first)
+    end = min(end, start + datetime.timedelta(days=COMPACT_DAYS))
+    hours = hours.filter(start__gte=start, start__lt=end)
+    rows = (
+        hours.annotate(day=TruncDay("start", tzinfo=UTC))
+        .values("day", "auction_id", "lot_id", "source", "referrer")
+        .annotate(views=Sum("views"), signed_in_views=Sum("signed_in_views"), total_time=Sum("total_time"))
+        .order_by()
+    )
+    with transaction.atomic():
+        _store(PageViewRollup.DAY, list(rows), "day")
+        hours.delete()
+    return (end - start).days
+
+
+def prune(now=None):
+    """Delete up to PRUNE_BATCH raw rows older than PAGEVIEW_RETENTION_DAYS that have been folded.
+    Returns how many."""
+    from auctions.models import PageView
+
+    since = _watermark()
+    if since is None:
+        return 0
+    before = min((now or timezone.now()) - datetime.timedelta(days=settings.PAGEVIEW_RETENTION_DAYS), since)
+    deleted = 0
+    while deleted < PRUNE_BATCH:
+        pks = list(
+            PageView.objects.filter(date_start__lt=before).order_by("date_start").values_list("pk", flat=True)[:CHUNK]
+        )
+        if not pks:
+            break
+        PageView.objects.filter(pk__in=pks).delete()
+        deleted += len(pks)
+    return deleted
+
+
+def _split(rollup_q, raw_q):
+    """The rollups matching ``rollup_q``, and the raw rows matching ``raw_q`` that haven't been folded."""
+    from auctions.models import PageView, PageViewRollup
+
+    since = watermark()
+    raw = PageView.objects.filter(raw_q)
+    if since is None:
+        return PageViewRollup.objects.none(), raw
+    return PageViewRollup.objects.filter(rollup_q), raw.filter(date_start__gte=since)
+
+
+def for_auction(auction):
+    """(rollup_q, raw_q) for the views of an auction's own pages or any of its lots."""
+    return Q(auction=auction) | Q(lot__auction=auction), Q(auction=auction) | Q(lot_number__auction=auction)
+
+
+def count(rollup_q, raw_q):
+    """How many views match; the two Q objects say the same thing in PageViewRollup's and PageView's terms."""
+    rollups, raw = _split(rollup_q, raw_q)
+    return (rollups.aggregate(views=Sum("views"))["views"] or 0) + raw.count()
+
+
+def lot_views(lot):
+    """(views, anonymous views) of ``lot``, or what :func:`load_lot_views` found for it."""
+    if hasattr(lot, "_prefetched_views"):
+        return lot._prefetched_views
+
+    def compute():
+        rollups, raw = _split(Q(lot=lot), Q(lot_number=lot))
+        folded = rollups.aggregate(views=Sum("views"), signed_in=Sum("signed_in_views"))
+        recent = raw.aggregate(views=Count("pk"), signed_in=Count("user"))
+        views = (folded["views"] or 0) + recent["views"]
+        return views, views - (folded["signed_in"] or 0) - recent["signed_in"]
+
+    return request_cache.remember(("lot_views", lot.pk), compute)
+
+
+def load_lot_views(lots):
+    """:func:`lot_views` for a page of lots, with one query of the rollups and one of the raw rows
+    rather than a few per lot."""
+    totals = {lot.pk: [0, 0] for lot in lots}
+    if not totals:
+        return
+    rollups, raw = _split(Q(lot__in=totals), Q(lot_number__in=totals))
+    for row in rollups.values("lot_id").annotate(views=Sum("views"), signed_in=Sum("signed_in_views")).order_by():
+        totals[row["lot_id"]][0] += row["views"] or 0
+        totals[row["lot_id"]][1] += row["signed_in"] or 0
+    for row in raw.values("lot_number_id").annotate(views=Count("pk"), signed_in=Count("user")).order_by():
+        totals[row["lot_number_id"]][0] += row["views"]
+        totals[row["lot_number_id"]][1] += row["signed_in"]
+    for lot in lots:
+        views, signed_in = totals[lot.pk]
+        lot._prefetched_views = (views, views - signed_in)
+
+
+def binned(rollup_q, raw_q, number_of_bins, start, end):
+    """bin_data of the matching views over [start, end). A day's rollup counts at the start of its day."""
+    rollups, raw = _split(
+        rollup_q & Q(start__gte=start, start__lt=end), raw_q & Q(date_start__gte=start, date_start__lt=end)
+    )
+    folded = bin_data(rollups.only("start", "views"), "start", number_of_bins, start, end, weight_field="views")
+    recent = bin_data(raw.only("date_start"), "date_start", number_of_bins, start, end)
+    return [a + b for a, b in zip(folded, recent, strict=True)]
+
+
+def by_weekday_and_hour(since):
+    """{(ISO weekday, hour): views} in the current time zone since ``since``. Only hourly rollups
+    know the hour, so this sees back HOURLY_DAYS at most."""
+    from auctions.models import PageViewRollup
+
+    rollups, raw = _split(Q(period=PageViewRollup.HOUR, start__gte=_hour(since)), Q(date_start__gte=since))
+    tz = timezone.get_current_timezone()
+    counts = defaultdict(int)
+    for queryset, field, views in ((rollups, "start", Sum("views")), (raw, "date_start", Count("pk"))):
+        for row in (
+            queryset.annotate(dow=ExtractIsoWeekDay(field, tzinfo=tz), hour=ExtractHour(field, tzinfo=tz))
+            .values("dow", "hour")
+            .annotate(views=views)
+            .order_by()
+        ):
+            counts[(row["dow"], row["hour"])] += row["views"]
+    return counts
+
+
+def referrers(auction, site_domain):
+    """[{"referrer", "count"}] for views of ``auction`` that came from another site."""
+    rollups, raw = _split(*for_auction(auction))
+    counts = defaultdict(int)
+    for queryset, views in ((rollups, Sum("views")), (raw.exclude(referrer__isnull=True), Count("pk"))):
+        for row in (
+            queryset.exclude(referrer="")
+            .exclude(referrer__startswith=site_domain)
+            .values("referrer")
+            .annotate(count=views)
+            .order_by()
+        ):
+            counts[row["referrer"]] += row["count"]
+    return [{"referrer": referrer, "count": n} for referrer, n in counts.items()]
@@ -83,7 +83,7 @@ from django.utils.html import strip_tags
 from django.utils.http import urlencode
 from django.utils.text import Truncator
 
-from . import command_palette, palette_routes
+from . import club_ledger, command_palette, palette_routes
 from .models import AuctionTOS, ClubMember, Lot
 from .services import (
     apply_club_member_to_tos,
@@ -2921,10 +2921,6 @@ def club_numbers(request, params: dict[str, Any]) -> dict[str, Any]:
     (the members list), and the balance needs ``permission_money`` or ``permission_edit_club``, which
     is precisely what :class:`auctions.views.ClubMoneyBalanceView` requires.
     """
-    from django.db.models import Sum
-
-    from .models import ClubMoney
-
     user = request.user
     hint = _str(params, "club") or _str(params, "name")
     club = palette_routes._club_from_hint(user, hint or (_page(request).get("club") or ""))
@@ -2951,9 +2947,8 @@ def club_numbers(request, params: dict[str, Any]) -> dict[str, Any]:
     if command_palette._perm(user, club, "permission_money") or command_palette._perm(
         user, club, "permission_edit_club"
     ):
-        balance = ClubMoney.objects.filter(club=club).aggregate(total=Sum("amount"))["total"]
         data["_money"] = {
-            "balance": str(balance if balance is not None else Decimal("0.00")),
+            "balance": str(club_ledger.balance(club)),
             "note": "This is the club's book balance, the same figure the treasurer report opens with.",
         }
     return {"found": True, "club_numbers": data}
@@ -0,0 +1,53 @@
+"""Answers to "who is this user in this auction/club" that hold for the rest of one request.
+
+Auction.permission_check, Auction.tos_for_user, Auction.auction_admins_pks and
+views.check_club_permission are asked the same question over and over while one page is built:
+AuctionViewMixin asks, the template asks again for every admin-only button, the lot autocomplete,
+check_bidding_permissions and the command palette ask once more. An auction admin page during a
+sale made dozens of identical AuctionTOS / ClubMember queries per render.
+
+Inside :func:`request_scope` each of those is looked up once and remembered by (question, user,
+auction or club). RequestCacheMiddleware opens a scope around every HTTP request, and the websocket
+consumers open one around each message they handle -- not around the whole connection, which can
+stay open for hours while an admin's rights are changed from another process. Outside a scope --
+Celery tasks, management commands, the shell -- nothing is remembered and every call queries as
+before.
+
+Anything that changes the answers clears the scope: saving or deleting an AuctionTOS, ClubMember
+or Auction (see the receivers in signals.py), and the few bulk ``update()`` calls that re-point
+those rows at a user, which call :func:`invalidate` themselves.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_answers: ContextVar[dict | None] = ContextVar("auctions_request_cache", default=None)
+
+
+@contextmanager
+def request_scope():
+    """Remember permission/TOS answers until the block exits."""
+    token = _answers.set({})
+    try:
+        yield
+    finally:
+        _answers.reset(token)
+
+
+def remember(key, compute):
+    """compute(), or its answer from earlier in this scope. Always computes outside a scope."""
+    answers = _answers.get()
+    if answers is None:
+        return compute()
+    if key not in answers:
+        answers[key] = compute()
+    return answers[key]
+
+
+def invalidate():
+    """Forget everything remembered in the current scope."""
+    answers = _answers.get()
+    if answers:
+        answers.clear()
@@ -306,6 +306,26 @@ def save_new_lot(lot, *, auction, tos, added_by):
     return lot
 
 
+def number_new_lots(lots, *, auction, tos=None):
+    """Give the unnumbered lots in ``lots`` their lot numbers, reserving them as one block.
+
+    ``Lot.save()`` would otherwise reserve one number per lot; for a batch that is a round trip
+    and a moment holding the auction's row per lot instead of once.  In seller-dash mode the
+    ``custom_lot_number`` block is reserved from ``tos`` (the seller every lot belongs to) the same
+    way.  Lots keep any number they already have.  Returns ``lots``.
+    """
+    unnumbered = [lot for lot in lots if lot.lot_number_int is None]
+    if unnumbered:
+        for lot, number in zip(unnumbered, auction.reserve_lot_numbers(len(unnumbered)), strict=True):
+            lot.lot_number_int = number
+    if auction.use_seller_dash_lot_numbering and tos is not None:
+        no_custom = [lot for lot in lots if not lot.custom_lot_number]
+        if no_custom:
+            for lot, number in zip(no_custom, tos.reserve_lot_numbers(len(no_custom)), strict=True):
+                lot.custom_lot_number = number
+    return lots
+
+
 def recalculate_seller_invoice(auction, tos):
     """Make sure the seller has an invoice for this auction and recalculate it.
 
@@ -11,6 +11,7 @@ from django.dispatch import receiver
 from django.utils import timezone
 from django_ses.signals import bounce_received, complaint_received
 
+from . import club_ledger, offline_changes, request_cache, sync_outbox
 from .site_setup import ensure_single_club_membership_for_user
 
 logger = logging.getLogger(__name__)
@@ -242,6 +243,33 @@ def refresh_calendar_pickups(sender, instance, **kwargs):
         logger.exception("Could not refresh calendar pickups for auction %s", instance.auction_id)
 
 
+@receiver(post_save, sender="auctions.Auction")
+@receiver(post_delete, sender="auctions.Auction")
+@receiver(post_save, sender="auctions.PickupLocation")
+@receiver(post_delete, sender="auctions.PickupLocation")
+def invalidate_checkin_welcome_index(sender, instance, **kwargs):
+    """Drop the cached check-in candidate index when an auction or its location changes.
+
+    Dropped now so the rest of this transaction reads its own writes, and again on commit so a
+    ping that rebuilt the index from the pre-commit rows in between doesn't keep it for a period.
+    """
+    from auctions.mobile.services import checkin
+
+    checkin.invalidate_welcome_index()
+    transaction.on_commit(checkin.invalidate_welcome_index)
+
+
+@receiver(post_save, sender="auctions.Auction")
+@receiver(post_delete, sender="auctions.Auction")
+@receiver(post_save, sender="auctions.AuctionTOS")
+@receiver(post_delete, sender="auctions.AuctionTOS")
+@receiver(post_save, sender="auctions.ClubMember")
+@receiver(post_delete, sender="auctions.ClubMember")
+def invalidate_request_permissions(sender, instance, **kwargs):
+    """Forget this request's remembered permission and TOS answers; they may have just changed."""
+    request_cache.invalidate()
+
+
 # What Discord shows about an auction. Any of these changing makes its scheduled event stale.
 DISCORD_AUCTION_FIELDS = (
     "title",
@@ -447,6 +475,7 @@ def propagate_clubmember_to_shadow_tos(sender, instance, created, **kwargs):
                 )
                 continue
             AuctionTOS.objects.filter(pk=shadow.pk).update(bidder_number=instance.bidder_number)
+            offline_changes.note_changes(offline_changes.USER, [shadow.pk], shadow.auction_id)
 
 
 @receiver(post_save, sender="auctions.ClubMember")
@@ -484,8 +513,9 @@ def update_wallet_passes_on_member_change(sender, instance, created, **kwargs):
 
     from .tasks import notify_apple_wallet_devices_for_member, update_google_wallet_object_for_member
 
-    transaction.on_commit(lambda: update_google_wallet_object_for_member.delay(instance.pk))
-    transaction.on_commit(lambda: notify_apple_wallet_devices_for_member.delay(instance.pk))
+    # Coalesced like the marketing syncs: a burst of edits to one member is one refresh.
+    sync_outbox.queue(update_google_wallet_object_for_member, instance.pk)
+    sync_outbox.queue(notify_apple_wallet_devices_for_member, instance.pk)
 
 
 @receiver(post_save, sender="auctions.ClubMember")
@@ -541,7 +571,7 @@ def sync_clubmember_to_mailchimp(sender, instance, created, **kwargs):
     if not created and prev_email and prev_email != current_email:
         transaction.on_commit(lambda old=prev_email: sync_club_member_email_change.delay(pk, old))
     else:
-        transaction.on_commit(lambda: sync_club_member_to_mailchimp.delay(pk))
+        sync_outbox.queue(sync_club_member_to_mailchimp, pk)
 
 
 @receiver(post_save, sender="auctions.ClubMember")
@@ -558,7 +588,7 @@ def sync_clubmember_to_brevo(sender, instance, created, **kwargs):
     if not created and prev_email and prev_email != current_email:
         transaction.on_commit(lambda old=prev_email: sync_club_member_email_change_brevo.delay(pk, old))
     else:
-        transaction.on_commit(lambda: sync_club_member_to_brevo.delay(pk))
+        sync_outbox.queue(sync_club_member_to_brevo, pk)
 
 
 @receiver(post_save, sender="auctions.AuctionTOS")
@@ -569,7 +599,7 @@ def sync_clubmember_to_mailchimp_on_auctiontos(sender, instance, **kwargs):
         return
     from .tasks import sync_club_member_to_mailchimp
 
-    transaction.on_commit(lambda: sync_club_member_to_mailchimp.delay(member_id))
+    sync_outbox.queue(sync_club_member_to_mailchimp, member_id)
 
 
 @receiver(post_save, sender="auctions.AuctionTOS")
@@ -580,7 +610,7 @@ def sync_clubmember_to_brevo_on_auctiontos(sender, instance, **kwargs):
         return
     from .tasks import sync_club_member_to_brevo
 
-    transaction.on_commit(lambda: sync_club_member_to_brevo.delay(member_id))
+    sync_outbox.queue(sync_club_member_to_brevo, member_id)
 
 
 @receiver(pre_save, sender="auctions.Invoice")
@@ -603,11 +633,11 @@ def sync_clubmember_to_mailchimp_on_invoice_paid(sender, instance, created, **kw
     if member_id and _club_member_mailchimp_connected(member_id):
         from .tasks import sync_club_member_to_mailchimp
 
-        transaction.on_commit(lambda: sync_club_member_to_mailchimp.delay(member_id))
+        sync_outbox.queue(sync_club_member_to_mailchimp, member_id)
     if member_id and _club_member_brevo_connected(member_id):
         from .tasks import sync_club_member_to_brevo
 
-        transaction.on_commit(lambda: sync_club_member_to_brevo.delay(member_id))
+        sync_outbox.queue(sync_club_member_to_brevo, member_id)
 
 
 @receiver(pre_save, sender=User)
@@ -666,6 +696,108 @@ def update_lot_info(sender, instance, **kwargs):
         instance.reserve_price = instance.auction.minimum_bid
 
 
+# Fields that decide what a lot contributes to the category keyword counts (category_keywords.py).
+_CATEGORY_KEYWORD_FIELDS = frozenset(
+    {"lot_name", "species_category", "category_automatically_added", "is_deleted", "auction"}
+)
+
+
+def _touches_category_keywords(update_fields):
+    return update_fields is None or not _CATEGORY_KEYWORD_FIELDS.isdisjoint(update_fields)
+
+
+@receiver(pre_save, sender="auctions.Lot")
+def stash_previous_lot_category_keywords(sender, instance, update_fields=None, **kwargs):
+    instance._previous_category_keywords = None
+    if not instance.pk or not _touches_category_keywords(update_fields):
+        return
+    from auctions.category_keywords import counted_keywords
+    from auctions.models import Lot
+
+    row = (
+        Lot.objects.filter(pk=instance.pk)
+        .values(
+            "lot_name",
+            "species_category_id",
+            "species_category__name",
+            "category_automatically_added",
+            "is_deleted",
+            "auction__promote_this_auction",
+        )
+        .first()
+    )
+    if row:
+        instance._previous_category_keywords = counted_keywords(
+            lot_name=row["lot_name"],
+            category_id=row["species_category_id"],
+            category_name=row["species_category__name"],
+            category_automatically_added=row["category_automatically_added"],
+            is_deleted=row["is_deleted"],
+            auction_promoted=row["auction__promote_this_auction"],
+        )
+
+
+@receiver(post_save, sender="auctions.Lot")
+def count_lot_category_keywords(sender, instance, update_fields=None, **kwargs):
+    """Keep guess_category()'s counts in step when a lot's name or hand-picked category changes."""
+    if not _touches_category_keywords(update_fields):
+        return
+    from auctions.category_keywords import apply_change, counted_keywords
+
+    before = getattr(instance, "_previous_category_keywords", None)
+    after = counted_keywords(
+        lot_name=instance.lot_name,
+        category_id=instance.species_category_id,
+        category_name=instance.species_category.name if instance.species_category_id else None,
+        category_automatically_added=instance.category_automatically_added,
+        is_deleted=instance.is_deleted,
+        auction_promoted=instance.auction.promote_this_auction if instance.auction_id else None,
+    )
+    if before != after:
+        # After commit, so a bulk import doesn't hold the busiest keyword rows locked for its whole transaction.
+        transaction.on_commit(lambda: apply_change(before, after))
+
+
+@receiver(post_save, sender="auctions.Lot")
+def prewarm_new_lot_label(sender, instance, created, raw=False, **kwargs):
+    """Render a new in-person lot's label before anybody asks, so check-in printing finds it made."""
+    if not created or raw or not instance.auction_id or instance.auction.is_online:
+        return
+    from .tasks import prewarm_lot_labels
+
+    pk = instance.pk
+    transaction.on_commit(lambda: prewarm_lot_labels.delay([pk]))
+
+
+@receiver(post_save, sender="auctions.Bid")
+def count_bid_in_bidder_metrics(sender, instance, created, **kwargs):
+    """A new bid adds one to the bidder's count; any other save (a delete is a save) recounts it."""
+    from auctions import bidder_metrics
+
+    if created:
+        bidder_metrics.note_bid(instance)
+    else:
+        auction_id = instance.lot_number.auction_id
+        transaction.on_commit(lambda: bidder_metrics.recount(auction_id, instance.user_id))
+
+
+@receiver(post_save, sender="auctions.PageView")
+def count_lot_view_in_bidder_metrics(sender, instance, created, **kwargs):
+    if created and instance.user_id and instance.lot_number_id:
+        from auctions import bidder_metrics
+
+        bidder_metrics.note_lot_views(instance.user_id, [instance.lot_number])
+
+
+@receiver(post_save, sender="auctions.LotImage")
+@receiver(post_delete, sender="auctions.LotImage")
+def retire_cached_lot_images(sender, instance, **kwargs):
+    """The lot page caches its image carousel by Lot.render_stamp; a changed image needs a new stamp."""
+    from auctions.models import Lot
+
+    Lot.bump_render_stamp([instance.lot_number_id])
+
+
 def link_unattached_tos_for_user(user, reason="duplicate detected on login"):
     """Link any AuctionTOS rows that match this user's email but have no user FK yet.
 
@@ -700,6 +832,7 @@ def link_unattached_tos_for_user(user, reason="duplicate detected on login"):
             linked_tos_pks.append(auctiontos.pk)
     if linked_tos_pks:
         Lot.objects.filter(auctiontos_seller__pk__in=linked_tos_pks, user__isnull=True).update(user=user)
+        request_cache.invalidate()
 
 
 @receiver(user_logged_in)
@@ -728,6 +861,7 @@ def user_logged_in_callback(sender, user, request, **kwargs):
     # Bulk update — no ClubHistory here because this is an automatic system action on login
     # and there is no meaningful "who did this" actor to record.
     ClubMember.objects.filter(user__isnull=True, email=user.email, is_deleted=False).update(user=user)
+    request_cache.invalidate()
     ensure_single_club_membership_for_user(user)
 
 
@@ -943,3 +1077,39 @@ def geocode_speaker_on_location_change(sender, instance, created, **kwargs):
     location_changed = created or (current_location != getattr(instance, "_previous_location", ""))
     if location_changed and not instance.location_coordinates:
         transaction.on_commit(lambda: geocode_speaker.delay(instance.pk))
+
+
+@receiver(post_save, sender="auctions.Auction")
+def note_offline_auction_change(sender, instance, **kwargs):
+    offline_changes.note_changes(offline_changes.AUCTION, [instance.pk], instance.pk)
+
+
+@receiver(post_save, sender="auctions.AuctionTOS")
+@receiver(post_delete, sender="auctions.AuctionTOS")
+def note_offline_user_change(sender, instance, update_fields=None, **kwargs):
+    """A bidder the offline snapshot shows was added, changed or removed; see offline_changes.py"""
+    if offline_changes.touches(offline_changes.USER_FIELDS, update_fields):
+        offline_changes.note_changes(offline_changes.USER, [instance.pk], instance.auction_id)
+
+
+@receiver(post_save, sender="auctions.Lot")
+@receiver(post_delete, sender="auctions.Lot")
+def note_offline_lot_change(sender, instance, update_fields=None, **kwargs):
+    if offline_changes.touches(offline_changes.LOT_FIELDS, update_fields):
+        offline_changes.note_changes(offline_changes.LOT, [instance.pk], instance.auction_id)
+
+
+@receiver(post_save, sender="auctions.Invoice")
+@receiver(post_delete, sender="auctions.Invoice")
+def note_offline_invoice_change(sender, instance, created=True, **kwargs):
+    """A bidder's row shows their invoice's status. (``created`` is only passed by post_save.)"""
+    if not created and getattr(instance, "_previous_status", None) == instance.status:
+        return
+    offline_changes.note_changes(offline_changes.USER, [instance.auctiontos_user_id], instance.auction_id)
+
+
+@receiver(post_save, sender="auctions.ClubMoney")
+def add_club_money_to_period(sender, instance, created, **kwargs):
+    """A treasurer entry saved on its own; bulk-created ones are added by club_ledger.book."""
+    if created:
+        club_ledger.add([instance])
@@ -0,0 +1,64 @@
+"""The outbox in front of the per-member Mailchimp, Brevo and Wallet syncs.
+
+The post_save receivers for ClubMember, AuctionTOS and Invoice used to queue these tasks from
+``transaction.on_commit``, coalesced by a marker in the cache: the first save queued the task with
+a countdown and the saves behind it found the marker. That held as long as the cache did -- an
+evicted or flushed marker let the next save queue a second copy -- and a worker that died between
+the commit and the callback lost the sync outright.
+
+:func:`queue` writes a :class:`~auctions.models.SyncOutbox` row in the transaction that made the
+change, keyed by (task, object), so a rolled-back change queues nothing and any number of saves of
+the same member before the row is sent leave one row. ``drain_sync_outbox``, from beat every
+COALESCE_SECONDS, sends the rows that are due, DRAIN_BATCH at a time, and deletes them; a save made
+after that writes a new row, so the last change always gets a sync of its own. Each task reads the
+member when it runs, so one sync sends whatever the last save left behind.
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# A row waits this long before it is sent, so a burst of edits to one member shares one sync.
+COALESCE_SECONDS = 30
+# Rows sent per drain; a drain that fills it queues another straight away.
+DRAIN_BATCH = 500
+
+
+def queue(task, object_pk):
+    """Have ``task`` run for ``object_pk`` once the coalescing window is up, unless it already will."""
+    from auctions.models import SyncOutbox
+
+    due = timezone.now() + datetime.timedelta(seconds=COALESCE_SECONDS)
+    SyncOutbox.objects.bulk_create([SyncOutbox(task=task.name, object_pk=object_pk, due=due)], ignore_conflicts=True)
+
+
+def drain(now=None):
+    """Send the rows that are due and delete them. Returns how many were sent.
+
+    Rows are locked as they are read, so two drains running at once send different rows, and sent
+    inside the transaction that deletes them: if the broker is down, the rows stay for next time.
+    """
+    from celery import current_app
+
+    from auctions.models import SyncOutbox
+
+    with transaction.atomic():
+        entries = list(
+            SyncOutbox.objects.select_for_update(skip_locked=True)
+            .filter(due__lte=now or timezone.now())
+            .order_by("due")[:DRAIN_BATCH]
+        )
+        for entry in entries:
+            task = current_app.tasks.get(entry.task)
+            if task is None:
+                logger.warning("Dropping outbox entry for unknown task %s", entry.task)
+                continue
+            task.delay(entry.object_pk)
+        SyncOutbox.objects.filter(pk__in=[entry.pk for entry in entries]).delete()
+    return len(entries)
@@ -7,7 +7,7 @@ from django.urls import reverse
 from django.utils.html import format_html, format_html_join
 from django.utils.safestring import mark_safe
 
-from . import donations
+from . import donations, page_view_rollups
 from .models import (
     Auction,
     AuctionHistory,
@@ -499,6 +499,10 @@ class LotHTMxTableForUsers(tables.Table):
     actions = tables.Column(accessor="all_chats", verbose_name="Actions")
     auction = tables.Column(attrs={"th": {"class": hide_string}, "cell": {"class": hide_string}})
 
+    def before_render(self, request):
+        # the views column, for the whole page at once
+        page_view_rollups.load_lot_views([row.record for row in self.paginated_rows()])
+
     def render_active(self, value, record):
         if record.banned:
             return mark_safe('<span class="badge bg-danger">Removed</span>')
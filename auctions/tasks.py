@@ -8,6 +8,7 @@ Each task wraps a management command to maintain backward compatibility.
 import datetime
 import json
 import logging
+import time
 from html import escape
 
 import httpx
@@ -29,9 +30,16 @@ AUCTION_STATS_TASK_NAME = "auction_stats_update"  # Name for the one-off schedul
 # Constants for BAP recalculation scheduling
 BAP_RECALCULATION_TASK_PREFIX = "bap_recalculation_club_"
 
-# One club-calendar sync at a time; see sync_club_calendars.
-CALENDAR_SYNC_LOCK_KEY = "sync_club_calendars_running"
+# Club calendar syncs run as a task per club; see sync_club_calendars. A club is "in flight" from
+# being queued until its task finishes, and is never queued twice. At most
+# CALENDAR_SYNC_CONCURRENCY clubs talk to Google/Discord at once; the rest wait for a slot.
+CALENDAR_SYNC_IN_FLIGHT_PREFIX = "sync_club_calendar_in_flight"
 CALENDAR_SYNC_LOCK_SECONDS = 60 * 60
+CALENDAR_SYNC_SLOT_PREFIX = "sync_club_calendar_slot"
+CALENDAR_SYNC_CONCURRENCY = 4
+CALENDAR_SYNC_SLOT_SECONDS = 15 * 60
+CALENDAR_SYNC_SLOT_WAIT_SECONDS = 30
+CALENDAR_SYNC_SLOT_RETRIES = 20
 
 logger = logging.getLogger(__name__)
 
@@ -450,6 +458,30 @@ def delete_pending_accounts(self):
     call_command("delete_pending_accounts")
 
 
+@shared_task(bind=True, ignore_result=True)
+def run_account_job(self, job_pk):
+    """Run an account merge, deletion or purge (see account_jobs) from the step it's on."""
+    from auctions import account_jobs
+    from auctions.models import AccountJob
+
+    job = AccountJob.objects.filter(pk=job_pk, finished_on__isnull=True).first()
+    if job:
+        try:
+            account_jobs.run(job)
+        except account_jobs.JobBusyError:
+            # queued twice; the other worker has it
+            pass
+
+
+@shared_task(bind=True, ignore_result=True)
+def resume_account_jobs(self):
+    """Requeue account jobs that stopped partway: their worker died, or a step failed."""
+    from auctions import account_jobs
+
+    for job_pk in account_jobs.resumable().values_list("pk", flat=True):
+        run_account_job.delay(job_pk)
+
+
 @shared_task(bind=True, ignore_result=True, retry_backoff=True, retry_backoff_max=600, max_retries=5)
 def delete_marketing_contact(self, club_pk, email):
     """Remove one address from a club's Mailchimp audience and Brevo list.
@@ -499,6 +531,38 @@ def cleanup_mail(self):
     call_command("cleanup_mail", days=settings.MAIL_RETENTION_DAYS, delete_attachments=True)
 
 
+@shared_task(bind=True, ignore_result=True)
+def archive_lot_history(self):
+    """Move the chat and bid history of lots that ended over LOT_HISTORY_ARCHIVE_DAYS ago out of
+    LotHistory (see history_archive)."""
+    from auctions import history_archive
+
+    if history_archive.archive() == history_archive.BATCH:
+        archive_lot_history.delay()
+
+
+@shared_task(bind=True, ignore_result=True)
+def rollup_page_views(self):
+    """Fold finished hours of PageView into PageViewRollup, then merge old hours into days and
+    delete raw rows past PAGEVIEW_RETENTION_DAYS (see page_view_rollups)."""
+    from django.core.cache import cache
+
+    from auctions import page_view_rollups
+
+    # a catch-up run re-queues itself; two folding the same hour would count it twice
+    if not cache.add(page_view_rollups.LOCK_KEY, "1", timeout=page_view_rollups.LOCK_SECONDS):
+        return
+    try:
+        more = page_view_rollups.fold() == page_view_rollups.FOLD_HOURS
+        if not more:
+            page_view_rollups.compact()
+            page_view_rollups.prune()
+    finally:
+        cache.delete(page_view_rollups.LOCK_KEY)
+    if more:
+        rollup_page_views.delay()
+
+
 @shared_task(bind=True, ignore_result=True)
 def send_announcement_emails(self, announcement_pk):
     """Mail one club announcement through whichever of Mailchimp/Brevo the club ticked.
@@ -596,6 +660,83 @@ def send_push_to_user(user_pk, *, title, body, url, category, collapse_key=None,
     return sent_count
 
 
+@shared_task
+def send_push_batch(
+    user_pks, *, title, body, url, category, collapse_key=None, auction_pk=None, invoice_pk=None, bodies=None
+):
+    """Batch form of :func:`send_push_to_user` for one notification going to many users.
+
+    Queued by ``notifications.enqueue_push_batch``. Loads every recipient's devices in one query,
+    hands them to FCM through ``notifications.send_fcm_batch``, then writes the bookkeeping in bulk:
+    one ``bulk_create`` of ``PushNotificationSent`` rows and one update clearing dead tokens. The
+    per-user email fallback is the same as the single-user task's. ``bodies`` maps ``str(user_pk)``
+    to a per-user body (JSON object keys are strings). Returns the number of devices reached.
+    """
+    from django.contrib.auth.models import User
+
+    from auctions import notifications
+    from auctions.models import MobileDevice, PushNotificationSent
+
+    bodies = bodies or {}
+    users = User.objects.in_bulk(user_pks)
+    if not users:
+        return 0
+    devices = list(
+        MobileDevice.objects.filter(user_id__in=users, push_enabled=True)
+        .exclude(fcm_token="")
+        .only("pk", "user_id", "fcm_token")
+    )
+    started = time.monotonic()
+    results = notifications.send_fcm_batch(
+        [
+            {
+                "token": device.fcm_token,
+                "title": title,
+                "body": bodies.get(str(device.user_id), body),
+                "url": url,
+                "category": category,
+                "collapse_key": collapse_key,
+            }
+            for device in devices
+        ]
+    )
+    elapsed = time.monotonic() - started
+    sent_rows = []
+    dead_device_pks = []
+    for device, result in zip(devices, results, strict=True):
+        if result == notifications.SEND_INVALID_TOKEN:
+            # Token follows the app install; a dead one never comes back, so clear it.
+            dead_device_pks.append(device.pk)
+        elif result == notifications.SEND_OK:
+            sent_rows.append(
+                PushNotificationSent(
+                    user_id=device.user_id,
+                    device_id=device.pk,
+                    category=category,
+                    auction_id=auction_pk,
+                    invoice_id=invoice_pk,
+                )
+            )
+    PushNotificationSent.objects.bulk_create(sent_rows)
+    if dead_device_pks:
+        MobileDevice.objects.filter(pk__in=dead_device_pks).update(fcm_token="")
+    reached = {row.user_id for row in sent_rows}
+    for user_pk, user in users.items():
+        if user_pk not in reached:
+            _email_undelivered_push(user, title=title, body=bodies.get(str(user_pk), body), url=url, category=category)
+    logger.info(
+        "Push batch (%s): %s of %s device(s) for %s user(s) in %.2fs (%.0f/s), %s dead token(s) cleared",
+        category,
+        len(sent_rows),
+        len(devices),
+        len(users),
+        elapsed,
+        len(devices) / elapsed if elapsed else 0,
+        len(dead_device_pks),
+    )
+    return len(sent_rows)
+
+
 def _email_undelivered_push(user, *, title, body, url, category):
     """Last-resort email for a push that reached no device (dead token, or FCM was down).
 
@@ -952,7 +1093,8 @@ def update_expired_membership_discord_roles(self):
 
     # Nightly Mailchimp catch-up: re-sync members of connected clubs so lifecycle tags
     # (expiring-soon, expired, new-member -> long-term-member, probably-inactive) stay
-    # accurate even when no edit happened. backfill() enqueues one async task per member.
+    # accurate even when no edit happened. backfill() enqueues one bulk task per club, which
+    # only sends the members whose fingerprint changed.
     from auctions import brevo
     from auctions import mailchimp as mc
     from auctions.models import Club
@@ -971,31 +1113,67 @@ def update_expired_membership_discord_roles(self):
             brevo.backfill(club)
 
 
+def _calendar_sync_in_flight_key(club_pk):
+    return f"{CALENDAR_SYNC_IN_FLIGHT_PREFIX}:{club_pk}"
+
+
+def _take_calendar_sync_slot(cache):
+    """Claim one of the CALENDAR_SYNC_CONCURRENCY slots; returns its key, or None when all are taken."""
+    for slot in range(CALENDAR_SYNC_CONCURRENCY):
+        key = f"{CALENDAR_SYNC_SLOT_PREFIX}:{slot}"
+        if cache.add(key, "1", timeout=CALENDAR_SYNC_SLOT_SECONDS):
+            return key
+    return None
+
+
 @shared_task(bind=True, ignore_result=True)
 def sync_club_calendars(self):
     """Keep every club's events, Google Calendar, and Discord scheduled events in step.
 
-    Does three things per club: mirror promoted auctions into events, exchange changes with
-    Google Calendar (push ours, pull theirs), and reconcile Discord scheduled events. Each club
-    is isolated, so one broken connection doesn't stop the rest.
+    Queues sync_club_calendar for each club with something to sync, so one slow calendar only
+    delays its own club. A club whose previous sync is still queued or running is skipped: two
+    syncs of one club racing would push the same event twice and could provision two calendars.
+    """
+    from django.core.cache import cache
+
+    from auctions import club_events
+
+    queued = 0
+    for club_pk in club_events.clubs_to_sync().values_list("pk", flat=True):
+        # Times out well past the beat interval, so a worker that dies mid-sync can't wedge the club.
+        if cache.add(_calendar_sync_in_flight_key(club_pk), "1", timeout=CALENDAR_SYNC_LOCK_SECONDS):
+            sync_club_calendar.delay(club_pk)
+            queued += 1
+    logger.info("Queued calendar sync for %s club(s)", queued)
+
+
+@shared_task(bind=True, ignore_result=True, max_retries=CALENDAR_SYNC_SLOT_RETRIES)
+def sync_club_calendar(self, club_pk):
+    """One club's share of sync_club_calendars: mirror promoted auctions into events, exchange
+    changes with Google Calendar (push ours, pull theirs), and reconcile Discord scheduled events.
 
-    Only one run at a time: this is scheduled every 15 minutes but a slow Google or a big club
-    can take longer than that, and two runs racing would push the same event twice and could
-    provision two calendars for one club.
+    Waits for a free concurrency slot by retrying; a club that still hasn't found one after
+    CALENDAR_SYNC_SLOT_RETRIES tries is let go and picked up by the next scheduled run.
     """
     from django.core.cache import cache
 
     from auctions import club_events
+    from auctions.models import Club
 
-    # Times out well past the beat interval, so a worker that dies mid-run can't wedge the lock.
-    if not cache.add(CALENDAR_SYNC_LOCK_KEY, "1", timeout=CALENDAR_SYNC_LOCK_SECONDS):
-        logger.info("Club calendar sync is already running; skipping this run.")
+    slot = _take_calendar_sync_slot(cache)
+    if slot is None:
+        if self.request.retries < self.max_retries:
+            raise self.retry(countdown=CALENDAR_SYNC_SLOT_WAIT_SECONDS)
+        logger.info("No calendar sync slot for club %s; leaving it for the next run.", club_pk)
+        cache.delete(_calendar_sync_in_flight_key(club_pk))
         return
     try:
-        count = club_events.sync_all()
-        logger.info("Synced calendars for %s club(s)", count)
+        club = Club.objects.filter(pk=club_pk, active=True).first()
+        if club is not None:
+            club_events.sync_club(club)
     finally:
-        cache.delete(CALENDAR_SYNC_LOCK_KEY)
+        cache.delete(slot)
+        cache.delete(_calendar_sync_in_flight_key(club_pk))
 
 
 @shared_task(bind=True, ignore_result=True)
@@ -1090,6 +1268,28 @@ def deduplicate_user_interest(self):
     call_command("deduplicate_user_interest")
 
 
+@shared_task(bind=True, ignore_result=True)
+def rebuild_category_keywords(self):
+    """
+    Recount the keyword -> category table that guess_category() ranks from.
+
+    Lot saves keep it current between runs; this catches changes that never
+    go through a save.
+    """
+    call_command("rebuild_category_keywords")
+
+
+@shared_task(bind=True, ignore_result=True)
+def reconcile_bidder_metrics(self):
+    """
+    Recount bid and lot-view counts for recently active auctions.
+
+    Bid and page view saves keep them current between runs; this catches
+    changes that never go through a save.
+    """
+    call_command("reconcile_bidder_metrics")
+
+
 @shared_task(bind=True, ignore_result=True)
 def migrate_to_cloudflare_images(self):
     """
@@ -1126,6 +1326,30 @@ def delete_cloudflare_image(self, image_id):
         logger.exception("Could not delete Cloudflare image %s", image_id)
 
 
+@shared_task(bind=True, ignore_result=True)
+def prewarm_lot_labels(self, lot_pks):
+    """Render and cache the labels of newly added lots, see label_cache.prewarm"""
+    from auctions import label_cache
+
+    label_cache.prewarm(lot_pks)
+
+
+@shared_task(bind=True, ignore_result=True)
+def build_remote_print_bundle(self, job_uuid, resolution=None, dpi=None):
+    """Draw a remote print job's labels into its bundle, see remote_print.queue_bundle"""
+    from auctions.mobile.services import remote_print
+    from auctions.models import RemotePrintJob
+
+    job = RemotePrintJob.objects.filter(uuid=job_uuid).select_related("user").first()
+    if job is None or job.status == RemotePrintJob.STATUS_CANCELLED:
+        return
+    try:
+        remote_print.build_bundle(job, resolution, dpi)
+    except ValueError:
+        # A size the label endpoint refuses; the phone will ask for the bundle at its own size.
+        logger.warning("Remote print job %s has an unusable label size", job_uuid, exc_info=True)
+
+
 def schedule_auction_stats_update(run_at=None):
     """
     Schedule a one-off task to update auction stats.
@@ -1362,26 +1586,25 @@ def create_google_wallet_class_for_club(self, club_pk):
     max_retries=5,
 )
 def update_google_wallet_objects_for_club(self, club_pk):
-    """Patch existing Google Wallet objects for all active members in a club."""
-    from auctions.google_wallet import is_configured, update_generic_object_for_member
+    """Patch the Google Wallet objects of a club's active members whose pass content changed.
+
+    See wallet_refresh.refresh_google_objects. Members whose PATCH fails get their own
+    update_google_wallet_object_for_member task, so one bad request doesn't re-run the club.
+    """
+    from auctions.google_wallet import is_configured
     from auctions.models import Club, ClubMember
+    from auctions.wallet_refresh import refresh_google_objects
 
     if not is_configured():
         return
     club = Club.objects.filter(pk=club_pk).first()
     if not club:
         return
-    members = ClubMember.objects.filter(club=club, is_deleted=False).select_related("user", "club")
+    members = list(ClubMember.objects.filter(club=club, is_deleted=False).select_related("user"))
     for member in members:
-        try:
-            update_generic_object_for_member(member)
-        except requests.RequestException:
-            logger.exception(
-                "Google Wallet object refresh failed for club=%s member=%s",
-                club.pk,
-                member.pk,
-            )
-            raise
+        member.club = club
+    for member_pk in refresh_google_objects(members):
+        update_google_wallet_object_for_member.delay(member_pk)
 
 
 @shared_task(
@@ -1396,23 +1619,104 @@ def update_google_wallet_object_for_member(self, member_pk):
     """Patch the Google Wallet GenericObject for a single club member.
 
     Used when wallet-visible fields on ClubMember change (name,
-    membership_number, membership_expiration_date).  If the member has never
-    added the pass to their Wallet the object won't exist yet — that is fine,
-    update_generic_object_for_member returns False on 404 without raising.
+    membership_number, membership_expiration_date), with saves coalesced by
+    sync_outbox, and to retry members a club-wide refresh couldn't reach.
+    Skipped when the pass content is unchanged. If the member has never added the
+    pass to their Wallet the object won't exist yet — that is fine, a 404 is not
+    an error.
     """
-    from auctions.google_wallet import is_configured, update_generic_object_for_member
+    from auctions.google_wallet import is_configured
     from auctions.models import ClubMember
+    from auctions.wallet_refresh import refresh_google_objects
 
     if not is_configured():
         return
     member = ClubMember.objects.filter(pk=member_pk, is_deleted=False).select_related("user", "club").first()
     if not member:
         return
-    try:
-        update_generic_object_for_member(member)
-    except requests.RequestException:
-        logger.exception("Google Wallet object refresh failed for member=%s", member_pk)
-        raise
+    if refresh_google_objects([member]):
+        raise self.retry()
+
+
+# The bulk sync tasks take a club's members this many at a time and re-queue themselves for the
+# next page, so a big club is a few short tasks instead of one per member (or one long enough to
+# hit CELERY_TASK_SOFT_TIME_LIMIT).
+MARKETING_SYNC_PAGE = 500
+
+
+@shared_task(bind=True, ignore_result=True)
+def drain_sync_outbox(self):
+    """Send the member syncs whose coalescing window is up (see sync_outbox)."""
+    from auctions import sync_outbox
+
+    if sync_outbox.drain() == sync_outbox.DRAIN_BATCH:
+        drain_sync_outbox.delay()
+
+
+def _bulk_sync_page(task, module, club, after_pk, force):
+    """Run *module*.bulk_sync over one page of *club*'s members and queue the next page."""
+    members = list(
+        module.in_scope_members(club)
+        .filter(pk__gt=after_pk)
+        .select_related("user__userdata")
+        .order_by("pk")[:MARKETING_SYNC_PAGE]
+    )
+    for member in members:
+        member.club = club
+    started = time.monotonic()
+    synced = module.bulk_sync(club, members, force=force)
+    logger.info(
+        "%s bulk sync for club %s: %s of %s member(s) sent in %.1fs",
+        module.__name__,
+        club.pk,
+        synced,
+        len(members),
+        time.monotonic() - started,
+    )
+    if len(members) == MARKETING_SYNC_PAGE:
+        task.delay(club.pk, after_pk=members[-1].pk, force=force)
+
+
+@shared_task(
+    bind=True,
+    ignore_result=True,
+    autoretry_for=(requests.RequestException,),
+    retry_backoff=True,
+    retry_backoff_max=600,
+    max_retries=5,
+)
+def bulk_sync_club_to_mailchimp(self, club_pk, after_pk=0, force=False):
+    """Bulk-sync one page of a club's members into its Mailchimp audience, then queue the next.
+
+    Used by backfill() for the initial connection, "sync now", and the nightly catch-up. Members
+    whose fingerprint is unchanged cost no API calls; see mailchimp.bulk_sync.
+    """
+    from auctions import mailchimp as mc
+    from auctions.models import Club
+
+    club = Club.objects.filter(pk=club_pk).first()
+    if not club or not club.mailchimp_connected:
+        return
+    _bulk_sync_page(bulk_sync_club_to_mailchimp, mc, club, after_pk, force)
+
+
+@shared_task(
+    bind=True,
+    ignore_result=True,
+    autoretry_for=(requests.RequestException,),
+    retry_backoff=True,
+    retry_backoff_max=600,
+    max_retries=5,
+)
+def bulk_sync_club_to_brevo(self, club_pk, after_pk=0, force=False):
+    """Brevo equivalent of bulk_sync_club_to_mailchimp; see brevo.bulk_sync."""
+    from auctions import brevo
+    from auctions.models import Club
+
+    club = Club.objects.filter(pk=club_pk).first()
+    if not club or not club.brevo_connected:
+        return
+    _bulk_sync_page(bulk_sync_club_to_brevo, brevo, club, after_pk, force)
 
 
 @shared_task(
@@ -1429,6 +1733,7 @@ def sync_club_member_to_mailchimp(self, member_pk):
     No-op when the club has no Mailchimp connection. Reused for member edits, auction joins,
     paid invoices, the initial backfill, and the nightly catch-up. Deactivated/opted-out
     members are archived by sync_member rather than skipped, so we don't filter is_deleted here.
+    Saves are coalesced in front of this task; see sync_outbox.
     """
     from auctions import mailchimp as mc
     from auctions.models import ClubMember
@@ -1554,8 +1859,9 @@ def refresh_google_wallet_membership_status(self):
 
     The Apple-side equivalent is refresh_apple_wallet_membership_status below.
     """
-    from auctions.google_wallet import is_configured, update_generic_object_for_member
+    from auctions.google_wallet import is_configured
     from auctions.models import ClubMember
+    from auctions.wallet_refresh import refresh_google_objects
 
     if not is_configured():
         return
@@ -1571,12 +1877,8 @@ def refresh_google_wallet_membership_status(self):
         membership_expiration_date__gte=window_start,
         membership_expiration_date__lt=today,
     ).select_related("user", "club")
-    for member in members:
-        try:
-            update_generic_object_for_member(member)
-        except requests.RequestException:
-            logger.exception("Google Wallet daily status refresh failed for member=%s", member.pk)
-            raise
+    for member_pk in refresh_google_objects(list(members)):
+        update_google_wallet_object_for_member.delay(member_pk)
 
 
 @shared_task(
@@ -1594,19 +1896,20 @@ def notify_apple_wallet_devices_for_member(self, member_pk):
     fresh content — Last-Modified on pass delivery and the passesUpdatedSince filter
     both read it — so it happens even when no device is registered (a manual
     pull-to-refresh on the pass must still see the change). Deleted members are NOT
-    skipped: the update they push is the voided pass.
+    skipped: the update they push is the voided pass. Nothing happens when the pass
+    content is unchanged since the last push (see wallet_refresh.push_apple_updates).
     """
-    from django.utils import timezone
-
-    from auctions.apple_wallet import is_configured, send_pass_update_notification
-    from auctions.models import AppleDeviceRegistration, ClubMember
+    from auctions.apple_wallet import is_configured
+    from auctions.models import ClubMember
+    from auctions.wallet_refresh import push_apple_updates
 
     if not is_configured():
         return
-    if not ClubMember.objects.filter(pk=member_pk).update(apple_pass_updated=timezone.now()):
+    member = ClubMember.objects.filter(pk=member_pk).select_related("user", "club").first()
+    if not member:
         return
-    for registration in AppleDeviceRegistration.objects.filter(member_id=member_pk):
-        send_pass_update_notification(registration)
+    if push_apple_updates([member]):
+        raise self.retry()
 
 
 @shared_task(
@@ -1622,18 +1925,23 @@ def notify_apple_wallet_devices_for_club(self, club_pk):
 
     Used when something on the club touches all passes at once — name/icon change
     (pass visuals) or flipping show_member_barcode (which voids/unvoids every pass).
+    Only members whose pass content changed are bumped and pushed; members with a
+    failed push are retried by their own notify_apple_wallet_devices_for_member.
     """
-    from django.utils import timezone
-
-    from auctions.apple_wallet import is_configured, send_pass_update_notification
-    from auctions.models import AppleDeviceRegistration, ClubMember
+    from auctions.apple_wallet import is_configured
+    from auctions.models import Club, ClubMember
+    from auctions.wallet_refresh import push_apple_updates
 
     if not is_configured():
         return
-    ClubMember.objects.filter(club_id=club_pk).update(apple_pass_updated=timezone.now())
-    registrations = AppleDeviceRegistration.objects.filter(member__club_id=club_pk)
-    for registration in registrations:
-        send_pass_update_notification(registration)
+    club = Club.objects.filter(pk=club_pk).first()
+    if not club:
+        return
+    members = list(ClubMember.objects.filter(club=club).select_related("user"))
+    for member in members:
+        member.club = club
+    for member_pk in push_apple_updates(members):
+        notify_apple_wallet_devices_for_member.delay(member_pk)
 
 
 @shared_task(
@@ -1652,26 +1960,27 @@ def refresh_apple_wallet_membership_status(self):
     status line and red styling need to change. Only members who lapsed in the last
     few days AND have at least one registered device are touched, so this stays cheap.
     """
-    from django.utils import timezone
-
-    from auctions.apple_wallet import is_configured, send_pass_update_notification
-    from auctions.models import AppleDeviceRegistration, ClubMember
+    from auctions.apple_wallet import is_configured
+    from auctions.models import ClubMember
+    from auctions.wallet_refresh import push_apple_updates
 
     if not is_configured():
         return
     today = datetime.datetime.now(tz=datetime.timezone.utc).date()
     window_start = today - datetime.timedelta(days=3)
-    members = ClubMember.objects.filter(
-        is_deleted=False,
-        club__membership_system__in=["january_first", "rolling"],
-        membership_expiration_date__gte=window_start,
-        membership_expiration_date__lt=today,
-        apple_device_registrations__isnull=False,
-    ).distinct()
-    for member in members:
-        ClubMember.objects.filter(pk=member.pk).update(apple_pass_updated=timezone.now())
-        for registration in AppleDeviceRegistration.objects.filter(member=member):
-            send_pass_update_notification(registration)
+    members = (
+        ClubMember.objects.filter(
+            is_deleted=False,
+            club__membership_system__in=["january_first", "rolling"],
+            membership_expiration_date__gte=window_start,
+            membership_expiration_date__lt=today,
+            apple_device_registrations__isnull=False,
+        )
+        .distinct()
+        .select_related("user", "club")
+    )
+    for member_pk in push_apple_updates(list(members)):
+        notify_apple_wallet_devices_for_member.delay(member_pk)
 
 
 @shared_task(
@@ -1690,7 +1999,7 @@ def geocode_club_member(self, pk):
     user's UserData if the address is empty but the user has joined an
     auction (manually_added=False).
     """
-    from auctions.models import AuctionTOS, ClubMember, UserData
+    from auctions.models import ClubMember
 
     api_key = getattr(settings, "GOOGLE_MAPS_SERVER_API_KEY", "")
     if not api_key:
@@ -1699,7 +2008,31 @@ def geocode_club_member(self, pk):
     member = ClubMember.objects.filter(pk=pk).first()
     if not member:
         return
+    _geocode_club_member(member, api_key)
+
+
+@shared_task(bind=True, ignore_result=True)
+def geocode_club_members(self, pks):
+    """geocode_club_member for a batch of members (a CSV import queues these, a page at a time).
+
+    A member whose request fails gets its own geocode_club_member, which retries it.
+    """
+    from auctions.models import ClubMember
+
+    api_key = getattr(settings, "GOOGLE_MAPS_SERVER_API_KEY", "")
+    if not api_key:
+        return
+    for member in ClubMember.objects.filter(pk__in=pks):
+        try:
+            _geocode_club_member(member, api_key)
+        except requests.RequestException:
+            geocode_club_member.delay(member.pk)
+
+
+def _geocode_club_member(member, api_key):
+    from auctions.models import AuctionTOS, ClubMember, UserData
 
+    pk = member.pk
     if member.address:
         response = requests.get(
             "https://maps.googleapis.com/maps/api/geocode/json",
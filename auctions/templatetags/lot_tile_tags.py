@@ -0,0 +1,20 @@
+from django import template
+
+from auctions import page_view_rollups
+from auctions.lot_tiles import load_lot_tiles as _load_lot_tiles
+
+register = template.Library()
+
+
+@register.simple_tag
+def load_lot_tiles(lots):
+    """{% load_lot_tiles object_list as object_list %} -- bulk-load a page of lots before the loop."""
+    return _load_lot_tiles(lots)
+
+
+@register.simple_tag
+def load_lot_views(lots):
+    """{% load_lot_views object_list as object_list %} -- every lot's view count, for the list page."""
+    lots = list(lots)
+    page_view_rollups.load_lot_views(lots)
+    return lots
@@ -16,6 +16,7 @@ from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
+from auctions import account_jobs
 from auctions.account_deletion import (
     GRACE_PERIOD_DAYS,
     cancel_deletion,
@@ -25,6 +26,7 @@ from auctions.account_deletion import (
     request_deletion,
 )
 from auctions.models import (
+    AccountJob,
     AuctionTOS,
     Club,
     ClubMember,
@@ -212,6 +214,41 @@ class AccountDeletionScheduleTests(TestCase):
         self.assertFalse(other.is_active)
 
 
+class InterruptedDeletionTests(TestCase):
+    """A deletion that is cut off partway carries on from there, with what it read before blanking."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="halfway", password="x", email="halfway@example.com")
+        request_deletion(self.user)
+        UserData.objects.filter(user=self.user).update(
+            account_deletion_requested=timezone.now() - datetime.timedelta(days=GRACE_PERIOD_DAYS + 1)
+        )
+
+    def test_it_picks_up_at_the_step_that_failed(self):
+        with patch("auctions.account_deletion._redact_emails_from_history", side_effect=RuntimeError("timeout")):
+            self.assertEqual(process_due_deletions(), 0)
+        job = AccountJob.objects.get(kind=AccountJob.DELETE, user=self.user)
+        self.assertIn("halfway@example.com", job.state["emails"])
+        self.assertTrue(job.last_error.startswith("redact_history"))
+        # still due, so tomorrow's run finishes it
+        self.assertIsNotNone(UserData.objects.get(user=self.user).account_deletion_requested)
+
+        with patch("auctions.account_deletion._redact_emails_from_history") as redact:
+            self.assertEqual(process_due_deletions(), 1)
+        self.assertIn("halfway@example.com", redact.call_args.args[0])
+        job.refresh_from_db()
+        self.assertIsNotNone(job.finished_on)
+        self.assertEqual(job.state, {})
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+
+    def test_a_deletion_another_worker_is_running_is_not_counted(self):
+        job = account_jobs.start(AccountJob.DELETE, self.user)
+        AccountJob.objects.filter(pk=job.pk).update(leased_until=timezone.now() + account_jobs.LEASE)
+        self.assertEqual(process_due_deletions(), 0)
+        self.assertTrue(User.objects.get(pk=self.user.pk).is_active)
+
+
 class PersonalDataIsDeletedTests(TestCase):
     """Everything that is only ever about this one person actually goes."""
 
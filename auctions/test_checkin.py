@@ -8,7 +8,9 @@ from django.urls import reverse
 from django.utils import timezone
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from auctions.models import Auction, AuctionHistory, AuctionTOS, Club, ClubMember, PickupLocation
+from auctions.mobile.services import checkin
+from auctions.models import Auction, AuctionHistory, AuctionTOS, Club, ClubMember, PickupLocation, distance_to
+from auctions.test_support import isolated_cache
 
 User = get_user_model()
 
@@ -22,6 +24,7 @@ def _bearer(user):
     return {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(user).access_token}"}
 
 
+@isolated_cache("checkin")
 class CheckinBase(TestCase):
     def setUp(self):
         now = timezone.now()
@@ -651,3 +654,42 @@ class PingIgnoresUnpromotedAuctionTests(CheckinBase):
         self.venue.promote_this_auction = True
         self.venue.save()
         self.assertIn("join_offer", self._types(self._ping(self.arrival, *AT)))
+
+
+class WelcomeIndexTests(CheckinBase):
+    """The cached candidate index that lets a ping far from any auction skip the database."""
+
+    def test_far_ping_is_query_free_once_indexed(self):
+        checkin.welcome_index()
+        with self.assertNumQueries(0):
+            self.assertEqual(checkin.evaluate_ping(self.arrival, *FAR), [])
+
+    def test_index_holds_only_single_location_auctions(self):
+        auction_pks = {entry[0] for bucket in checkin.welcome_index().values() for entry in bucket}
+        self.assertIn(self.venue.pk, auction_pks)
+        PickupLocation.objects.create(name="Overflow", auction=self.venue, latitude=VENUE[0], longitude=VENUE[1])
+        auction_pks = {entry[0] for bucket in checkin.welcome_index().values() for entry in bucket}
+        self.assertNotIn(self.venue.pk, auction_pks)
+
+    def test_moving_the_location_drops_the_index(self):
+        self.assertIn("join_offer", self._types(self._ping(self.arrival, *AT)))
+        self.location.latitude = FAR[0]
+        self.location.save()
+        self.assertEqual(checkin.nearby_welcome_candidates(*AT), [])
+
+    def test_candidates_match_distance_to(self):
+        distance, auction_pk = checkin.nearby_welcome_candidates(*NEAR)[0]
+        annotated = (
+            PickupLocation.objects.filter(pk=self.location.pk)
+            .annotate(distance=distance_to(*NEAR, approximate_distance_to=checkin.DISTANCE_RESOLUTION_MI))
+            .get()
+            .distance
+        )
+        self.assertEqual(auction_pk, self.venue.pk)
+        self.assertAlmostEqual(distance, annotated, places=6)
+
+    def test_nearby_cells_cover_a_cell_boundary(self):
+        # Two points either side of a precision-4 cell edge, well within 2 mi of each other.
+        west, east = (44.47, -73.1260), (44.47, -73.1250)
+        self.assertNotEqual(checkin._geohash(*west), checkin._geohash(*east))
+        self.assertIn(checkin._geohash(*east), checkin._nearby_geohashes(*west))
@@ -253,7 +253,7 @@ class AnnouncementDeliveryTests(TestCase):
         self.client.force_login(self.admin)
         with (
             patch("auctions.discord_events.send_channel_message") as discord,
-            patch("auctions.tasks.send_push_to_user.delay") as push,
+            patch("auctions.tasks.send_push_batch.delay") as push,
         ):
             self.client.post(
                 self.url,
@@ -275,7 +275,7 @@ class AnnouncementDeliveryTests(TestCase):
         self.client.force_login(self.admin)
         with (
             patch("auctions.discord_events.send_channel_message", return_value="msg-1") as discord,
-            patch("auctions.tasks.send_push_to_user.delay") as push,
+            patch("auctions.tasks.send_push_batch.delay") as push,
         ):
             response = self.client.post(
                 self.url,
@@ -291,14 +291,14 @@ class AnnouncementDeliveryTests(TestCase):
         discord.assert_called_once()
         self.assertIn("Bring a plant", discord.call_args[0][1])
         push.assert_called_once()
-        self.assertEqual(push.call_args[0][0], member.user_id)
+        self.assertEqual(push.call_args[0][0], [member.user_id])
 
     def test_a_failed_discord_post_is_recorded_and_never_costs_the_push(self):
         self._reachable_member()
         self.client.force_login(self.admin)
         with (
             patch("auctions.discord_events.send_channel_message", return_value=""),
-            patch("auctions.tasks.send_push_to_user.delay") as push,
+            patch("auctions.tasks.send_push_batch.delay") as push,
         ):
             self.client.post(
                 self.url,
@@ -315,7 +315,7 @@ class AnnouncementDeliveryTests(TestCase):
         self.client.force_login(self.admin)
         with (
             patch("auctions.discord_events.send_channel_message") as discord,
-            patch("auctions.tasks.send_push_to_user.delay") as push,
+            patch("auctions.tasks.send_push_batch.delay") as push,
         ):
             self.client.post(self.url, {"text": "Website only", "show_on_website": "on"})
             self._grace_expires()
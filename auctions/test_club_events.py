@@ -15,6 +15,7 @@ from django.utils import timezone
 from auctions import club_events, discord_events, recurrence
 from auctions import google_calendar as gcal
 from auctions.models import Auction, Club, ClubEvent, ClubMember, PickupLocation
+from auctions.test_support import isolated_cache
 
 
 class ClubEventModelTests(TestCase):
@@ -972,6 +973,36 @@ class GoogleCalendarSyncTests(TestCase):
         self.club.refresh_from_db()
         self.assertEqual(self.club.google_calendar_sync_token, "")
 
+    def test_an_expired_sync_token_catches_up_with_updated_min(self):
+        """A club that has synced before doesn't lose this run to an expired token: it asks for
+        what changed since the last round trip that worked, and keeps the fresh token."""
+        last_sync = timezone.now() - datetime.timedelta(days=3)
+        self.club.google_calendar_sync_token = "stale"
+        self.club.google_calendar_last_sync = last_sync
+        self.club.save()
+        start = timezone.now() + datetime.timedelta(days=5)
+        page = {
+            "items": [
+                {
+                    "id": "g-changed",
+                    "status": "confirmed",
+                    "summary": "Added in Google",
+                    "start": {"dateTime": start.isoformat()},
+                    "end": {"dateTime": (start + datetime.timedelta(hours=2)).isoformat()},
+                }
+            ],
+            "nextSyncToken": "fresh",
+        }
+        with patch.object(gcal, "_request", side_effect=[gcal.SYNC_TOKEN_GONE, page]) as request:
+            created, _, _ = gcal.pull_events(self.club)
+        self.assertEqual(created, 1)
+        retry_params = request.call_args_list[1].kwargs["params"]
+        self.assertNotIn("syncToken", retry_params)
+        updated_min = datetime.datetime.fromisoformat(retry_params["updatedMin"])
+        self.assertEqual(updated_min, last_sync - gcal.UPDATED_MIN_OVERLAP)
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.google_calendar_sync_token, "fresh")
+
     def test_sync_club_records_an_error_instead_of_raising(self):
         with patch.object(gcal, "ensure_calendar", side_effect=gcal.GoogleCalendarError("boom")):
             self.assertFalse(gcal.sync_club(self.club))
@@ -2394,6 +2425,7 @@ class ClubEventCancellationTests(TestCase):
         self.assertContains(response, "Cancelled")
 
 
+@isolated_cache("club-calendar-sync")
 class SyncAllTests(TestCase):
     def test_one_broken_club_does_not_stop_the_others(self):
         good = Club.objects.create(name="Good Club", discord_server_id="g-1")
@@ -2429,31 +2461,68 @@ class SyncAllTests(TestCase):
             club_events.sync_all()
         sync_club.assert_not_called()
 
-    def test_the_celery_task_runs(self):
-        from auctions.tasks import sync_club_calendars
+    def test_the_periodic_task_queues_a_sync_per_club(self):
+        from auctions.tasks import sync_club_calendar, sync_club_calendars
 
-        Club.objects.create(name="Task Club")
-        with patch.object(club_events, "sync_all", return_value=0) as sync_all:
+        first = Club.objects.create(name="Task Club", discord_server_id="g-4")
+        second = Club.objects.create(name="Other Task Club", discord_server_id="g-5")
+        with patch.object(sync_club_calendar, "delay") as delay:
             sync_club_calendars()
-        sync_all.assert_called_once()
+        self.assertEqual(sorted(call.args[0] for call in delay.call_args_list), sorted([first.pk, second.pk]))
 
-    def test_two_runs_cannot_overlap(self):
-        """Beat fires this every 15 minutes; a slow run would otherwise race the next one and
-        push the same events twice, or provision two calendars for one club."""
-        from django.core.cache import cache
+    def test_a_club_still_in_flight_is_not_queued_again(self):
+        """Beat fires this every 15 minutes; a slow club would otherwise race its own next sync and
+        push the same events twice, or provision two calendars."""
+        from auctions.tasks import sync_club_calendar, sync_club_calendars
 
-        from auctions.tasks import CALENDAR_SYNC_LOCK_KEY, sync_club_calendars
+        club = Club.objects.create(name="Slow Club", discord_server_id="g-6")
+        with patch.object(sync_club_calendar, "delay") as delay:
+            sync_club_calendars()
+            sync_club_calendars()
+        self.assertEqual(delay.call_count, 1)
 
-        cache.delete(CALENDAR_SYNC_LOCK_KEY)
-        started = []
+        # Once its task has run, the club is queued again on the next pass.
+        with patch.object(club_events, "sync_club") as sync_club:
+            sync_club_calendar(club.pk)
+        sync_club.assert_called_once()
+        with patch.object(sync_club_calendar, "delay") as delay:
+            sync_club_calendars()
+        delay.assert_called_once_with(club.pk)
 
-        def slow():
-            started.append(1)
-            sync_club_calendars()  # the "second run", arriving while the first holds the lock
-            return 0
+    def test_a_broken_club_is_released_for_the_next_run(self):
+        from auctions.tasks import sync_club_calendar, sync_club_calendars
 
-        with patch.object(club_events, "sync_all", side_effect=slow):
+        club = Club.objects.create(name="Broken Club", discord_server_id="g-7")
+        with patch.object(sync_club_calendar, "delay"):
             sync_club_calendars()
-        self.assertEqual(len(started), 1)
-        # The lock is released, so the next scheduled run still happens.
-        self.assertIsNone(cache.get(CALENDAR_SYNC_LOCK_KEY))
+        msg = "kaboom"
+        with patch.object(club_events, "sync_club", side_effect=RuntimeError(msg)), self.assertRaises(RuntimeError):
+            sync_club_calendar(club.pk)
+        with patch.object(sync_club_calendar, "delay") as delay:
+            sync_club_calendars()
+        delay.assert_called_once_with(club.pk)
+
+    def test_concurrency_is_bounded(self):
+        from celery.exceptions import Retry
+        from django.core.cache import cache
+
+        from auctions.tasks import (
+            CALENDAR_SYNC_CONCURRENCY,
+            CALENDAR_SYNC_SLOT_PREFIX,
+            sync_club_calendar,
+        )
+
+        club = Club.objects.create(name="Waiting Club", discord_server_id="g-8")
+        busy = [f"{CALENDAR_SYNC_SLOT_PREFIX}:{slot}" for slot in range(CALENDAR_SYNC_CONCURRENCY)]
+        for key in busy:
+            cache.set(key, "1")
+        with patch.object(club_events, "sync_club") as sync_club, self.assertRaises(Retry):
+            sync_club_calendar(club.pk)
+        sync_club.assert_not_called()
+
+        cache.delete(busy[-1])
+        with patch.object(club_events, "sync_club") as sync_club:
+            sync_club_calendar(club.pk)
+        sync_club.assert_called_once()
+        # The slot it borrowed is handed back.
+        self.assertIsNone(cache.get(busy[-1]))
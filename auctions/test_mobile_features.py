@@ -29,7 +29,7 @@ from django.urls import reverse
 from django.utils import timezone
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from auctions import notifications, tasks
+from auctions import label_cache, notifications, tasks
 from auctions.mobile.services.devices import DeviceService
 from auctions.models import (
     Auction,
@@ -57,6 +57,7 @@ from auctions.printer_programs import (
     validate_profile_programs,
 )
 from auctions.printing import label_prefs_warnings, warning_matrix
+from auctions.test_support import isolated_cache
 from auctions.tests import StandardTestCase
 
 # A plausible-looking inline service-account JSON; push_configured() only checks it's non-empty and
@@ -609,6 +610,67 @@ class SendPushToUserTests(TestCase):
         send.assert_not_called()
 
 
+class SendPushBatchTests(TestCase):
+    """The batch task behind announcement/promo/watcher pushes: one FCM call, bulk bookkeeping."""
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f"batch{i}", password="x", email=f"batch{i}@example.com")
+            for i in range(3)
+        ]
+        self.devices = [
+            MobileDevice.objects.create(user=user, device_uuid=uuid.uuid4(), fcm_token=f"tok{i}", push_enabled=True)
+            for i, user in enumerate(self.users)
+        ]
+
+    def _send(self, results, **kwargs):
+        from auctions.tasks import send_push_batch
+
+        with (
+            patch("auctions.notifications.send_fcm_batch", return_value=results) as send,
+            patch("auctions.tasks.mail.send") as mail_send,
+        ):
+            count = send_push_batch(
+                [user.pk for user in self.users], title="t", body="b", url="u", category="invoice", **kwargs
+            )
+        return count, send, mail_send
+
+    def test_one_fcm_call_and_one_row_per_delivered_device(self):
+        count, send, _ = self._send([notifications.SEND_OK] * 3)
+        self.assertEqual(count, 3)
+        send.assert_called_once()
+        self.assertEqual({push["token"] for push in send.call_args.args[0]}, {"tok0", "tok1", "tok2"})
+        self.assertEqual(PushNotificationSent.objects.filter(category="invoice").count(), 3)
+
+    def test_dead_tokens_cleared_and_undelivered_users_emailed(self):
+        results = [notifications.SEND_OK, notifications.SEND_INVALID_TOKEN, notifications.SEND_ERROR]
+        count, _, mail_send = self._send(results)
+        self.assertEqual(count, 1)
+        tokens = dict(MobileDevice.objects.values_list("pk", "fcm_token"))
+        self.assertEqual(tokens[self.devices[0].pk], "tok0")
+        self.assertEqual(tokens[self.devices[1].pk], "")
+        self.assertEqual(tokens[self.devices[2].pk], "tok2")
+        self.assertEqual(sorted(call.args[0] for call in mail_send.call_args_list), [u.email for u in self.users[1:]])
+
+    def test_per_user_bodies(self):
+        _, send, _ = self._send([notifications.SEND_OK] * 3, bodies={str(self.users[0].pk): "just for you"})
+        bodies = {push["token"]: push["body"] for push in send.call_args.args[0]}
+        self.assertEqual(bodies, {"tok0": "just for you", "tok1": "b", "tok2": "b"})
+
+    def test_enqueue_chunks_users_into_few_tasks(self):
+        with (
+            patch.object(notifications, "PUSH_BATCH_USERS", 2),
+            patch("auctions.tasks.send_push_batch.delay") as delay,
+        ):
+            queued = notifications.enqueue_push_batch(
+                [1, 2, 2, 3], title="t", body="b", url="u", category="promo", bodies={3: "three"}
+            )
+        self.assertEqual(queued, 3)
+        self.assertEqual([call.args[0] for call in delay.call_args_list], [[1, 2], [3]])
+        self.assertIsNone(delay.call_args_list[0].kwargs["bodies"])
+        self.assertEqual(delay.call_args_list[1].kwargs["bodies"], {"3": "three"})
+
+
 # ---------------------------------------------------------------------------
 # Part 2 — device register/unregister (token lifecycle)
 # ---------------------------------------------------------------------------
@@ -748,7 +810,7 @@ class PromoPushCommandTests(TestCase):
 
     @override_settings(FIREBASE_CREDENTIALS_JSON=FAKE_FIREBASE)
     def test_notifies_nearby_opted_in_user(self):
-        with patch("auctions.tasks.send_push_to_user.delay") as delay:
+        with patch("auctions.tasks.send_push_batch.delay") as delay:
             call_command("promo_push_notifications")
         delay.assert_called_once()
         self.auction.refresh_from_db()
@@ -756,10 +818,11 @@ class PromoPushCommandTests(TestCase):
 
     @override_settings(FIREBASE_CREDENTIALS_JSON=FAKE_FIREBASE)
     def test_title_is_short_and_the_body_carries_name_and_distance(self):
-        with patch("auctions.tasks.send_push_to_user.delay") as delay:
+        with patch("auctions.tasks.send_push_batch.delay") as delay:
             call_command("promo_push_notifications")
         self.assertEqual(delay.call_args.kwargs["title"], "New auction")
-        body = delay.call_args.kwargs["body"]
+        self.assertEqual(delay.call_args.args[0], [self.user.pk])
+        body = delay.call_args.kwargs["bodies"][str(self.user.pk)]
         self.assertIn(self.auction.title, body)
         self.assertIn("miles away", body)
 
@@ -768,14 +831,14 @@ class PromoPushCommandTests(TestCase):
         userdata = self.user.userdata
         userdata.distance_unit = "km"
         userdata.save()
-        with patch("auctions.tasks.send_push_to_user.delay") as delay:
+        with patch("auctions.tasks.send_push_batch.delay") as delay:
             call_command("promo_push_notifications")
-        self.assertIn("km away", delay.call_args.kwargs["body"])
+        self.assertIn("km away", delay.call_args.kwargs["bodies"][str(self.user.pk)])
 
     @override_settings(FIREBASE_CREDENTIALS_JSON=FAKE_FIREBASE)
     def test_dedupes_via_ledger(self):
         PushNotificationSent.objects.create(user=self.user, category="promo", auction=self.auction)
-        with patch("auctions.tasks.send_push_to_user.delay") as delay:
+        with patch("auctions.tasks.send_push_batch.delay") as delay:
             call_command("promo_push_notifications")
         delay.assert_not_called()
 
@@ -784,14 +847,14 @@ class PromoPushCommandTests(TestCase):
         ud = self.user.userdata
         ud.email_me_about_new_auctions = False
         ud.save()
-        with patch("auctions.tasks.send_push_to_user.delay") as delay:
+        with patch("auctions.tasks.send_push_batch.delay") as delay:
             call_command("promo_push_notifications")
         delay.assert_not_called()
 
     @override_settings(FIREBASE_CREDENTIALS_JSON=FAKE_FIREBASE)
     def test_does_not_promote_freshly_posted_auction(self):
         Auction.objects.filter(pk=self.auction.pk).update(date_posted=timezone.now())
-        with patch("auctions.tasks.send_push_to_user.delay") as delay:
+        with patch("auctions.tasks.send_push_batch.delay") as delay:
             call_command("promo_push_notifications")
         delay.assert_not_called()
 
@@ -1528,6 +1591,175 @@ class LabelPngMatchesPdfTests(StandardTestCase):
         self.assertEqual(web.content, self._png(resolution="600x400"))
 
 
+@isolated_cache("label-cache")
+class LabelRenderCacheTests(StandardTestCase):
+    """WeasyPrint lays a label out once; reprints, and the PNG of a label already printed, come from
+    the cache. Anything that changes what the label says is a different cache entry."""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("mobile-label-lot", kwargs={"pk": self.lot.pk})
+        self.prefs, _ = UserLabelPrefs.objects.get_or_create(user=self.user)
+        self.prefs.preset = "thermal_sm"
+        self.prefs.save()
+
+    def _png(self, user=None, **params):
+        resp = self.client.get(self.url, {"resolution": "600x400", **params}, **_bearer(user or self.user))
+        self.assertEqual(resp.status_code, 200)
+        return resp.content
+
+    def test_a_reprint_is_not_laid_out_again(self):
+        with patch("auctions.label_cache._html_to_pdf", wraps=label_cache._html_to_pdf) as layout:
+            first = self._png()
+            self.assertEqual(self._png(), first)
+        self.assertEqual(layout.call_count, 1)
+
+    def test_changing_the_lot_changes_the_label(self):
+        first = self._png()
+        self.lot.lot_name = "A renamed lot"
+        self.lot.save()
+        with patch("auctions.label_cache._html_to_pdf", wraps=label_cache._html_to_pdf) as layout:
+            self.assertNotEqual(self._png(), first)
+        self.assertEqual(layout.call_count, 1)
+
+    def test_a_sheet_is_laid_out_page_by_page_and_joined(self):
+        import pypdfium2
+
+        parts = [label_cache._html_to_pdf(f"<p>page {n}</p>") for n in range(3)]
+        pdf = pypdfium2.PdfDocument(label_cache.merge_pdfs(parts))
+        try:
+            self.assertEqual(len(pdf), 3)
+        finally:
+            pdf.close()
+        self.assertEqual(label_cache.split_pages(range(7), 3), [[0, 1, 2], [3, 4, 5], [6]])
+
+    def test_new_in_person_lots_are_prewarmed_for_thermal_printing_admins(self):
+        prefs, _ = UserLabelPrefs.objects.get_or_create(user=self.admin_user)
+        prefs.preset = "thermal_very_sm"
+        prefs.save()
+        lot = Lot.objects.create(
+            lot_name="Prewarmed", auction=self.in_person_auction, auctiontos_seller=self.in_person_tos, quantity=1
+        )
+        # The online auction's lot is skipped; the in-person one is rendered for its creator and admin_user
+        self.assertEqual(label_cache.prewarm([lot.pk, self.lot.pk]), 2)
+        self.url = reverse("mobile-label-lot", kwargs={"pk": lot.pk})
+        with patch("auctions.label_cache._html_to_pdf", wraps=label_cache._html_to_pdf) as layout:
+            self._png(user=self.admin_user)
+        self.assertEqual(layout.call_count, 0)
+        lot.refresh_from_db()
+        self.assertFalse(lot.label_printed)
+
+
+class LabelBitmapMatchesPdfTests(StandardTestCase):
+    """The bitmap engine draws label_template.html's layout itself, so it can drift from the PDF.
+    These compare the two raster for raster: both are cut into a coarse grid, and the cells with
+    ink in them must be (nearly) the same cells. Anti-aliasing and sub-pixel glyph placement differ
+    by design; a field in the wrong place, the wrong size, or missing altogether does not pass.
+    """
+
+    GRID = (24, 16)
+    MIN_AGREEMENT = 0.8
+
+    def setUp(self):
+        super().setUp()
+        self.prefs, _ = UserLabelPrefs.objects.get_or_create(user=self.user)
+        self.lot.summernote_description = "<p>Tank raised &amp; eating flake</p>"
+        self.lot.save()
+        self.request = self.client.get(reverse("mobile-label-lot", kwargs={"pk": self.lot.pk})).wsgi_request
+        self.request.user = self.user
+
+    def _both(self, width, height):
+        from auctions.mobile.services.label_bitmap import render_lot_label_bitmap
+        from auctions.mobile.services.label_raster import render_lot_label_png
+
+        pdf = render_lot_label_png(self.lot, self.request, width=width, height=height, dpi=203)
+        bitmap = render_lot_label_bitmap(self.lot, self.request, width=width, height=height, dpi=203)
+        self.assertIsNotNone(pdf)
+        self.assertIsNotNone(bitmap)
+        return pdf, bitmap
+
+    def _ink_cells(self, content):
+        from PIL import Image
+
+        image = Image.open(io.BytesIO(content)).convert("L")
+        return [value < 250 for value in image.resize(self.GRID, Image.Resampling.BOX).getdata()]
+
+    def assertSameLayout(self, pdf, bitmap):
+        pdf_cells, bitmap_cells = self._ink_cells(pdf), self._ink_cells(bitmap)
+        self.assertTrue(any(pdf_cells), "the PDF label is blank")
+        agreement = sum(a == b for a, b in zip(pdf_cells, bitmap_cells, strict=True)) / len(pdf_cells)
+        self.assertGreaterEqual(agreement, self.MIN_AGREEMENT)
+
+    def test_presets_match_the_pdf(self):
+        for preset, resolution in (("thermal_sm", (600, 400)), ("thermal_very_sm", (700, 225)), ("lg", (770, 240))):
+            with self.subTest(preset=preset):
+                self.prefs.preset = preset
+                self.prefs.save()
+                self.assertSameLayout(*self._both(*resolution))
+
+    def test_print_fields_match_the_pdf(self):
+        self.prefs.preset = "thermal_sm"
+        self.prefs.save()
+        for fields in ("lot_name,seller_name", "lot_name,qr_code,description_label", "qr_code,category"):
+            with self.subTest(fields=fields):
+                self.online_auction.label_print_fields = fields
+                self.online_auction.save()
+                self.assertSameLayout(*self._both(600, 400))
+
+    def test_bitmap_is_one_bit_at_the_requested_size(self):
+        from PIL import Image
+
+        _pdf, bitmap = self._both(384, 256)
+        image = Image.open(io.BytesIO(bitmap))
+        self.assertEqual(image.mode, "1")
+        self.assertEqual(image.size, (384, 256))
+
+    def test_engine_param_on_the_label_endpoint(self):
+        url = reverse("mobile-label-lot", kwargs={"pk": self.lot.pk})
+        resp = self.client.get(url, {"engine": "bitmap", "resolution": "600x400"}, **_bearer(self.user))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "image/png")
+        self.assertEqual(self.client.get(url, {"engine": "crayon"}, **_bearer(self.user)).status_code, 400)
+
+    def test_batch_returns_labels_in_the_order_asked(self):
+        import base64
+
+        from PIL import Image
+
+        other = Lot.objects.create(
+            lot_name="Second lot", auction=self.online_auction, auctiontos_seller=self.online_tos, quantity=1
+        )
+        strangers = Lot.objects.create(
+            lot_name="Not yours", auction=self.in_person_auction, auctiontos_seller=self.in_person_buyer, quantity=1
+        )
+        resp = self.client.get(
+            reverse("mobile-label-batch"),
+            {"lots": f"{other.pk},{self.lot.pk},{strangers.pk},999999", "resolution": "300x200"},
+            **_bearer(self.user_with_no_lots),
+        )
+        self.assertEqual(resp.status_code, 200)
+        # user_with_no_lots is strangers' seller, and nothing else
+        self.assertEqual([label["lot"] for label in resp.json()["labels"]], [strangers.pk])
+        self.assertEqual(resp.json()["skipped"], [other.pk, self.lot.pk, 999999])
+
+        resp = self.client.get(
+            reverse("mobile-label-batch"),
+            {"lots": f"{other.pk},{self.lot.pk}", "resolution": "300x200"},
+            **_bearer(self.user),
+        )
+        labels = resp.json()["labels"]
+        self.assertEqual([label["lot"] for label in labels], [other.pk, self.lot.pk])
+        for label in labels:
+            self.assertEqual(Image.open(io.BytesIO(base64.b64decode(label["png"]))).size, (300, 200))
+
+    def test_batch_rejects_nonsense(self):
+        url = reverse("mobile-label-batch")
+        self.assertEqual(self.client.get(url, {"lots": "a,b"}, **_bearer(self.user)).status_code, 400)
+        self.assertEqual(self.client.get(url, {"lots": ""}, **_bearer(self.user)).status_code, 400)
+        too_many = ",".join(str(pk) for pk in range(1, 102))
+        self.assertEqual(self.client.get(url, {"lots": too_many}, **_bearer(self.user)).status_code, 400)
+
+
 # ---------------------------------------------------------------------------
 # Part Y3 — telling a user their printer is supported now
 # ---------------------------------------------------------------------------
@@ -1674,7 +1906,7 @@ class WatchedLotPushRoutingTests(StandardTestCase):
         from auctions.views import notify_watchers_lot_selling_soon
 
         with (
-            patch("auctions.views.send_push_to_user.delay") as app_push,
+            patch("auctions.tasks.send_push_batch.delay") as app_push,
             patch("auctions.views.send_user_notification") as web_push,
         ):
             notify_watchers_lot_selling_soon(self.in_person_lot, **kwargs)
@@ -1687,7 +1919,7 @@ class WatchedLotPushRoutingTests(StandardTestCase):
         app_push, web_push = self._notify()
         web_push.assert_not_called()
         app_push.assert_called_once()
-        self.assertEqual(app_push.call_args.args[0], self.watcher.pk)
+        self.assertEqual(app_push.call_args.args[0], [self.watcher.pk])
         self.assertEqual(app_push.call_args.kwargs["category"], notifications.CATEGORY_LOT_SELLING)
         # Same tag the browser payload uses, so "about to be sold" replaces "coming up soon".
         self.assertEqual(app_push.call_args.kwargs["collapse_key"], f"lot_sell_notification_{self.in_person_lot.pk}")
@@ -1,16 +1,22 @@
 """Tests for the mobile offline-mode backend (in-person sale).
 
 Covers GET /api/mobile/offline/snapshot/ and POST /api/mobile/offline/sync/:
-snapshot scoping/ordering/status, idempotent replay, requested-number honoring + remap,
+snapshot scoping/ordering/status, deltas since a cursor, idempotent replay, requested-number honoring + remap,
 cross-batch ``op:<id>`` references, the four conflict rules, per-op independence, and auth/limits.
 """
 
+import gzip
 import json
 from decimal import Decimal
+from unittest.mock import patch
 
+import brotli
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from auctions.mobile.services import offline
 from auctions.models import AuctionTOS, Club, ClubMember, Invoice, Lot, MobileOfflineOp
 from auctions.tests import StandardTestCase
 
@@ -115,6 +121,146 @@ class MobileOfflineSnapshotTests(StandardTestCase):
         self.assertEqual(row["lot_number"], str(lot.lot_number_int))
 
 
+class MobileOfflineDeltaTests(StandardTestCase):
+    """``since=<cursor>``: what changed, what went away, and when to send everything instead."""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("mobile-offline-snapshot")
+        self.admin_user.userdata.last_auction_used = self.in_person_auction
+        self.admin_user.userdata.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lot = Lot.objects.create(
+                lot_name="Delta lot",
+                auction=self.in_person_auction,
+                auctiontos_seller=self.admin_in_person_tos,
+                quantity=1,
+            )
+            self.other_lot = Lot.objects.create(
+                lot_name="Unchanged lot",
+                auction=self.in_person_auction,
+                auctiontos_seller=self.admin_in_person_tos,
+                quantity=1,
+            )
+        self.cursor = self._get().json()["cursor"]
+
+    def _get(self, **params):
+        headers = params.pop("headers", {})
+        return self.client.get(self.url, params, **_bearer(self.admin_user), **headers)
+
+    def _delta(self):
+        return self._get(since=self.cursor).json()
+
+    def test_a_full_snapshot_carries_a_cursor(self):
+        data = self._get().json()
+        self.assertFalse(data["delta"])
+        self.assertTrue(data["cursor"].startswith(f"{self.in_person_auction.pk}:"))
+        self.assertIn(self.other_lot.pk, {lot["pk"] for lot in data["lots"]})
+
+    def test_nothing_changed_is_an_empty_delta(self):
+        data = self._delta()
+        self.assertTrue(data["delta"])
+        self.assertEqual((data["users"], data["lots"], data["deleted_users"], data["deleted_lots"]), ([], [], [], []))
+        self.assertEqual(data["cursor"], self.cursor)
+
+    def test_a_changed_lot_is_all_the_delta_holds(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lot.lot_name = "Renamed"
+            self.lot.save()
+        data = self._delta()
+        self.assertEqual([(lot["pk"], lot["lot_name"]) for lot in data["lots"]], [(self.lot.pk, "Renamed")])
+        self.assertEqual(data["users"], [])
+        self.assertNotEqual(data["cursor"], self.cursor)
+
+    def test_a_deleted_lot_is_listed_as_deleted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lot.is_deleted = True
+            self.lot.save()
+        data = self._delta()
+        self.assertEqual(data["lots"], [])
+        self.assertEqual(data["deleted_lots"], [self.lot.pk])
+
+    def test_a_lot_moved_to_another_auction_is_gone_from_this_one(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lot.auction = self.online_auction
+            self.lot.save()
+        self.assertEqual(self._delta()["deleted_lots"], [self.lot.pk])
+
+    def test_a_removed_bidder_is_listed_as_deleted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            tos = AuctionTOS.objects.create(
+                auction=self.in_person_auction,
+                pickup_location=self.in_person_location,
+                name="Brief",
+                bidder_number="950",
+            )
+        self.cursor = self._get().json()["cursor"]
+        with self.captureOnCommitCallbacks(execute=True):
+            tos.delete()
+        self.assertEqual(self._delta()["deleted_users"], [tos.pk])
+
+    def test_an_invoice_changing_status_sends_its_bidder_again(self):
+        tos = self.admin_in_person_tos
+        with self.captureOnCommitCallbacks(execute=True):
+            invoice = Invoice.objects.create(auctiontos_user=tos, auction=self.in_person_auction, status="DRAFT")
+        self.cursor = self._get().json()["cursor"]
+        with self.captureOnCommitCallbacks(execute=True):
+            invoice.status = "PAID"
+            invoice.save()
+        self.assertEqual([(user["pk"], user["invoice_status"]) for user in self._delta()["users"]], [(tos.pk, "PAID")])
+
+    def test_a_save_that_changes_nothing_shown_moves_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lot.label_printed = True
+            self.lot.save(update_fields=["label_printed"])
+        self.assertEqual(self._get().json()["cursor"], self.cursor)
+
+    def test_a_cursor_from_another_auction_gets_everything(self):
+        data = self._get(since=f"{self.online_auction.pk}:1").json()
+        self.assertFalse(data["delta"])
+        self.assertIn(self.other_lot.pk, {lot["pk"] for lot in data["lots"]})
+
+    def test_a_cursor_from_the_future_gets_everything(self):
+        self.assertFalse(self._get(since=f"{self.in_person_auction.pk}:999999999").json()["delta"])
+
+    def test_an_unchanged_snapshot_is_a_304(self):
+        etag = self._get(since=self.cursor)["ETag"]
+        self.assertEqual(self._get(since=self.cursor, headers={"HTTP_IF_NONE_MATCH": etag}).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lot.quantity = 3
+            self.lot.save()
+        self.assertEqual(self._get(since=self.cursor, headers={"HTTP_IF_NONE_MATCH": etag}).status_code, 200)
+
+    def test_columns_layout(self):
+        data = self._get(layout="columns").json()
+        columns = data["lots"]["columns"]
+        row = next(row for row in data["lots"]["rows"] if row[columns.index("pk")] == self.lot.pk)
+        self.assertEqual(row[columns.index("lot_name")], "Delta lot")
+        self.assertEqual(data["users"]["columns"][0], "pk")
+
+    def test_an_unknown_layout_is_400(self):
+        self.assertEqual(self._get(layout="xml").status_code, 400)
+
+    def test_brotli_and_gzip(self):
+        plain = self._get().json()
+        for encoding, decompress in (("br", brotli.decompress), ("gzip", gzip.decompress)):
+            response = self._get(headers={"HTTP_ACCEPT_ENCODING": f"{encoding}, identity"})
+            self.assertEqual(response["Content-Encoding"], encoding)
+            self.assertIn("Accept-Encoding", response["Vary"])
+            data = json.loads(decompress(response.content))
+            self.assertEqual(data["lots"], plain["lots"])
+
+    def test_sync_answers_with_a_delta_when_given_a_cursor(self):
+        payload = {"auction": self.in_person_auction.slug, "ops": [], "since": self.cursor}
+        response = self.client.post(
+            reverse("mobile-offline-sync"),
+            data=json.dumps(payload),
+            content_type="application/json",
+            **_bearer(self.admin_user),
+        )
+        self.assertTrue(response.json()["snapshot"]["delta"])
+
+
 class MobileOfflineSyncTests(StandardTestCase):
     def setUp(self):
         super().setUp()
@@ -589,3 +735,79 @@ class MobileOfflineSyncTests(StandardTestCase):
         }
         self._post(self.admin_user, [op])
         self.assertFalse(MobileOfflineOp.objects.filter(op_id="nc1").exists())
+
+    # -- batching -------------------------------------------------------------
+
+    def test_ledger_is_read_once_per_batch(self):
+        def ledger_reads(count):
+            ops = [
+                {"op_id": f"q{count}-{i}", "type": "add_user", "bidder_number": "", "name": f"Walk-in {i}"}
+                for i in range(count)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                offline.apply_ops(self.auction, self.admin_user, ops)
+            return len([q for q in queries if "auctions_mobileofflineop" in q["sql"] and q["sql"].startswith("SELECT")])
+
+        self.assertEqual(ledger_reads(2), ledger_reads(8))
+        self.assertEqual(MobileOfflineOp.objects.filter(op_id__startswith="q8-").count(), 8)
+
+    def test_an_op_another_sync_applied_meanwhile_is_not_applied_again(self):
+        prefetch = offline._OpApplier.prefetch
+
+        def racing_prefetch(applier, ops):
+            prefetch(applier, ops)
+            # the same queue, resent, got there between this batch's load and its apply
+            MobileOfflineOp.objects.create(
+                op_id="race1",
+                auction=self.auction,
+                user=self.admin_user,
+                op_type="add_user",
+                result_data={"bidder_number": "91"},
+            )
+
+        op = {"op_id": "race1", "type": "add_user", "bidder_number": "91", "name": "Twice"}
+        with patch.object(offline._OpApplier, "prefetch", racing_prefetch):
+            results = offline.apply_ops(self.auction, self.admin_user, [op])
+        self.assertEqual(results[0]["status"], "already_applied")
+        self.assertEqual(results[0]["bidder_number"], "91")
+        self.assertFalse(AuctionTOS.objects.filter(auction=self.auction, name="Twice").exists())
+
+    def test_a_bidder_added_in_the_batch_is_found_by_number(self):
+        ops = [
+            {
+                "op_id": "n_u",
+                "type": "add_user",
+                "bidder_number": "90",
+                "name": "Door",
+                "email": "",
+                "phone_number": "",
+            },
+            {
+                "op_id": "n_l",
+                "type": "add_lot",
+                "seller": "90",
+                "lot_number": "330",
+                "lot_name": "Plant",
+                "quantity": 1,
+            },
+            {"op_id": "n_w", "type": "set_winner", "lot": "330", "winner": "90", "winning_price": "3"},
+            {"op_id": "n_again", "type": "set_winner", "lot": "330", "winner": "90", "winning_price": "4"},
+        ]
+        results = self._results_by_id(self._post(self.admin_user, ops))
+        self.assertEqual([results[op["op_id"]]["status"] for op in ops[:3]], ["applied"] * 3)
+        # the lot sold by the op before is sold for this one
+        self.assertEqual(results["n_again"]["conflict"], "winner_conflict")
+
+    def test_one_invoice_for_a_seller_with_many_lots(self):
+        seller = AuctionTOS.objects.create(
+            auction=self.auction, pickup_location=self.in_person_location, name="Busy", bidder_number="62"
+        )
+        ops = [
+            {"op_id": f"many{i}", "type": "add_lot", "seller": "62", "lot_name": f"Lot {i}", "quantity": 1}
+            for i in range(3)
+        ]
+        self._post(self.admin_user, ops)
+        self.assertEqual(Invoice.objects.filter(auctiontos_user=seller).count(), 1)
+        self.assertEqual(
+            self.auction.auctionhistory_set.filter(action="Bulk added 1 lots for Busy", user=self.admin_user).count(), 3
+        )
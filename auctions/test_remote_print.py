@@ -13,7 +13,10 @@ from inside any of them.
 """
 
 import datetime
+import io
+import json
 import uuid
+import zipfile
 from unittest.mock import patch
 
 from django.test import TestCase, override_settings
@@ -24,6 +27,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from auctions.mobile.services import remote_print
 from auctions.models import Lot, MobileDevice, RemotePrintJob, UserLabelPrefs
 from auctions.notifications import SEND_ERROR, SEND_OK
+from auctions.test_support import isolated_cache
 from auctions.tests import StandardTestCase
 
 APP_UA = "FishAuctionsApp/1.0 (Flutter; iOS)"
@@ -118,6 +122,19 @@ class HeartbeatTests(RemotePrintBase):
         self.assertFalse(self.device.print_ready)
         self.assertTrue(self.device.ever_print_ready)
 
+    def test_heartbeat_records_the_label_size(self):
+        self._beat(print_ready=True, label_resolution="576x384", label_dpi=203)
+        self.device.refresh_from_db()
+        self.assertEqual((self.device.label_resolution, self.device.label_dpi), ("576x384", 203))
+
+    def test_a_label_size_the_label_endpoint_refuses_is_not_kept(self):
+        """Presence matters more than drawing ahead, so the beat still counts."""
+        response = self._beat(print_ready=True, label_resolution="99999x1", label_dpi=203)
+        self.assertEqual(response.status_code, 204)
+        self.device.refresh_from_db()
+        self.assertTrue(self.device.print_ready)
+        self.assertEqual((self.device.label_resolution, self.device.label_dpi), ("", None))
+
     def test_requires_authentication(self):
         response = self.client.post(
             reverse("mobile-device-heartbeat"),
@@ -287,6 +304,37 @@ class DispatchTests(RemotePrintBase):
         job.refresh_from_db()
         self.assertEqual(job.status, RemotePrintJob.STATUS_SENT)
 
+    def test_push_says_where_the_bundle_is_and_starts_drawing_it(self):
+        with (
+            patch("auctions.mobile.services.remote_print.send_fcm_data_message", return_value=SEND_OK) as send,
+            patch("auctions.tasks.build_remote_print_bundle.delay") as build,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            job = remote_print.start(self.user, [lot.pk for lot in self.lots])
+        self.assertEqual(
+            send.call_args[0][1]["bundle"], reverse("mobile-printjob-bundle", kwargs={"job_uuid": job.uuid})
+        )
+        build.assert_called_once_with(str(job.uuid), None, None)
+
+    def test_nothing_is_drawn_when_the_push_fails(self):
+        with (
+            patch("auctions.mobile.services.remote_print.send_fcm_data_message", return_value=SEND_ERROR),
+            patch("auctions.tasks.build_remote_print_bundle.delay") as build,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            remote_print.start(self.user, [self.lots[0].pk])
+        build.assert_not_called()
+
+    def test_nothing_is_drawn_for_a_phone_that_cant_be_pushed_to(self):
+        self.device.fcm_token = ""
+        self.device.save()
+        with (
+            patch("auctions.tasks.build_remote_print_bundle.delay") as build,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            remote_print.start(self.user, [self.lots[0].pk])
+        build.assert_not_called()
+
     def test_missing_token_is_unreachable_at_once(self):
         """A failure already known must not become twenty seconds of spinner."""
         self.device.fcm_token = ""
@@ -314,7 +362,7 @@ class JobStatusViewTests(RemotePrintBase):
     def test_status_is_json(self):
         self.client.force_login(self.user)
         payload = self.client.get(self.status_url).json()
-        self.assertEqual(payload, {"status": "queued", "printed": 0, "total": 3, "message": None})
+        self.assertEqual(payload, {"status": "queued", "printed": 0, "rendered": 0, "total": 3, "message": None})
 
     def test_another_user_cannot_watch_the_job(self):
         self.client.force_login(self.user_with_no_lots)
@@ -486,6 +534,153 @@ class JobReportingTests(RemotePrintBase):
         self.assertEqual(response.status_code, 401)
 
 
+# ---------------------------------------------------------------------------
+# The bundle -- every label of a job in one download
+# ---------------------------------------------------------------------------
+
+
+@isolated_cache("remote-print-bundle")
+@patch("auctions.label_cache.RENDER_PROCESSES", 1)
+class JobBundleTests(RemotePrintBase):
+    def setUp(self):
+        super().setUp()
+        self.device.label_resolution = "384x240"
+        self.device.label_dpi = 203
+        self.device.save()
+        self.job = remote_print.create_job(self.user, [lot.pk for lot in reversed(self.lots)])
+        self.bundle_url = reverse("mobile-printjob-bundle", kwargs={"job_uuid": self.job.uuid})
+
+    def _open(self, content):
+        bundle = zipfile.ZipFile(io.BytesIO(content))
+        return bundle, json.loads(bundle.read("manifest.json"))
+
+    def test_a_job_is_drawn_at_the_devices_size(self):
+        self.assertEqual((self.job.label_resolution, self.job.label_dpi), ("384x240", 203))
+
+    def test_the_bundle_holds_every_label_in_print_order(self):
+        from PIL import Image
+
+        bundle, manifest = self._open(remote_print.build_bundle(self.job))
+        self.assertEqual([label["lot"] for label in manifest["labels"]], self.job.lots)
+        self.assertEqual((manifest["resolution"], manifest["dpi"]), ("384x240", 203))
+        image = Image.open(io.BytesIO(bundle.read(manifest["labels"][0]["file"])))
+        self.assertEqual(image.size, (384, 240))
+
+    def test_drawing_is_counted_on_the_job_without_moving_the_silence_clock(self):
+        RemotePrintJob.objects.filter(pk=self.job.pk).update(status=RemotePrintJob.STATUS_SENT)
+        before = RemotePrintJob.objects.get(pk=self.job.pk).updated_at
+        with patch("auctions.mobile.services.remote_print.BUNDLE_CHUNK", 1):
+            remote_print.build_bundle(self.job)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.rendered_count, 3)
+        self.assertEqual(self.job.updated_at, before)
+
+    def test_each_chunk_is_announced_to_the_waiting_page(self):
+        with (
+            patch("auctions.mobile.services.remote_print.BUNDLE_CHUNK", 1),
+            patch("auctions.models.UserData.send_websocket_message") as send,
+        ):
+            remote_print.build_bundle(self.job)
+        self.assertEqual([call.args[0]["rendered"] for call in send.call_args_list], [1, 2, 3])
+        self.assertEqual(send.call_args.args[0]["type"], "print_job")
+        self.assertEqual(send.call_args.args[0]["job"], str(self.job.uuid))
+
+    def test_a_lot_deleted_since_is_skipped_not_fatal(self):
+        Lot.objects.filter(pk=self.lots[1].pk).update(is_deleted=True)
+        _bundle, manifest = self._open(remote_print.build_bundle(self.job))
+        self.assertEqual(manifest["skipped"], [self.lots[1].pk])
+        self.assertEqual(len(manifest["labels"]), 2)
+
+    def test_the_phone_downloads_the_bundle_already_drawn(self):
+        content = remote_print.build_bundle(self.job)
+        with patch("auctions.mobile.services.remote_print.build_bundle") as build:
+            response = self.client.get(self.bundle_url, **_bearer(self.user))
+        build.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        self.assertEqual(response.content, content)
+
+    def test_a_small_bundle_at_a_size_no_worker_draws_is_drawn_on_the_spot(self):
+        response = self.client.get(self.bundle_url, {"resolution": "200x100", "dpi": "300"}, **_bearer(self.user))
+        self.assertEqual(response.status_code, 200)
+        _bundle, manifest = self._open(response.content)
+        self.assertEqual((manifest["resolution"], manifest["dpi"]), ("200x100", 300))
+        self.assertEqual(remote_print.cached_bundle(self.job, "200x100", "300"), response.content)
+
+    def test_a_bundle_the_worker_is_drawing_is_not_drawn_again(self):
+        with patch("auctions.tasks.build_remote_print_bundle.delay"), self.captureOnCommitCallbacks(execute=True):
+            remote_print.queue_bundle(self.job)
+        with patch("auctions.mobile.services.remote_print.build_bundle") as build:
+            response = self.client.get(self.bundle_url, **_bearer(self.user))
+        build.assert_not_called()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response["Retry-After"], "2")
+        self.assertEqual(response.json()["total"], 3)
+
+    def test_a_missing_bundle_at_the_devices_size_is_queued_once(self):
+        with (
+            patch("auctions.tasks.build_remote_print_bundle.delay") as build,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            first = self.client.get(self.bundle_url, **_bearer(self.user))
+            second = self.client.get(self.bundle_url, **_bearer(self.user))
+        self.assertEqual((first.status_code, second.status_code), (202, 202))
+        build.assert_called_once_with(str(self.job.uuid), None, None)
+
+    def test_a_large_bundle_at_another_size_goes_to_the_worker(self):
+        params = {"resolution": "200x100", "dpi": "300"}
+        with (
+            patch("auctions.mobile.services.remote_print.INLINE_MAX_LABELS", 2),
+            patch("auctions.tasks.build_remote_print_bundle.delay") as build,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            response = self.client.get(self.bundle_url, params, **_bearer(self.user))
+        self.assertEqual(response.status_code, 202)
+        build.assert_called_once_with(str(self.job.uuid), "200x100", "300")
+
+    def test_a_finished_build_is_no_longer_in_progress(self):
+        with patch("auctions.tasks.build_remote_print_bundle.delay"), self.captureOnCommitCallbacks(execute=True):
+            remote_print.queue_bundle(self.job)
+        remote_print.build_bundle(self.job)
+        self.assertFalse(remote_print.is_building(self.job))
+        self.assertEqual(self.client.get(self.bundle_url, **_bearer(self.user)).status_code, 200)
+
+    def test_the_worker_draws_without_starting_a_render_pool(self):
+        with (
+            patch("auctions.label_cache.RENDER_PROCESSES", 4),
+            patch("auctions.label_cache._may_start_processes", return_value=False),
+            patch("auctions.label_cache._get_pool") as pool,
+        ):
+            _bundle, manifest = self._open(remote_print.build_bundle(self.job))
+        pool.assert_not_called()
+        self.assertEqual(len(manifest["labels"]), 3)
+
+    def test_a_bad_size_is_400(self):
+        response = self.client.get(self.bundle_url, {"resolution": "huge"}, **_bearer(self.user))
+        self.assertEqual(response.status_code, 400)
+
+    def test_another_users_bundle_is_404(self):
+        self.assertEqual(self.client.get(self.bundle_url, **_bearer(self.user_with_no_lots)).status_code, 404)
+
+    def test_the_task_leaves_a_cancelled_job_alone(self):
+        from auctions.tasks import build_remote_print_bundle
+
+        RemotePrintJob.objects.filter(pk=self.job.pk).update(status=RemotePrintJob.STATUS_CANCELLED)
+        with patch("auctions.mobile.services.remote_print.build_bundle") as build:
+            build_remote_print_bundle(str(self.job.uuid))
+        build.assert_not_called()
+
+    def test_progress_from_the_phone_is_announced_too(self):
+        with patch("auctions.models.UserData.send_websocket_message") as send:
+            self.client.post(
+                reverse("mobile-printjob-progress", kwargs={"job_uuid": self.job.uuid}),
+                {"printed": 1, "total": 3},
+                content_type="application/json",
+                **_bearer(self.user),
+            )
+        self.assertEqual(send.call_args.args[0]["printed"], 1)
+
+
 class JobIsolationTests(RemotePrintBase):
     """A job uuid is unguessable; a 403 would only confirm that somebody else's exists."""
 
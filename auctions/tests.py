@@ -13,18 +13,22 @@ from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 from django import forms
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ImproperlyConfigured, ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Count, Q
 from django.test import TestCase, TransactionTestCase, override_settings
 from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
 from fishauctions._env import parse_bool_env, require_secure_prod_secrets
 
-from . import brevo
+from . import account_jobs, brevo, club_ledger, history_archive, page_view_rollups, sync_outbox
 from . import mailchimp as mc
 from .email_routing import resolve_routed_recipient
 from .filters import LotAdminFilter
@@ -37,8 +41,10 @@ from .forms import (
     CustomResetPasswordForm,
     CustomSignupForm,
 )
+from .lot_tiles import load_lot_tiles
 from .models import (
     PRIVACY_POLICY_SLUG,
+    AccountJob,
     Auction,
     AuctionCampaign,
     AuctionDropdown,
@@ -46,9 +52,12 @@ from .models import (
     AuctionIgnore,
     AuctionTOS,
     BapAward,
+    BapMonthlyPoints,
     Bid,
+    BidderMetrics,
     BlogPost,
     Category,
+    CategoryKeyword,
     ChatSubscription,
     Club,
     ClubAPIKey,
@@ -57,6 +66,7 @@ from .models import (
     ClubHistory,
     ClubMember,
     ClubMoney,
+    ClubMoneyPeriod,
     CommandPalettePage,
     CommandPaletteSearch,
     Invoice,
@@ -64,14 +74,18 @@ from .models import (
     InvoicePayment,
     Lot,
     LotHistory,
+    LotHistoryArchive,
+    LotHistorySummary,
     LotImage,
     LotQueueEntry,
     PageView,
+    PageViewRollup,
     PayPalSeller,
     PickupLocation,
     SearchHistory,
     Species,
     SquareSeller,
+    SyncOutbox,
     UserBan,
     UserData,
     UserIgnoreCategory,
@@ -79,7 +93,10 @@ from .models import (
     UserLabelPrefs,
     Watch,
     add_price_info,
+    add_tos_info,
+    guess_category,
 )
+from .request_cache import request_scope
 from .services import save_new_lot
 from .test_support import isolated_cache
 
@@ -357,6 +374,60 @@ class ViewLotTest(TestCase):
         self.assertContains(response, "River")
 
 
+@isolated_cache("lot-page-fragments")
+class LotPageFragmentCacheTests(TestCase):
+    """The images and description on the lot page are cached by Lot.render_stamp"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="seller", password="testpassword")
+        self.lot = Lot.objects.create(
+            lot_name="A cached lot",
+            date_end=timezone.now() + datetime.timedelta(days=3),
+            reserve_price=5,
+            user=self.user,
+            quantity=1,
+            summernote_description="<p>First description</p>",
+        )
+        self.url = reverse("lot_by_pk", kwargs={"pk": self.lot.pk})
+
+    def stamp(self):
+        return Lot.objects.get(pk=self.lot.pk).render_stamp
+
+    def test_saving_the_lot_changes_the_stamp(self):
+        before = self.stamp()
+        self.lot.save(update_fields=["lot_name"])
+        self.assertNotEqual(self.stamp(), before)
+
+    def test_image_changes_change_the_stamp_of_lots_sharing_them(self):
+        sharing = Lot.objects.create(
+            lot_name="Shares images", reserve_price=5, quantity=1, use_images_from=self.lot, user=self.user
+        )
+        before = self.stamp()
+        sharing_before = Lot.objects.get(pk=sharing.pk).render_stamp
+        image = LotImage.objects.create(lot_number=self.lot, url="https://example.com/a.jpg", is_primary=True)
+        self.assertNotEqual(self.stamp(), before)
+        self.assertNotEqual(Lot.objects.get(pk=sharing.pk).render_stamp, sharing_before)
+        before = self.stamp()
+        image.delete()
+        self.assertNotEqual(self.stamp(), before)
+
+    def test_description_is_served_from_cache_until_the_lot_changes(self):
+        self.assertContains(self.client.get(self.url), "First description")
+        # Behind the lot's back: the stamp doesn't change, so the cached fragment is still shown
+        Lot.objects.filter(pk=self.lot.pk).update(summernote_description="<p>Second description</p>")
+        self.assertContains(self.client.get(self.url), "First description")
+        lot = Lot.objects.get(pk=self.lot.pk)
+        lot.save()
+        self.assertContains(self.client.get(self.url), "Second description")
+
+    def test_image_management_buttons_are_not_shared_with_other_viewers(self):
+        LotImage.objects.create(lot_number=self.lot, url="https://example.com/a.jpg", is_primary=True)
+        self.client.login(username="seller", password="testpassword")
+        self.assertContains(self.client.get(self.url), "Edit image")
+        self.client.logout()
+        self.assertNotContains(self.client.get(self.url), "Edit image")
+
+
 class AuctionModelTests(TestCase):
     """Test for the auction model, duh"""
 
@@ -717,6 +788,68 @@ class LotModelTests(TestCase):
         assert Bid.objects.filter(user=userA, lot_number=lot, is_deleted=False).count() == 2
 
 
+class GuessCategoryTests(TestCase):
+    """guess_category() ranks from the CategoryKeyword counts, which lot saves keep current."""
+
+    def setUp(self):
+        self.user = User.objects.create(username="Category teacher")
+        self.cichlids = Category.objects.create(name="Cichlids")
+        self.plants = Category.objects.create(name="Plants")
+
+    def make_lot(self, name, category, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Lot.objects.create(
+                lot_name=name,
+                species_category=category,
+                date_end=timezone.now() + datetime.timedelta(days=30),
+                reserve_price=5,
+                user=self.user,
+                quantity=1,
+                **kwargs,
+            )
+
+    def test_the_category_people_used_for_these_words_wins(self):
+        self.make_lot("Electric yellow cichlid", self.cichlids)
+        self.make_lot("Yellow lab cichlid", self.cichlids)
+        self.make_lot("Yellow ludwigia", self.plants)
+        self.assertEqual(guess_category("Cichlid trio, yellow"), self.cichlids)
+        self.assertEqual(guess_category("Ludwigia stems"), self.plants)
+        self.assertIsNone(guess_category("Sponge filter"))
+
+    def test_guessing_does_not_look_at_lots(self):
+        self.make_lot("Yellow lab cichlid", self.cichlids)
+        with self.assertNumQueries(2):
+            self.assertEqual(guess_category("Yellow lab"), self.cichlids)
+
+    def test_a_guessed_category_teaches_nothing(self):
+        self.make_lot("Java fern", self.plants, category_automatically_added=True)
+        self.assertFalse(CategoryKeyword.objects.exists())
+
+    def test_recategorising_a_lot_moves_its_counts(self):
+        lot = self.make_lot("Anubias nana", self.cichlids)
+        self.assertEqual(guess_category("anubias"), self.cichlids)
+        lot.species_category = self.plants
+        with self.captureOnCommitCallbacks(execute=True):
+            lot.save()
+        self.assertEqual(guess_category("anubias"), self.plants)
+        self.assertEqual(CategoryKeyword.objects.get(keyword="anubias", category=self.cichlids).lots, 0)
+
+    def test_deleting_a_lot_takes_its_counts_back(self):
+        lot = self.make_lot("Anubias nana", self.plants)
+        lot.is_deleted = True
+        with self.captureOnCommitCallbacks(execute=True):
+            lot.save()
+        self.assertIsNone(guess_category("anubias"))
+
+    def test_the_nightly_rebuild_catches_updates_that_skip_save(self):
+        lot = self.make_lot("Anubias nana", self.plants)
+        Lot.objects.filter(pk=lot.pk).update(species_category=self.cichlids)
+        self.assertEqual(guess_category("anubias"), self.plants)
+        call_command("rebuild_category_keywords", stdout=io.StringIO())
+        self.assertEqual(guess_category("anubias"), self.cichlids)
+        self.assertEqual(CategoryKeyword.objects.count(), 2)
+
+
 class LotModelConcurrencyTests(TransactionTestCase):
     """Tests that require real database transactions (not wrapped in TestCase transaction)"""
 
@@ -866,7 +999,7 @@ class LotModelConcurrencyTests(TransactionTestCase):
         )
         # Force the same lot_number_int to simulate a duplicate that slipped through
         lot2.lot_number_int = lot1.lot_number_int
-        # Use _do_save to bypass the locking mechanism for testing the duplicate detection logic
+        # Use _do_save to bypass the lot number reservation for testing the duplicate detection logic
         # This is intentional to test the post-save duplicate check that catches edge cases
         lot2._do_save()
 
@@ -927,7 +1060,7 @@ class LotModelConcurrencyTests(TransactionTestCase):
         )
         # Force the same custom_lot_number to simulate a duplicate that slipped through
         lot2.custom_lot_number = lot1.custom_lot_number
-        # Use _do_save to bypass the locking mechanism for testing the duplicate detection logic
+        # Use _do_save to bypass the lot number reservation for testing the duplicate detection logic
         # This is intentional to test the post-save duplicate check that catches edge cases
         lot2._do_save()
 
@@ -1012,6 +1145,69 @@ class LotModelConcurrencyTests(TransactionTestCase):
         self.assertEqual(lot2.lot_number_display, "KM-8-2")
         self.assertEqual(lot3.lot_number_display, "AB-12-1")
 
+    def test_lot_numbers_continue_after_the_highest_number_used(self):
+        """The auction's sequence starts after every number already in it, deleted lots included."""
+        user = User.objects.create(username="Test user")
+        auction = Auction.objects.create(
+            title="Test Auction",
+            date_start=timezone.now(),
+            date_end=timezone.now() + datetime.timedelta(days=7),
+            created_by=user,
+        )
+        old = Lot.objects.create(lot_name="Old lot", auction=auction, user=user, quantity=1, reserve_price=5)
+        Lot.objects.filter(pk=old.pk).update(lot_number_int=41, is_deleted=True)
+        Auction.objects.filter(pk=auction.pk).update(lot_number_sequence=None)
+        auction.refresh_from_db()
+
+        lot = Lot.objects.create(lot_name="New lot", auction=auction, user=user, quantity=1, reserve_price=5)
+        self.assertEqual(lot.lot_number_int, 42)
+        auction.refresh_from_db()
+        self.assertEqual(auction.lot_number_sequence, 42)
+
+    def test_a_batch_of_new_lots_reserves_its_numbers_in_one_go(self):
+        from auctions.models import AuctionTOS, PickupLocation
+        from auctions.services import number_new_lots
+
+        user = User.objects.create(username="Test user")
+        auction = Auction.objects.create(
+            title="Test Auction with Seller Dash",
+            date_start=timezone.now(),
+            date_end=timezone.now() + datetime.timedelta(days=7),
+            created_by=user,
+            use_seller_dash_lot_numbering=True,
+        )
+        location = PickupLocation.objects.create(name="Test Location", user=user)
+        seller = AuctionTOS.objects.create(user=user, auction=auction, pickup_location=location, bidder_number="7")
+        Lot.objects.create(
+            lot_name="Already here", auction=auction, user=user, auctiontos_seller=seller, quantity=1, reserve_price=5
+        )
+        lots = [
+            Lot(lot_name=f"Lot {i}", auction=auction, user=user, auctiontos_seller=seller, quantity=1, reserve_price=5)
+            for i in range(3)
+        ]
+        with self.assertNumQueries(4):  # a locked read and a bump, for the auction and for the seller
+            number_new_lots(lots, auction=auction, tos=seller)
+        self.assertEqual([lot.lot_number_int for lot in lots], [2, 3, 4])
+        self.assertEqual([lot.custom_lot_number for lot in lots], ["7-2", "7-3", "7-4"])
+        for lot in lots:
+            lot.save()
+        self.assertEqual(
+            sorted(auction.lots_qs.values_list("custom_lot_number", flat=True)), ["7-1", "7-2", "7-3", "7-4"]
+        )
+
+    def test_a_number_given_by_hand_is_not_handed_out_again(self):
+        user = User.objects.create(username="Test user")
+        auction = Auction.objects.create(
+            title="Test Auction",
+            date_start=timezone.now(),
+            date_end=timezone.now() + datetime.timedelta(days=7),
+            created_by=user,
+        )
+        Lot.objects.create(lot_name="First", auction=auction, user=user, quantity=1, reserve_price=5)
+        auction.note_lot_number(10)
+        lot = Lot.objects.create(lot_name="Next", auction=auction, user=user, quantity=1, reserve_price=5)
+        self.assertEqual(lot.lot_number_int, 11)
+
 
 class ChatSubscriptionTests(TestCase):
     def test_chat_subscriptions(self):
@@ -1211,6 +1407,135 @@ class ChatSubscriptionTests(TestCase):
         assert lot_owner_data.unnotified_subscriptions_count == 0
 
 
+class LotHistoryArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="archived_chatter")
+        self.long_ago = timezone.now() - datetime.timedelta(days=settings.LOT_HISTORY_ARCHIVE_DAYS + 30)
+        self.old_lot = self._lot("old lot", self.long_ago, active=False)
+        self.new_lot = self._lot("new lot", timezone.now() + datetime.timedelta(days=1))
+        self.old_rows = [
+            self._history(self.old_lot, "first", self.long_ago - datetime.timedelta(hours=3)),
+            self._history(self.old_lot, "bid", self.long_ago - datetime.timedelta(hours=2), changed_price=True),
+            self._history(self.old_lot, "last", self.long_ago - datetime.timedelta(hours=1)),
+            self._history(self.old_lot, "removed", self.long_ago, removed=True),
+        ]
+        self._history(self.new_lot, "still live", self.long_ago)
+
+    def _lot(self, name, date_end, active=True):
+        return Lot.objects.create(
+            lot_name=name, date_end=date_end, reserve_price=5, user=self.user, quantity=1, active=active
+        )
+
+    def _history(self, lot, message, timestamp, **kwargs):
+        history = LotHistory.objects.create(lot=lot, user=self.user, message=message, **kwargs)
+        LotHistory.objects.filter(pk=history.pk).update(timestamp=timestamp)
+        return history
+
+    def test_archive_moves_ended_lots_only(self):
+        self.assertEqual(history_archive.archive(), 1)
+        self.assertFalse(LotHistory.objects.filter(lot=self.old_lot).exists())
+        self.assertTrue(LotHistory.objects.filter(lot=self.new_lot).exists())
+        self.assertEqual(
+            set(LotHistoryArchive.objects.filter(lot=self.old_lot).values_list("pk", flat=True)),
+            {row.pk for row in self.old_rows},
+        )
+        summary = self.old_lot.history_summary
+        self.assertEqual((summary.chat_count, summary.bid_count), (2, 1))
+        self.assertEqual(summary.last_message, "last")
+        self.assertEqual(history_archive.archive(), 0)
+
+    def test_later_rows_add_to_the_summary(self):
+        history_archive.archive()
+        self._history(self.old_lot, "later", self.long_ago + datetime.timedelta(days=1))
+        history_archive.archive(now=timezone.now() + datetime.timedelta(days=2))
+        summary = LotHistorySummary.objects.get(lot=self.old_lot)
+        self.assertEqual((summary.chat_count, summary.last_message), (3, "later"))
+        chats = Count("lothistory", filter=Q(lothistory__changed_price=False, lothistory__removed=False))
+        annotated = Lot.objects.annotate(all_chats=history_archive.chat_count(chats)).get(pk=self.old_lot.pk)
+        self.assertEqual(annotated.all_chats, 3)
+
+    def test_recent_reads_both_tables(self):
+        history_archive.archive()
+        self._history(self.old_lot, "after archiving", timezone.now())
+        with self.assertNumQueries(2):
+            messages = [row.message for row in history_archive.recent(self.old_lot)]
+        self.assertEqual(messages, ["after archiving", "last", "bid", "first"])
+        self.assertEqual([row.message for row in history_archive.recent(self.old_lot, limit=2)], messages[:2])
+
+
+class PageViewRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="rollup_viewer")
+        self.auction = Auction.objects.create(
+            title="rollup auction",
+            is_online=True,
+            date_start=timezone.now() - datetime.timedelta(days=200),
+            date_end=timezone.now() - datetime.timedelta(days=190),
+        )
+        self.lot = Lot.objects.create(
+            lot_name="viewed lot", auction=self.auction, reserve_price=5, user=self.user, quantity=1
+        )
+        old = timezone.now() - datetime.timedelta(days=settings.PAGEVIEW_RETENTION_DAYS + 2)
+        old = old.replace(minute=10, second=0, microsecond=0)
+        self._view(old, user=self.user, total_time=10)
+        self._view(old + datetime.timedelta(minutes=5), total_time=20)
+        self._view(old + datetime.timedelta(hours=30), source="weekly_email")
+        self._view(timezone.now() - datetime.timedelta(minutes=10))
+
+    def _view(self, when, **kwargs):
+        view = PageView.objects.create(lot_number=self.lot, auction=self.auction, **kwargs)
+        PageView.objects.filter(pk=view.pk).update(date_start=when)
+        return view
+
+    def _fold_all(self):
+        while page_view_rollups.fold() == page_view_rollups.FOLD_HOURS:
+            pass
+
+    def test_fold_keeps_totals(self):
+        self._fold_all()
+        rollups = PageViewRollup.objects.filter(period=PageViewRollup.HOUR)
+        self.assertEqual(sum(rollups.values_list("views", flat=True)), 3)
+        first = rollups.get(source="")
+        self.assertEqual((first.views, first.signed_in_views, first.total_time), (2, 1, 30))
+        self.assertEqual(page_view_rollups.fold(), 0)
+        # the last view is too recent to fold, and is read from PageView
+        self.assertEqual(page_view_rollups.lot_views(self.lot), (4, 3))
+        self.assertEqual(page_view_rollups.count(*page_view_rollups.for_auction(self.auction)), 4)
+        self.assertEqual(self.auction.weekly_promo_email_clicks, 1)
+
+    def test_prune_only_deletes_folded_views(self):
+        self.assertEqual(page_view_rollups.prune(), 0)
+        page_view_rollups.fold()
+        # the first run folds a day, which leaves the third view out
+        self.assertEqual(page_view_rollups.prune(), 2)
+        self._fold_all()
+        self.assertEqual(page_view_rollups.prune(), 1)
+        self.assertEqual(PageView.objects.count(), 1)
+        self.assertEqual(page_view_rollups.lot_views(self.lot), (4, 3))
+
+    def test_compact_merges_old_hours_into_days(self):
+        # a day is only merged once the whole of it has been folded
+        self._view(timezone.now() - datetime.timedelta(hours=3))
+        self._fold_all()
+        page_view_rollups.compact()
+        hours = PageViewRollup.objects.filter(period=PageViewRollup.HOUR)
+        self.assertEqual(list(hours.values_list("views", flat=True)), [1])
+        days = PageViewRollup.objects.filter(period=PageViewRollup.DAY)
+        self.assertEqual(sum(days.values_list("views", flat=True)), 3)
+        self.assertEqual(page_view_rollups.lot_views(self.lot), (5, 4))
+
+    def test_a_page_of_lots_is_counted_in_two_queries(self):
+        self._fold_all()
+        unviewed = Lot.objects.create(lot_name="unviewed", auction=self.auction, reserve_price=5, quantity=1)
+        lots = list(Lot.objects.filter(pk__in=[self.lot.pk, unviewed.pk]).order_by("pk"))
+        with request_scope():
+            page_view_rollups.watermark()
+            with self.assertNumQueries(2):
+                page_view_rollups.load_lot_views(lots)
+                self.assertEqual([lot.page_views for lot in lots], [4, 0])
+                self.assertEqual([lot.anonymous_views for lot in lots], [3, 0])
+
+
 class InvoiceModelTests(StandardTestCase):
     def test_invoices(self):
         assert self.invoice.auction == self.online_auction
@@ -5986,6 +6311,48 @@ class UserDataMergeIntoTests(TestCase):
         self.assertTrue(PayPalSeller.objects.filter(user=self.target_user, paypal_merchant_id="paypal_123").exists())
         self.assertTrue(SquareSeller.objects.filter(user=self.target_user, square_merchant_id="square_123").exists())
 
+    def test_an_interrupted_merge_carries_on_where_it_stopped(self):
+        with (
+            patch.object(AuctionTOS, "merge_duplicate", side_effect=RuntimeError("lost the database")),
+            self.assertRaises(RuntimeError),
+        ):
+            self.source_user.userdata.merge_into(self.target_user)
+        job = AccountJob.objects.get(kind=AccountJob.MERGE, user=self.source_user)
+        self.assertEqual(job.steps_done, 3)
+        self.assertTrue(job.last_error.startswith("auction_tos"))
+        self.bid.refresh_from_db()
+        self.assertEqual(self.bid.user, self.target_user)
+        self.assertTrue(AuctionTOS.objects.filter(pk=self.source_tos.pk).exists())
+
+        target_userdata = self.source_user.userdata.merge_into(self.target_user)
+        job.refresh_from_db()
+        self.assertIsNotNone(job.finished_on)
+        self.assertFalse(AuctionTOS.objects.filter(pk=self.source_tos.pk).exists())
+        # the credit moved once, not once per attempt
+        self.assertEqual(target_userdata.credit, Decimal("10.00"))
+
+    def test_a_job_another_worker_holds_is_left_alone(self):
+        job = account_jobs.start(AccountJob.MERGE, self.source_user, self.target_user)
+        AccountJob.objects.filter(pk=job.pk).update(leased_until=timezone.now() + account_jobs.LEASE)
+        with self.assertRaises(account_jobs.JobBusyError):
+            self.source_user.userdata.merge_into(self.target_user)
+        self.assertFalse(account_jobs.resumable().exists())
+        self.bid.refresh_from_db()
+        self.assertEqual(self.bid.user, self.source_user)
+
+    def test_a_job_that_keeps_failing_stops_being_retried(self):
+        with patch.object(AuctionTOS, "merge_duplicate", side_effect=RuntimeError("bad row")):
+            for _ in range(account_jobs.MAX_ATTEMPTS - 1):
+                with self.assertRaises(RuntimeError):
+                    self.source_user.userdata.merge_into(self.target_user)
+            self.assertTrue(account_jobs.resumable().exists())
+            with self.assertRaises(RuntimeError), self.assertLogs("auctions.account_jobs", "ERROR"):
+                self.source_user.userdata.merge_into(self.target_user)
+        self.assertFalse(account_jobs.resumable().exists())
+        job = AccountJob.objects.get(kind=AccountJob.MERGE, user=self.source_user)
+        self.assertEqual(job.attempts, account_jobs.MAX_ATTEMPTS)
+        self.assertIsNone(job.finished_on)
+
     def test_management_command_calls_merge_into(self):
         out = io.StringIO()
 
@@ -6057,6 +6424,45 @@ class AuctionViewPermissionTests(StandardTestCase):
         self.assertNotContains(response, old_bulk_add_url)
 
 
+class AuctionPermissionRequestCacheTests(StandardTestCase):
+    """permission_check and tos_for_user are looked up once per request_scope, and forgotten on change"""
+
+    def test_permission_check_is_remembered_within_a_scope(self):
+        with request_scope():
+            self.assertTrue(self.online_auction.permission_check(self.admin_user))
+            with self.assertNumQueries(0):
+                self.assertTrue(self.online_auction.permission_check(self.admin_user))
+
+    def test_nothing_is_remembered_outside_a_scope(self):
+        self.online_auction.permission_check(self.user_with_no_lots)
+        with self.assertNumQueries(1):
+            self.assertFalse(self.online_auction.permission_check(self.user_with_no_lots))
+
+    def test_saving_a_tos_forgets_the_answer(self):
+        with request_scope():
+            self.assertFalse(self.online_auction.permission_check(self.user_with_no_lots))
+            self.tosC.is_admin = True
+            self.tosC.save()
+            self.assertTrue(self.online_auction.permission_check(self.user_with_no_lots))
+
+    def test_tos_for_user_and_admin_pks_are_remembered(self):
+        with request_scope():
+            tos = self.online_auction.tos_for_user(self.userB)
+            admins = self.online_auction.auction_admins_pks
+            with self.assertNumQueries(0):
+                self.assertEqual(self.online_auction.tos_for_user(self.userB), tos)
+                self.assertEqual(self.online_auction.auction_admins_pks, admins)
+        self.assertEqual(tos, self.tosB)
+        self.assertIn(self.admin_user.pk, admins)
+
+    def test_each_request_starts_fresh(self):
+        self.client.login(username=self.user_with_no_lots.username, password="testpassword")
+        self.assertNotEqual(self.client.get(self.online_auction.get_edit_url()).status_code, 200)
+        self.tosC.is_admin = True
+        self.tosC.save()
+        self.assertEqual(self.client.get(self.online_auction.get_edit_url()).status_code, 200)
+
+
 class AuctionEditViewTests(StandardTestCase):
     """Test auction edit view with different user types"""
 
@@ -6556,6 +6962,70 @@ class LotListViewTests(StandardTestCase):
         self.assertContains(response, f'"query": "seller:{self.online_tos.bidder_number}"')
 
 
+class LotTileLoaderTests(StandardTestCase):
+    """load_lot_tiles() must give the tile templates the same answers as the per-lot properties"""
+
+    def open_lot(self, name, seller=None):
+        return Lot.objects.create(
+            lot_name=name,
+            auction=self.online_auction,
+            user=seller or self.user,
+            quantity=1,
+            reserve_price=5,
+            date_end=timezone.now() + datetime.timedelta(days=1),
+        )
+
+    def test_bids_match_the_per_lot_query(self):
+        lot = self.open_lot("Bid on lot")
+        Bid.objects.create(user=self.userB, lot_number=lot, amount=20)
+        Bid.objects.create(user=self.userB, lot_number=lot, amount=8)  # latest bid is the one that counts
+        Bid.objects.create(user=self.user_with_no_lots, lot_number=lot, amount=12)
+        Bid.objects.create(user=self.admin_user, lot_number=lot, amount=3)  # under the reserve
+        fresh = Lot.objects.get(pk=lot.pk)
+        (loaded,) = load_lot_tiles(Lot.objects.filter(pk=lot.pk))
+        self.assertEqual([b.pk for b in loaded.bids], [b.pk for b in fresh.bids])
+        self.assertEqual(loaded.high_bid, fresh.high_bid)
+        self.assertEqual(loaded.high_bidder, self.user_with_no_lots)
+        self.assertEqual(loaded.high_bidder_display, fresh.high_bidder_display)
+
+    def test_thumbnail_prefers_the_lots_own_image_then_an_auto_image(self):
+        pictured = self.open_lot("Pictured lot")
+        image = LotImage.objects.create(lot_number=pictured, url="https://example.com/a.jpg", is_primary=True)
+        borrows = self.open_lot("Borrowing lot")
+        borrows.use_images_from = pictured
+        borrows.save()
+        older = self.open_lot("Common fish", seller=self.userB)
+        auto = LotImage.objects.create(lot_number=older, url="https://example.com/b.jpg", is_primary=True)
+        unpictured = self.open_lot("Common fish")
+        nothing = self.open_lot("Nobody has this")
+        loaded = {
+            lot.pk: lot
+            for lot in load_lot_tiles(Lot.objects.filter(pk__in=[pictured.pk, borrows.pk, unpictured.pk, nothing.pk]))
+        }
+        self.assertEqual(loaded[pictured.pk].thumbnail, image)
+        self.assertEqual(loaded[borrows.pk].thumbnail, image)
+        self.assertEqual(loaded[unpictured.pk].thumbnail, auto)
+        self.assertEqual(Lot.objects.get(pk=unpictured.pk).thumbnail, auto)
+        self.assertIsNone(loaded[nothing.pk].thumbnail)
+
+    def test_a_page_of_lots_costs_the_same_queries_as_one_lot(self):
+        def page_cost(count):
+            lots = []
+            for i in range(count):
+                lot = self.open_lot(f"Tile {count} {i}")
+                Bid.objects.create(user=self.userB, lot_number=lot, amount=10)
+                lots.append(lot.pk)
+            with CaptureQueriesContext(connection) as queries:
+                tiles = [
+                    (lot.thumbnail, lot.high_bid, lot.high_bidder_display, lot.currency_symbol, lot.seller_as_str)
+                    for lot in load_lot_tiles(Lot.objects.filter(pk__in=lots))
+                ]
+            self.assertEqual(len(tiles), count)
+            return len(queries)
+
+        self.assertEqual(page_cost(20), page_cost(1))
+
+
 class MyLotsViewTests(StandardTestCase):
     """Test my lots view with different user types"""
 
@@ -10425,6 +10895,55 @@ class HasEverGrantedPermissionTests(StandardTestCase):
         self.assertFalse(tos.has_ever_granted_permission)
 
 
+class BidderMetricsTests(StandardTestCase):
+    """The bid and lot-view counts add_tos_info() reads are kept current as bids and views happen"""
+
+    def metrics(self, user=None):
+        row = BidderMetrics.objects.filter(auction=self.online_auction, user=user or self.userB).first()
+        return (row.lots_bid, row.lots_viewed) if row else None
+
+    def trust_info(self):
+        return add_tos_info(AuctionTOS.objects.filter(pk=self.tosB.pk)).get()
+
+    def test_bids_and_first_views_are_counted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Bid.objects.create(user=self.userB, lot_number=self.lot, amount=5)
+        self.assertEqual(self.metrics(), (1, 0))
+        with self.captureOnCommitCallbacks(execute=True):
+            Bid.objects.create(user=self.userB, lot_number=self.lot, amount=6)
+            PageView.objects.create(user=self.userB, lot_number=self.lot)
+        with self.captureOnCommitCallbacks(execute=True):
+            PageView.objects.create(user=self.userB, lot_number=self.lot)
+            PageView.objects.create(user=self.userB, lot_number=self.lotB)
+        self.assertEqual(self.metrics(), (2, 2))
+        info = self.trust_info()
+        self.assertEqual((info.lots_bid, info.lots_viewed), (2, 2))
+
+    def test_deleting_a_bid_recounts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            bid = Bid.objects.create(user=self.userB, lot_number=self.lot, amount=5)
+            Bid.objects.create(user=self.userB, lot_number=self.lotB, amount=5)
+        with self.captureOnCommitCallbacks(execute=True):
+            bid.delete()
+        self.assertEqual(self.metrics(), (1, 0))
+
+    def test_reconcile_puts_right_what_saves_cannot_see(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Bid.objects.create(user=self.userB, lot_number=self.lot, amount=5)
+        Bid.objects.filter(user=self.userB).update(is_deleted=True)
+        self.assertEqual(self.metrics(), (1, 0))
+        call_command("reconcile_bidder_metrics", stdout=io.StringIO())
+        self.assertIsNone(self.metrics())
+        self.assertEqual(self.trust_info().lots_bid, 0)
+
+    def test_merging_users_moves_their_counts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Bid.objects.create(user=self.user_who_does_not_join, lot_number=self.lot, amount=5)
+            Bid.objects.create(user=self.userB, lot_number=self.lotB, amount=5)
+        self.user_who_does_not_join.userdata.merge_into(self.userB)
+        self.assertEqual(self.metrics(), (2, 0))
+
+
 class BulkAddLotsAutoTests(StandardTestCase):
     """Tests for the new auto-save bulk add lots functionality"""
 
@@ -15691,6 +16210,146 @@ class WeeklyPromoManagementCommandTests(StandardTestCase):
             self.assertTrue(mock_send.called, "mail.send should be called when last promo was more than 6 days ago")
 
 
+class SendNotificationsCommandTests(StandardTestCase):
+    """sendnotifications: watchers of lots ending in the next two hours hear about it once."""
+
+    def setUp(self):
+        super().setUp()
+        # StandardTestCase's own auctions and lots ended days ago; keep them out of these runs.
+        Auction.objects.update(watch_warning_email_sent=True)
+        Lot.objects.update(watch_warning_email_sent=True)
+        self.ending = Auction.objects.create(
+            created_by=self.user,
+            title="Ending within the hour",
+            is_online=True,
+            date_start=timezone.now() - datetime.timedelta(days=3),
+            date_end=timezone.now() + datetime.timedelta(minutes=50),
+        )
+        self.later = Auction.objects.create(
+            created_by=self.user,
+            title="Ending tomorrow",
+            is_online=True,
+            date_start=timezone.now() - datetime.timedelta(days=3),
+            date_end=timezone.now() + datetime.timedelta(days=1),
+        )
+
+    def _lot(self, auction=None, **kwargs):
+        return Lot.objects.create(
+            lot_name="watched", auction=auction, user=self.user, quantity=1, reserve_price=5, **kwargs
+        )
+
+    def _run(self):
+        with patch("auctions.notifications.notify_user") as notify:
+            call_command("sendnotifications", stdout=io.StringIO())
+        return notify
+
+    def test_each_watcher_is_notified_once(self):
+        first, second = self._lot(self.ending), self._lot(self.ending)
+        Watch.objects.create(user=self.userB, lot_number=first)
+        Watch.objects.create(user=self.userB, lot_number=second)
+        Watch.objects.create(user=self.user_with_no_lots, lot_number=second)
+        notify = self._run()
+        self.assertEqual(
+            sorted(call.args[0].pk for call in notify.call_args_list),
+            sorted([self.userB.pk, self.user_with_no_lots.pk]),
+        )
+        self.ending.refresh_from_db()
+        self.assertTrue(self.ending.watch_warning_email_sent)
+        # and not again next time
+        self.assertFalse(self._run().called)
+
+    def test_deleted_and_banned_lots_and_later_auctions_are_left_out(self):
+        Watch.objects.create(user=self.userB, lot_number=self._lot(self.ending, is_deleted=True))
+        Watch.objects.create(user=self.userB, lot_number=self._lot(self.ending, banned=True))
+        Watch.objects.create(user=self.user_with_no_lots, lot_number=self._lot(self.later))
+        self.assertFalse(self._run().called)
+        self.later.refresh_from_db()
+        self.assertFalse(self.later.watch_warning_email_sent)
+
+    def test_a_lot_outside_any_auction(self):
+        lot = self._lot(date_end=timezone.now() + datetime.timedelta(minutes=30))
+        not_yet = self._lot(date_end=timezone.now() + datetime.timedelta(hours=5))
+        Watch.objects.create(user=self.userB, lot_number=lot)
+        Watch.objects.create(user=self.user_with_no_lots, lot_number=not_yet)
+        notify = self._run()
+        self.assertEqual([call.args[0].pk for call in notify.call_args_list], [self.userB.pk])
+        lot.refresh_from_db()
+        not_yet.refresh_from_db()
+        self.assertTrue(lot.watch_warning_email_sent)
+        self.assertFalse(not_yet.watch_warning_email_sent)
+
+    def test_queries_do_not_grow_with_lots_or_watches(self):
+        def queries_for(lot_count):
+            Auction.objects.filter(pk=self.ending.pk).update(watch_warning_email_sent=False)
+            for _ in range(lot_count):
+                Watch.objects.create(user=self.userB, lot_number=self._lot(self.ending))
+            with CaptureQueriesContext(connection) as queries:
+                self._run()
+            return len(queries)
+
+        self.assertEqual(queries_for(2), queries_for(20))
+
+
+class EmailUnseenChatsCommandTests(StandardTestCase):
+    """email_unseen_chats: one digest per user with unread chat, built from one query."""
+
+    def setUp(self):
+        super().setUp()
+        # Anything StandardTestCase chatted about has been seen already.
+        ChatSubscription.objects.update(last_seen=timezone.now(), last_notification_sent=timezone.now())
+
+    def _chat(self, lot, user):
+        """A message a minute ago, on a lot whose subscribers last looked an hour ago."""
+        an_hour_ago = timezone.now() - datetime.timedelta(hours=1)
+        ChatSubscription.objects.filter(lot=lot).update(last_seen=an_hour_ago, last_notification_sent=an_hour_ago)
+        history = LotHistory.objects.create(user=user, lot=lot, message="still available?", changed_price=False)
+        LotHistory.objects.filter(pk=history.pk).update(timestamp=timezone.now() - datetime.timedelta(minutes=1))
+
+    def _lot(self, user):
+        return Lot.objects.create(lot_name="chatty", user=user, quantity=1, reserve_price=5)
+
+    def _run(self):
+        with patch("post_office.mail.send") as send:
+            call_command("email_unseen_chats", stdout=io.StringIO())
+        return send
+
+    def test_digest_and_marked_notified(self):
+        mine = self._lot(self.userB)
+        theirs = self._lot(self.user)
+        ChatSubscription.objects.create(lot=theirs, user=self.userB)
+        self._chat(mine, self.user)
+        self._chat(mine, self.user)
+        self._chat(theirs, self.user)
+        send = self._run()
+        self.assertEqual(send.call_count, 1)
+        self.assertEqual(send.call_args.args[0], self.userB.email)
+        data = send.call_args.kwargs["context"]["data"]
+        self.assertEqual(data.my_lot_subscriptions_count, 1)
+        self.assertEqual(data.my_lot_subscriptions[0].new_message_count, 2)
+        self.assertEqual(data.other_lot_subscriptions_count, 1)
+        self.assertEqual(self.userB.userdata.unnotified_subscriptions_count, 0)
+        # and not again until somebody says something new
+        self.assertFalse(self._run().called)
+
+    def test_own_messages_and_opted_out_users_are_left_out(self):
+        self._chat(self._lot(self.userB), self.userB)
+        quiet = self._lot(self.user_with_no_lots)
+        UserData.objects.filter(user=self.user_with_no_lots).update(email_me_when_people_comment_on_my_lots=False)
+        self._chat(quiet, self.userB)
+        self.assertFalse(self._run().called)
+
+    def test_queries_do_not_grow_with_users(self):
+        def queries_for(user_count):
+            for i in range(user_count):
+                user = User.objects.create(username=f"chatter-{user_count}-{i}", email=f"c{user_count}{i}@example.com")
+                self._chat(self._lot(user), self.userB)
+            with CaptureQueriesContext(connection) as queries:
+                self._run()
+            return len(queries)
+
+        self.assertEqual(queries_for(2), queries_for(6))
+
+
 class AuctionTOSNotificationsCommandTests(StandardTestCase):
     """Test the auctiontos_notifications management command"""
 
@@ -19172,6 +19831,61 @@ class ClubMemberUpdateTests(CsvImportTestMixin, TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTrue(ClubMember.objects.filter(club=self.club, email="rag@example.com").exists())
 
+    def _import_members_as_owner(self, csv_content):
+        owner_member, _ = ClubMember.objects.get_or_create(club=self.club, user=self.owner)
+        owner_member.permission_export = True
+        owner_member.save()
+        self.client.login(username="cu_owner", password="testpass")
+        csv_file = SimpleUploadedFile("members.csv", csv_content.encode("utf-8"), content_type="text/csv")
+        url = reverse("club_member_import", kwargs={"slug": self.club.slug})
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.run_csv_import(url, csv_file)
+
+    def test_csv_import_flags_rhyming_rows_within_the_file(self):
+        """A row whose name rhymes with a member added earlier in the same file is linked to it, as a
+        one-at-a-time save() would have."""
+        self._import_members_as_owner("first name,last name,email\nRobert,Jones,rj@example.com\nBob,Jones,\n")
+        robert = ClubMember.objects.get(club=self.club, name="Robert Jones")
+        bob = ClubMember.objects.get(club=self.club, name="Bob Jones")
+        self.assertEqual(robert.possible_duplicate, bob)
+        self.assertEqual(bob.possible_duplicate, robert)
+
+    def test_csv_import_merge_updates_existing_member(self):
+        """A row matched by email fills in the member's empty fields and marks them admin-edited."""
+        self._import_members_as_owner("name,email,phone\nJane Doe,cu_member@example.com,555-1234\n")
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.phone_number, "555-1234")
+        self.assertTrue(self.member.admin_edited)
+        self.assertEqual(self.member.user, self.member_user)
+
+    def test_csv_import_geocodes_in_one_batch(self):
+        """New members are geocoded by one batch task instead of a task each."""
+        with (
+            patch("auctions.tasks.geocode_club_members.delay") as batch,
+            patch("auctions.tasks.geocode_club_member.delay") as single,
+        ):
+            self._import_members_as_owner("name,email\nAl,al@example.com\nBea,bea@example.com\nCy,cy@example.com\n")
+        single.assert_not_called()
+        batch.assert_called_once()
+        added = ClubMember.objects.filter(
+            club=self.club, email__in=["al@example.com", "bea@example.com", "cy@example.com"]
+        )
+        self.assertCountEqual(batch.call_args.args[0], added.values_list("pk", flat=True))
+
+    def test_csv_import_queries_do_not_grow_with_rows(self):
+        """Planning and writing a file takes the same number of queries for 3 rows as for 12."""
+
+        def queries(names):
+            rows = "".join(f"{name} Person,{name.lower()}@example.com,555-0000\n" for name in names)
+            with CaptureQueriesContext(connection) as ctx:
+                self._import_members_as_owner("name,email,phone\n" + rows)
+            return len(ctx.captured_queries)
+
+        small = queries(["Ann", "Ben", "Cal"])
+        large = queries([f"Dee{i}" for i in range(12)])
+        self.assertEqual(ClubMember.objects.filter(club=self.club, phone_number="555-0000").count(), 15)
+        self.assertEqual(small, large)
+
     def test_csv_import_non_admin_gets_403(self):
         """Non-admin user cannot import CSV"""
         self.client.login(username="cu_other", password="testpass")
@@ -22023,6 +22737,16 @@ class ClubPermissionWildcardTests(TestCase):
         ]:
             self.assertTrue(self.check(self.user, self.club, perm), f"admin should pass {perm}")
 
+    def test_membership_is_looked_up_once_per_scope(self):
+        member = self._make_member(permission_view=True)
+        with request_scope():
+            self.assertTrue(self.check(self.user, self.club, "permission_view"))
+            with self.assertNumQueries(0):
+                self.assertFalse(self.check(self.user, self.club, "permission_money"))
+            member.permission_money = True
+            member.save()
+            self.assertTrue(self.check(self.user, self.club, "permission_money"))
+
     def test_no_permissions_fails_all(self):
         self._make_member()
         for perm in [
@@ -24026,6 +24750,62 @@ class ClubMoneyLedgerCashBasisTests(TestCase):
         self.assertEqual(march["auction_sales"], Decimal("0.00"))
         self.assertEqual(april["auction_sales"], Decimal("100.00"))
 
+    def test_running_balance_matches_the_ledger(self):
+        auction = self._auction(club_pct=20)
+        seller, buyer = self._tos(auction), self._tos(auction)
+        self._sold_lot(auction, seller, buyer, 100)
+        self._paid_invoice(seller)
+        buyer_invoice = self._paid_invoice(buyer)
+        buyer_invoice.status = "UNPAID"
+        buyer_invoice.save()
+        ClubMoney.objects.create(
+            club=self.club,
+            date=datetime.date(2026, 2, 1),
+            amount=Decimal("12.50"),
+            category=ClubMoney.CATEGORY_DONATION,
+        )
+        self.assertEqual(club_ledger.balance(self.club), self._ledger_total(club=self.club))
+        self.assertEqual(
+            sum(ClubMoneyPeriod.objects.filter(club=self.club).values_list("entries", flat=True)),
+            ClubMoney.objects.filter(club=self.club).count(),
+        )
+
+        ClubMoneyPeriod.objects.filter(club=self.club).delete()
+        club_ledger.rebuild([self.club.pk])
+        self.assertEqual(club_ledger.balance(self.club), self._ledger_total(club=self.club))
+
+    def test_sync_invoices_looks_up_the_ledger_once(self):
+        auction = self._auction(club_pct=20)
+        seller = self._tos(auction)
+        invoices = []
+        for price in (10, 20, 30):
+            buyer = self._tos(auction)
+            self._sold_lot(auction, seller, buyer, price)
+            invoice = Invoice.objects.get_or_create(auctiontos_user=buyer)[0]
+            invoice.status = "PAID"
+            invoices.append(invoice)
+        with CaptureQueriesContext(connection) as queries:
+            club_ledger.sync_invoices(invoices)
+        ledger_queries = [
+            query["sql"]
+            for query in queries.captured_queries
+            if "auctions_clubmoney" in query["sql"] and "auctions_clubmoneyperiod" not in query["sql"]
+        ]
+        self.assertEqual(len(ledger_queries), 2)  # what's booked, and the insert
+        self.assertEqual(self._ledger_total(club=self.club), Decimal("60.00"))
+        self.assertEqual(club_ledger.balance(self.club), Decimal("60.00"))
+
+    def test_batch_books_when_the_block_ends(self):
+        auction = self._auction(club_pct=20)
+        seller, buyer = self._tos(auction), self._tos(auction)
+        self._sold_lot(auction, seller, buyer, 100)
+        with club_ledger.batch():
+            buyer_invoice = self._paid_invoice(buyer)
+            buyer_invoice.save()
+            self.assertFalse(ClubMoney.objects.filter(invoice=buyer_invoice).exists())
+        self.assertEqual(self._by_category(buyer_invoice), {ClubMoney.CATEGORY_AUCTION_SALE: Decimal("100.00")})
+        self.assertEqual(club_ledger.balance(self.club), Decimal("100.00"))
+
 
 class PaidInvoiceFreezeTests(StandardTestCase):
     """Item 9: once an invoice is PAID it is settled and frozen.
@@ -24546,6 +25326,7 @@ class MakeClubAdminAssignsAuctionsTests(TestCase):
         self.assertEqual(auction.club, self.other_club)
 
 
+@isolated_cache("bap-charts")
 class BapTop10ChartTests(TestCase):
     """Cumulative points-over-time chart for the top 10 club members.
 
@@ -24676,6 +25457,37 @@ class BapTop10ChartTests(TestCase):
         self.assertEqual(hap["datasets"][0]["data"][-1], 7)
         self.assertEqual(cap["datasets"][0]["data"][-1], 3)
 
+    def test_awards_are_kept_as_monthly_totals(self):
+        this_month = timezone.now().date().replace(day=1)
+        self._award(self.current, points=5, month_offset=0)
+        monthly = BapMonthlyPoints.objects.get(club_member=self.current, month=this_month)
+        self.assertEqual(monthly.points, 15)
+        self.assertEqual(BapMonthlyPoints.objects.filter(club_member=self.first).count(), 2)
+
+    def test_series_are_cached_until_the_next_award(self):
+        self._chart_data(current_member=self.current)
+        # only the top 10 lookup; the running totals come from the cache
+        with self.assertNumQueries(1):
+            data = self._chart_data(current_member=self.current)
+        self.assertEqual({d["label"]: d["data"][-1] for d in data["datasets"]}["Third Member"], 5)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self._award(self.third, points=4, month_offset=0)
+        # the cache is cleared once the award commits, not while a view could still read the old totals
+        with self.assertNumQueries(1):
+            self._chart_data(current_member=self.current)
+        for callback in callbacks:
+            callback()
+        data = self._chart_data(current_member=self.current)
+        self.assertEqual({d["label"]: d["data"][-1] for d in data["datasets"]}["Third Member"], 9)
+
+    def test_my_points_chart_ends_at_the_members_points(self):
+        from .views import _club_points_chart_data
+
+        self._award(self.current, points=100, year=self.this_year - 6, month_offset=0)
+        self.current.refresh_from_db()
+        data = _club_points_chart_data(self.club, self.current)
+        self.assertEqual(data["datasets"][0]["data"][-1], self.current.bap_points)
+
     def test_chart_markup_renders_in_bap_tab(self):
         client = Client()
         client.force_login(self.current.user)
@@ -25389,6 +26201,7 @@ class AppleWalletPassTests(TestCase):
             self.assertEqual(response.status_code, 404)
 
 
+@isolated_cache("passkit")
 class PassKitWebServiceTests(TestCase):
     """Apple PassKit web service: device registration, pass delivery, APNs pushes."""
 
@@ -25646,27 +26459,35 @@ class PassKitWebServiceTests(TestCase):
             )
             self.assertEqual(response.status_code, 200)
 
-    def test_member_change_queues_apple_notification(self):
-        """Editing a wallet-visible field queues both the Google PATCH and the Apple push."""
+    def _drain_wallet_outbox(self):
         with (
-            patch("auctions.tasks.update_google_wallet_object_for_member.delay") as google_delay,
-            patch("auctions.tasks.notify_apple_wallet_devices_for_member.delay") as apple_delay,
-            self.captureOnCommitCallbacks(execute=True),
+            patch("auctions.tasks.update_google_wallet_object_for_member.delay") as google_queue,
+            patch("auctions.tasks.notify_apple_wallet_devices_for_member.delay") as apple_queue,
         ):
-            self.member.membership_expiration_date = timezone.now().date() + datetime.timedelta(days=365)
-            self.member.save()
-        google_delay.assert_called_once_with(self.member.pk)
-        apple_delay.assert_called_once_with(self.member.pk)
+            sync_outbox.drain(now=timezone.now() + datetime.timedelta(seconds=sync_outbox.COALESCE_SECONDS))
+        return google_queue, apple_queue
+
+    def test_member_change_queues_apple_notification(self):
+        """Editing a wallet-visible field queues both the Google PATCH and the Apple push."""
+        self.member.membership_expiration_date = timezone.now().date() + datetime.timedelta(days=365)
+        self.member.save()
+        google_queue, apple_queue = self._drain_wallet_outbox()
+        google_queue.assert_called_once_with(self.member.pk)
+        apple_queue.assert_called_once_with(self.member.pk)
 
     def test_member_deactivation_queues_apple_notification(self):
-        with (
-            patch("auctions.tasks.update_google_wallet_object_for_member.delay"),
-            patch("auctions.tasks.notify_apple_wallet_devices_for_member.delay") as apple_delay,
-            self.captureOnCommitCallbacks(execute=True),
-        ):
-            self.member.is_deleted = True
+        self.member.is_deleted = True
+        self.member.save()
+        _google_queue, apple_queue = self._drain_wallet_outbox()
+        apple_queue.assert_called_once()
+
+    def test_repeated_member_edits_queue_one_refresh(self):
+        for name in ("First", "Second", "Third"):
+            self.member.name = name
             self.member.save()
-        apple_delay.assert_called_once_with(self.member.pk)
+        google_queue, apple_queue = self._drain_wallet_outbox()
+        google_queue.assert_called_once()
+        apple_queue.assert_called_once()
 
     def test_barcode_mode_flip_queues_club_wide_apple_notification(self):
         with (
@@ -25693,13 +26514,54 @@ class PassKitWebServiceTests(TestCase):
         before = self.member.apple_pass_updated
         with (
             self.settings(**self.FAKE_WALLET_SETTINGS),
-            patch("auctions.apple_wallet.send_pass_update_notification") as send,
+            patch("auctions.apple_wallet.push_pass_update", return_value=MagicMock(status_code=200)) as push,
         ):
             notify_apple_wallet_devices_for_member(self.member.pk)
         self.member.refresh_from_db()
         self.assertGreater(self.member.apple_pass_updated, before)
-        send.assert_called_once()
-        self.assertEqual(send.call_args[0][0].pk, registration.pk)
+        push.assert_called_once_with(registration.push_token)
+
+    def test_unchanged_pass_is_not_pushed_again(self):
+        from .tasks import notify_apple_wallet_devices_for_member
+
+        self._register()
+        with (
+            self.settings(**self.FAKE_WALLET_SETTINGS),
+            patch("auctions.apple_wallet.push_pass_update", return_value=MagicMock(status_code=200)) as push,
+        ):
+            notify_apple_wallet_devices_for_member(self.member.pk)
+            stamp = type(self.member).objects.get(pk=self.member.pk).apple_pass_updated
+            notify_apple_wallet_devices_for_member(self.member.pk)
+        push.assert_called_once()
+        self.assertEqual(type(self.member).objects.get(pk=self.member.pk).apple_pass_updated, stamp)
+
+    def test_club_push_isolates_failed_members(self):
+        import httpx
+
+        from .models import AppleDeviceRegistration, ClubMember
+        from .tasks import notify_apple_wallet_devices_for_club
+
+        other = ClubMember.objects.create(club=self.club, name="Other Member")
+        self._register("good-token")
+        AppleDeviceRegistration.objects.create(
+            member=other, device_library_identifier="device-2", push_token="flaky-token"
+        )
+
+        def fake_push(push_token):
+            if push_token == "flaky-token":
+                msg = "connection reset"
+                raise httpx.ConnectError(msg)
+            return MagicMock(status_code=200)
+
+        with (
+            self.settings(**self.FAKE_WALLET_SETTINGS),
+            patch("auctions.apple_wallet.push_pass_update", side_effect=fake_push),
+            patch("auctions.tasks.notify_apple_wallet_devices_for_member.delay") as retry_delay,
+        ):
+            notify_apple_wallet_devices_for_club(self.club.pk)
+        retry_delay.assert_called_once_with(other.pk)
+        self.assertTrue(ClubMember.objects.get(pk=self.member.pk).apple_pass_fingerprint)
+        self.assertFalse(ClubMember.objects.get(pk=other.pk).apple_pass_fingerprint)
 
     def test_apns_dead_token_deletes_registration(self):
         from .apple_wallet import send_pass_update_notification
@@ -25974,9 +26836,10 @@ class ClubIconWalletTests(TestCase):
             GOOGLE_WALLET_SERVICE_ACCOUNT_KEY="fake-key",
         ):
             with patch("auctions.google_wallet.get_access_token", return_value="t"):
-                with patch("auctions.google_wallet.requests.patch", return_value=patch_resp) as patch_mock:
+                with patch("auctions.google_wallet._session") as session:
+                    session.return_value.patch.return_value = patch_resp
                     self.assertTrue(update_generic_object_for_member(self.member))
-        payload = patch_mock.call_args.kwargs["json"]
+        payload = session.return_value.patch.call_args.kwargs["json"]
         self.assertEqual(payload["cardTitle"]["defaultValue"]["value"], self.club.name)
         # Logo + background must be on the GenericObject PATCH — not the class.
         self.assertIn("logo", payload)
@@ -26038,6 +26901,75 @@ class ClubIconWalletTests(TestCase):
         self.assertNotIn("hexBackgroundColor", patch_body)
 
 
+@override_settings(
+    GOOGLE_WALLET_ISSUER_ID="3388000000022XXXXXX",
+    GOOGLE_WALLET_SERVICE_ACCOUNT_EMAIL="signer@example.iam.gserviceaccount.com",
+    GOOGLE_WALLET_SERVICE_ACCOUNT_KEY="fake-key",
+)
+class GoogleWalletRefreshTests(TestCase):
+    """Club-wide Google Wallet refresh: only changed passes go out, failures are isolated per member."""
+
+    def setUp(self):
+        from .models import Club, ClubMember
+
+        self.club = Club.objects.create(name="Refresh Club")
+        self.members = [ClubMember.objects.create(club=self.club, name=f"Member {i}") for i in range(3)]
+
+    def _refresh(self, fail_for=()):
+        import requests
+
+        from .tasks import update_google_wallet_objects_for_club
+
+        def fake_patch(member, body):
+            if member.pk in fail_for:
+                raise requests.ConnectionError
+            return True
+
+        with (
+            patch("auctions.google_wallet.patch_generic_object", side_effect=fake_patch) as patch_mock,
+            patch("auctions.tasks.update_google_wallet_object_for_member.delay") as retry_delay,
+        ):
+            update_google_wallet_objects_for_club(self.club.pk)
+        return patch_mock, retry_delay
+
+    def test_unchanged_passes_are_skipped(self):
+        first, _ = self._refresh()
+        self.assertEqual(first.call_count, 3)
+        second, _ = self._refresh()
+        second.assert_not_called()
+
+    def test_only_changed_members_are_patched(self):
+        self._refresh()
+        type(self.members[1]).objects.filter(pk=self.members[1].pk).update(name="Renamed")
+        patch_mock, _ = self._refresh()
+        self.assertEqual([c.args[0].pk for c in patch_mock.call_args_list], [self.members[1].pk])
+
+    def test_club_rename_touches_every_pass(self):
+        self._refresh()
+        type(self.club).objects.filter(pk=self.club.pk).update(name="Rebranded Club")
+        patch_mock, _ = self._refresh()
+        self.assertEqual(patch_mock.call_count, 3)
+
+    def test_one_failure_does_not_stop_the_rest(self):
+        failing = self.members[0].pk
+        patch_mock, retry_delay = self._refresh(fail_for={failing})
+        self.assertEqual(patch_mock.call_count, 3)
+        retry_delay.assert_called_once_with(failing)
+        # The failed member keeps no fingerprint, so the next run sends them again.
+        patch_mock, _ = self._refresh()
+        self.assertEqual([c.args[0].pk for c in patch_mock.call_args_list], [failing])
+
+    def test_rate_limiter_spaces_calls(self):
+        from .wallet_refresh import RateLimiter
+
+        limiter = RateLimiter(per_second=1000)
+        with patch("auctions.wallet_refresh.time.sleep") as sleep:
+            limiter.wait()
+            limiter.wait()
+        sleep.assert_called_once()
+        self.assertLessEqual(sleep.call_args.args[0], 0.001)
+
+
 class ManageUsersThroughClubTests(TestCase):
     """Tests for the per-auction 'manage_users_through_club' setting that pivots auction
     user management onto ClubMember records."""
@@ -27594,6 +28526,279 @@ class BrevoSyncTests(TestCase):
         self.assertEqual(client.request.call_args.args, ("DELETE", "/contacts/old%40example.com"))
 
 
+class LocalMailchimpAudience:
+    """In-memory stand-in for the parts of the Mailchimp client the bulk sync uses.
+
+    Keeps contacts by subscriber hash and counts calls, so tests can assert on how many requests a
+    sync would have made. Addresses in ``reject`` come back in the batch's ``errors``.
+    """
+
+    def __init__(self, reject=()):
+        self.contacts = {}
+        self.tags = {}
+        self.calls = []
+        self.reject = set(reject)
+        self.lists = self
+
+    def batch_list_members(self, list_id, body):
+        self.calls.append(("batch_list_members", len(body["members"])))
+        result = {"new_members": [], "updated_members": [], "errors": []}
+        for entry in body["members"]:
+            email = entry["email_address"]
+            if email in self.reject:
+                result["errors"].append({"email_address": email, "error": f"{email} looks fake"})
+                continue
+            key = mc.subscriber_hash(email)
+            bucket = "updated_members" if key in self.contacts else "new_members"
+            self.contacts[key] = dict(entry, web_id=self.contacts.get(key, {}).get("web_id", len(self.contacts) + 1))
+            result[bucket].append(self.contacts[key])
+        return result
+
+    def update_list_member_tags(self, list_id, sub_hash, body):
+        self.calls.append(("update_list_member_tags", sub_hash))
+        self.tags[sub_hash] = {tag["name"] for tag in body["tags"] if tag["status"] == "active"}
+
+    def delete_list_member(self, list_id, sub_hash):
+        self.calls.append(("delete_list_member", sub_hash))
+        self.contacts.pop(sub_hash, None)
+
+
+@isolated_cache("marketing-bulk-sync")
+class MailchimpBulkSyncTests(TestCase):
+    """bulk_sync fingerprint diffing and batching against LocalMailchimpAudience."""
+
+    def setUp(self):
+        self.club = Club.objects.create(
+            name="Bulk Club", mailchimp_access_token="token", mailchimp_server_prefix="us1", mailchimp_audience_id="l1"
+        )
+        self.members = [
+            ClubMember.objects.create(club=self.club, name=f"Member {i}", email=f"m{i}@example.com") for i in range(3)
+        ]
+        self.audience = LocalMailchimpAudience()
+
+    def _sync(self, **kwargs):
+        members = list(mc.in_scope_members(self.club).order_by("pk"))
+        with patch("auctions.mailchimp.get_client", return_value=self.audience):
+            return mc.bulk_sync(self.club, members, **kwargs)
+
+    def test_first_sync_batches_contacts_and_records_fingerprints(self):
+        self.assertEqual(self._sync(), 3)
+        self.assertEqual(self.audience.calls.count(("batch_list_members", 3)), 1)
+        self.assertEqual(len(self.audience.tags), 3)
+        for member in self.members:
+            member.refresh_from_db()
+            self.assertEqual(member.mailchimp_status, "subscribed")
+            self.assertTrue(member.mailchimp_web_id)
+            self.assertIn(":", member.mailchimp_sync_fingerprint)
+
+    def test_unchanged_members_make_no_calls(self):
+        self._sync()
+        self.audience.calls.clear()
+        self.assertEqual(self._sync(), 0)
+        self.assertEqual(self.audience.calls, [])
+
+    def test_only_the_changed_contact_is_resent(self):
+        self._sync()
+        self.audience.calls.clear()
+        ClubMember.objects.filter(pk=self.members[1].pk).update(address="1 Fish Lane")
+
+        self.assertEqual(self._sync(), 1)
+        # A merge field changed, the tags didn't, so no tags call.
+        self.assertEqual(self.audience.calls, [("batch_list_members", 1)])
+
+    def test_force_resends_everyone(self):
+        self._sync()
+        self.audience.calls.clear()
+        self.assertEqual(self._sync(force=True), 3)
+        self.assertIn(("batch_list_members", 3), self.audience.calls)
+
+    def test_rejected_address_is_cleaned_without_failing_the_batch(self):
+        self.audience.reject = {"m0@example.com"}
+        self._sync()
+        self.members[0].refresh_from_db()
+        self.members[1].refresh_from_db()
+        self.assertEqual(self.members[0].mailchimp_status, "cleaned")
+        self.assertEqual(self.members[1].mailchimp_status, "subscribed")
+        self.assertNotIn(mc.subscriber_hash("m0@example.com"), self.audience.tags)
+
+    def test_remote_unsubscribe_is_not_resubscribed(self):
+        ClubMember.objects.filter(pk=self.members[0].pk).update(mailchimp_status="unsubscribed")
+        self._sync()
+        self.assertEqual(self.audience.contacts[mc.subscriber_hash("m0@example.com")]["status"], "unsubscribed")
+
+    def test_do_not_contact_is_archived_once(self):
+        self._sync()
+        ClubMember.objects.filter(pk=self.members[2].pk).update(contact_status="do_not_contact")
+        self._sync()
+        self._sync()
+        deletes = [call for call in self.audience.calls if call[0] == "delete_list_member"]
+        self.assertEqual(len(deletes), 1)
+        self.members[2].refresh_from_db()
+        self.assertEqual(self.members[2].mailchimp_status, "archived")
+
+    def test_api_failure_leaves_fingerprints_for_the_next_run(self):
+        from mailchimp_marketing.api_client import ApiClientError
+
+        client = MagicMock()
+        client.lists.batch_list_members.side_effect = ApiClientError('{"detail": "Down"}', 503)
+        members = list(mc.in_scope_members(self.club))
+        with patch("auctions.mailchimp.get_client", return_value=client):
+            self.assertEqual(mc.bulk_sync(self.club, members), 0)
+        self.assertFalse(ClubMember.objects.exclude(mailchimp_sync_fingerprint="").exists())
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.mailchimp_last_error, "Down")
+
+    def test_per_member_sync_fingerprint_matches_bulk(self):
+        client = MagicMock()
+        client.lists.set_list_member.return_value = {"web_id": 7, "status": "subscribed"}
+        with patch("auctions.mailchimp.get_client", return_value=client):
+            mc.sync_member(ClubMember.objects.get(pk=self.members[0].pk))
+        self._sync()
+        sent = [call for call in self.audience.calls if call[0] == "batch_list_members"]
+        self.assertEqual(sent, [("batch_list_members", 2)])
+
+    def test_backfill_queues_one_task_per_club(self):
+        with patch("auctions.tasks.bulk_sync_club_to_mailchimp.delay") as delay:
+            self.assertEqual(mc.backfill(self.club), 3)
+        delay.assert_called_once_with(self.club.pk, force=False)
+
+    def test_bulk_task_pages_through_members(self):
+        from auctions import tasks
+
+        with (
+            patch.object(tasks, "MARKETING_SYNC_PAGE", 2),
+            patch("auctions.mailchimp.get_client", return_value=self.audience),
+            patch("auctions.tasks.bulk_sync_club_to_mailchimp.delay") as delay,
+        ):
+            tasks.bulk_sync_club_to_mailchimp(self.club.pk)
+        self.assertEqual(self.audience.calls[0], ("batch_list_members", 2))
+        delay.assert_called_once_with(self.club.pk, after_pk=self.members[1].pk, force=False)
+
+    def _drain(self):
+        later = timezone.now() + datetime.timedelta(seconds=sync_outbox.COALESCE_SECONDS)
+        with patch("auctions.tasks.sync_club_member_to_mailchimp.delay") as delay:
+            sync_outbox.drain(now=later)
+        return delay
+
+    def test_repeated_saves_coalesce_into_one_sync(self):
+        self._drain()  # the syncs queued by setUp
+        with patch("auctions.tasks.geocode_club_member.delay"):
+            for address in ("1 Fish Lane", "2 Fish Lane", "3 Fish Lane"):
+                self.members[0].address = address
+                self.members[0].save()
+            # Nothing is sent until the window is up.
+            with patch("auctions.tasks.sync_club_member_to_mailchimp.delay") as delay:
+                sync_outbox.drain()
+            delay.assert_not_called()
+            self._drain().assert_called_once_with(self.members[0].pk)
+
+            # Once the queued sync has been sent, the next save gets a sync of its own.
+            self.members[0].address = "4 Fish Lane"
+            self.members[0].save()
+            self._drain().assert_called_once_with(self.members[0].pk)
+
+    def test_rolled_back_save_queues_no_sync(self):
+        self._drain()
+        with (
+            patch("auctions.tasks.geocode_club_member.delay"),
+            self.assertRaises(RuntimeError),
+            transaction.atomic(),
+        ):
+            self.members[0].address = "5 Fish Lane"
+            self.members[0].save()
+            self.assertTrue(SyncOutbox.objects.filter(object_pk=self.members[0].pk).exists())
+            raise RuntimeError
+        self.assertFalse(SyncOutbox.objects.exists())
+        self._drain().assert_not_called()
+
+
+class LocalBrevoAccount:
+    """In-memory stand-in for BrevoClient covering the bulk sync's endpoints.
+
+    Records each (method, path, body); addresses in ``reject`` make the call holding them fail the
+    way Brevo does, with a 400 for the whole request.
+    """
+
+    def __init__(self, reject=()):
+        self.calls = []
+        self.reject = set(reject)
+
+    def request(self, method, path, *, json_body=None, params=None):
+        self.calls.append((method, path, json_body))
+        contacts = (json_body or {}).get("contacts") or (json_body or {}).get("jsonBody") or []
+        if (
+            any(contact["email"] in self.reject for contact in contacts)
+            or (json_body or {}).get("email") in self.reject
+        ):
+            raise brevo.BrevoApiError(400, "invalid email")
+        resp = MagicMock(status_code=202 if path == "/contacts/import" else 204, content=b"")
+        if path == "/contacts":
+            resp.status_code, resp.content = 201, b'{"id": 5}'
+            resp.json.return_value = {"id": 5}
+        return resp
+
+
+@isolated_cache("marketing-bulk-sync")
+class BrevoBulkSyncTests(TestCase):
+    """bulk_sync for Brevo against LocalBrevoAccount (mirrors MailchimpBulkSyncTests)."""
+
+    def setUp(self):
+        self.club = Club.objects.create(name="Brevo Bulk Club", brevo_api_key="xkeysib-test", brevo_list_id="7")
+        self.new = ClubMember.objects.create(club=self.club, name="New Member", email="new@example.com")
+        self.known = ClubMember.objects.create(
+            club=self.club, name="Known Member", email="known@example.com", brevo_contact_id="41"
+        )
+        self.account = LocalBrevoAccount()
+
+    def _sync(self, **kwargs):
+        members = list(brevo.in_scope_members(self.club).order_by("pk"))
+        with patch("auctions.brevo.get_client", return_value=self.account):
+            return brevo.bulk_sync(self.club, members, **kwargs)
+
+    def test_new_contacts_are_imported_and_known_ones_batch_updated(self):
+        self.assertEqual(self._sync(), 2)
+        paths = {path: body for _, path, body in self.account.calls}
+        self.assertEqual([c["email"] for c in paths["/contacts/import"]["jsonBody"]], ["new@example.com"])
+        self.assertEqual(paths["/contacts/import"]["listIds"], [7])
+        self.assertFalse(paths["/contacts/import"]["emailBlacklist"])
+        [update] = paths["/contacts/batch"]["contacts"]
+        self.assertEqual(update["email"], "known@example.com")
+        self.assertFalse(update["emailBlacklisted"])
+        self.known.refresh_from_db()
+        self.assertEqual(self.known.brevo_status, "subscribed")
+        self.assertTrue(self.known.brevo_sync_fingerprint)
+
+    def test_unchanged_members_make_no_calls(self):
+        self._sync()
+        self.account.calls.clear()
+        self.assertEqual(self._sync(), 0)
+        self.assertEqual(self.account.calls, [])
+
+    def test_rejected_chunk_falls_back_to_per_member_sync(self):
+        self.account.reject = {"new@example.com"}
+        self._sync()
+        self.new.refresh_from_db()
+        self.known.refresh_from_db()
+        self.assertEqual(self.new.brevo_status, "cleaned")
+        self.assertEqual(self.known.brevo_status, "subscribed")
+
+        # The refused payload isn't retried on the next run.
+        self.account.calls.clear()
+        self._sync()
+        self.assertEqual(self.account.calls, [])
+
+    def test_opted_out_contacts_import_blacklisted(self):
+        ClubMember.objects.filter(pk=self.new.pk).update(contact_status="non_essential")
+        self._sync()
+        [body] = [body for _, path, body in self.account.calls if path == "/contacts/import"]
+        self.assertTrue(body["emailBlacklist"])
+
+    def test_backfill_queues_one_task_per_club(self):
+        with patch("auctions.tasks.bulk_sync_club_to_brevo.delay") as delay:
+            self.assertEqual(brevo.backfill(self.club, force=True), 2)
+        delay.assert_called_once_with(self.club.pk, force=True)
+
+
 class MarketingSyncLogRedactionTests(TestCase):
     """Member email addresses must never reach the log files.
 
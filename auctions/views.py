@@ -57,7 +57,7 @@ from django.db.models import (
     prefetch_related_objects,
 )
 from django.db.models.base import Model as Model
-from django.db.models.functions import ExtractHour, ExtractIsoWeekDay, TruncDay, TruncMonth
+from django.db.models.functions import TruncDay
 from django.forms import modelformset_factory
 from django.http import (
     Http404,
@@ -94,7 +94,7 @@ from django.views.generic.edit import (
 )
 from django_filters.views import FilterView
 from django_tables2 import SingleTableMixin
-from django_weasyprint import WeasyTemplateResponseMixin
+from django_weasyprint import WeasyTemplateResponse, WeasyTemplateResponseMixin
 from el_pagination.views import AjaxListView
 from PIL import Image
 from pytz import timezone as pytz_timezone
@@ -113,7 +113,19 @@ from user_agents import parse
 from webpush import send_user_notification
 from webpush.models import PushInformation
 
-from . import announcements, club_events, discord_events, voice
+from . import (
+    announcements,
+    bap_charts,
+    bidder_metrics,
+    club_events,
+    club_ledger,
+    discord_events,
+    label_cache,
+    member_import,
+    page_view_rollups,
+    request_cache,
+    voice,
+)
 from .authentication import ApiKeyThrottle, OptionalAPIKeyAuthentication
 from .bidding import place_bid_and_broadcast
 from .filters import (
@@ -268,7 +280,7 @@ from .models import (
     normalize_email,
     normalize_species_name,
 )
-from .notifications import CATEGORY_LOT_SELLING, push_configured, user_has_app_push
+from .notifications import CATEGORY_LOT_SELLING, enqueue_push_batch, push_configured, user_has_app_push
 from .serializers import (
     CLUB_MEMBER_API_KEY_MAPPING_FIELDS,
     BapAwardAPIKeyCreateSerializer,
@@ -290,6 +302,7 @@ from .services import (
     existing_tos_for_club_member,
     lot_add_block,
     map_fields,
+    number_new_lots,
     recalculate_seller_invoice,
     save_new_lot,
     user_can_clone_lot,
@@ -470,7 +483,11 @@ def check_club_permission(user, club, permission_name):
         return False
     if user.is_superuser:
         return True
-    member = ClubMember.objects.filter(club=club, user=user, is_deleted=False).first()
+    club_pk = getattr(club, "pk", club)
+    member = request_cache.remember(
+        ("club_member", club_pk, user.pk),
+        lambda: ClubMember.objects.filter(club=club, user=user, is_deleted=False).first(),
+    )
     if not member:
         return False
     if member.permission_admin:
@@ -1029,33 +1046,9 @@ def _club_top10_chart_data(club, rank_field, award_field, current_member, months
     if not top10:
         return None
 
-    start_month = months[0]
-    member_ids = [m.pk for m in top10]
-
-    # Mirror BapAward.recalculate_member_points: awards tied to a deleted or banned lot
-    # do not count toward a member's standings, so the chart must drop them too or its
-    # running totals will disagree with the leaderboard numbers shown alongside it.
-    awards = (
-        BapAward.objects.filter(club_member_id__in=member_ids).exclude(lot__is_deleted=True).exclude(lot__banned=True)
-    )
-
-    monthly_awards = (
-        awards.filter(date__gte=start_month)
-        .annotate(month=TruncMonth("date"))
-        .values("club_member_id", "month")
-        .annotate(total=Sum(award_field))
-        .order_by("club_member_id", "month")
-    )
-    member_monthly = collections.defaultdict(dict)
-    for item in monthly_awards:
-        month_key = (item["month"] if isinstance(item["month"], date_type) else item["month"].date()).replace(day=1)
-        member_monthly[item["club_member_id"]][month_key] = item["total"] or 0
-
-    if is_ytd:
-        initial_totals = {}
-    else:
-        initial_qs = awards.filter(date__lt=start_month).values("club_member_id").annotate(total=Sum(award_field))
-        initial_totals = {item["club_member_id"]: item["total"] or 0 for item in initial_qs}
+    # BapMonthlyPoints, like the leaderboard numbers shown alongside, leaves out awards tied to a
+    # deleted or banned lot, so the lines end where the leaderboard says they should.
+    series = bap_charts.cumulative(club, [m.pk for m in top10], rank_field, award_field, months, is_ytd=is_ytd)
 
     first_place = top10[0]
     datasets = []
@@ -1069,11 +1062,7 @@ def _club_top10_chart_data(club, rank_field, award_field, current_member, months
         else:
             color, width = "#0d6efd", 1.0
 
-        running = initial_totals.get(m.pk, 0)
-        data = []
-        for month in months:
-            running += member_monthly[m.pk].get(month, 0)
-            data.append(running)
+        data = series[m.pk]
 
         datasets.append(
             {
@@ -1095,47 +1084,10 @@ def _club_points_chart_data(club, member):
         return None
 
     months = _last_n_month_starts(60)
-    start_month = months[0]
-    monthly_awards = (
-        BapAward.objects.filter(club_member=member, date__gte=start_month)
-        .annotate(month=TruncMonth("date"))
-        .values("month")
-        .annotate(
-            bap_total=Sum("points"),
-            hap_total=Sum("hap_points"),
-            culture_total=Sum("cap_points"),
-        )
-        .order_by("month")
-    )
-    monthly_totals = {
-        (item["month"] if isinstance(item["month"], date_type) else item["month"].date()).replace(day=1): {
-            "bap": item["bap_total"] or 0,
-            "hap": item["hap_total"] or 0,
-            "culture": item["culture_total"] or 0,
-        }
-        for item in monthly_awards
-    }
-    initial_totals = BapAward.objects.filter(club_member=member, date__lt=start_month).aggregate(
-        bap_total=Sum("points"),
-        hap_total=Sum("hap_points"),
-        culture_total=Sum("cap_points"),
-    )
-
-    running_bap = initial_totals["bap_total"] or 0
-    running_hap = initial_totals["hap_total"] or 0
-    running_culture = initial_totals["culture_total"] or 0
-    bap_data = []
-    hap_data = []
-    culture_data = []
-
-    for month in months:
-        totals = monthly_totals.get(month, {})
-        running_bap += totals.get("bap", 0)
-        running_hap += totals.get("hap", 0)
-        running_culture += totals.get("culture", 0)
-        bap_data.append(running_bap)
-        hap_data.append(running_hap)
-        culture_data.append(running_culture)
+    series = bap_charts.member_cumulative(member, months)
+    bap_data = series["points"]
+    hap_data = series["hap_points"]
+    culture_data = series["cap_points"]
 
     datasets = [
         {
@@ -5265,17 +5217,21 @@ def notify_watchers_lot_selling_soon(lot, request_user=None, position=None):
     # Shared by both delivery paths so the "about to be sold" alert replaces the earlier
     # "coming up soon" one on the device instead of stacking a second alert.
     tag = f"lot_sell_notification_{lot.pk}"
+    watchers = list(watchers)
+    app_user_pks = {watch.user.pk for watch in watchers if user_has_app_push(watch.user)}
+    if app_user_pks:
+        # Every app watcher in one batch task rather than a task each.
+        enqueue_push_batch(
+            sorted(app_user_pks),
+            title=head,
+            body=body,
+            url=lot_url,
+            category=CATEGORY_LOT_SELLING,
+            collapse_key=tag,
+            auction_pk=lot.auction.pk,
+        )
     for watch in watchers:
-        if user_has_app_push(watch.user):
-            send_push_to_user.delay(
-                watch.user.pk,
-                title=head,
-                body=body,
-                url=lot_url,
-                category=CATEGORY_LOT_SELLING,
-                collapse_key=tag,
-                auction_pk=lot.auction.pk,
-            )
+        if watch.user.pk in app_user_pks:
             continue
         # does the user actually have a subscription?
         push_info = PushInformation.objects.filter(user=watch.user).first()
@@ -5926,6 +5882,7 @@ class CSVContactImportMixin:
     # A subclass implements:
     #   plan_row(self, row) -> dict|None        classify one CSV row (see action schema below)
     #   apply_action(self, action, decision) -> str   write one planned action, return a result tag
+    #   prepare_apply(self, actions)            optional; runs once, before the batch transaction opens
     #   import_done_url(self) / import_cancel_url(self)
     #   import_target_id(self)                  binds the token to its auction/club
     #   record_import_history(self, results, filename)
@@ -6113,14 +6070,13 @@ class CSVContactImportMixin:
         if not cache.add(claim_key, 1, self.PREVIEW_TTL_SECONDS):
             messages.info(self.request, "This import is already being processed.")
             return redirect(self.import_done_url())
-        results = {}
         try:
+            # Outside the batch's transaction, so anything it locks (a lot number reservation) is
+            # released before the rows are written rather than held until the last one is.
+            self.prepare_apply(payload["actions"])
             # Apply the whole batch atomically: if one row raises, nothing is half-written.
             with transaction.atomic():
-                for action in payload["actions"]:
-                    decision = post_data.get(f"decision_{action['i']}", "merge")
-                    tag = self.apply_action(action, decision)
-                    results[tag] = results.get(tag, 0) + 1
+                results = self.apply_actions(payload["actions"], post_data)
         except Exception:
             # The batch rolled back and wrote nothing; release the claim so the admin can retry the token.
             cache.delete(claim_key)
@@ -6131,6 +6087,20 @@ class CSVContactImportMixin:
         self.message_import_results(results)
         return redirect(self.import_done_url())
 
+    def prepare_apply(self, actions):
+        """Optional hook: set up for a batch of apply_action calls (e.g. reserve numbers). Runs before, not
+        inside, the batch's transaction. No-op by default."""
+
+    def apply_actions(self, actions, post_data):
+        """Write the whole batch and return {result tag: count}. Calls apply_action row by row; a view
+        that can write its rows in bulk overrides this instead."""
+        results = {}
+        for action in actions:
+            decision = post_data.get(f"decision_{action['i']}", "merge")
+            tag = self.apply_action(action, decision)
+            results[tag] = results.get(tag, 0) + 1
+        return results
+
     def record_import_history(self, results, filename=None):
         """Optional hook: write an audit/history entry after a confirmed import. No-op by default."""
 
@@ -6685,6 +6655,8 @@ class BulkAddLots(LoginRequiredMixin, AuctionViewMixin, TemplateView):
             # evidence about a lot, not about a save, so re-posting a row whose species was
             # cleared last week must not count a second time -- see record_choice.
             species_moved = {id(form.instance) for form in lot_formset.forms if "species" in form.changed_data}
+            # One reservation for every new row's lot number, rather than one per save_new_lot below.
+            number_new_lots([lot for lot in lots if not lot.pk], auction=self.auction, tos=self.tos)
             for lot in lots:
                 lot_is_new = not lot.pk
                 if lot_is_new:
@@ -7141,7 +7113,7 @@ class SaveLotAjax(APIView, AuctionViewMixin):
             if errors:
                 return JsonResponse({"success": False, "errors": errors})
 
-            # Save the lot - locking is handled in Lot.save() for both standard and seller_dash modes
+            # Save the lot - Lot.save() reserves its number for both standard and seller_dash modes
             lot.save()
 
             # The species half of the save, and only once the row has really been saved: a row that
@@ -7476,6 +7448,13 @@ class ImportLotsFromCSV(LoginRequiredMixin, CSVContactImportMixin, AuctionViewMi
         seller.save()
         return seller, True
 
+    def prepare_apply(self, actions):
+        # Every lot this import creates gets its number from one reservation, in row order. The
+        # reservation commits on its own, so the auction row is locked only while it bumps the
+        # sequence; if the import then rolls back, those numbers are skipped, never reused.
+        creates = sum(1 for action in actions if action["action"] in ("create", "duplicate"))
+        self._lot_numbers = collections.deque(self.auction.reserve_lot_numbers(creates) if creates else [])
+
     def _create_lot(self, fields, seller):
         new_lot = Lot(
             lot_name=fields.get("lot_name", ""),
@@ -7499,6 +7478,8 @@ class ImportLotsFromCSV(LoginRequiredMixin, CSVContactImportMixin, AuctionViewMi
             new_lot.user = owner
         if fields.get("category_id"):
             new_lot.species_category_id = fields["category_id"]
+        if getattr(self, "_lot_numbers", None):
+            new_lot.lot_number_int = self._lot_numbers.popleft()
         new_lot.save()
 
     def apply_action(self, action, decision):
@@ -7560,6 +7541,9 @@ class ViewLot(DetailView):
     custom_lot_number = None
     auction_slug = None
     enable_404 = True
+    # How long the images and description stay cached; they are keyed by Lot.render_stamp, so this
+    # only bounds how stale an automatically added image from another lot can get.
+    fragment_cache_seconds = 60 * 60
 
     def dispatch(self, request, *args, **kwargs):
         self.auction_slug = kwargs.pop("slug", None)
@@ -7613,9 +7597,12 @@ class ViewLot(DetailView):
         return qs
 
     def get_context_data(self, **kwargs):
-        lot = self.get_object()
+        lot = self.object
+        # high_bid, high_bidder, the bid box and the admin bid list all read lot.bids; look them up once
+        lot._prefetched_bids = list(lot.bids)
         context = super().get_context_data(**kwargs)
         context["domain"] = Site.objects.get_current().domain
+        context["lot_fragment_seconds"] = self.fragment_cache_seconds
         context["is_auction_admin"] = False
         if lot.auction:
             context["auction"] = lot.auction
@@ -8498,6 +8485,7 @@ class BidDelete(LoginRequiredMixin, DeleteView):
             user=bid.user,
             lot_number=lot,
         ).update(is_deleted=True)
+        bidder_metrics.recount(lot.auction_id, bid.user_id)
         LotHistory.objects.create(lot=lot, user=self.request.user, message=history_message, changed_price=True)
         return HttpResponseRedirect(success_url)
 
@@ -10571,9 +10559,24 @@ class SquarePaymentSuccessView(InvoiceNoLoginView):
         return context
 
 
+class LabelSheetResponse(WeasyTemplateResponse):
+    """A label PDF put together page by page from label_cache, rather than laid out all at once"""
+
+    @property
+    def rendered_content(self):
+        return label_cache.render_sheet(
+            self.resolve_template(self.template_name),
+            self.resolve_context(self.context_data),
+            request=self._request,
+            base_url=self.get_base_url(),
+        )
+
+
 class LotLabelView(TemplateView, WeasyTemplateResponseMixin, AuctionViewMixin):
     """View and print labels for an auction"""
 
+    response_class = LabelSheetResponse
+
     # these are defined in urls.py and used in get_object(), below
     bidder_number = None
     username = None
@@ -11043,7 +11046,12 @@ class UnprintedLotLabelsView(LotLabelView):
 class SingleLotLabelView(LotLabelView):
     """Reprint labels for just one lot"""
 
+    # Set (never from a URL) by the mobile label services to draw several lots of one auction at once
+    lots = None
+
     def get_queryset(self):
+        if self.lots is not None:
+            return Lot.objects.filter(pk__in=[lot.pk for lot in self.lots])
         return Lot.objects.filter(pk=self.lot.pk)
 
     def dispatch(self, request, *args, **kwargs):
@@ -11074,6 +11082,7 @@ class SingleLotLabelView(LotLabelView):
                     resolution=request.GET.get("resolution"),
                     dpi=request.GET.get("dpi"),
                     request=request,
+                    engine=request.GET.get("engine"),
                 )
             except ValueError:
                 logging.getLogger(__name__).warning(
@@ -11139,10 +11148,13 @@ class RemotePrintJobCancelView(RemotePrintJobMixin, View):
     """
 
     def post(self, request, job_uuid):
+        from auctions.mobile.services import remote_print
+
         job = self.get_job(request, job_uuid)
         if not job.is_terminal:
             job.status = RemotePrintJob.STATUS_CANCELLED
             job.save(update_fields=["status", "updated_at"])
+            remote_print.announce(job)
         return JsonResponse({"status": job.status})
 
 
@@ -11257,36 +11269,38 @@ class InvoiceBulkUpdateStatus(LoginRequiredMixin, TemplateView, FormMixin, Aucti
         # Set or clear invoice_notification_due based on new status
         if self.new_invoice_status in ("UNPAID", "PAID"):
             run_at = timezone.now() + timedelta(seconds=INVOICE_NOTIFICATION_DELAY_SECONDS)
-        for invoice in invoices:
-            # Core: change the status and save. Extras follow, each guarded.
-            if self.new_invoice_status in ("PAID", "UNPAID") and not invoice.renewal_needed:
+        # Book the ledger entries for every invoice together once the loop is done
+        with club_ledger.batch():
+            for invoice in invoices:
+                # Core: change the status and save. Extras follow, each guarded.
+                if self.new_invoice_status in ("PAID", "UNPAID") and not invoice.renewal_needed:
+                    try:
+                        _ensure_invoice_renewal_state(invoice)
+                    except Exception:
+                        logger.exception("Failed to ensure renewal state for invoice %s in bulk", invoice.pk)
                 try:
-                    _ensure_invoice_renewal_state(invoice)
+                    invoice.status = self.new_invoice_status
+                    invoice.invoice_notification_due = run_at
+                    invoice.save()
                 except Exception:
-                    logger.exception("Failed to ensure renewal state for invoice %s in bulk", invoice.pk)
-            try:
-                invoice.status = self.new_invoice_status
-                invoice.invoice_notification_due = run_at
-                invoice.save()
-            except Exception:
-                logger.exception("Failed to update invoice %s to %s in bulk", invoice.pk, self.new_invoice_status)
-                continue
-            try:
-                invoice.recalculate()
-            except Exception:
-                logger.exception("recalculate failed for invoice %s in bulk", invoice.pk)
-            if self.new_invoice_status == "PAID":
+                    logger.exception("Failed to update invoice %s to %s in bulk", invoice.pk, self.new_invoice_status)
+                    continue
                 try:
-                    _process_invoice_membership_renewal(invoice, acting_user=request.user)
+                    invoice.recalculate()
                 except Exception:
-                    logger.exception("membership renewal failed for invoice %s in bulk", invoice.pk)
-            try:
-                if run_at:
-                    schedule_invoice_notification(invoice.pk, run_at)
-                else:
-                    cancel_invoice_notification(invoice.pk)
-            except Exception:
-                logger.exception("schedule/cancel notification failed for invoice %s in bulk", invoice.pk)
+                    logger.exception("recalculate failed for invoice %s in bulk", invoice.pk)
+                if self.new_invoice_status == "PAID":
+                    try:
+                        _process_invoice_membership_renewal(invoice, acting_user=request.user)
+                    except Exception:
+                        logger.exception("membership renewal failed for invoice %s in bulk", invoice.pk)
+                try:
+                    if run_at:
+                        schedule_invoice_notification(invoice.pk, run_at)
+                    else:
+                        cancel_invoice_notification(invoice.pk)
+                except Exception:
+                    logger.exception("schedule/cancel notification failed for invoice %s in bulk", invoice.pk)
         action = f"Set {invoices.count()} invoices from {self.old_status_display} to {self.new_status_display}"
         try:
             self.auction.create_history(
@@ -12791,7 +12805,7 @@ class MailchimpAudienceSelectView(LoginRequiredMixin, ClubViewMixin, View):
         mc.ensure_merge_fields(club)
         mc.ensure_segments(club)
         mc.ensure_webhook(club)
-        count = mc.backfill(club)
+        count = mc.backfill(club, force=True)
 
         ClubHistory.objects.create(
             club=club,
@@ -12827,7 +12841,7 @@ class MailchimpSyncNowView(LoginRequiredMixin, ClubViewMixin, View):
         if not club.mailchimp_connected:
             messages.error(request, "Mailchimp is not connected.")
             return redirect(config_url)
-        count = mc.backfill(club)
+        count = mc.backfill(club, force=True)
         messages.success(request, f"Queued {count} member(s) for syncing to Mailchimp.")
         return redirect(config_url)
 
@@ -13639,7 +13653,7 @@ class BrevoListSelectView(LoginRequiredMixin, ClubViewMixin, View):
 
         brevo.ensure_attributes(club)
         brevo.ensure_webhook(club)
-        count = brevo.backfill(club)
+        count = brevo.backfill(club, force=True)
 
         ClubHistory.objects.create(
             club=club,
@@ -13674,7 +13688,7 @@ class BrevoSyncNowView(LoginRequiredMixin, ClubViewMixin, View):
         if not club.brevo_connected:
             messages.error(request, "Brevo is not connected.")
             return redirect(config_url)
-        count = brevo.backfill(club)
+        count = brevo.backfill(club, force=True)
         messages.success(request, f"Queued {count} member(s) for syncing to Brevo.")
         return redirect(config_url)
 
@@ -15482,11 +15496,10 @@ class AdminTrafficJSON(AdminOnlyViewMixin, BaseLineChartView):
 
     def get_data(self):
         timeframe = timezone.now() - timedelta(days=self.bins)
-        views = PageView.objects.filter(date_start__gte=timeframe).order_by("-date_start")
 
         # what follows is a delightful reminder of how important a consistent naming scheme is
         return [
-            bin_data(views, "date_start", self.bins, timeframe, timezone.now())[::-1],
+            page_view_rollups.binned(Q(), Q(), self.bins, timeframe, timezone.now())[::-1],
         ]
 
 
@@ -15510,16 +15523,9 @@ class AdminTrafficTimeOfDayJSON(AdminOnlyViewMixin, BaseLineChartView):
 
     def get_data(self):
         timeframe = timezone.now() - timedelta(days=self.bins)
-        counts = (
-            PageView.objects.filter(date_start__gte=timeframe)
-            .annotate(hour=ExtractHour("date_start", tzinfo=timezone.get_current_timezone()))
-            .annotate(dow=ExtractIsoWeekDay("date_start", tzinfo=timezone.get_current_timezone()))
-            .values("dow", "hour")
-            .annotate(count=Count("pk"))
-        )
         grid = [[0] * 24 for _ in range(7)]
-        for row in counts:
-            grid[row["dow"] - 1][row["hour"]] += row["count"]
+        for (dow, hour), views in page_view_rollups.by_weekday_and_hour(timeframe).items():
+            grid[dow - 1][hour] += views
         return grid
 
 
@@ -16299,7 +16305,7 @@ class AuctionCategoriesChartData(AuctionChartView):
             Category.objects.filter(lot__auction=self.auction).annotate(num_lots=Count("lot")).order_by("-num_lots")
         )
         lot_count = self.auction.lots_qs.count()
-        allViews = PageView.objects.filter(lot_number__auction=self.auction).count()
+        allViews = page_view_rollups.count(Q(lot__auction=self.auction), Q(lot_number__auction=self.auction))
         allBids = Bid.objects.exclude(is_deleted=True).filter(lot_number__auction=self.auction).count()
         allVolume = (
             Lot.objects.exclude(is_deleted=True)
@@ -16309,10 +16315,10 @@ class AuctionCategoriesChartData(AuctionChartView):
         if lot_count:
             for category in categories[: self.number_of_categories_to_show]:
                 labels.append(str(category))
-                thisViews = PageView.objects.filter(
-                    lot_number__auction=self.auction,
-                    lot_number__species_category=category,
-                ).count()
+                thisViews = page_view_rollups.count(
+                    Q(lot__auction=self.auction, lot__species_category=category),
+                    Q(lot_number__auction=self.auction, lot_number__species_category=category),
+                )
                 thisBids = (
                     Bid.objects.exclude(is_deleted=True)
                     .filter(
@@ -16433,7 +16439,6 @@ class AuctionStatsActivityJSONView(BaseLineChartView, AuctionStatsPermissionsMix
             data = self.auction.cached_stats["activity"]["data"]
         else:
             # Fallback to original calculation if cache is not available
-            views = PageView.objects.filter(Q(auction=self.auction) | Q(lot_number__auction=self.auction))
             joins = AuctionTOS.objects.filter(auction=self.auction)
             new_lots = Lot.objects.filter(auction=self.auction)
             searches = SearchHistory.objects.filter(auction=self.auction)
@@ -16441,7 +16446,9 @@ class AuctionStatsActivityJSONView(BaseLineChartView, AuctionStatsPermissionsMix
             watches = Watch.objects.filter(lot_number__auction=self.auction)
 
             data = [
-                bin_data(views, "date_start", self.bins, self.date_start, self.date_end),
+                page_view_rollups.binned(
+                    *page_view_rollups.for_auction(self.auction), self.bins, self.date_start, self.date_end
+                ),
                 bin_data(joins, "createdon", self.bins, self.date_start, self.date_end),
                 bin_data(new_lots, "date_posted", self.bins, self.date_start, self.date_end),
                 bin_data(searches, "createdon", self.bins, self.date_start, self.date_end),
@@ -16718,14 +16725,7 @@ class AuctionStatsReferrersJSONView(AuctionStatsBarChartJSONView):
             return self.auction.cached_stats["referrers"]["labels"]
 
         # Fallback to original calculation
-        self.views = (
-            PageView.objects.filter(Q(auction=self.auction) | Q(lot_number__auction=self.auction))
-            .exclude(referrer__isnull=True)
-            .exclude(referrer__startswith=Site.objects.get_current().domain)
-            .exclude(referrer__exact="")
-            .values("referrer")
-            .annotate(count=Count("referrer"))
-        )
+        self.views = page_view_rollups.referrers(self.auction, Site.objects.get_current().domain)
         result = []
         for view in self.views:
             if view["count"] > 1:
@@ -21627,6 +21627,8 @@ class ClubMemberMergeView(LoginRequiredMixin, ClubViewMixin, View):
                     InvoicePayment.objects.filter(club_member=source).update(club_member=target)
                     source.is_deleted = True
                     source.save(update_fields=["is_deleted"])
+                    # the awards just moved; the target's totals and chart rows have to follow
+                    BapAward.recalculate_member_points(target)
                     ClubHistory.objects.create(
                         club=self.club,
                         user=request.user,
@@ -23128,9 +23130,9 @@ class ClubTreasurerReportView(LoginRequiredMixin, ClubViewMixin, TemplateView):
     def _filtered_entries(self, start_date, end_date):
         return ClubMoney.objects.filter(club=self.club, date__range=(start_date, end_date)).order_by("-date", "-pk")
 
-    def _money_sum(self, queryset, **filters):
-        total = queryset.filter(**filters).aggregate(total=Sum("amount"))["total"]
-        return total or Decimal("0.00")
+    def _money_sum(self, entries, category):
+        # entries is the period's list, already loaded for the table
+        return sum((entry.amount for entry in entries if entry.category == category), Decimal("0.00"))
 
     def _outstanding_invoices(self, start_date, end_date):
         """Auction invoices from the period that still owe the club money.
@@ -23210,11 +23212,8 @@ class ClubTreasurerReportView(LoginRequiredMixin, ClubViewMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         filter_form, start_date, end_date = self._get_filter_form()
-        entries_qs = self._filtered_entries(start_date, end_date)
-        entries = list(entries_qs)
-        current_balance = ClubMoney.objects.filter(club=self.club).aggregate(total=Sum("amount"))["total"] or Decimal(
-            "0.00"
-        )
+        entries = list(self._filtered_entries(start_date, end_date))
+        current_balance = club_ledger.balance(self.club)
         currency_symbol = self._club_currency_symbol()
         context.update(
             {
@@ -23223,7 +23222,7 @@ class ClubTreasurerReportView(LoginRequiredMixin, ClubViewMixin, TemplateView):
                 "start_date": start_date,
                 "end_date": end_date,
                 "report_entries": entries,
-                "report_summary": self._report_summary(entries_qs, start_date, end_date),
+                "report_summary": self._report_summary(entries, start_date, end_date),
                 "club_money_form": ClubMoneyForm(
                     initial={"date": timezone.localdate()},
                     category_choices=self._manual_category_choices(),
@@ -23257,8 +23256,10 @@ class ClubTreasurerReportExportView(LoginRequiredMixin, ClubViewMixin, View):
         response["Content-Disposition"] = f'attachment; filename="{self.club.slug}-treasurer-report.csv"'
         writer = csv.writer(response)
         writer.writerow(["date", "amount", "description", "category"])
-        for entry in ClubMoney.objects.filter(club=self.club, date__range=(start_date, end_date)).order_by(
-            "date", "pk"
+        for entry in (
+            ClubMoney.objects.filter(club=self.club, date__range=(start_date, end_date))
+            .order_by("date", "pk")
+            .iterator(chunk_size=2000)
         ):
             writer.writerow([entry.date.isoformat(), entry.amount, entry.description, entry.category])
         return response
@@ -23297,9 +23298,7 @@ class ClubMoneyCreateView(LoginRequiredMixin, ClubViewMixin, View):
             {
                 "ok": True,
                 "message": f"Saved {entry.get_category_display()} record.",
-                "current_balance": str(
-                    ClubMoney.objects.filter(club=self.club).aggregate(total=Sum("amount"))["total"] or Decimal("0.00")
-                ),
+                "current_balance": str(club_ledger.balance(self.club)),
                 "entry": {
                     "date": str(entry.date),
                     "amount": str(entry.amount),
@@ -23324,9 +23323,7 @@ class ClubMoneyBalanceView(LoginRequiredMixin, ClubViewMixin, View):
         form = ClubMoneyBalanceForm(request.POST)
         if not form.is_valid():
             return JsonResponse({"ok": False, "errors": form.errors}, status=400)
-        current_balance = ClubMoney.objects.filter(club=self.club).aggregate(total=Sum("amount"))["total"] or Decimal(
-            "0.00"
-        )
+        current_balance = club_ledger.balance(self.club)
         account_balance = form.cleaned_data["account_balance"]
         adjustment = account_balance - current_balance
         if adjustment:
@@ -23352,9 +23349,7 @@ class ClubMoneyBalanceView(LoginRequiredMixin, ClubViewMixin, View):
                     if adjustment
                     else "Books already matched the supplied account balance. No adjustment was created."
                 ),
-                "current_balance": str(
-                    ClubMoney.objects.filter(club=self.club).aggregate(total=Sum("amount"))["total"] or Decimal("0.00")
-                ),
+                "current_balance": str(club_ledger.balance(self.club)),
             }
         )
 
@@ -23413,9 +23408,11 @@ class ClubMemberCSVImportView(LoginRequiredMixin, CSVContactImportMixin, ClubVie
             return f"{label} ({member.email})"
         return label
 
-    @staticmethod
-    def _to_date(value):
-        return date_type.fromisoformat(value) if value else None
+    def _member_index(self):
+        """The club's members, loaded once for every row of the preview (see member_import)."""
+        if getattr(self, "member_index", None) is None:
+            self.member_index = member_import.MemberIndex.for_club(self.club)
+        return self.member_index
 
     def _parse_member_row(self, row):
         """Extract + normalize one CSV row into the member fields dict (dates as ISO strings for caching)."""
@@ -23461,7 +23458,7 @@ class ClubMemberCSVImportView(LoginRequiredMixin, CSVContactImportMixin, ClubVie
         if not email and not name:
             return {**base, "action": "skip", "reason": "Row has no name or email"}
         if email:
-            existing = self.club.find_member(email=email)
+            existing = self._member_index().find(email=email)
             if existing:
                 return {
                     **base,
@@ -23472,7 +23469,7 @@ class ClubMemberCSVImportView(LoginRequiredMixin, CSVContactImportMixin, ClubVie
                     "reason": "Matched an existing member by email",
                 }
         if name:
-            existing = self.club.find_member(name=name)
+            existing = self._member_index().find(name=name)
             if existing:
                 return {
                     **base,
@@ -23484,83 +23481,9 @@ class ClubMemberCSVImportView(LoginRequiredMixin, CSVContactImportMixin, ClubVie
                 }
         return {**base, "action": "create", "reason": ""}
 
-    def _create_member(self, fields):
-        member = ClubMember.objects.create(
-            club=self.club,
-            email=fields.get("email", ""),
-            name=fields.get("name", ""),
-            phone_number=fields.get("phone", ""),
-            address=fields.get("address", ""),
-            memo=fields.get("memo", ""),
-            discord_id=fields.get("discord_id") or None,
-            contact_status=fields.get("contact_status") or "contact",
-            membership_last_paid=self._to_date(fields.get("membership_last_paid")),
-            membership_expiration_date=self._to_date(fields.get("membership_expiration_date")),
-            send_welcome_email=False,
-            welcome_email_sent=True,
-            source="csv",
-            added_by=self.request.user,
-            is_deleted=fields.get("mark_deleted", False),
-        )
-        date_joined = self._to_date(fields.get("date_joined"))
-        if date_joined is not None:
-            ClubMember.objects.filter(pk=member.pk).update(createdon=date_joined)
-        return member
-
-    def _update_member(self, member, fields):
-        """Apply CSV fields onto an existing member. Only overwrites with non-empty values so a merge of a
-        sparse walk-in row never blanks existing contact details."""
-        # An admin importing their roster owns these rows now; the account-deletion rules follow.
-        member.admin_edited = True
-        if fields.get("name"):
-            member.name = fields["name"]
-        if fields.get("phone"):
-            member.phone_number = fields["phone"]
-        if fields.get("address"):
-            member.address = fields["address"]
-        if fields.get("memo"):
-            member.memo = fields["memo"]
-        if fields.get("discord_id"):
-            member.discord_id = fields["discord_id"]
-        if fields.get("contact_status") is not None:
-            member.contact_status = fields["contact_status"]
-        if fields.get("mark_deleted"):
-            member.is_deleted = True
-        if fields.get("email") and not member.email:
-            member.email = fields["email"]
-        last_paid = self._to_date(fields.get("membership_last_paid"))
-        if last_paid is not None:
-            member.membership_last_paid = last_paid
-        expiration = self._to_date(fields.get("membership_expiration_date"))
-        if expiration is not None:
-            member.membership_expiration_date = expiration
-        member.save()
-        date_joined = self._to_date(fields.get("date_joined"))
-        if date_joined is not None:
-            ClubMember.objects.filter(pk=member.pk).update(createdon=date_joined)
-
-    def apply_action(self, action, decision):
-        kind = action["action"]
-        if kind == "skip":
-            return "skipped"
-        fields = action.get("fields", {})
-        target_pk = action.get("target_pk")
-        if kind == "create" or (kind == "duplicate" and decision == "create"):
-            member = self._create_member(fields)
-            if kind == "duplicate" and target_pk:
-                ClubMember.objects.filter(pk=member.pk).update(possible_duplicate=target_pk)
-                ClubMember.objects.filter(pk=target_pk, possible_duplicate__isnull=True).update(
-                    possible_duplicate=member.pk
-                )
-            return "created"
-        member = (
-            ClubMember.objects.filter(pk=target_pk, club=self.club, is_deleted=False).first() if target_pk else None
-        )
-        if not member:
-            self._create_member(fields)
-            return "created"
-        self._update_member(member, fields)
-        return "updated" if kind == "update" else "merged"
+    def apply_actions(self, actions, post_data):
+        decisions = {action["i"]: post_data.get(f"decision_{action['i']}", "merge") for action in actions}
+        return member_import.import_members(self.club, actions, decisions, added_by=self.request.user)
 
     def record_import_history(self, results, filename=None):
         parts = []
@@ -0,0 +1,195 @@
+"""Change-detected, concurrent refresh of members' Google and Apple Wallet passes.
+
+A club rename, a new icon, or the daily run for lapsed memberships used to touch every member's
+pass one request at a time, and the first failure stopped the rest. Here each member's
+pass-visible content is hashed and compared with the hash stored when their pass was last
+delivered (ClubMember.google_wallet_fingerprint / apple_pass_fingerprint), so only passes that
+would actually look different are sent. Those go out from a small thread pool over each
+provider's shared client (a keep-alive session for Google, the HTTP/2 APNs connection for Apple)
+under a per-provider rate limit.
+
+Worker threads only do HTTP; everything that reads or writes the database happens on the calling
+thread. A member whose request fails doesn't hold up anyone else: their pk comes back to the
+caller, whose per-member task retries it on its own.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import requests
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Google Wallet's default per-project quota is 20 requests a second; stay under it so a big
+# club's refresh doesn't start collecting 429s.
+GOOGLE_WALLET_MAX_PER_SECOND = 15
+GOOGLE_WALLET_WORKERS = 8
+# APNs doesn't publish a limit, but one HTTP/2 connection is meant for many concurrent streams.
+APNS_MAX_PER_SECOND = 200
+APNS_WORKERS = 16
+
+
+class RateLimiter:
+    """Spaces calls from any number of threads at least 1/per_second apart."""
+
+    def __init__(self, per_second):
+        self.interval = 1 / per_second
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _digest(value) -> str:
+    return hashlib.blake2b(json.dumps(value, sort_keys=True, default=str).encode(), digest_size=8).hexdigest()
+
+
+def apple_pass_fingerprint(member) -> str:
+    """Digest of everything on the member's .pkpass that comes from our data (see _build_pass_json)."""
+    club = member.club
+    member_name = member.name or (member.user.get_full_name() or member.user.username if member.user else "Member")
+    return _digest(
+        [
+            club.name,
+            club.icon.name if club.icon else "",
+            club.show_member_barcode,
+            member_name,
+            member.membership_number,
+            member.wallet_status_text,
+            member.wallet_status_is_expired,
+            member.is_deleted,
+        ]
+    )
+
+
+def _run_concurrently(items, send, *, workers, per_second):
+    """Call send(item) for every item from a thread pool; returns [(item, result, exception)]."""
+    limiter = RateLimiter(per_second)
+
+    def paced(item):
+        limiter.wait()
+        return send(item)
+
+    outcomes = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(paced, item) for item in items]
+        for item, future in zip(items, futures, strict=True):
+            try:
+                outcomes.append((item, future.result(), None))
+            except (requests.RequestException, httpx.HTTPError) as e:
+                outcomes.append((item, None, e))
+    return outcomes
+
+
+def refresh_google_objects(members, *, force=False) -> list[int]:
+    """PATCH the Google Wallet object of every member whose pass content changed.
+
+    Returns the pks of members whose PATCH failed; their stored fingerprint is left alone so a
+    retry sends them again. A 404 (the member never saved the pass) counts as delivered: when
+    they do save it, the save-to-wallet link carries the current content anyway.
+    """
+    from auctions.google_wallet import generic_object_patch_body, patch_generic_object
+    from auctions.models import ClubMember
+
+    pending = []
+    for member in members:
+        body = generic_object_patch_body(member)
+        fingerprint = _digest(body)
+        if force or fingerprint != member.google_wallet_fingerprint:
+            pending.append((member, body, fingerprint))
+    if not pending:
+        return []
+
+    started = time.monotonic()
+    outcomes = _run_concurrently(
+        pending,
+        lambda item: patch_generic_object(item[0], item[1]),
+        workers=GOOGLE_WALLET_WORKERS,
+        per_second=GOOGLE_WALLET_MAX_PER_SECOND,
+    )
+    delivered = []
+    failed = []
+    for (member, _body, fingerprint), _result, error in outcomes:
+        if error is not None:
+            logger.error("Google Wallet object refresh failed for member=%s: %s", member.pk, error)
+            failed.append(member.pk)
+            continue
+        member.google_wallet_fingerprint = fingerprint
+        delivered.append(member)
+    ClubMember.objects.bulk_update(delivered, ["google_wallet_fingerprint"])
+    logger.info(
+        "Google Wallet refresh: %s changed pass(es), %s failed, %.1fs",
+        len(pending),
+        len(failed),
+        time.monotonic() - started,
+    )
+    return failed
+
+
+def push_apple_updates(members, *, force=False) -> list[int]:
+    """Bump and push the Apple pass of every member whose pass content changed.
+
+    The apple_pass_updated bump (what makes the web service serve the new pass) happens for
+    every changed member whether or not they have a registered device, as in
+    notify_apple_wallet_devices_for_member. Returns the pks of members with a push that failed
+    transiently; dead tokens are dropped and don't count as failures.
+    """
+    from auctions.apple_wallet import handle_pass_update_response, push_pass_update
+    from auctions.models import AppleDeviceRegistration, ClubMember
+
+    changed = {}
+    for member in members:
+        fingerprint = apple_pass_fingerprint(member)
+        if force or fingerprint != member.apple_pass_fingerprint:
+            changed[member.pk] = (member, fingerprint)
+    if not changed:
+        return []
+
+    started = time.monotonic()
+    ClubMember.objects.filter(pk__in=changed).update(apple_pass_updated=timezone.now())
+    registrations = list(AppleDeviceRegistration.objects.filter(member_id__in=changed))
+    outcomes = _run_concurrently(
+        registrations,
+        lambda registration: push_pass_update(registration.push_token),
+        workers=APNS_WORKERS,
+        per_second=APNS_MAX_PER_SECOND,
+    )
+    failed = set()
+    for registration, response, error in outcomes:
+        if error is None:
+            try:
+                handle_pass_update_response(registration, response)
+            except httpx.HTTPError as e:
+                error = e
+        if error is not None:
+            logger.error("APNs pass update failed for member=%s: %s", registration.member_id, error)
+            failed.add(registration.member_id)
+
+    delivered = []
+    for pk, (member, fingerprint) in changed.items():
+        if pk not in failed:
+            member.apple_pass_fingerprint = fingerprint
+            delivered.append(member)
+    ClubMember.objects.bulk_update(delivered, ["apple_pass_fingerprint"])
+    logger.info(
+        "Apple Wallet refresh: %s changed pass(es), %s push(es), %s failed member(s), %.1fs",
+        len(changed),
+        len(registrations),
+        len(failed),
+        time.monotonic() - started,
+    )
+    return sorted(failed)
@@ -33,6 +33,11 @@ app.conf.beat_schedule = {
         "task": "auctions.tasks.endauctions",
         "schedule": 60.0,  # Run every minute
     },
+    # Member Mailchimp/Brevo/Wallet syncs whose coalescing window is up (auctions/sync_outbox.py) - every 30 seconds
+    "drain_sync_outbox": {
+        "task": "auctions.tasks.drain_sync_outbox",
+        "schedule": 30.0,  # Run every 30 seconds
+    },
     # Send notifications about watched items - every 15 minutes
     "sendnotifications": {
         "task": "auctions.tasks.sendnotifications",
@@ -106,6 +111,16 @@ app.conf.beat_schedule = {
         "task": "auctions.tasks.deduplicate_user_interest",
         "schedule": 86400.0,  # Run every 24 hours
     },
+    # Recount the keyword -> category table guess_category() uses - every 24 hours
+    "rebuild_category_keywords": {
+        "task": "auctions.tasks.rebuild_category_keywords",
+        "schedule": 86400.0,  # Run every 24 hours
+    },
+    # Recount the bid/view counts behind the auction users trust sort - every 24 hours
+    "reconcile_bidder_metrics": {
+        "task": "auctions.tasks.reconcile_bidder_metrics",
+        "schedule": 86400.0,  # Run every 24 hours
+    },
     # Clean up old invoice notification tasks - every 24 hours
     "cleanup_old_invoice_notification_tasks": {
         "task": "auctions.tasks.cleanup_old_invoice_notification_tasks",
@@ -141,6 +156,21 @@ app.conf.beat_schedule = {
         "task": "auctions.tasks.cleanup_mail",
         "schedule": 86400.0,  # Run every 24 hours
     },
+    # Move LotHistory of lots that ended over settings.LOT_HISTORY_ARCHIVE_DAYS ago to the archive - every 24 hours
+    "archive_lot_history": {
+        "task": "auctions.tasks.archive_lot_history",
+        "schedule": 86400.0,  # Run every 24 hours
+    },
+    # Carry on with account merges, deletions and purges that stopped partway - every 30 minutes
+    "resume_account_jobs": {
+        "task": "auctions.tasks.resume_account_jobs",
+        "schedule": 1800.0,  # Run every 30 minutes
+    },
+    # Add finished hours of PageView to PageViewRollup, prune raw views past settings.PAGEVIEW_RETENTION_DAYS - every hour
+    "rollup_page_views": {
+        "task": "auctions.tasks.rollup_page_views",
+        "schedule": 3600.0,  # Run every hour
+    },
     # Move one local image to Cloudflare Images - every minute (no-op unless CLOUDFLARE_IMAGES_* is set in .env)
     "migrate_to_cloudflare_images": {
         "task": "auctions.tasks.migrate_to_cloudflare_images",
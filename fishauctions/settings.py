@@ -300,6 +300,7 @@ MIDDLEWARE = [
     # "debug_toolbar.middleware.DebugToolbarMiddleware", # see line 170 above
     "django.middleware.security.SecurityMiddleware",
     "auctions.middleware.MobileAppMiddleware",  # Sets request.is_mobile_app from the User-Agent
+    "auctions.middleware.RequestCacheMiddleware",  # Remembers permission/TOS lookups for one request
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -519,6 +520,14 @@ POST_OFFICE = {
 # Long enough to answer "did the site email me?" and to investigate a bounce; see
 # auctions.tasks.cleanup_mail, which runs daily.
 MAIL_RETENTION_DAYS = int(os.environ.get("MAIL_RETENTION_DAYS", "30"))
+# Chat and bid history of lots that ended longer ago than this is moved out of LotHistory into
+# LotHistoryArchive; see auctions/history_archive.py.  Keep it well past 90 days, after which an
+# auction's stats (which count LotHistory) are no longer recalculated.
+LOT_HISTORY_ARCHIVE_DAYS = int(os.environ.get("LOT_HISTORY_ARCHIVE_DAYS", "365"))
+# Raw PageView rows older than this are deleted once they've been added to the PageViewRollup table
+# (auctions/page_view_rollups.py).  Anything that still needs individual views -- unique visitors,
+# the admin traffic pages, bidder metrics -- only sees this far back.
+PAGEVIEW_RETENTION_DAYS = int(os.environ.get("PAGEVIEW_RETENTION_DAYS", "365"))
 # django-ses configuration
 AWS_SES_AUTO_THROTTLE = 0.5
 AWS_ACCESS_KEY_ID = os.environ.get("AWS_ACCESS_KEY_ID", "")